@@ -21,6 +21,7 @@ from .zones import (
     ZoneTouch,
     SupportResistanceZone,
     SupportResistanceDetector,
+    ZoneIndex,
 )
 
 from .confluence import (
@@ -40,6 +41,11 @@ from .signals import (
     generate_signal,
 )
 
+from .scanner import (
+    SignalScanner,
+    ScanResult,
+)
+
 __all__ = [
     # Candle patterns
     "CandlePatternType",
@@ -52,6 +58,7 @@ __all__ = [
     "ZoneTouch",
     "SupportResistanceZone",
     "SupportResistanceDetector",
+    "ZoneIndex",
     # Multi-timeframe confluence
     "ConfluenceSignal",
     "TimeframeAnalysis",
@@ -65,4 +72,7 @@ __all__ = [
     "TradeLevels",
     "MinimumRR",
     "generate_signal",
+    # Multi-symbol scanning
+    "SignalScanner",
+    "ScanResult",
 ]
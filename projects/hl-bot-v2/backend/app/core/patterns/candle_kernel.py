@@ -0,0 +1,403 @@
+"""Vectorized candle pattern kernel.
+
+Evaluates every CandlePatternDetector rule over whole OHLC arrays at once,
+producing a boolean mask and a strength array per pattern type. DetectedPattern
+objects are only built for the candle indices a caller asks for, so scanning
+the last few candles of a long window costs one set of array operations
+instead of a dozen Python method calls per candle.
+
+Descriptions and metadata come from ``PATTERN_FORMATS`` in ``candles.py``.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.market.data import Candle
+from app.core.patterns.candles import (
+    CandlePatternType,
+    DetectedPattern,
+    PatternSignal,
+    build_pattern,
+)
+
+
+def candles_to_ohlc(candles: Sequence[Candle]) -> Dict[str, np.ndarray]:
+    """Convert candles to contiguous float64 OHLC arrays.
+
+    Args:
+        candles: Candles in chronological order
+
+    Returns:
+        Dict with "open", "high", "low" and "close" arrays
+    """
+    count = len(candles)
+    return {
+        "open": np.fromiter((c.open for c in candles), dtype=np.float64, count=count),
+        "high": np.fromiter((c.high for c in candles), dtype=np.float64, count=count),
+        "low": np.fromiter((c.low for c in candles), dtype=np.float64, count=count),
+        "close": np.fromiter((c.close for c in candles), dtype=np.float64, count=count),
+    }
+
+
+class CandlePatternKernel:
+    """Batch evaluation of all candle pattern rules over OHLC arrays.
+
+    Example:
+        >>> kernel = CandlePatternKernel.from_candles(candles)
+        >>> kernel.masks[CandlePatternType.HAMMER].sum()
+        >>> recent = kernel.patterns(kernel.last_indices(10))
+    """
+
+    def __init__(
+        self,
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        wick_threshold: float = 0.3,
+        body_threshold: float = 0.6,
+        engulfing_threshold: float = 0.95,
+        doji_threshold: float = 0.1,
+    ):
+        """Compute pattern masks and strengths for the given OHLC arrays.
+
+        Args:
+            open_: Open prices
+            high: High prices
+            low: Low prices
+            close: Close prices
+            wick_threshold: Same as CandlePatternDetector.wick_threshold
+            body_threshold: Same as CandlePatternDetector.body_threshold
+            engulfing_threshold: Same as CandlePatternDetector.engulfing_threshold
+            doji_threshold: Same as CandlePatternDetector.doji_threshold
+        """
+        o = np.asarray(open_, dtype=np.float64)
+        h = np.asarray(high, dtype=np.float64)
+        l = np.asarray(low, dtype=np.float64)
+        c = np.asarray(close, dtype=np.float64)
+        if not (len(o) == len(h) == len(l) == len(c)):
+            raise ValueError("OHLC arrays must have the same length")
+
+        self.size = len(o)
+
+        # Candle metrics (same formulas as the Candle properties)
+        body_low = np.minimum(o, c)
+        body_high = np.maximum(o, c)
+        self.total_range = h - l
+        self.body_size = np.abs(c - o)
+        self.bullish = c > o
+        self.bearish = c < o
+
+        valid = self.total_range != 0
+        denominator = np.where(valid, self.total_range, 1.0)
+        self.body_ratio = self.body_size / denominator
+        self.upper_wick_ratio = (h - body_high) / denominator
+        self.lower_wick_ratio = (body_low - l) / denominator
+
+        body_r = self.body_ratio
+        up_r = self.upper_wick_ratio
+        lo_r = self.lower_wick_ratio
+
+        masks: Dict[CandlePatternType, np.ndarray] = {}
+        strengths: Dict[CandlePatternType, np.ndarray] = {}
+
+        # LE candle
+        masks[CandlePatternType.LE_CANDLE] = (
+            valid & (body_r > body_threshold) & (up_r < 0.2) & (lo_r < 0.2)
+        )
+        strengths[CandlePatternType.LE_CANDLE] = np.minimum(body_r, 1.0)
+
+        # Small wick
+        min_wick = np.minimum(up_r, lo_r)
+        masks[CandlePatternType.SMALL_WICK] = valid & (min_wick < 0.1)
+        strengths[CandlePatternType.SMALL_WICK] = 1.0 - min_wick
+
+        # Steeper wick (upper rejection takes precedence)
+        self.steeper_upper = valid & (up_r > 0.5)
+        masks[CandlePatternType.STEEPER_WICK] = self.steeper_upper | (valid & (lo_r > 0.5))
+        strengths[CandlePatternType.STEEPER_WICK] = np.where(
+            self.steeper_upper, np.minimum(up_r, 1.0), np.minimum(lo_r, 1.0)
+        )
+
+        # Celery
+        masks[CandlePatternType.CELERY] = (
+            valid & (body_r < 0.2) & (up_r > wick_threshold) & (lo_r > wick_threshold)
+        )
+        strengths[CandlePatternType.CELERY] = (
+            (1.0 - np.abs(up_r - lo_r)) + (1.0 - (body_r / 0.2))
+        ) / 2
+
+        # Doji
+        masks[CandlePatternType.DOJI] = valid & (body_r < doji_threshold)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            strengths[CandlePatternType.DOJI] = 1.0 - (body_r / doji_threshold)
+
+        # Hammer family - first matching rule wins
+        small_body = valid & ~(body_r > 0.3)
+        hammer = small_body & (lo_r > 0.6) & (up_r <= 0.15)
+        shooting_star = small_body & ~hammer & (up_r > 0.6) & (lo_r <= 0.15)
+        taken = hammer | shooting_star
+        inverted_hammer = small_body & ~taken & (up_r > 0.5) & (lo_r < 0.2) & (body_r < 0.2)
+        taken = taken | inverted_hammer
+        hanging_man = small_body & ~taken & (lo_r > 0.5) & (up_r < 0.2) & (body_r < 0.2)
+        masks[CandlePatternType.HAMMER] = hammer
+        masks[CandlePatternType.SHOOTING_STAR] = shooting_star
+        masks[CandlePatternType.INVERTED_HAMMER] = inverted_hammer
+        masks[CandlePatternType.HANGING_MAN] = hanging_man
+        strengths[CandlePatternType.HAMMER] = np.minimum(lo_r, 1.0)
+        strengths[CandlePatternType.SHOOTING_STAR] = np.minimum(up_r, 1.0)
+        strengths[CandlePatternType.INVERTED_HAMMER] = np.minimum(up_r, 1.0)
+        strengths[CandlePatternType.HANGING_MAN] = np.minimum(lo_r, 1.0)
+
+        # Pin bars
+        pin_body = valid & ~(body_r > 0.25)
+        pin_bullish = pin_body & (lo_r > 0.65) & (lo_r > (up_r * 3))
+        pin_bearish = pin_body & ~pin_bullish & (up_r > 0.65) & (up_r > (lo_r * 3))
+        masks[CandlePatternType.PIN_BAR_BULLISH] = pin_bullish
+        masks[CandlePatternType.PIN_BAR_BEARISH] = pin_bearish
+        strengths[CandlePatternType.PIN_BAR_BULLISH] = np.minimum(lo_r, 1.0)
+        strengths[CandlePatternType.PIN_BAR_BEARISH] = np.minimum(up_r, 1.0)
+
+        # Strong directional
+        strong = valid & (body_r > 0.7)
+        masks[CandlePatternType.STRONG_BULLISH] = strong & self.bullish
+        masks[CandlePatternType.STRONG_BEARISH] = strong & ~self.bullish
+        strengths[CandlePatternType.STRONG_BULLISH] = np.minimum(body_r, 1.0)
+        strengths[CandlePatternType.STRONG_BEARISH] = strengths[CandlePatternType.STRONG_BULLISH]
+
+        # Two-candle patterns, aligned so element i compares candle i with i-1
+        self.has_previous_body = np.zeros(self.size, dtype=bool)
+        self.has_previous_range = np.zeros(self.size, dtype=bool)
+        self.coverage = np.zeros(self.size, dtype=np.float64)
+        self.size_ratio = np.zeros(self.size, dtype=np.float64)
+        bullish_engulfing = np.zeros(self.size, dtype=bool)
+        bearish_engulfing = np.zeros(self.size, dtype=bool)
+        inside_bar = np.zeros(self.size, dtype=bool)
+        outside_bar = np.zeros(self.size, dtype=bool)
+
+        if self.size >= 2:
+            prev_body = self.body_size[:-1]
+            prev_range = self.total_range[:-1]
+            self.has_previous_body[1:] = prev_body > 0
+            self.has_previous_range[1:] = prev_range > 0
+            self.coverage[1:] = self.body_size[1:] / np.where(prev_body > 0, prev_body, 1.0)
+            self.coverage[1:][~(prev_body > 0)] = 0.0
+            self.size_ratio[1:] = self.total_range[1:] / np.where(prev_range > 0, prev_range, 1.0)
+            self.size_ratio[1:][~(prev_range > 0)] = 0.0
+
+            contains = (body_low[1:] <= body_low[:-1]) & (body_high[1:] >= body_high[:-1])
+            covers = self.coverage[1:] >= engulfing_threshold
+            bullish_engulfing[1:] = self.bearish[:-1] & self.bullish[1:] & contains & covers
+            bearish_engulfing[1:] = self.bullish[:-1] & self.bearish[1:] & contains & covers
+
+            inside_bar[1:] = (h[1:] <= h[:-1]) & (l[1:] >= l[:-1])
+            outside_bar[1:] = ~inside_bar[1:] & (h[1:] > h[:-1]) & (l[1:] < l[:-1])
+
+        masks[CandlePatternType.BULLISH_ENGULFING] = bullish_engulfing
+        masks[CandlePatternType.BEARISH_ENGULFING] = bearish_engulfing
+        masks[CandlePatternType.INSIDE_BAR] = inside_bar
+        masks[CandlePatternType.OUTSIDE_BAR] = outside_bar
+        engulfing_strength = np.minimum(self.coverage / 2.0, 1.0)
+        strengths[CandlePatternType.BULLISH_ENGULFING] = engulfing_strength
+        strengths[CandlePatternType.BEARISH_ENGULFING] = engulfing_strength
+        strengths[CandlePatternType.INSIDE_BAR] = 1.0 - self.size_ratio
+        strengths[CandlePatternType.OUTSIDE_BAR] = np.minimum(self.size_ratio / 2.0, 1.0)
+
+        self.masks = masks
+        self.strengths = strengths
+
+    @classmethod
+    def from_candles(
+        cls,
+        candles: Sequence[Candle],
+        wick_threshold: float = 0.3,
+        body_threshold: float = 0.6,
+        engulfing_threshold: float = 0.95,
+        doji_threshold: float = 0.1,
+    ) -> "CandlePatternKernel":
+        """Build a kernel from a list of candles.
+
+        Args:
+            candles: Candles in chronological order
+            wick_threshold: Same as CandlePatternDetector.wick_threshold
+            body_threshold: Same as CandlePatternDetector.body_threshold
+            engulfing_threshold: Same as CandlePatternDetector.engulfing_threshold
+            doji_threshold: Same as CandlePatternDetector.doji_threshold
+
+        Returns:
+            CandlePatternKernel over the candles
+        """
+        ohlc = candles_to_ohlc(candles)
+        return cls(
+            ohlc["open"], ohlc["high"], ohlc["low"], ohlc["close"],
+            wick_threshold=wick_threshold,
+            body_threshold=body_threshold,
+            engulfing_threshold=engulfing_threshold,
+            doji_threshold=doji_threshold,
+        )
+
+    def last_indices(self, count: int) -> range:
+        """Indices of the last ``count`` candles."""
+        return range(max(0, self.size - max(0, count)), self.size)
+
+    def patterns(self, indices: Optional[Iterable[int]] = None) -> List[DetectedPattern]:
+        """Materialize DetectedPattern objects for the selected candles.
+
+        Output order is all single-candle patterns by index, then all
+        two-candle patterns by index.
+
+        Args:
+            indices: Candle indices to materialize (None = all). Indices outside
+                the array are ignored.
+
+        Returns:
+            List of DetectedPattern objects
+        """
+        if indices is None:
+            selected = np.arange(self.size)
+        else:
+            selected = np.unique(np.fromiter(indices, dtype=np.int64))
+            selected = selected[(selected >= 0) & (selected < self.size)]
+
+        if len(selected) == 0:
+            return []
+
+        patterns = self._single_candle_patterns(selected)
+        patterns.extend(self._multi_candle_patterns(selected[selected >= 1]))
+        return patterns
+
+    def _column(self, values: np.ndarray, selected: np.ndarray) -> list:
+        """Selected elements as Python scalars."""
+        return values[selected].tolist()
+
+    def _single_candle_patterns(self, selected: np.ndarray) -> List[DetectedPattern]:
+        """Build single-candle patterns for the selected indices."""
+        m = {t: self._column(mask, selected) for t, mask in self.masks.items()}
+        s = {t: self._column(strength, selected) for t, strength in self.strengths.items()}
+        body_r = self._column(self.body_ratio, selected)
+        up_r = self._column(self.upper_wick_ratio, selected)
+        lo_r = self._column(self.lower_wick_ratio, selected)
+        bullish = self._column(self.bullish, selected)
+        steeper_upper = self._column(self.steeper_upper, selected)
+
+        patterns: List[DetectedPattern] = []
+        for k, index in enumerate(selected.tolist()):
+            direction = PatternSignal.BULLISH if bullish[k] else PatternSignal.BEARISH
+            values = {
+                "body_ratio": body_r[k],
+                "upper_wick_ratio": up_r[k],
+                "lower_wick_ratio": lo_r[k],
+            }
+            found: List[Tuple[CandlePatternType, PatternSignal, dict]] = []
+
+            if m[CandlePatternType.LE_CANDLE][k]:
+                found.append((CandlePatternType.LE_CANDLE, direction, {}))
+
+            if m[CandlePatternType.SMALL_WICK][k]:
+                found.append((CandlePatternType.SMALL_WICK, direction, {}))
+
+            if m[CandlePatternType.STEEPER_WICK][k]:
+                if steeper_upper[k]:
+                    found.append((CandlePatternType.STEEPER_WICK, PatternSignal.BEARISH, {
+                        "wick_ratio": up_r[k], "direction": "upper", "side": "Upper",
+                    }))
+                else:
+                    found.append((CandlePatternType.STEEPER_WICK, PatternSignal.BULLISH, {
+                        "wick_ratio": lo_r[k], "direction": "lower", "side": "Lower",
+                    }))
+
+            if m[CandlePatternType.CELERY][k]:
+                found.append((CandlePatternType.CELERY, PatternSignal.NEUTRAL, {}))
+
+            if m[CandlePatternType.DOJI][k]:
+                found.append((CandlePatternType.DOJI, PatternSignal.NEUTRAL, {}))
+
+            # Hammer family masks are already mutually exclusive
+            if m[CandlePatternType.HAMMER][k]:
+                found.append((CandlePatternType.HAMMER, PatternSignal.BULLISH, {}))
+            elif m[CandlePatternType.SHOOTING_STAR][k]:
+                found.append((CandlePatternType.SHOOTING_STAR, PatternSignal.BEARISH, {}))
+            elif m[CandlePatternType.INVERTED_HAMMER][k]:
+                found.append((CandlePatternType.INVERTED_HAMMER, PatternSignal.BULLISH, {}))
+            elif m[CandlePatternType.HANGING_MAN][k]:
+                found.append((CandlePatternType.HANGING_MAN, PatternSignal.BEARISH, {}))
+
+            if m[CandlePatternType.PIN_BAR_BULLISH][k]:
+                found.append((
+                    CandlePatternType.PIN_BAR_BULLISH, PatternSignal.BULLISH,
+                    {"wick_ratio": lo_r[k]},
+                ))
+            elif m[CandlePatternType.PIN_BAR_BEARISH][k]:
+                found.append((
+                    CandlePatternType.PIN_BAR_BEARISH, PatternSignal.BEARISH,
+                    {"wick_ratio": up_r[k]},
+                ))
+
+            if m[CandlePatternType.STRONG_BULLISH][k]:
+                found.append((CandlePatternType.STRONG_BULLISH, direction, {}))
+            elif m[CandlePatternType.STRONG_BEARISH][k]:
+                found.append((CandlePatternType.STRONG_BEARISH, direction, {}))
+
+            for pattern_type, signal, extra in found:
+                patterns.append(build_pattern(
+                    pattern_type, signal, s[pattern_type][k], index, {**values, **extra}
+                ))
+
+        return patterns
+
+    def _multi_candle_patterns(self, selected: np.ndarray) -> List[DetectedPattern]:
+        """Build two-candle patterns for the selected indices (all >= 1)."""
+        if len(selected) == 0:
+            return []
+
+        m = {
+            t: self._column(self.masks[t], selected)
+            for t in (
+                CandlePatternType.BULLISH_ENGULFING,
+                CandlePatternType.BEARISH_ENGULFING,
+                CandlePatternType.INSIDE_BAR,
+                CandlePatternType.OUTSIDE_BAR,
+            )
+        }
+        s = {t: self._column(self.strengths[t], selected) for t in m}
+        previous = selected - 1
+        coverage = self._column(self.coverage, selected)
+        has_previous_body = self._column(self.has_previous_body, selected)
+        size_ratio = self._column(self.size_ratio, selected)
+        has_previous_range = self._column(self.has_previous_range, selected)
+        previous_body = self._column(self.body_size, previous)
+        current_body = self._column(self.body_size, selected)
+        previous_range = self._column(self.total_range, previous)
+        current_range = self._column(self.total_range, selected)
+        bullish = self._column(self.bullish, selected)
+
+        patterns: List[DetectedPattern] = []
+        for k, index in enumerate(selected.tolist()):
+            values = {
+                # A missing previous body or range gives an integer 0 ratio
+                "coverage_ratio": coverage[k] if has_previous_body[k] else 0,
+                "previous_body": previous_body[k],
+                "current_body": current_body[k],
+                "size_ratio": size_ratio[k] if has_previous_range[k] else 0,
+                "previous_range": previous_range[k],
+                "current_range": current_range[k],
+            }
+            found: List[Tuple[CandlePatternType, PatternSignal]] = []
+
+            if m[CandlePatternType.BULLISH_ENGULFING][k]:
+                found.append((CandlePatternType.BULLISH_ENGULFING, PatternSignal.BULLISH))
+            elif m[CandlePatternType.BEARISH_ENGULFING][k]:
+                found.append((CandlePatternType.BEARISH_ENGULFING, PatternSignal.BEARISH))
+
+            if m[CandlePatternType.INSIDE_BAR][k]:
+                found.append((CandlePatternType.INSIDE_BAR, PatternSignal.NEUTRAL))
+            elif m[CandlePatternType.OUTSIDE_BAR][k]:
+                signal = PatternSignal.BULLISH if bullish[k] else PatternSignal.BEARISH
+                found.append((CandlePatternType.OUTSIDE_BAR, signal))
+
+            for pattern_type, signal in found:
+                patterns.append(build_pattern(
+                    pattern_type, signal, s[pattern_type][k], index, values
+                ))
+
+        return patterns
@@ -5,9 +5,12 @@ All detections are deterministic and based on price action structure.
 """
 from dataclasses import dataclass
 from enum import StrEnum
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 from app.core.market.data import Candle
 
+if TYPE_CHECKING:
+    from app.core.patterns.candle_kernel import CandlePatternKernel
+
 
 class CandlePatternType(StrEnum):
     """Types of detected candle patterns."""
@@ -61,6 +64,111 @@ class DetectedPattern:
     metadata: dict
 
 
+# Description template and metadata fields for each pattern type. Templates are
+# formatted with the pattern's signal and the values it was detected with.
+PATTERN_FORMATS: Dict[CandlePatternType, Tuple[str, Tuple[str, ...]]] = {
+    CandlePatternType.LE_CANDLE: (
+        "LE Candle: Strong {signal} momentum, {body_ratio:.1%} body",
+        ("body_ratio", "upper_wick_ratio", "lower_wick_ratio"),
+    ),
+    CandlePatternType.SMALL_WICK: (
+        "Small Wick: Clean {signal} move, minimal rejection",
+        ("upper_wick_ratio", "lower_wick_ratio"),
+    ),
+    CandlePatternType.STEEPER_WICK: (
+        "Steeper Wick: {side} wick rejection ({wick_ratio:.1%})",
+        ("wick_ratio", "direction"),
+    ),
+    CandlePatternType.CELERY: (
+        "Celery: Narrow body ({body_ratio:.1%}), long wicks both sides",
+        ("body_ratio", "upper_wick_ratio", "lower_wick_ratio"),
+    ),
+    CandlePatternType.BULLISH_ENGULFING: (
+        "Bullish Engulfing: {coverage_ratio:.1%} coverage",
+        ("coverage_ratio", "previous_body", "current_body"),
+    ),
+    CandlePatternType.BEARISH_ENGULFING: (
+        "Bearish Engulfing: {coverage_ratio:.1%} coverage",
+        ("coverage_ratio", "previous_body", "current_body"),
+    ),
+    CandlePatternType.DOJI: (
+        "Doji: Indecision, {body_ratio:.2%} body",
+        ("body_ratio",),
+    ),
+    CandlePatternType.HAMMER: (
+        "Hammer: Bullish reversal, {lower_wick_ratio:.1%} lower wick",
+        ("lower_wick_ratio", "body_ratio"),
+    ),
+    CandlePatternType.SHOOTING_STAR: (
+        "Shooting Star: Bearish reversal, {upper_wick_ratio:.1%} upper wick",
+        ("upper_wick_ratio", "body_ratio"),
+    ),
+    CandlePatternType.INVERTED_HAMMER: (
+        "Inverted Hammer: {upper_wick_ratio:.1%} upper wick",
+        ("upper_wick_ratio", "body_ratio"),
+    ),
+    CandlePatternType.HANGING_MAN: (
+        "Hanging Man: {lower_wick_ratio:.1%} lower wick",
+        ("lower_wick_ratio", "body_ratio"),
+    ),
+    CandlePatternType.PIN_BAR_BULLISH: (
+        "Bullish Pin Bar: Strong lower rejection ({wick_ratio:.1%})",
+        ("wick_ratio", "body_ratio"),
+    ),
+    CandlePatternType.PIN_BAR_BEARISH: (
+        "Bearish Pin Bar: Strong upper rejection ({wick_ratio:.1%})",
+        ("wick_ratio", "body_ratio"),
+    ),
+    CandlePatternType.STRONG_BULLISH: (
+        "Strong {signal} candle: {body_ratio:.1%} body",
+        ("body_ratio",),
+    ),
+    CandlePatternType.STRONG_BEARISH: (
+        "Strong {signal} candle: {body_ratio:.1%} body",
+        ("body_ratio",),
+    ),
+    CandlePatternType.INSIDE_BAR: (
+        "Inside Bar: Consolidation, {size_ratio:.1%} of previous range",
+        ("size_ratio", "previous_range", "current_range"),
+    ),
+    CandlePatternType.OUTSIDE_BAR: (
+        "Outside Bar: Expansion, {size_ratio:.1%} of previous range",
+        ("size_ratio", "previous_range", "current_range"),
+    ),
+}
+
+
+def build_pattern(
+    pattern_type: CandlePatternType,
+    signal: PatternSignal,
+    strength: float,
+    candle_index: int,
+    values: Dict[str, Any],
+) -> DetectedPattern:
+    """Build a DetectedPattern with its description and metadata from PATTERN_FORMATS.
+
+    Args:
+        pattern_type: Type of pattern detected
+        signal: Bullish/bearish/neutral signal
+        strength: Pattern strength score
+        candle_index: Index of the pattern candle in the sequence
+        values: Values available to the description template; the pattern
+            type's metadata fields are copied from here
+
+    Returns:
+        DetectedPattern for the candle
+    """
+    template, fields = PATTERN_FORMATS[pattern_type]
+    return DetectedPattern(
+        pattern_type=pattern_type,
+        signal=signal,
+        strength=strength,
+        candle_index=candle_index,
+        description=template.format(signal=signal, **values),
+        metadata={field: values[field] for field in fields},
+    )
+
+
 class CandlePatternDetector:
     """Detects candlestick patterns in price data.
     
@@ -91,11 +199,20 @@ class CandlePatternDetector:
         self.engulfing_threshold = engulfing_threshold
         self.doji_threshold = doji_threshold
     
-    def detect_all_patterns(self, candles: List[Candle]) -> List[DetectedPattern]:
+    def detect_all_patterns(
+        self,
+        candles: List[Candle],
+        last_n: Optional[int] = None,
+    ) -> List[DetectedPattern]:
         """Detect all patterns in a candle sequence.
         
+        Pattern rules are evaluated over the whole series at once by
+        CandlePatternKernel; DetectedPattern objects are only built for the
+        candles being returned.
+        
         Args:
             candles: List of Candle objects in chronological order
+            last_n: Only return patterns on the last N candles (None = all)
             
         Returns:
             List of DetectedPattern objects, one per detected pattern
@@ -109,555 +226,28 @@ class CandlePatternDetector:
         if not candles:
             return []
         
-        patterns = []
-        
-        # Single candle patterns (check all candles)
-        for i, candle in enumerate(candles):
-            patterns.extend(self._detect_single_candle_patterns(candle, i))
-        
-        # Multi-candle patterns (need at least 2 candles)
-        if len(candles) >= 2:
-            for i in range(1, len(candles)):
-                patterns.extend(
-                    self._detect_multi_candle_patterns(candles, i)
-                )
-        
-        return patterns
-    
-    def _detect_single_candle_patterns(
-        self, candle: Candle, index: int
-    ) -> List[DetectedPattern]:
-        """Detect patterns that can be identified from a single candle."""
-        patterns = []
-        
-        # LE Candle (Liquidity Engine) - strong directional move
-        if pattern := self._detect_le_candle(candle, index):
-            patterns.append(pattern)
-        
-        # Small Wick - minimal rejection, strong momentum
-        if pattern := self._detect_small_wick(candle, index):
-            patterns.append(pattern)
-        
-        # Steeper Wick - long wick rejection
-        if pattern := self._detect_steeper_wick(candle, index):
-            patterns.append(pattern)
-        
-        # Celery - narrow body with long wicks
-        if pattern := self._detect_celery(candle, index):
-            patterns.append(pattern)
-        
-        # Doji
-        if pattern := self._detect_doji(candle, index):
-            patterns.append(pattern)
-        
-        # Hammer / Shooting Star
-        if pattern := self._detect_hammer_shooting_star(candle, index):
-            patterns.append(pattern)
-        
-        # Pin Bars
-        if pattern := self._detect_pin_bar(candle, index):
-            patterns.append(pattern)
-        
-        # Strong Directional
-        if pattern := self._detect_strong_directional(candle, index):
-            patterns.append(pattern)
-        
-        return patterns
-    
-    def _detect_multi_candle_patterns(
-        self, candles: List[Candle], index: int
-    ) -> List[DetectedPattern]:
-        """Detect patterns that require multiple candles."""
-        patterns = []
-        
-        current = candles[index]
-        previous = candles[index - 1]
-        
-        # Engulfing patterns
-        if pattern := self._detect_engulfing(previous, current, index):
-            patterns.append(pattern)
-        
-        # Inside/Outside bars
-        if pattern := self._detect_inside_outside_bar(previous, current, index):
-            patterns.append(pattern)
-        
-        return patterns
-    
-    def _detect_le_candle(
-        self, candle: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect Liquidity Engine candle - strong directional move.
-        
-        Characteristics:
-        - Large body (>60% of range)
-        - Small wicks (<20% of range each)
-        - Strong momentum in one direction
-        """
-        if candle.total_range == 0:
-            return None
-        
-        body_ratio = candle.body_size / candle.total_range
-        upper_wick_ratio = candle.wick_size_upper / candle.total_range
-        lower_wick_ratio = candle.wick_size_lower / candle.total_range
-        
-        # Large body, small wicks
-        if body_ratio > self.body_threshold and \
-           upper_wick_ratio < 0.2 and lower_wick_ratio < 0.2:
-            
-            signal = PatternSignal.BULLISH if candle.is_bullish else PatternSignal.BEARISH
-            strength = min(body_ratio, 1.0)  # Stronger with larger body
-            
-            return DetectedPattern(
-                pattern_type=CandlePatternType.LE_CANDLE,
-                signal=signal,
-                strength=strength,
-                candle_index=index,
-                description=f"LE Candle: Strong {signal} momentum, {body_ratio:.1%} body",
-                metadata={
-                    "body_ratio": body_ratio,
-                    "upper_wick_ratio": upper_wick_ratio,
-                    "lower_wick_ratio": lower_wick_ratio,
-                }
-            )
-        
-        return None
-    
-    def _detect_small_wick(
-        self, candle: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect Small Wick candle - minimal rejection.
-        
-        Characteristics:
-        - Very small wicks (<10% of range on one or both sides)
-        - Strong price acceptance
-        """
-        if candle.total_range == 0:
-            return None
-        
-        upper_wick_ratio = candle.wick_size_upper / candle.total_range
-        lower_wick_ratio = candle.wick_size_lower / candle.total_range
-        
-        # At least one wick must be very small
-        min_wick = min(upper_wick_ratio, lower_wick_ratio)
-        
-        if min_wick < 0.1:
-            signal = PatternSignal.BULLISH if candle.is_bullish else PatternSignal.BEARISH
-            strength = 1.0 - min_wick  # Stronger with smaller wick
-            
-            return DetectedPattern(
-                pattern_type=CandlePatternType.SMALL_WICK,
-                signal=signal,
-                strength=strength,
-                candle_index=index,
-                description=f"Small Wick: Clean {signal} move, minimal rejection",
-                metadata={
-                    "upper_wick_ratio": upper_wick_ratio,
-                    "lower_wick_ratio": lower_wick_ratio,
-                }
-            )
-        
-        return None
-    
-    def _detect_steeper_wick(
-        self, candle: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect Steeper Wick - long wick indicating rejection.
-        
-        Characteristics:
-        - One wick is >50% of total range
-        - Indicates rejection at that price level
-        """
-        if candle.total_range == 0:
-            return None
-        
-        upper_wick_ratio = candle.wick_size_upper / candle.total_range
-        lower_wick_ratio = candle.wick_size_lower / candle.total_range
-        
-        # Long upper wick = bearish rejection
-        if upper_wick_ratio > 0.5:
-            return DetectedPattern(
-                pattern_type=CandlePatternType.STEEPER_WICK,
-                signal=PatternSignal.BEARISH,
-                strength=min(upper_wick_ratio, 1.0),
-                candle_index=index,
-                description=f"Steeper Wick: Upper wick rejection ({upper_wick_ratio:.1%})",
-                metadata={
-                    "wick_ratio": upper_wick_ratio,
-                    "direction": "upper",
-                }
-            )
-        
-        # Long lower wick = bullish rejection
-        if lower_wick_ratio > 0.5:
-            return DetectedPattern(
-                pattern_type=CandlePatternType.STEEPER_WICK,
-                signal=PatternSignal.BULLISH,
-                strength=min(lower_wick_ratio, 1.0),
-                candle_index=index,
-                description=f"Steeper Wick: Lower wick rejection ({lower_wick_ratio:.1%})",
-                metadata={
-                    "wick_ratio": lower_wick_ratio,
-                    "direction": "lower",
-                }
-            )
-        
-        return None
+        kernel = self.build_kernel(candles)
+        indices = None if last_n is None else kernel.last_indices(last_n)
+        return kernel.patterns(indices)
     
-    def _detect_celery(
-        self, candle: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect Celery pattern - narrow body with long wicks on both sides.
+    def build_kernel(self, candles: List[Candle]) -> "CandlePatternKernel":
+        """Evaluate all pattern rules over a candle series with this detector's thresholds.
         
-        Characteristics:
-        - Small body (<20% of range)
-        - Long wicks on both sides (>30% each)
-        - Indicates indecision or equilibrium
-        """
-        if candle.total_range == 0:
-            return None
-        
-        body_ratio = candle.body_size / candle.total_range
-        upper_wick_ratio = candle.wick_size_upper / candle.total_range
-        lower_wick_ratio = candle.wick_size_lower / candle.total_range
-        
-        if body_ratio < 0.2 and \
-           upper_wick_ratio > self.wick_threshold and \
-           lower_wick_ratio > self.wick_threshold:
-            
-            # Strength based on wick symmetry and body smallness
-            wick_balance = 1.0 - abs(upper_wick_ratio - lower_wick_ratio)
-            body_strength = 1.0 - (body_ratio / 0.2)
-            strength = (wick_balance + body_strength) / 2
-            
-            return DetectedPattern(
-                pattern_type=CandlePatternType.CELERY,
-                signal=PatternSignal.NEUTRAL,
-                strength=strength,
-                candle_index=index,
-                description=f"Celery: Narrow body ({body_ratio:.1%}), long wicks both sides",
-                metadata={
-                    "body_ratio": body_ratio,
-                    "upper_wick_ratio": upper_wick_ratio,
-                    "lower_wick_ratio": lower_wick_ratio,
-                }
-            )
-        
-        return None
-    
-    def _detect_engulfing(
-        self, previous: Candle, current: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect Bullish/Bearish Engulfing patterns.
-        
-        Characteristics:
-        - Current candle body completely engulfs previous candle body
-        - Reversal pattern
-        """
-        # Bullish Engulfing: bearish candle followed by bullish that engulfs it
-        if previous.is_bearish and current.is_bullish:
-            prev_body_low = min(previous.open, previous.close)
-            prev_body_high = max(previous.open, previous.close)
-            curr_body_low = min(current.open, current.close)
-            curr_body_high = max(current.open, current.close)
-            
-            if curr_body_low <= prev_body_low and curr_body_high >= prev_body_high:
-                # Calculate coverage ratio
-                coverage = current.body_size / previous.body_size if previous.body_size > 0 else 0
-                
-                if coverage >= self.engulfing_threshold:
-                    strength = min(coverage / 2.0, 1.0)  # Cap at 1.0
-                    
-                    return DetectedPattern(
-                        pattern_type=CandlePatternType.BULLISH_ENGULFING,
-                        signal=PatternSignal.BULLISH,
-                        strength=strength,
-                        candle_index=index,
-                        description=f"Bullish Engulfing: {coverage:.1%} coverage",
-                        metadata={
-                            "coverage_ratio": coverage,
-                            "previous_body": previous.body_size,
-                            "current_body": current.body_size,
-                        }
-                    )
-        
-        # Bearish Engulfing: bullish candle followed by bearish that engulfs it
-        if previous.is_bullish and current.is_bearish:
-            prev_body_low = min(previous.open, previous.close)
-            prev_body_high = max(previous.open, previous.close)
-            curr_body_low = min(current.open, current.close)
-            curr_body_high = max(current.open, current.close)
-            
-            if curr_body_low <= prev_body_low and curr_body_high >= prev_body_high:
-                coverage = current.body_size / previous.body_size if previous.body_size > 0 else 0
-                
-                if coverage >= self.engulfing_threshold:
-                    strength = min(coverage / 2.0, 1.0)
-                    
-                    return DetectedPattern(
-                        pattern_type=CandlePatternType.BEARISH_ENGULFING,
-                        signal=PatternSignal.BEARISH,
-                        strength=strength,
-                        candle_index=index,
-                        description=f"Bearish Engulfing: {coverage:.1%} coverage",
-                        metadata={
-                            "coverage_ratio": coverage,
-                            "previous_body": previous.body_size,
-                            "current_body": current.body_size,
-                        }
-                    )
-        
-        return None
-    
-    def _detect_doji(
-        self, candle: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect Doji pattern - indecision candle.
-        
-        Characteristics:
-        - Very small body (<10% of range by default)
-        - Can have wicks of any size
-        - Indicates indecision or potential reversal
-        """
-        if candle.total_range == 0:
-            return None
-        
-        body_ratio = candle.body_size / candle.total_range
-        
-        if body_ratio < self.doji_threshold:
-            strength = 1.0 - (body_ratio / self.doji_threshold)
-            
-            return DetectedPattern(
-                pattern_type=CandlePatternType.DOJI,
-                signal=PatternSignal.NEUTRAL,
-                strength=strength,
-                candle_index=index,
-                description=f"Doji: Indecision, {body_ratio:.2%} body",
-                metadata={
-                    "body_ratio": body_ratio,
-                }
-            )
-        
-        return None
-    
-    def _detect_hammer_shooting_star(
-        self, candle: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect Hammer and Shooting Star patterns.
-        
-        Hammer: Bullish reversal with long lower wick
-        Shooting Star: Bearish reversal with long upper wick
-        Inverted Hammer: Bullish with long upper wick
-        Hanging Man: Bearish with long lower wick
-        """
-        if candle.total_range == 0:
-            return None
-        
-        body_ratio = candle.body_size / candle.total_range
-        upper_wick_ratio = candle.wick_size_upper / candle.total_range
-        lower_wick_ratio = candle.wick_size_lower / candle.total_range
-        
-        # Small body required for all these patterns
-        if body_ratio > 0.3:
-            return None
-        
-        # Hammer: Long lower wick (>2x body), small upper wick
-        if lower_wick_ratio > 0.6 and upper_wick_ratio <= 0.15:
-            strength = min(lower_wick_ratio, 1.0)
-            return DetectedPattern(
-                pattern_type=CandlePatternType.HAMMER,
-                signal=PatternSignal.BULLISH,
-                strength=strength,
-                candle_index=index,
-                description=f"Hammer: Bullish reversal, {lower_wick_ratio:.1%} lower wick",
-                metadata={
-                    "lower_wick_ratio": lower_wick_ratio,
-                    "body_ratio": body_ratio,
-                }
-            )
-        
-        # Shooting Star: Long upper wick (>2x body), small lower wick
-        if upper_wick_ratio > 0.6 and lower_wick_ratio <= 0.15:
-            strength = min(upper_wick_ratio, 1.0)
-            return DetectedPattern(
-                pattern_type=CandlePatternType.SHOOTING_STAR,
-                signal=PatternSignal.BEARISH,
-                strength=strength,
-                candle_index=index,
-                description=f"Shooting Star: Bearish reversal, {upper_wick_ratio:.1%} upper wick",
-                metadata={
-                    "upper_wick_ratio": upper_wick_ratio,
-                    "body_ratio": body_ratio,
-                }
-            )
-        
-        # Inverted Hammer: Long upper wick, at support
-        if upper_wick_ratio > 0.5 and lower_wick_ratio < 0.2 and body_ratio < 0.2:
-            strength = min(upper_wick_ratio, 1.0)
-            return DetectedPattern(
-                pattern_type=CandlePatternType.INVERTED_HAMMER,
-                signal=PatternSignal.BULLISH,
-                strength=strength,
-                candle_index=index,
-                description=f"Inverted Hammer: {upper_wick_ratio:.1%} upper wick",
-                metadata={
-                    "upper_wick_ratio": upper_wick_ratio,
-                    "body_ratio": body_ratio,
-                }
-            )
-        
-        # Hanging Man: Long lower wick, at resistance
-        if lower_wick_ratio > 0.5 and upper_wick_ratio < 0.2 and body_ratio < 0.2:
-            strength = min(lower_wick_ratio, 1.0)
-            return DetectedPattern(
-                pattern_type=CandlePatternType.HANGING_MAN,
-                signal=PatternSignal.BEARISH,
-                strength=strength,
-                candle_index=index,
-                description=f"Hanging Man: {lower_wick_ratio:.1%} lower wick",
-                metadata={
-                    "lower_wick_ratio": lower_wick_ratio,
-                    "body_ratio": body_ratio,
-                }
-            )
-        
-        return None
-    
-    def _detect_pin_bar(
-        self, candle: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect Pin Bar patterns - strong rejection with long wick.
-        
-        Similar to hammer/shooting star but with slightly different criteria.
-        Pin bars are strong reversal signals.
-        """
-        if candle.total_range == 0:
-            return None
-        
-        body_ratio = candle.body_size / candle.total_range
-        upper_wick_ratio = candle.wick_size_upper / candle.total_range
-        lower_wick_ratio = candle.wick_size_lower / candle.total_range
-        
-        # Pin bar needs small body and one dominant wick
-        if body_ratio > 0.25:
-            return None
-        
-        # Bullish Pin Bar: Long lower wick
-        if lower_wick_ratio > 0.65 and lower_wick_ratio > (upper_wick_ratio * 3):
-            strength = min(lower_wick_ratio, 1.0)
-            return DetectedPattern(
-                pattern_type=CandlePatternType.PIN_BAR_BULLISH,
-                signal=PatternSignal.BULLISH,
-                strength=strength,
-                candle_index=index,
-                description=f"Bullish Pin Bar: Strong lower rejection ({lower_wick_ratio:.1%})",
-                metadata={
-                    "wick_ratio": lower_wick_ratio,
-                    "body_ratio": body_ratio,
-                }
-            )
-        
-        # Bearish Pin Bar: Long upper wick
-        if upper_wick_ratio > 0.65 and upper_wick_ratio > (lower_wick_ratio * 3):
-            strength = min(upper_wick_ratio, 1.0)
-            return DetectedPattern(
-                pattern_type=CandlePatternType.PIN_BAR_BEARISH,
-                signal=PatternSignal.BEARISH,
-                strength=strength,
-                candle_index=index,
-                description=f"Bearish Pin Bar: Strong upper rejection ({upper_wick_ratio:.1%})",
-                metadata={
-                    "wick_ratio": upper_wick_ratio,
-                    "body_ratio": body_ratio,
-                }
-            )
-        
-        return None
-    
-    def _detect_strong_directional(
-        self, candle: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect strong directional candles - momentum indicators.
-        
-        Characteristics:
-        - Large body (>70% of range)
-        - Minimal wicks
-        - Strong momentum
-        """
-        if candle.total_range == 0:
-            return None
-        
-        body_ratio = candle.body_size / candle.total_range
-        
-        if body_ratio > 0.7:
-            signal = PatternSignal.BULLISH if candle.is_bullish else PatternSignal.BEARISH
-            strength = min(body_ratio, 1.0)
-            
-            pattern_type = (
-                CandlePatternType.STRONG_BULLISH if candle.is_bullish
-                else CandlePatternType.STRONG_BEARISH
-            )
+        Args:
+            candles: List of Candle objects in chronological order
             
-            return DetectedPattern(
-                pattern_type=pattern_type,
-                signal=signal,
-                strength=strength,
-                candle_index=index,
-                description=f"Strong {signal} candle: {body_ratio:.1%} body",
-                metadata={
-                    "body_ratio": body_ratio,
-                }
-            )
-        
-        return None
-    
-    def _detect_inside_outside_bar(
-        self, previous: Candle, current: Candle, index: int
-    ) -> Optional[DetectedPattern]:
-        """Detect Inside and Outside bars.
-        
-        Inside Bar: Current candle's range is within previous candle's range
-        Outside Bar: Current candle's range engulfs previous candle's range
+        Returns:
+            CandlePatternKernel with per-pattern masks and strengths
         """
-        # Inside Bar: consolidation pattern
-        if current.high <= previous.high and current.low >= previous.low:
-            # Strength based on how much smaller the inside bar is
-            size_ratio = current.total_range / previous.total_range if previous.total_range > 0 else 0
-            strength = 1.0 - size_ratio  # Smaller inside bar = stronger pattern
-            
-            return DetectedPattern(
-                pattern_type=CandlePatternType.INSIDE_BAR,
-                signal=PatternSignal.NEUTRAL,
-                strength=strength,
-                candle_index=index,
-                description=f"Inside Bar: Consolidation, {size_ratio:.1%} of previous range",
-                metadata={
-                    "size_ratio": size_ratio,
-                    "previous_range": previous.total_range,
-                    "current_range": current.total_range,
-                }
-            )
-        
-        # Outside Bar: expansion/breakout pattern
-        if current.high > previous.high and current.low < previous.low:
-            size_ratio = current.total_range / previous.total_range if previous.total_range > 0 else 0
-            strength = min(size_ratio / 2.0, 1.0)  # Cap at 1.0
-            
-            signal = PatternSignal.BULLISH if current.is_bullish else PatternSignal.BEARISH
-            
-            return DetectedPattern(
-                pattern_type=CandlePatternType.OUTSIDE_BAR,
-                signal=signal,
-                strength=strength,
-                candle_index=index,
-                description=f"Outside Bar: Expansion, {size_ratio:.1%} of previous range",
-                metadata={
-                    "size_ratio": size_ratio,
-                    "previous_range": previous.total_range,
-                    "current_range": current.total_range,
-                }
-            )
-        
-        return None
+        from app.core.patterns.candle_kernel import CandlePatternKernel
+        
+        return CandlePatternKernel.from_candles(
+            candles,
+            wick_threshold=self.wick_threshold,
+            body_threshold=self.body_threshold,
+            engulfing_threshold=self.engulfing_threshold,
+            doji_threshold=self.doji_threshold,
+        )
     
     def get_patterns_at_index(
         self, candles: List[Candle], index: int
@@ -673,8 +263,9 @@ class CandlePatternDetector:
         Returns:
             List of patterns detected at that index
         """
-        all_patterns = self.detect_all_patterns(candles)
-        return [p for p in all_patterns if p.candle_index == index]
+        if not candles:
+            return []
+        return self.build_kernel(candles).patterns([index])
     
     def filter_patterns(
         self,
@@ -9,9 +9,12 @@ Combines:
 - Support/Resistance zone proximity
 - Pattern strength and signal direction
 """
+import hashlib
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.market.data import Candle
 from app.core.patterns.candles import (
@@ -39,6 +42,10 @@ class TimeframeWeight(Enum):
     LOWER = 1.0   # Lower timeframes get less weight
 
 
+# (symbol, timeframe, last candle timestamp, candle count, last close, detector config hash)
+AnalysisCacheKey = Tuple[str, str, Any, int, float, str]
+
+
 class ConfluenceSignal(Enum):
     """Overall directional signal from confluence analysis."""
     STRONG_BULLISH = "strong_bullish"
@@ -241,6 +248,12 @@ class MultiTimeframeConfluenceScorer:
         ... }
         >>> score = scorer.score_confluence(mtf_data, analysis_timeframe="15m")
         >>> print(f"Confluence: {score.overall_score:.1f}/100 - {score.signal.value}")
+    
+    Per-timeframe analyses are kept in a bounded LRU cache keyed by symbol,
+    timeframe, the last candle and the detector configuration, so repeated
+    calls only re-run detection for timeframes that gained a new candle.
+    Cached TimeframeAnalysis objects are shared between calls and should be
+    treated as read-only.
     """
     
     def __init__(
@@ -248,6 +261,7 @@ class MultiTimeframeConfluenceScorer:
         pattern_detector: Optional[CandlePatternDetector] = None,
         structure_analyzer: Optional[MarketStructureAnalyzer] = None,
         zone_detector: Optional[SupportResistanceDetector] = None,
+        cache_size: int = 256,
     ):
         """Initialize confluence scorer with optional custom analyzers.
         
@@ -255,10 +269,67 @@ class MultiTimeframeConfluenceScorer:
             pattern_detector: Custom candle pattern detector (uses default if None)
             structure_analyzer: Custom market structure analyzer (uses default if None)
             zone_detector: Custom S/R zone detector (uses default if None)
+            cache_size: Max cached timeframe analyses (0 disables caching)
         """
         self.pattern_detector = pattern_detector or CandlePatternDetector()
         self.structure_analyzer = structure_analyzer or MarketStructureAnalyzer()
         self.zone_detector = zone_detector or SupportResistanceDetector()
+        
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: "OrderedDict[AnalysisCacheKey, TimeframeAnalysis]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def cache_info(self) -> Dict[str, Any]:
+        """Get analysis cache statistics.
+        
+        Returns:
+            Dict with hits, misses, hit rate, current size and max size
+        """
+        total = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / total if total else 0.0,
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+        }
+    
+    def clear_cache(self) -> None:
+        """Drop all cached analyses and reset the hit/miss counters."""
+        with self._cache_lock:
+            self._cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+    
+    def _config_hash(self) -> str:
+        """Fingerprint of the detector settings that affect analysis output."""
+        parts = []
+        for component in (self.pattern_detector, self.structure_analyzer, self.zone_detector):
+            settings = sorted(
+                (name, value) for name, value in vars(component).items()
+                if not name.startswith("_")
+            )
+            parts.append(f"{type(component).__qualname__}:{settings!r}")
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()
+    
+    def _cache_key(self, candles: List[Candle], timeframe: str) -> AnalysisCacheKey:
+        """Build the cache key for a candle series.
+        
+        The candle count and last close are included alongside the last
+        timestamp so a still-forming candle or a resized window is never
+        served a stale analysis.
+        """
+        last = candles[-1]
+        return (
+            last.symbol,
+            timeframe,
+            last.timestamp,
+            len(candles),
+            last.close,
+            self._config_hash(),
+        )
     
     def analyze_timeframe(
         self,
@@ -267,6 +338,10 @@ class MultiTimeframeConfluenceScorer:
     ) -> TimeframeAnalysis:
         """Analyze a single timeframe comprehensively.
         
+        Results are served from the analysis cache when the same series
+        (by symbol, timeframe and last candle) was analyzed before with the
+        same detector configuration.
+        
         Args:
             candles: List of candles for this timeframe
             timeframe: Timeframe string (e.g., "5m", "1h")
@@ -274,6 +349,34 @@ class MultiTimeframeConfluenceScorer:
         Returns:
             TimeframeAnalysis with all detected patterns and structure
         """
+        if self.cache_size <= 0 or not candles:
+            return self._run_analysis(candles, timeframe)
+        
+        key = self._cache_key(candles, timeframe)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+        
+        analysis = self._run_analysis(candles, timeframe)
+        
+        with self._cache_lock:
+            self._cache[key] = analysis
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        
+        return analysis
+    
+    def _run_analysis(
+        self,
+        candles: List[Candle],
+        timeframe: str,
+    ) -> TimeframeAnalysis:
+        """Run pattern, structure and zone detection on a candle series."""
         # Detect all patterns
         patterns = self.pattern_detector.detect_all_patterns(candles)
         
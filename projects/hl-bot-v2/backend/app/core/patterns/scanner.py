@@ -0,0 +1,416 @@
+"""Multi-symbol signal scanning on a persistent process pool.
+
+Signal generation is pure-Python CPU work, so evaluating a whole symbol
+universe in one process is serialized by the GIL. SignalScanner spreads
+symbols over a fixed set of worker processes:
+
+- Each symbol is pinned to one worker, which keeps a warm SignalGenerator
+  (including its confluence analysis cache) and a rolling candle buffer per
+  timeframe for the symbols it owns.
+- Only candles the worker has not seen yet are shipped, packed into compact
+  NumPy record arrays instead of pickled Candle lists.
+- Results stream back as each symbol finishes, with per-symbol latency.
+"""
+import asyncio
+import logging
+import time
+import zlib
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.market.data import Candle
+from app.core.patterns.signals import SignalGenerationConfig, SignalGenerator
+from src.hl_bot.types import Signal
+
+logger = logging.getLogger(__name__)
+
+CANDLE_DTYPE = np.dtype([
+    ("ts", "<i8"),  # Microseconds since the Unix epoch (UTC)
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _timestamp_us(timestamp: datetime) -> int:
+    """Exact integer microseconds since the epoch (naive datetimes are UTC)."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def encode_candles(candles: List[Candle]) -> np.ndarray:
+    """Pack candles into a CANDLE_DTYPE record array.
+
+    Args:
+        candles: Candles in chronological order
+
+    Returns:
+        Record array with one row per candle
+    """
+    packed = np.empty(len(candles), dtype=CANDLE_DTYPE)
+    for row, candle in enumerate(candles):
+        packed[row] = (
+            _timestamp_us(candle.timestamp),
+            candle.open, candle.high, candle.low, candle.close, candle.volume,
+        )
+    return packed
+
+
+def decode_candles(packed: np.ndarray, symbol: str, timeframe: str) -> List[Candle]:
+    """Rebuild Candle objects from a CANDLE_DTYPE record array.
+
+    Args:
+        packed: Record array produced by encode_candles
+        symbol: Symbol for every candle
+        timeframe: Timeframe for every candle
+
+    Returns:
+        List of candles with UTC timestamps
+    """
+    return [
+        Candle(
+            timestamp=_EPOCH + timedelta(microseconds=ts),
+            open=o, high=h, low=l, close=c, volume=v,
+            symbol=symbol, timeframe=timeframe,
+        )
+        for ts, o, h, l, c, v in packed.tolist()
+    ]
+
+
+@dataclass
+class ScanResult:
+    """Outcome of scanning one symbol."""
+
+    symbol: str
+    signal: Optional[Signal]
+    latency_ms: float  # Submit to result received, including queueing
+    compute_ms: float = 0.0  # Time spent inside the worker
+    worker: int = -1
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the symbol was evaluated without error."""
+        return self.error is None
+
+
+# --- Worker process side -----------------------------------------------------
+
+_worker_generator: Optional[SignalGenerator] = None
+_worker_buffers: Dict[Tuple[str, str], List[Candle]] = {}
+_worker_buffer_size = 0
+
+
+def _init_worker(config: Optional[SignalGenerationConfig], buffer_size: int) -> None:
+    """Create the worker's long-lived generator and buffers."""
+    global _worker_generator, _worker_buffers, _worker_buffer_size
+    _worker_generator = SignalGenerator(config=config)
+    _worker_buffers = {}
+    _worker_buffer_size = buffer_size
+
+
+def _scan_in_worker(
+    symbol: str,
+    analysis_timeframe: str,
+    updates: Dict[str, Tuple[Optional[int], np.ndarray]],
+) -> Tuple[Optional[Signal], float, List[str]]:
+    """Apply candle updates for a symbol and generate its signal.
+
+    Each update is ``(since, packed)``: ``since`` is the timestamp the
+    worker's buffer must end at for the delta to apply (None for a full
+    window). Packed candles replace any buffered candles at or after their
+    first timestamp, so a re-sent forming bar overwrites the stale copy.
+
+    Returns:
+        (signal, compute milliseconds, timeframes that need a full resend)
+    """
+    started = time.perf_counter()
+    stale = []
+
+    for timeframe, (since, packed) in updates.items():
+        key = (symbol, timeframe)
+        buffer = _worker_buffers.get(key)
+
+        if since is not None:
+            if not buffer or _timestamp_us(buffer[-1].timestamp) != since:
+                stale.append(timeframe)
+                continue
+        else:
+            buffer = []
+
+        if len(packed):
+            first_ts = int(packed["ts"][0])
+            while buffer and _timestamp_us(buffer[-1].timestamp) >= first_ts:
+                buffer.pop()
+            buffer.extend(decode_candles(packed, symbol, timeframe))
+            if len(buffer) > _worker_buffer_size:
+                del buffer[:len(buffer) - _worker_buffer_size]
+
+        _worker_buffers[key] = buffer
+
+    if stale:
+        return None, (time.perf_counter() - started) * 1000, stale
+
+    mtf_data = {
+        timeframe: _worker_buffers[(symbol, timeframe)]
+        for timeframe in updates
+    }
+    signal = _worker_generator.generate_signal(mtf_data, analysis_timeframe, symbol)
+    return signal, (time.perf_counter() - started) * 1000, []
+
+
+# --- Parent process side -----------------------------------------------------
+
+@dataclass
+class _PendingScan:
+    """Bookkeeping for an in-flight symbol evaluation."""
+
+    symbol: str
+    worker: int
+    submitted_at: float
+    pool: Optional[ProcessPoolExecutor] = None
+    sent: Dict[str, int] = field(default_factory=dict)  # timeframe -> last ts shipped
+    resent: bool = False
+
+
+class SignalScanner:
+    """Generate signals for many symbols in parallel worker processes.
+
+    Example:
+        >>> scanner = SignalScanner(workers=8)
+        >>> for result in scanner.scan(universe, analysis_timeframe="15m"):
+        ...     if result.signal:
+        ...         print(result.symbol, result.signal.signal_type, f"{result.latency_ms:.0f}ms")
+        >>> scanner.shutdown()
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        config: Optional[SignalGenerationConfig] = None,
+        buffer_size: int = 2000,
+    ):
+        """Initialize scanner.
+
+        Args:
+            workers: Number of worker processes
+            config: Signal generation config used by every worker
+            buffer_size: Max candles kept per symbol and timeframe; older
+                candles drop out of the analysis window
+        """
+        if workers < 1:
+            raise ValueError("SignalScanner needs at least one worker")
+
+        self.workers = workers
+        self.config = config or SignalGenerationConfig()
+        self.buffer_size = buffer_size
+
+        self._pools: List[Optional[ProcessPoolExecutor]] = [None] * workers
+        # Last candle timestamp each worker holds, per (symbol, timeframe)
+        self._synced: Dict[Tuple[str, str], int] = {}
+
+    def worker_for(self, symbol: str) -> int:
+        """Worker index a symbol is pinned to (stable across runs)."""
+        return zlib.crc32(symbol.encode()) % self.workers
+
+    def scan(
+        self,
+        universe: Dict[str, Dict[str, List[Candle]]],
+        analysis_timeframe: str,
+    ) -> Iterator[ScanResult]:
+        """Evaluate every symbol and yield results as they complete.
+
+        Args:
+            universe: symbol -> {timeframe -> candles in chronological order}
+            analysis_timeframe: Primary timeframe for entries
+
+        Yields:
+            ScanResult per symbol, in completion order
+        """
+        pending: Dict[Future, _PendingScan] = {}
+        for symbol, mtf_data in universe.items():
+            future, job = self._submit(symbol, mtf_data, analysis_timeframe, full=False)
+            pending[future] = job
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                result, retry = self._collect(future, job, universe[job.symbol], analysis_timeframe)
+                if retry is not None:
+                    pending[retry[0]] = retry[1]
+                else:
+                    yield result
+
+    async def scan_async(
+        self,
+        universe: Dict[str, Dict[str, List[Candle]]],
+        analysis_timeframe: str,
+    ) -> AsyncIterator[ScanResult]:
+        """Async variant of :meth:`scan` that does not block the event loop.
+
+        Args:
+            universe: symbol -> {timeframe -> candles in chronological order}
+            analysis_timeframe: Primary timeframe for entries
+
+        Yields:
+            ScanResult per symbol, in completion order
+        """
+        pending: Dict[asyncio.Future, Tuple[Future, _PendingScan]] = {}
+
+        def _track(future: Future, job: _PendingScan) -> None:
+            pending[asyncio.wrap_future(future)] = (future, job)
+
+        for symbol, mtf_data in universe.items():
+            _track(*self._submit(symbol, mtf_data, analysis_timeframe, full=False))
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for wrapped in done:
+                future, job = pending.pop(wrapped)
+                wrapped.exception()  # Handled via the concurrent future below
+                result, retry = self._collect(future, job, universe[job.symbol], analysis_timeframe)
+                if retry is not None:
+                    _track(*retry)
+                else:
+                    yield result
+
+    def scan_all(
+        self,
+        universe: Dict[str, Dict[str, List[Candle]]],
+        analysis_timeframe: str,
+    ) -> Dict[str, ScanResult]:
+        """Evaluate every symbol and return results keyed by symbol."""
+        return {r.symbol: r for r in self.scan(universe, analysis_timeframe)}
+
+    def shutdown(self) -> None:
+        """Stop all worker processes and forget their buffered state."""
+        for index, pool in enumerate(self._pools):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+                self._pools[index] = None
+        self._synced.clear()
+
+    def _get_pool(self, worker: int) -> ProcessPoolExecutor:
+        """Get (or start) the single-process pool for a worker slot."""
+        pool = self._pools[worker]
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_init_worker,
+                initargs=(self.config, self.buffer_size),
+            )
+            self._pools[worker] = pool
+        return pool
+
+    def _restart_worker(self, worker: int, broken: ProcessPoolExecutor) -> None:
+        """Replace a broken worker; its buffers are gone, so forget them."""
+        if self._pools[worker] is not broken:
+            return  # Already replaced for an earlier failed job
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pools[worker] = None
+        for key in [k for k in self._synced if self.worker_for(k[0]) == worker]:
+            del self._synced[key]
+
+    def _submit(
+        self,
+        symbol: str,
+        mtf_data: Dict[str, List[Candle]],
+        analysis_timeframe: str,
+        full: bool,
+        only: Optional[List[str]] = None,
+    ) -> Tuple[Future, _PendingScan]:
+        """Ship the candles a worker is missing and start its evaluation."""
+        worker = self.worker_for(symbol)
+        job = _PendingScan(symbol=symbol, worker=worker, submitted_at=time.perf_counter())
+        updates: Dict[str, Tuple[Optional[int], np.ndarray]] = {}
+
+        for timeframe, candles in mtf_data.items():
+            if not candles:
+                continue
+            window = candles[-self.buffer_size:]
+            since = None if full or (only and timeframe in only) else self._synced.get((symbol, timeframe))
+            delta = window
+            if since is not None:
+                # Resend from the last shipped bar so an updated close is picked up
+                start = len(window)
+                while start > 0 and _timestamp_us(window[start - 1].timestamp) >= since:
+                    start -= 1
+                if start == 0:
+                    since = None  # Window no longer overlaps the worker's buffer
+                else:
+                    delta = window[start:]
+            updates[timeframe] = (since, encode_candles(delta))
+            job.sent[timeframe] = _timestamp_us(window[-1].timestamp)
+
+        job.pool = self._get_pool(worker)
+        future = job.pool.submit(_scan_in_worker, symbol, analysis_timeframe, updates)
+        return future, job
+
+    def _collect(
+        self,
+        future: Future,
+        job: _PendingScan,
+        mtf_data: Dict[str, List[Candle]],
+        analysis_timeframe: str,
+    ) -> Tuple[Optional[ScanResult], Optional[Tuple[Future, _PendingScan]]]:
+        """Turn a finished future into a result, or resubmit after a resync.
+
+        Returns:
+            (result, None) when done, or (None, (future, job)) when resubmitted
+        """
+        def _result(signal=None, compute_ms=0.0, error=None) -> ScanResult:
+            return ScanResult(
+                symbol=job.symbol,
+                signal=signal,
+                latency_ms=(time.perf_counter() - job.submitted_at) * 1000,
+                compute_ms=compute_ms,
+                worker=job.worker,
+                error=error,
+            )
+
+        try:
+            signal, compute_ms, stale = future.result()
+        except BrokenProcessPool as e:
+            logger.warning(f"Scanner worker {job.worker} died while scanning {job.symbol}: {e}")
+            self._restart_worker(job.worker, job.pool)
+            if job.resent:
+                return _result(error=str(e)), None
+            retry = self._submit(job.symbol, mtf_data, analysis_timeframe, full=True)
+            retry[1].resent = True
+            retry[1].submitted_at = job.submitted_at
+            return None, retry
+        except Exception as e:
+            logger.warning(f"Signal scan failed for {job.symbol}: {e}")
+            for timeframe in job.sent:
+                self._synced.pop((job.symbol, timeframe), None)
+            return _result(error=str(e)), None
+
+        if stale:
+            # Timeframes that were in sync have been applied by the worker
+            for timeframe, last_ts in job.sent.items():
+                if timeframe not in stale:
+                    self._synced[(job.symbol, timeframe)] = last_ts
+            if job.resent:
+                return _result(error=f"Worker buffer out of sync for {stale}"), None
+            retry = self._submit(job.symbol, mtf_data, analysis_timeframe, full=False, only=stale)
+            retry[1].resent = True
+            retry[1].submitted_at = job.submitted_at
+            return None, retry
+
+        for timeframe, last_ts in job.sent.items():
+            self._synced[(job.symbol, timeframe)] = last_ts
+
+        return _result(signal=signal, compute_ms=compute_ms), None
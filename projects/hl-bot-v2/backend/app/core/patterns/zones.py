@@ -6,6 +6,7 @@ shown reactions. These zones act as price magnets and decision points.
 Zones differ from exact levels - they represent areas/ranges where
 institutional orders may be clustered.
 """
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -204,6 +205,54 @@ class SupportResistanceZone:
         }
 
 
+class ZoneIndex:
+    """Zones sorted by midpoint for price-proximity queries.
+    
+    A zone is within distance ``d`` of a price only if its midpoint is within
+    ``d`` plus half its width, so a query bisects the midpoint array around the
+    price and checks just those zones instead of scanning every zone.
+    
+    Example:
+        >>> index = ZoneIndex(zones)
+        >>> nearby = index.within(current_price, current_price * 0.05)
+    """
+    
+    def __init__(self, zones: List[SupportResistanceZone]):
+        """Build the index.
+        
+        Args:
+            zones: Zones to index (their bounds must not change afterwards)
+        """
+        self.zones = list(zones)
+        self._order = sorted(range(len(self.zones)), key=lambda k: self.zones[k].midpoint)
+        self._midpoints = [self.zones[k].midpoint for k in self._order]
+        self._max_half_width = max(
+            (abs(z.zone_width) / 2 for z in self.zones), default=0.0
+        )
+    
+    def __len__(self) -> int:
+        return len(self.zones)
+    
+    def within(self, price: float, max_distance: float) -> List[int]:
+        """Positions of zones that may lie within ``max_distance`` of price.
+        
+        The result is a superset (padded for float rounding), returned in the
+        zones' original order; callers apply their exact distance test.
+        
+        Args:
+            price: Reference price
+            max_distance: Maximum distance from price to zone edge
+            
+        Returns:
+            Candidate positions into ``zones``, ascending
+        """
+        reach = abs(max_distance) + self._max_half_width
+        reach += (reach + abs(price)) * 1e-9
+        lo = bisect_left(self._midpoints, price - reach)
+        hi = bisect_right(self._midpoints, price + reach)
+        return sorted(self._order[lo:hi])
+
+
 class SupportResistanceDetector:
     """Detects support and resistance zones from OHLCV data.
     
@@ -242,6 +291,10 @@ class SupportResistanceDetector:
         self.zone_width_pct = zone_width_pct
         self.lookback_window = lookback_window
         self.touch_proximity_pct = touch_proximity_pct
+        
+        # Midpoint index for the most recent zone list queried
+        self._zone_index: Optional[ZoneIndex] = None
+        self._zone_index_key: Optional[Tuple[int, ...]] = None
     
     def detect_zones(self, candles: List[Candle]) -> List[SupportResistanceZone]:
         """Detect all support and resistance zones in the candle series.
@@ -303,9 +356,13 @@ class SupportResistanceDetector:
         Returns:
             List of zones around swing points
         """
-        zones = []
         lookback = 5  # Simple swing detection
         
+        # Collect swing candidates first, then count touches for all of them
+        # in a single sweep over the candles.
+        # Each candidate: (swing index, zone top, zone bottom, is_resistance)
+        candidates: List[Tuple[int, float, float, bool]] = []
+        
         for i in range(lookback, len(candles) - lookback):
             candle = candles[i]
             
@@ -318,25 +375,9 @@ class SupportResistanceDetector:
             
             if is_swing_high:
                 zone_width = candle.high * self.zone_width_pct
-                top = candle.high + zone_width / 2
-                bottom = candle.high - zone_width / 2
-                
-                # Find touches of this zone in subsequent candles
-                touches = self._find_zone_touches(
-                    candles[i:], top, bottom, avg_volume, is_resistance=True
-                )
-                
-                if touches:
-                    zones.append(SupportResistanceZone(
-                        zone_type=ZoneType.RESISTANCE,
-                        top=top,
-                        bottom=bottom,
-                        strength=ZoneStrength.WEAK,  # Will be classified later
-                        touches=touches,
-                        first_touch=touches[0].candle.timestamp,
-                        last_touch=touches[-1].candle.timestamp,
-                        volume_profile=candle.volume / avg_volume if avg_volume > 0 else 1.0,
-                    ))
+                candidates.append((
+                    i, candle.high + zone_width / 2, candle.high - zone_width / 2, True
+                ))
             
             # Check for swing low (support zone)
             is_swing_low = all(
@@ -347,27 +388,127 @@ class SupportResistanceDetector:
             
             if is_swing_low:
                 zone_width = candle.low * self.zone_width_pct
-                top = candle.low + zone_width / 2
-                bottom = candle.low - zone_width / 2
+                candidates.append((
+                    i, candle.low + zone_width / 2, candle.low - zone_width / 2, False
+                ))
+        
+        # Find touches of each zone from its swing candle onwards
+        all_touches = self._sweep_zone_touches(candles, candidates, avg_volume)
+        
+        zones = []
+        for (i, top, bottom, is_resistance), touches in zip(candidates, all_touches):
+            if not touches:
+                continue
+            
+            zones.append(SupportResistanceZone(
+                zone_type=ZoneType.RESISTANCE if is_resistance else ZoneType.SUPPORT,
+                top=top,
+                bottom=bottom,
+                strength=ZoneStrength.WEAK,  # Will be classified later
+                touches=touches,
+                first_touch=touches[0].candle.timestamp,
+                last_touch=touches[-1].candle.timestamp,
+                volume_profile=candles[i].volume / avg_volume if avg_volume > 0 else 1.0,
+            ))
+        
+        return zones
+    
+    def _sweep_zone_touches(
+        self,
+        candles: List[Candle],
+        candidates: List[Tuple[int, float, float, bool]],
+        avg_volume: float,
+    ) -> List[List[ZoneTouch]]:
+        """Find touches for many zones in one pass over the candles.
+        
+        Equivalent to calling _find_zone_touches(candles[start:], ...) for
+        every candidate, but zones are indexed by price (sorted by bottom) so
+        each candle only examines zones its price span can reach.
+        
+        Args:
+            candles: Candles in chronological order
+            candidates: (start index, zone top, zone bottom, is_resistance) per zone
+            avg_volume: Average volume for normalization
+            
+        Returns:
+            Touch lists, one per candidate in the same order
+        """
+        touches: List[List[ZoneTouch]] = [[] for _ in candidates]
+        if not candidates:
+            return touches
+        
+        order = sorted(range(len(candidates)), key=lambda k: candidates[k][2])
+        bottoms = [candidates[k][2] for k in order]
+        # A zone overlapping [low, high] has bottom >= low - width; pad the
+        # widest zone slightly so float rounding never drops a candidate.
+        max_width = max(max(top - bottom for _, top, bottom, _ in candidates), 0.0)
+        reach = max_width * (1 + 1e-9) + 1e-12
+        
+        previous_hits: set = set()
+        for t, candle in enumerate(candles):
+            span_low = min(candle.low, candle.open, candle.close)
+            span_high = max(candle.high, candle.open, candle.close)
+            lo = bisect_left(bottoms, span_low - reach - abs(span_low) * 1e-12)
+            hi = bisect_right(bottoms, span_high)
+            
+            hits = set()
+            for pos in range(lo, hi):
+                k = order[pos]
+                start, zone_top, zone_bottom, is_resistance = candidates[k]
+                if start > t:
+                    continue
                 
-                # Find touches of this zone in subsequent candles
-                touches = self._find_zone_touches(
-                    candles[i:], top, bottom, avg_volume, is_resistance=False
+                candle_in_zone = (
+                    (candle.low <= zone_top and candle.high >= zone_bottom) or
+                    (zone_bottom <= candle.close <= zone_top) or
+                    (zone_bottom <= candle.open <= zone_top)
                 )
+                if not candle_in_zone:
+                    continue
                 
-                if touches:
-                    zones.append(SupportResistanceZone(
-                        zone_type=ZoneType.SUPPORT,
-                        top=top,
-                        bottom=bottom,
-                        strength=ZoneStrength.WEAK,
-                        touches=touches,
-                        first_touch=touches[0].candle.timestamp,
-                        last_touch=touches[-1].candle.timestamp,
-                        volume_profile=candle.volume / avg_volume if avg_volume > 0 else 1.0,
-                    ))
+                hits.add(k)
+                if k in previous_hits:
+                    continue  # Still inside the zone from the previous candle
+                
+                touches[k].append(self._make_touch(
+                    candle, zone_top, zone_bottom, avg_volume, is_resistance
+                ))
+            
+            previous_hits = hits
         
-        return zones
+        return touches
+    
+    def _make_touch(
+        self,
+        candle: Candle,
+        zone_top: float,
+        zone_bottom: float,
+        avg_volume: float,
+        is_resistance: bool,
+    ) -> ZoneTouch:
+        """Build the touch for a candle entering a zone."""
+        # Determine touch price
+        if is_resistance:
+            touch_price = min(candle.high, zone_top)
+        else:
+            touch_price = max(candle.low, zone_bottom)
+        
+        # Check if price bounced or broke through
+        # For resistance: bounce if close is below zone
+        # For support: bounce if close is above zone
+        if is_resistance:
+            is_bounce = candle.close < zone_bottom
+        else:
+            is_bounce = candle.close > zone_top
+        
+        volume_ratio = candle.volume / avg_volume if avg_volume > 0 else 1.0
+        
+        return ZoneTouch(
+            candle=candle,
+            price=touch_price,
+            is_bounce=is_bounce,
+            volume_ratio=volume_ratio,
+        )
     
     def _detect_touch_zones(
         self,
@@ -504,7 +645,6 @@ class SupportResistanceDetector:
             List of zone touches
         """
         touches = []
-        zone_mid = (zone_top + zone_bottom) / 2
         in_zone = False
         
         for candle in candles:
@@ -518,28 +658,8 @@ class SupportResistanceDetector:
             if candle_in_zone and not in_zone:
                 # Entering zone
                 in_zone = True
-                
-                # Determine touch price
-                if is_resistance:
-                    touch_price = min(candle.high, zone_top)
-                else:
-                    touch_price = max(candle.low, zone_bottom)
-                
-                # Check if price bounced or broke through
-                # For resistance: bounce if close is below zone
-                # For support: bounce if close is above zone
-                if is_resistance:
-                    is_bounce = candle.close < zone_bottom
-                else:
-                    is_bounce = candle.close > zone_top
-                
-                volume_ratio = candle.volume / avg_volume if avg_volume > 0 else 1.0
-                
-                touches.append(ZoneTouch(
-                    candle=candle,
-                    price=touch_price,
-                    is_bounce=is_bounce,
-                    volume_ratio=volume_ratio,
+                touches.append(self._make_touch(
+                    candle, zone_top, zone_bottom, avg_volume, is_resistance
                 ))
             
             elif not candle_in_zone:
@@ -612,60 +732,75 @@ class SupportResistanceDetector:
         # Sort by midpoint
         sorted_zones = sorted(zones, key=lambda z: z.midpoint)
         
+        # Walk the zones once, growing the current group's bounds and type;
+        # touches are only combined when a group is closed.
         merged = []
-        current_zone = sorted_zones[0]
+        group = [sorted_zones[0]]
+        group_top = sorted_zones[0].top
+        group_bottom = sorted_zones[0].bottom
+        group_type = sorted_zones[0].zone_type
         
-        for i in range(1, len(sorted_zones)):
-            next_zone = sorted_zones[i]
-            
+        for next_zone in sorted_zones[1:]:
             # Calculate distance between zone midpoints
-            distance_pct = abs(next_zone.midpoint - current_zone.midpoint) / current_zone.midpoint
+            group_mid = (group_top + group_bottom) / 2
+            distance_pct = abs(next_zone.midpoint - group_mid) / group_mid
             
             # Check if zones are compatible (same type or flipped)
             compatible = (
-                current_zone.zone_type == next_zone.zone_type or
-                current_zone.zone_type == ZoneType.SUPPORT_RESISTANCE or
+                group_type == next_zone.zone_type or
+                group_type == ZoneType.SUPPORT_RESISTANCE or
                 next_zone.zone_type == ZoneType.SUPPORT_RESISTANCE
             )
             
             # Merge if close and compatible
             if distance_pct < self.zone_merge_threshold and compatible:
-                # Merge zones
-                merged_top = max(current_zone.top, next_zone.top)
-                merged_bottom = min(current_zone.bottom, next_zone.bottom)
-                merged_touches = current_zone.touches + next_zone.touches
-                merged_touches.sort(key=lambda t: t.candle.timestamp)
-                
-                # Determine merged type
-                if current_zone.zone_type == next_zone.zone_type:
-                    merged_type = current_zone.zone_type
-                else:
-                    merged_type = ZoneType.SUPPORT_RESISTANCE
-                
-                # Calculate merged volume profile
-                total_touches = len(merged_touches)
-                merged_volume = sum(t.volume_ratio for t in merged_touches) / total_touches
-                
-                current_zone = SupportResistanceZone(
-                    zone_type=merged_type,
-                    top=merged_top,
-                    bottom=merged_bottom,
-                    strength=ZoneStrength.WEAK,
-                    touches=merged_touches,
-                    first_touch=merged_touches[0].candle.timestamp,
-                    last_touch=merged_touches[-1].candle.timestamp,
-                    volume_profile=merged_volume,
-                )
+                group.append(next_zone)
+                group_top = max(group_top, next_zone.top)
+                group_bottom = min(group_bottom, next_zone.bottom)
+                if group_type != next_zone.zone_type:
+                    group_type = ZoneType.SUPPORT_RESISTANCE
             else:
-                # Not mergeable, add current and move to next
-                merged.append(current_zone)
-                current_zone = next_zone
+                # Not mergeable, close current group and move to next
+                merged.append(self._build_merged_zone(group, group_top, group_bottom, group_type))
+                group = [next_zone]
+                group_top = next_zone.top
+                group_bottom = next_zone.bottom
+                group_type = next_zone.zone_type
         
-        # Add last zone
-        merged.append(current_zone)
+        # Add last group
+        merged.append(self._build_merged_zone(group, group_top, group_bottom, group_type))
         
         return merged
     
+    def _build_merged_zone(
+        self,
+        group: List[SupportResistanceZone],
+        top: float,
+        bottom: float,
+        zone_type: ZoneType,
+    ) -> SupportResistanceZone:
+        """Combine a group of nearby zones into one zone."""
+        if len(group) == 1:
+            return group[0]
+        
+        # Stable sort keeps earlier zones' touches first on equal timestamps
+        merged_touches = [t for zone in group for t in zone.touches]
+        merged_touches.sort(key=lambda t: t.candle.timestamp)
+        
+        # Calculate merged volume profile
+        merged_volume = sum(t.volume_ratio for t in merged_touches) / len(merged_touches)
+        
+        return SupportResistanceZone(
+            zone_type=zone_type,
+            top=top,
+            bottom=bottom,
+            strength=ZoneStrength.WEAK,
+            touches=merged_touches,
+            first_touch=merged_touches[0].candle.timestamp,
+            last_touch=merged_touches[-1].candle.timestamp,
+            volume_profile=merged_volume,
+        )
+    
     def _classify_strength(self, zone: SupportResistanceZone) -> ZoneStrength:
         """Classify zone strength based on characteristics.
         
@@ -707,7 +842,7 @@ class SupportResistanceDetector:
         """Find zones nearest to current price.
         
         Args:
-            zones: List of zones to search
+            zones: List of zones to search (or a prebuilt ZoneIndex)
             current_price: Current market price
             max_distance_pct: Maximum distance as percentage of price
             zone_types: Filter by zone types (None = all types)
@@ -715,11 +850,46 @@ class SupportResistanceDetector:
         Returns:
             List of (zone, distance) tuples, sorted by distance
         """
-        # Filter by type if specified
+        if current_price <= 0:
+            return self._find_nearest_zones_linear(
+                zones, current_price, max_distance_pct, zone_types
+            )
+        
+        index = self._get_zone_index(zones)
+        candidates = index.within(current_price, max_distance_pct * current_price)
+        
+        # Calculate distances
+        zones_with_distance = []
+        for position in candidates:
+            zone = index.zones[position]
+            # Filter by type if specified
+            if zone_types and zone.zone_type not in zone_types:
+                continue
+            
+            distance = zone.distance_to_zone(current_price)
+            distance_pct = abs(distance) / current_price
+            
+            if distance_pct <= max_distance_pct:
+                zones_with_distance.append((zone, distance))
+        
+        # Sort by absolute distance (ties keep input order)
+        zones_with_distance.sort(key=lambda x: abs(x[1]))
+        
+        return zones_with_distance
+    
+    def _find_nearest_zones_linear(
+        self,
+        zones: List[SupportResistanceZone],
+        current_price: float,
+        max_distance_pct: float,
+        zone_types: Optional[List[ZoneType]],
+    ) -> List[Tuple[SupportResistanceZone, float]]:
+        """Full scan used when the price is not positive (no distance window)."""
+        if isinstance(zones, ZoneIndex):
+            zones = zones.zones
         if zone_types:
             zones = [z for z in zones if z.zone_type in zone_types]
         
-        # Calculate distances
         zones_with_distance = []
         for zone in zones:
             distance = zone.distance_to_zone(current_price)
@@ -728,11 +898,28 @@ class SupportResistanceDetector:
             if distance_pct <= max_distance_pct:
                 zones_with_distance.append((zone, distance))
         
-        # Sort by absolute distance
         zones_with_distance.sort(key=lambda x: abs(x[1]))
         
         return zones_with_distance
     
+    def _get_zone_index(self, zones: List[SupportResistanceZone]) -> ZoneIndex:
+        """Return a midpoint index for the zones, reusing the last one if unchanged.
+        
+        Args:
+            zones: Zone list, or a prebuilt ZoneIndex
+            
+        Returns:
+            ZoneIndex over the zones
+        """
+        if isinstance(zones, ZoneIndex):
+            return zones
+        
+        key = tuple(id(z) for z in zones)
+        if self._zone_index is None or self._zone_index_key != key:
+            self._zone_index = ZoneIndex(zones)
+            self._zone_index_key = key
+        return self._zone_index
+    
     def get_active_zones(
         self,
         zones: List[SupportResistanceZone],
@@ -747,16 +934,25 @@ class SupportResistanceDetector:
         3. Are within reasonable distance of current price
         
         Args:
-            zones: List of zones to filter
+            zones: List of zones to filter (or a prebuilt ZoneIndex)
             current_price: Current market price
             lookback_touches: Consider zones touched within last N touches
             
         Returns:
             List of active zones
         """
+        if current_price <= 0:
+            zone_list = zones.zones if isinstance(zones, ZoneIndex) else list(zones)
+            candidates = range(len(zone_list))
+        else:
+            index = self._get_zone_index(zones)
+            candidates = index.within(current_price, 0.10 * current_price)
+            zone_list = index.zones
+        
         active = []
         
-        for zone in zones:
+        for position in candidates:
+            zone = zone_list[position]
             # Skip broken zones
             if zone.broken:
                 continue
@@ -11,6 +11,7 @@ from typing import Any
 
 from celery import Task
 from celery.exceptions import Ignore, Retry
+from celery.signals import worker_process_shutdown
 
 from app.celery_app import celery_app
 
@@ -57,6 +58,43 @@ class CallbackTask(Task):
         logger.warning(f"Task {task_id} ({self.name}) retrying: {exc}")
 
 
+# Processors are created once per worker process so their process pools are
+# reused across tasks, and shut down when the worker process exits
+_processors: dict[str, Any] = {}
+
+
+def get_youtube_processor() -> YouTubeProcessor:
+    """Get this worker process's YouTube processor."""
+    if "youtube" not in _processors:
+        _processors["youtube"] = YouTubeProcessor(
+            cache_dir=Path("/tmp/hl_bot_youtube"),
+            enable_whisper=True,
+            max_video_duration=7200,  # 2 hours
+            frame_interval=30,
+        )
+    return _processors["youtube"]
+
+
+def get_pdf_processor() -> PDFProcessor:
+    """Get this worker process's PDF processor."""
+    if "pdf" not in _processors:
+        _processors["pdf"] = PDFProcessor(
+            cache_dir=Path("/tmp/hl_bot_pdf"),
+            enable_ocr=True,
+            min_image_size=(100, 100),
+            max_pages=500,
+        )
+    return _processors["pdf"]
+
+
+@worker_process_shutdown.connect
+def shutdown_processors(**kwargs: Any) -> None:
+    """Shut down the worker process's processor pools."""
+    for processor in _processors.values():
+        processor.shutdown()
+    _processors.clear()
+
+
 # Helper to run async functions in Celery tasks
 def run_async(coro):
     """Run an async coroutine in a new event loop."""
@@ -107,13 +145,7 @@ def process_youtube_video(
     logger.info(f"Processing YouTube video: {url}")
 
     try:
-        # Initialize processor
-        processor = YouTubeProcessor(
-            cache_dir=Path("/tmp/hl_bot_youtube"),
-            enable_whisper=True,
-            max_video_duration=7200,  # 2 hours
-            frame_interval=30,
-        )
+        processor = get_youtube_processor()
 
         # Process video (async)
         videos = run_async(
@@ -188,12 +220,7 @@ def process_youtube_playlist(
     logger.info(f"Processing YouTube playlist: {url}")
 
     try:
-        processor = YouTubeProcessor(
-            cache_dir=Path("/tmp/hl_bot_youtube"),
-            enable_whisper=True,
-            max_video_duration=7200,
-            frame_interval=30,
-        )
+        processor = get_youtube_processor()
 
         # Process playlist (async)
         videos = run_async(
@@ -260,14 +287,7 @@ def process_pdf_document(
         if not pdf_file.exists():
             raise PDFError(f"PDF file not found: {pdf_path}")
 
-        # Initialize processor
-        processor = PDFProcessor(
-            cache_dir=Path("/tmp/hl_bot_pdf"),
-            enable_ocr=True,
-            min_image_size=(100, 100),
-            max_pages=500,
-            extract_images=extract_images,
-        )
+        processor = get_pdf_processor()
 
         # Process PDF (async)
         pdf_info = run_async(processor.process_file(pdf_file, extract_images))
@@ -454,7 +474,7 @@ def cleanup_youtube_cache(max_age_days: int = 7) -> dict[str, int]:
     logger.info(f"Cleaning up YouTube cache older than {max_age_days} days")
 
     try:
-        processor = YouTubeProcessor(cache_dir=Path("/tmp/hl_bot_youtube"))
+        processor = get_youtube_processor()
         count = run_async(processor.cleanup_cache(max_age_days))
 
         logger.info(f"Cleaned up {count} YouTube cache directories")
@@ -478,7 +498,7 @@ def cleanup_pdf_cache(max_age_days: int = 7) -> dict[str, int]:
     logger.info(f"Cleaning up PDF cache older than {max_age_days} days")
 
     try:
-        processor = PDFProcessor(cache_dir=Path("/tmp/hl_bot_pdf"))
+        processor = get_pdf_processor()
         count = run_async(processor.cleanup_cache(max_age_days))
 
         logger.info(f"Cleaned up {count} PDF cache directories")
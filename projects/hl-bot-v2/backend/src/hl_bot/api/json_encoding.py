@@ -0,0 +1,63 @@
+"""JSON encoding for WebSocket payloads.
+
+Broadcasts are encoded once and the resulting text is shared by every
+connection. orjson is used when installed (the ``performance`` extra), with
+the standard library as a fallback; both produce the same compact output:
+Decimals become strings, datetimes ISO 8601 strings, Enum members their
+values and non-string dict keys strings.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _default(obj: Any) -> Any:
+    """Convert values the encoders do not handle (identically) themselves."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if HAS_ORJSON:
+    # Datetimes and dataclasses go through _default so both encoders agree
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+    def dumps_bytes(message: Any) -> bytes:
+        """Encode a message as compact UTF-8 JSON."""
+        return orjson.dumps(message, default=_default, option=_ORJSON_OPTIONS)
+
+else:
+
+    def dumps_bytes(message: Any) -> bytes:
+        """Encode a message as compact UTF-8 JSON."""
+        return json.dumps(
+            message, default=_default, separators=(",", ":"), ensure_ascii=False
+        ).encode()
+
+
+def dumps(message: Any) -> str:
+    """Encode a message as compact JSON text.
+
+    WebSocket text frames are sent as ``str`` over ASGI, so a broadcast
+    encodes once with this and hands the same string to every connection.
+    """
+    return dumps_bytes(message).decode()
+
+
+__all__ = ["HAS_ORJSON", "dumps", "dumps_bytes"]
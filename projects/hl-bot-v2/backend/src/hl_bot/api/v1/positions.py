@@ -11,6 +11,9 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.responses import JSONResponse
 
+from hl_bot.api.json_encoding import dumps
+from hl_bot.api.send_queue import ClientSendQueue, SlowConsumerPolicy
+from hl_bot.config import get_settings
 from hl_bot.trading.position_monitor import PositionMonitor, PositionUpdate
 from hl_bot.utils.logging import get_logger
 
@@ -89,11 +92,32 @@ async def position_monitor_health(
 
 
 class ConnectionManager:
-    """Manages WebSocket connections for position streaming."""
+    """Manages WebSocket connections for position streaming.
 
-    def __init__(self):
-        """Initialize connection manager."""
-        self._connections: list[WebSocket] = []
+    Every connection has its own bounded send queue and writer task (see
+    hl_bot.api.send_queue), so broadcasting never waits on a slow client.
+    """
+
+    # "Try again later": sent when a client is dropped for falling behind
+    SLOW_CONSUMER_CLOSE_CODE = 1013
+
+    def __init__(
+        self,
+        queue_size: int = 256,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.COALESCE,
+        send_timeout: float = 10.0,
+    ):
+        """Initialize connection manager.
+
+        Args:
+            queue_size: Outbound messages buffered per connection
+            policy: What to do when a connection's queue is full
+            send_timeout: Seconds a single send may take before the client is dropped
+        """
+        self.queue_size = queue_size
+        self.policy = SlowConsumerPolicy(policy)
+        self.send_timeout = send_timeout
+        self._queues: dict[WebSocket, ClientSendQueue] = {}
         self._lock = asyncio.Lock()
 
     async def connect(self, websocket: WebSocket) -> None:
@@ -103,9 +127,17 @@ class ConnectionManager:
             websocket: WebSocket connection to accept
         """
         await websocket.accept()
+        queue = ClientSendQueue(
+            websocket.send_text,
+            max_size=self.queue_size,
+            policy=self.policy,
+            send_timeout=self.send_timeout,
+            on_failure=lambda reason: self._drop(websocket, reason),
+        )
         async with self._lock:
-            self._connections.append(websocket)
-        logger.info(f"WebSocket connected: {len(self._connections)} total")
+            self._queues[websocket] = queue
+        queue.start()
+        logger.info(f"WebSocket connected: {len(self._queues)} total")
 
     async def disconnect(self, websocket: WebSocket) -> None:
         """Remove a WebSocket connection.
@@ -114,46 +146,84 @@ class ConnectionManager:
             websocket: WebSocket connection to remove
         """
         async with self._lock:
-            if websocket in self._connections:
-                self._connections.remove(websocket)
-        logger.info(f"WebSocket disconnected: {len(self._connections)} remaining")
+            queue = self._queues.pop(websocket, None)
+        if queue is not None:
+            await queue.close()
+            logger.info(f"WebSocket disconnected: {len(self._queues)} remaining")
+
+    def send(self, websocket: WebSocket, message: dict) -> bool:
+        """Queue a message for one client, in order with broadcasts.
+
+        Args:
+            websocket: Target connection
+            message: Message to send
+
+        Returns:
+            False if the client is no longer connected
+        """
+        queue = self._queues.get(websocket)
+        return queue is not None and queue.put(dumps(message))
 
     async def broadcast(self, message: dict) -> None:
         """Broadcast message to all connected clients.
 
+        The message is serialized once and queued on every connection;
+        this returns without waiting for any client.
+
         Args:
             message: Message to broadcast
         """
-        if not self._connections:
+        if not self._queues:
             return
 
-        # Convert to JSON
-        json_message = json.dumps(message)
+        # Encode once; every queue holds the same string
+        json_message = dumps(message)
+        key = self._coalesce_key(message)
 
-        # Send to all connections
-        disconnected = []
-        for connection in self._connections[:]:  # Copy list to avoid modification during iteration
-            try:
-                await connection.send_text(json_message)
-            except Exception as e:
-                logger.warning(f"Failed to send to client: {e}")
-                disconnected.append(connection)
-
-        # Clean up disconnected clients
-        if disconnected:
-            async with self._lock:
-                for connection in disconnected:
-                    if connection in self._connections:
-                        self._connections.remove(connection)
+        for queue in list(self._queues.values()):
+            queue.put(json_message, key)
+
+    @staticmethod
+    def _coalesce_key(message: dict) -> tuple[str, str] | None:
+        """Key under which newer messages supersede queued ones.
+
+        Only price updates qualify: each carries the symbol's full position
+        state, while fills and exchange-sync changes must all be delivered.
+        """
+        if message.get("event_type") == "price_update":
+            return ("price_update", message.get("symbol", ""))
+        return None
+
+    async def _drop(self, websocket: WebSocket, reason: str) -> None:
+        """Close and remove a client whose writer gave up."""
+        logger.warning(f"Dropping slow WebSocket client: {reason}")
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=self.SLOW_CONSUMER_CLOSE_CODE, reason="Client too slow"),
+                timeout=1.0,
+            )
+        except Exception:
+            pass  # Already closed or stalled
+        await self.disconnect(websocket)
 
     @property
     def connection_count(self) -> int:
         """Get number of active connections."""
-        return len(self._connections)
+        return len(self._queues)
+
+
+def _create_connection_manager() -> ConnectionManager:
+    """Create the connection manager from the websocket_* settings."""
+    settings = get_settings()
+    return ConnectionManager(
+        queue_size=settings.websocket_send_queue_size,
+        policy=SlowConsumerPolicy(settings.websocket_slow_consumer_policy),
+        send_timeout=settings.websocket_send_timeout,
+    )
 
 
 # Global connection manager
-_connection_manager = ConnectionManager()
+_connection_manager = _create_connection_manager()
 
 
 @router.websocket("/stream")
@@ -213,10 +283,10 @@ async def position_stream(websocket: WebSocket) -> None:
     # Connect to manager
     await _connection_manager.connect(websocket)
 
-    # Send initial position summary
+    # Send initial position summary (queued, so it precedes any broadcast)
     try:
         summary = monitor.get_position_summary()
-        await websocket.send_json({
+        _connection_manager.send(websocket, {
             "type": "initial_state",
             **summary
         })
@@ -241,13 +311,13 @@ async def position_stream(websocket: WebSocket) -> None:
                     if action == "get_summary":
                         # Send current position summary
                         summary = monitor.get_position_summary()
-                        await websocket.send_json({
+                        _connection_manager.send(websocket, {
                             "type": "summary",
                             **summary
                         })
                     elif action == "ping":
                         # Respond to ping
-                        await websocket.send_json({"type": "pong"})
+                        _connection_manager.send(websocket, {"type": "pong"})
                     else:
                         logger.warning(f"Unknown action: {action}")
 
@@ -255,10 +325,8 @@ async def position_stream(websocket: WebSocket) -> None:
                     logger.warning(f"Invalid JSON from client: {data[:100]}")
 
             except asyncio.TimeoutError:
-                # Send keepalive ping
-                try:
-                    await websocket.send_json({"type": "ping"})
-                except Exception:
+                # Send keepalive ping (fails once the client has been dropped)
+                if not _connection_manager.send(websocket, {"type": "ping"}):
                     break
 
     except WebSocketDisconnect:
@@ -42,6 +42,23 @@ class Settings(BaseSettings):
         description="Use Hyperliquid testnet (False for mainnet)",
     )
 
+    # WebSocket fan-out
+    websocket_send_queue_size: int = Field(
+        default=256,
+        ge=1,
+        description="Outbound messages buffered per WebSocket client",
+    )
+    websocket_slow_consumer_policy: str = Field(
+        default="coalesce",
+        pattern=r"^(drop_oldest|coalesce|disconnect)$",
+        description="What to do with a client that falls behind",
+    )
+    websocket_send_timeout: float = Field(
+        default=10.0,
+        gt=0,
+        description="Seconds a single send may take before the client is dropped",
+    )
+
     # API Keys (examples - will be configured later)
     # api_key: SecretStr | None = Field(default=None, description="External API key")
     
@@ -9,6 +9,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from hl_bot.config import get_settings
 from hl_bot.api.v1 import health, strategies, ingestion, ingest, positions
+from hl_bot.services.chart_rendering import shutdown_chart_render_service
 from hl_bot.trading.position_monitor import PositionMonitor
 from hl_bot.trading.position import PositionTracker
 from hl_bot.trading.audit_logger import AuditLogger
@@ -89,6 +90,14 @@ async def lifespan(app: FastAPI):
         await _position_monitor.stop()
         logger.info("Position monitor stopped")
 
+    # Stop ingestion worker pools
+    for module in (ingestion, ingest):
+        module.youtube_processor.shutdown()
+        module.pdf_processor.shutdown()
+
+    # Stop the chart render pool (started lazily by the first render)
+    shutdown_chart_render_service()
+
 
 # Create FastAPI app
 settings = get_settings()
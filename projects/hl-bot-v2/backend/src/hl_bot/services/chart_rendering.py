@@ -0,0 +1,476 @@
+"""Chart rendering for visual analysis.
+
+ChartRenderer draws a candle window to a PNG for Claude Vision, with either
+mplfinance or the lightweight raster backend (raster_chart).
+ChartRenderService runs renders in a process pool so async callers never
+block the event loop on matplotlib. It also caches PNGs keyed on a hash of
+the candle window plus the render options, so an unchanged window costs
+nothing to render again. Concurrent requests for the same chart share one
+render.
+"""
+
+import asyncio
+import functools
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import timezone
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from hl_bot.types import Candle
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Candle packing
+# ============================================================================
+
+# Columns of a packed candle row
+CANDLE_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+def pack_candles(candles: Sequence[Candle]) -> np.ndarray:
+    """Pack candles into an (n, 6) float64 array.
+
+    Timestamps become UTC epoch seconds (naive timestamps are taken as UTC).
+    The array is both the cache key input and what is shipped to workers.
+    """
+    rows = np.empty((len(candles), len(CANDLE_COLUMNS)), dtype=np.float64)
+    for i, c in enumerate(candles):
+        ts = c.timestamp if c.timestamp.tzinfo else c.timestamp.replace(tzinfo=timezone.utc)
+        rows[i] = (
+            ts.timestamp(),
+            float(c.open),
+            float(c.high),
+            float(c.low),
+            float(c.close),
+            float(c.volume) if c.volume else 0.0,
+        )
+    return rows
+
+
+def _pyplot():
+    """Import pyplot on the non-interactive backend (deferred: it is slow to import)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+# ============================================================================
+# Renderers
+# ============================================================================
+
+# Candle chart backends: full mplfinance charts, or the lightweight raster
+# renderer (see raster_chart) that needs neither matplotlib nor pandas
+CHART_BACKENDS = ("mplfinance", "raster")
+
+
+class ChartRenderer:
+    """Renders candle data to chart images for visual analysis."""
+
+    def __init__(self, style: str = "charles", backend: str = "mplfinance"):
+        """Initialize chart renderer.
+
+        Args:
+            style: mplfinance style ('charles', 'yahoo', 'nightclouds', etc.)
+            backend: Rendering backend, one of CHART_BACKENDS
+        """
+        if backend not in CHART_BACKENDS:
+            raise ValueError(f"Unknown chart backend: {backend}")
+        self.style = style
+        self.backend = backend
+
+    def render_candles(
+        self,
+        candles: list[Candle],
+        title: str = "",
+        show_volume: bool = True,
+        highlight_range: Optional[tuple[float, float]] = None,
+        width: int = 1200,
+        height: int = 800,
+    ) -> bytes:
+        """Render candles to PNG image.
+
+        Args:
+            candles: List of candle data
+            title: Chart title
+            show_volume: Whether to show volume
+            highlight_range: Optional (low, high) to highlight as range zone
+            width: Image width in pixels
+            height: Image height in pixels
+
+        Returns:
+            PNG image bytes
+        """
+        if not candles:
+            raise ValueError("No candles to render")
+
+        return self.render_rows(
+            pack_candles(candles),
+            title=title,
+            show_volume=show_volume,
+            highlight_range=highlight_range,
+            width=width,
+            height=height,
+        )
+
+    def render_rows(
+        self,
+        rows: np.ndarray,
+        title: str = "",
+        show_volume: bool = True,
+        highlight_range: Optional[tuple[float, float]] = None,
+        width: int = 1200,
+        height: int = 800,
+    ) -> bytes:
+        """Render packed candle rows (see pack_candles) to PNG image."""
+        if len(rows) == 0:
+            raise ValueError("No candles to render")
+
+        if self.backend == "raster":
+            from hl_bot.services.raster_chart import render_raster_candles
+            return render_raster_candles(
+                rows,
+                title=title,
+                show_volume=show_volume,
+                highlight_range=highlight_range,
+                width=width,
+                height=height,
+                style=self.style,
+            )
+
+        _pyplot()
+        import mplfinance as mpf
+        import pandas as pd
+
+        df = pd.DataFrame(rows[:, 1:], columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        df.index = pd.DatetimeIndex(pd.to_datetime(rows[:, 0], unit='s'), name='Date')
+
+        # Create figure
+        fig_ratio = (width / 100, height / 100)
+
+        # Add horizontal lines for range if specified
+        addplots = []
+        if highlight_range:
+            low, high = highlight_range
+            addplots.append(mpf.make_addplot(
+                [low] * len(df), color='green', linestyle='--', alpha=0.7
+            ))
+            addplots.append(mpf.make_addplot(
+                [high] * len(df), color='red', linestyle='--', alpha=0.7
+            ))
+
+        # Render to buffer (mplfinance rejects addplot=None)
+        buf = io.BytesIO()
+        extra = {'addplot': addplots} if addplots else {}
+
+        mpf.plot(
+            df,
+            type='candle',
+            style=self.style,
+            title=title,
+            volume=show_volume,
+            figsize=fig_ratio,
+            savefig=dict(fname=buf, dpi=100, format='png'),
+            **extra,
+        )
+
+        buf.seek(0)
+        return buf.read()
+
+
+def render_trade_chart(
+    rows: np.ndarray,
+    entry_price: float,
+    exit_price: float,
+    stop_loss: float,
+    take_profit: float,
+    title: str = "",
+) -> bytes:
+    """Render packed candle rows with a trade's entry, exit, SL and TP levels.
+
+    Returns:
+        PNG image bytes
+    """
+    import matplotlib.patches as patches
+    plt = _pyplot()
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    try:
+        # Plot candlesticks
+        for i, (_, open_, high, low, close, _) in enumerate(rows):
+            color = 'green' if close >= open_ else 'red'
+
+            # Body
+            body_bottom = min(open_, close)
+            body_height = abs(close - open_)
+            ax.add_patch(patches.Rectangle(
+                (i - 0.3, body_bottom), 0.6, body_height,
+                facecolor=color, edgecolor=color
+            ))
+
+            # Wicks
+            ax.plot([i, i], [low, body_bottom], color=color, linewidth=1)
+            ax.plot([i, i], [body_bottom + body_height, high], color=color, linewidth=1)
+
+        # Mark entry and exit
+        ax.axhline(y=entry_price, color='blue', linestyle='--', label=f'Entry: {entry_price:.2f}')
+        ax.axhline(y=exit_price, color='purple', linestyle='--', label=f'Exit: {exit_price:.2f}')
+        ax.axhline(y=stop_loss, color='red', linestyle=':', label=f'SL: {stop_loss:.2f}')
+        ax.axhline(y=take_profit, color='green', linestyle=':', label=f'TP: {take_profit:.2f}')
+
+        # Styling
+        ax.set_title(title)
+        ax.legend(loc='upper left')
+        ax.grid(True, alpha=0.3)
+
+        # Save to bytes
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', dpi=100, bbox_inches='tight')
+        buf.seek(0)
+        return buf.read()
+    finally:
+        plt.close(fig)
+
+
+def _render_job(kind: str, rows: np.ndarray, options: dict[str, Any]) -> bytes:
+    """Render one chart (runs in a worker process)."""
+    if kind == "candles":
+        options = dict(options)
+        renderer = ChartRenderer(options.pop("style"), backend=options.pop("backend"))
+        return renderer.render_rows(rows, **options)
+    if kind == "trade":
+        return render_trade_chart(rows, **options)
+    raise ValueError(f"Unknown chart kind: {kind}")
+
+
+def _init_worker(backend: str = "mplfinance") -> None:
+    """Import the plotting stack once per worker instead of on its first chart."""
+    if backend == "raster":
+        import hl_bot.services.raster_chart  # noqa: F401
+        return
+    _pyplot()
+    import mplfinance  # noqa: F401
+    import pandas  # noqa: F401
+
+
+# ============================================================================
+# Rendering service
+# ============================================================================
+
+@dataclass
+class RenderStats:
+    """Render cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0  # Served by a render already in flight
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+
+class ChartRenderService:
+    """Off-loop chart rendering with a content-keyed PNG cache.
+
+    Example:
+        >>> service = ChartRenderService(max_workers=2)
+        >>> png = await service.render_candles(candles, title="BTC 15m")
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache_size: int = 256,
+        executor: Optional[Executor] = None,
+        backend: str = "mplfinance",
+    ):
+        """Initialize rendering service.
+
+        Args:
+            max_workers: Render processes (defaults to min(4, CPU count));
+                0 renders on the event loop's default thread pool instead
+            cache_size: Maximum number of PNGs kept in the LRU cache
+            executor: Executor to render on (overrides max_workers)
+            backend: Default candle chart backend; workers preload only
+                what it needs
+        """
+        if backend not in CHART_BACKENDS:
+            raise ValueError(f"Unknown chart backend: {backend}")
+        self._max_workers = min(4, os.cpu_count() or 1) if max_workers is None else max_workers
+        self._cache_size = cache_size
+        self._executor = executor
+        self._own_executor = executor is None
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.backend = backend
+        self.stats = RenderStats()
+
+    async def render_candles(
+        self,
+        candles: Sequence[Candle],
+        title: str = "",
+        show_volume: bool = True,
+        highlight_range: Optional[tuple[float, float]] = None,
+        width: int = 1200,
+        height: int = 800,
+        style: str = "charles",
+        backend: Optional[str] = None,
+    ) -> bytes:
+        """Render candles to PNG (see ChartRenderer.render_candles).
+
+        The backend defaults to the service's backend.
+        """
+        backend = backend or self.backend
+        if backend not in CHART_BACKENDS:
+            raise ValueError(f"Unknown chart backend: {backend}")
+        return await self._render("candles", candles, {
+            "style": style,
+            "backend": backend,
+            "title": title,
+            "show_volume": show_volume,
+            "highlight_range": tuple(map(float, highlight_range)) if highlight_range else None,
+            "width": width,
+            "height": height,
+        })
+
+    async def render_trade_chart(
+        self,
+        candles: Sequence[Candle],
+        entry_price: float,
+        exit_price: float,
+        stop_loss: float,
+        take_profit: float,
+        title: str = "",
+    ) -> bytes:
+        """Render candles with trade levels to PNG (see render_trade_chart)."""
+        return await self._render("trade", candles, {
+            "entry_price": float(entry_price),
+            "exit_price": float(exit_price),
+            "stop_loss": float(stop_loss),
+            "take_profit": float(take_profit),
+            "title": title,
+        })
+
+    @staticmethod
+    def cache_key(kind: str, rows: np.ndarray, options: dict[str, Any]) -> str:
+        """Hash of the packed candle window and render options."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(kind.encode())
+        digest.update(repr(sorted(options.items())).encode())
+        digest.update(np.ascontiguousarray(rows).tobytes())
+        return digest.hexdigest()
+
+    @property
+    def cache_entries(self) -> int:
+        return len(self._cache)
+
+    def clear_cache(self) -> None:
+        """Drop all cached PNGs."""
+        self._cache.clear()
+
+    def shutdown(self) -> None:
+        """Shut down the render process pool (if owned)."""
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _render(self, kind: str, candles: Sequence[Candle], options: dict[str, Any]) -> bytes:
+        """Serve a chart from cache, a render in flight, or a new render."""
+        if not candles:
+            raise ValueError("No candles to render")
+
+        rows = pack_candles(candles)
+        key = self.cache_key(kind, rows, options)
+
+        png = self._cache.get(key)
+        if png is not None:
+            self._cache.move_to_end(key)
+            self.stats.hits += 1
+            return png
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.stats.misses += 1
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        future = loop.run_in_executor(executor, _render_job, kind, rows, options)
+        self._inflight[key] = future
+        future.add_done_callback(functools.partial(self._on_rendered, key, executor))
+
+        # Shielded so one cancelled caller does not cancel a shared render
+        return await asyncio.shield(future)
+
+    def _on_rendered(self, key: str, executor: Optional[Executor], future: asyncio.Future) -> None:
+        """Cache a finished render; drop a broken pool so the next render restarts it."""
+        self._inflight.pop(key, None)
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if error is None:
+            self._cache[key] = future.result()
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        elif isinstance(error, BrokenProcessPool) and self._own_executor and executor is self._executor:
+            logger.warning("Chart render pool broke; restarting on next render")
+            self._executor = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        """Lazily create the render process pool (None = default thread pool)."""
+        if self._executor is None and self._own_executor and self._max_workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                initializer=_init_worker,
+                initargs=(self.backend,),
+            )
+        return self._executor
+
+
+_default_service: Optional[ChartRenderService] = None
+_default_lock = threading.Lock()
+
+
+def get_chart_render_service() -> ChartRenderService:
+    """Return the process-wide chart render service."""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = ChartRenderService()
+        return _default_service
+
+
+def shutdown_chart_render_service() -> None:
+    """Shut down the process-wide service's render pool, if the service was created."""
+    with _default_lock:
+        if _default_service is not None:
+            _default_service.shutdown()
+
+
+__all__ = [
+    "CANDLE_COLUMNS",
+    "CHART_BACKENDS",
+    "ChartRenderService",
+    "ChartRenderer",
+    "RenderStats",
+    "get_chart_render_service",
+    "pack_candles",
+    "render_trade_chart",
+    "shutdown_chart_render_service",
+]
@@ -2,19 +2,26 @@
 
 Analyzes trading chart images to extract patterns, levels, and trading setups.
 Uses Claude Vision for multi-modal analysis.
+
+Cached analyses are found by exact content hash first, then by perceptual
+hash (pHash): re-encoded or rescaled copies of a chart that was already
+analyzed reuse its analysis instead of another LLM call. Cropped copies are
+out of scope: a chart cut short at the edge cannot be told apart from one
+with fewer candles.
 """
 
 import asyncio
 import base64
 import hashlib
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
 from typing import Any
 
 import aiofiles
+import numpy as np
 from PIL import Image
 from pydantic import BaseModel, Field, ValidationError
 
@@ -153,6 +160,171 @@ class ImageAnalysis:
         }
 
 
+# ============================================================================
+# Perceptual Hashing
+# ============================================================================
+
+_PHASH_SIZE = 32  # Side of the downscaled grayscale image
+_PHASH_LOW = 8  # Side of the low-frequency DCT block kept in the hash
+_THUMBNAIL_SIZE = 64  # Side of the grayscale thumbnail confirming a pHash match
+# Largest per-pixel thumbnail difference (of 255) between copies of one chart:
+# re-encoding stays within a few levels, while one extra candle changes
+# some pixels by tens
+_THUMBNAIL_MAX_DIFF = 12
+# Largest relative aspect-ratio difference between rescaled copies (rounding)
+_ASPECT_TOLERANCE = 0.01
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix."""
+    k = np.arange(n)[:, None]
+    matrix = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+
+_DCT = _dct_matrix(_PHASH_SIZE)
+
+
+def perceptual_hash(image: Image.Image) -> int:
+    """Compute the 64-bit DCT perceptual hash (pHash) of an image.
+
+    Each bit says whether one of the 8x8 lowest-frequency DCT coefficients
+    of the 32x32 grayscale image is above their median, so the hash survives
+    re-encoding, rescaling and small crops.
+
+    Args:
+        image: Image to hash
+
+    Returns:
+        64-bit hash
+    """
+    gray = image.convert("L").resize((_PHASH_SIZE, _PHASH_SIZE), Image.Resampling.LANCZOS)
+    pixels = np.asarray(gray, dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:_PHASH_LOW, :_PHASH_LOW].ravel()
+
+    # The DC term is the mean brightness: leave it out of the median
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def chart_thumbnail(image: Image.Image) -> bytes:
+    """Downscale an image to the grayscale thumbnail that confirms pHash matches."""
+    gray = image.convert("L").resize(
+        (_THUMBNAIL_SIZE, _THUMBNAIL_SIZE), Image.Resampling.LANCZOS
+    )
+    return gray.tobytes()
+
+
+def thumbnails_match(a: bytes, b: bytes) -> bool:
+    """Whether two chart thumbnails show the same chart."""
+    if len(a) != len(b):
+        return False
+    diff = np.abs(
+        np.frombuffer(a, dtype=np.uint8).astype(np.int16)
+        - np.frombuffer(b, dtype=np.uint8).astype(np.int16)
+    )
+    return int(diff.max(initial=0)) <= _THUMBNAIL_MAX_DIFF
+
+
+class PerceptualHashIndex:
+    """pHash index of analyzed images, searched by Hamming distance.
+
+    Images can be indexed with their pixel size, in which case lookups with
+    a size only consider images of the same aspect ratio, at any scale.
+    """
+
+    def __init__(self) -> None:
+        self._hashes: dict[str, int] = {}
+        self._sizes: dict[str, tuple[int, int] | None] = {}
+        # Parallel id list / uint64 arrays for vectorized search, rebuilt lazily
+        self._ids: list[str] = []
+        self._array: np.ndarray | None = None
+        self._aspects: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, image_id: str) -> bool:
+        return image_id in self._hashes
+
+    def add(self, image_id: str, phash: int, size: tuple[int, int] | None = None) -> None:
+        """Add (or replace) an image's hash, optionally with its (width, height)."""
+        self._hashes[image_id] = phash
+        self._sizes[image_id] = size
+        self._array = None
+
+    def remove(self, image_ids: set[str]) -> None:
+        """Drop images from the index."""
+        for image_id in image_ids:
+            self._hashes.pop(image_id, None)
+            self._sizes.pop(image_id, None)
+        self._array = None
+
+    def within(
+        self, phash: int, max_distance: int, size: tuple[int, int] | None = None
+    ) -> list[tuple[str, int]]:
+        """Find indexed images within max_distance bits, closest first.
+
+        Args:
+            phash: Hash to look up
+            max_distance: Maximum Hamming distance
+            size: Only consider images with the aspect ratio of this (width, height)
+
+        Returns:
+            (image_id, distance) pairs
+        """
+        if not self._hashes:
+            return []
+
+        if self._array is None:
+            self._ids = list(self._hashes)
+            self._array = np.array(list(self._hashes.values()), dtype=np.uint64)
+            # Width / height, NaN for images indexed without a size
+            self._aspects = np.array(
+                [w / h for w, h in (self._sizes[i] or (np.nan, 1) for i in self._ids)]
+            )
+
+        # Popcount of the XOR, one row of 8 bytes per indexed hash
+        xor = (self._array ^ np.uint64(phash)).view(np.uint8).reshape(-1, 8)
+        distances = np.unpackbits(xor, axis=1).sum(axis=1)
+        eligible = distances <= max_distance
+        if size is not None:
+            eligible &= np.abs(self._aspects / (size[0] / size[1]) - 1) <= _ASPECT_TOLERANCE
+
+        rows = np.flatnonzero(eligible)
+        rows = rows[np.argsort(distances[rows], kind="stable")]
+        return [(self._ids[row], int(distances[row])) for row in rows]
+
+    def nearest(
+        self, phash: int, max_distance: int, size: tuple[int, int] | None = None
+    ) -> tuple[str, int] | None:
+        """Find the closest indexed image within max_distance bits.
+
+        Returns:
+            (image_id, distance) or None
+        """
+        matches = self.within(phash, max_distance, size)
+        return matches[0] if matches else None
+
+    def items(self) -> list[tuple[str, int, tuple[int, int] | None]]:
+        return [(i, h, self._sizes[i]) for i, h in self._hashes.items()]
+
+
+@dataclass
+class CacheStats:
+    """Analysis cache counters."""
+
+    exact_hits: int = 0
+    near_hits: int = 0  # Served by a perceptually similar image
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.exact_hits + self.near_hits + self.misses
+        return (self.exact_hits + self.near_hits) / total if total else 0.0
+
+
 # ============================================================================
 # Image Analyzer Service
 # ============================================================================
@@ -229,6 +401,7 @@ Provide structured analysis that can be used for strategy extraction."""
         model: str = LLMClient.MODEL_SONNET,
         max_image_size: int = 5 * 1024 * 1024,  # 5MB
         supported_formats: frozenset[str] = frozenset(["png", "jpg", "jpeg", "webp"]),
+        phash_max_distance: int | None = None,
     ):
         """Initialize image analyzer.
 
@@ -238,15 +411,25 @@ Provide structured analysis that can be used for strategy extraction."""
             model: LLM model to use for vision analysis
             max_image_size: Maximum image file size in bytes
             supported_formats: Supported image formats
+            phash_max_distance: Opt-in near-duplicate reuse: maximum Hamming
+                distance (of 64 bits, 4 or less recommended) at which a cached
+                analysis of a perceptually similar image is considered. A
+                candidate must also have the same aspect ratio and a matching
+                thumbnail, so re-encoded and rescaled copies match; crops are
+                out of scope. None (the default) only reuses exact matches
         """
         self._llm = llm_client or LLMClient()
         self._cache_dir = cache_dir
         self._model = model
         self._max_size = max_image_size
         self._formats = supported_formats
+        self._phash_max_distance = phash_max_distance
+        self._phash_index = PerceptualHashIndex()
+        self.cache_stats = CacheStats()
 
         if self._cache_dir:
             self._cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_phash_index()
 
         logger.info(
             f"Image analyzer initialized: model={model}, "
@@ -277,14 +460,37 @@ Provide structured analysis that can be used for strategy extraction."""
         # Load and validate image
         image_bytes, image_info = await self._load_image(image_source, filename)
 
-        # Check cache
+        # Check cache: exact content first, then perceptually similar images
         image_id = self._compute_image_id(image_bytes)
+        phash = thumbnail = None
         if self._cache_dir:
             cached = await self._check_cache(image_id)
             if cached:
                 logger.info(f"Cache hit for image {image_id}")
+                self.cache_stats.exact_hits += 1
                 return cached
 
+            if self._phash_max_distance is not None:
+                image = Image.open(BytesIO(image_bytes))
+                phash, thumbnail = await asyncio.get_event_loop().run_in_executor(
+                    None, lambda: (perceptual_hash(image), chart_thumbnail(image))
+                )
+                size = (image_info["width"], image_info["height"])
+                cached = await self._check_similar(phash, size, thumbnail)
+                if cached:
+                    self.cache_stats.near_hits += 1
+                    return replace(
+                        cached,
+                        image_id=image_id,
+                        filename=filename,
+                        width=image_info["width"],
+                        height=image_info["height"],
+                        format=image_info["format"],
+                        file_size=image_info["file_size"],
+                    )
+
+            self.cache_stats.misses += 1
+
         # Prepare image for LLM (convert to data URL)
         image_data_url = self._bytes_to_data_url(image_bytes, image_info["format"])
 
@@ -320,7 +526,7 @@ Provide structured analysis that can be used for strategy extraction."""
 
             # Cache result
             if self._cache_dir:
-                await self._cache_result(image_id, result)
+                await self._cache_result(image_id, result, phash, thumbnail)
 
             logger.info(
                 f"Analysis complete for {filename}: "
@@ -634,12 +840,81 @@ Provide structured analysis that can be used for strategy extraction."""
             logger.warning(f"Failed to load cached result for {image_id}: {e}")
             return None
 
-    async def _cache_result(self, image_id: str, result: ImageAnalysis) -> None:
+    async def _check_similar(
+        self, phash: int, size: tuple[int, int], thumbnail: bytes
+    ) -> ImageAnalysis | None:
+        """Find a cached analysis of a near-identical image.
+
+        Charts with the same layout (theme, axes, grid) can be a few bits
+        apart in pHash, so every candidate with the same aspect ratio is
+        confirmed by comparing thumbnails before its analysis is reused.
+
+        Args:
+            phash: Perceptual hash of the image
+            size: Image (width, height)
+            thumbnail: ``chart_thumbnail`` of the image
+
+        Returns:
+            Cached result or None
+        """
+        for similar_id, distance in self._phash_index.within(
+            phash, self._phash_max_distance, size
+        ):
+            try:
+                async with aiofiles.open(self._thumbnail_file(similar_id), "rb") as f:
+                    candidate = await f.read()
+            except OSError:
+                candidate = None
+            cached = await self._check_cache(similar_id) if candidate is not None else None
+            if cached is None:
+                # Analysis was removed or unreadable: stop matching against it
+                self._phash_index.remove({similar_id})
+                continue
+
+            if thumbnails_match(thumbnail, candidate):
+                logger.info(f"Near-duplicate cache hit: {similar_id} (distance {distance})")
+                return cached
+
+        return None
+
+    @property
+    def _phash_index_file(self) -> Path:
+        # Not *.json, so cleanup_cache never mistakes it for an analysis
+        return self._cache_dir / "phash_index.txt"
+
+    def _thumbnail_file(self, image_id: str) -> Path:
+        return self._cache_dir / f"{image_id}.thumb"
+
+    def _load_phash_index(self) -> None:
+        """Load the pHash index ("<image_id> <hex hash> <width>x<height>" lines)."""
+        if not self._phash_index_file.exists():
+            return
+
+        try:
+            for line in self._phash_index_file.read_text().splitlines():
+                fields = line.split()
+                if len(fields) != 3:
+                    continue  # Written before sizes were recorded: cannot be confirmed
+                image_id, phash, size = fields
+                width, height = size.split("x")
+                self._phash_index.add(image_id, int(phash, 16), (int(width), int(height)))
+        except Exception as e:
+            logger.warning(f"Failed to load pHash index: {e}")
+
+    async def _cache_result(
+        self,
+        image_id: str,
+        result: ImageAnalysis,
+        phash: int | None = None,
+        thumbnail: bytes | None = None,
+    ) -> None:
         """Cache analysis result.
 
         Args:
             image_id: Image identifier
             result: Analysis result to cache
+            phash: Perceptual hash to index the result under
+            thumbnail: Thumbnail confirming near-duplicate matches
         """
         if not self._cache_dir:
             return
@@ -652,6 +927,13 @@ Provide structured analysis that can be used for strategy extraction."""
             async with aiofiles.open(cache_file, "w") as f:
                 await f.write(json.dumps(result.to_dict(), indent=2))
 
+            if phash is not None and thumbnail is not None and image_id not in self._phash_index:
+                async with aiofiles.open(self._thumbnail_file(image_id), "wb") as f:
+                    await f.write(thumbnail)
+                self._phash_index.add(image_id, phash, (result.width, result.height))
+                async with aiofiles.open(self._phash_index_file, "a") as f:
+                    await f.write(f"{image_id} {phash:016x} {result.width}x{result.height}\n")
+
         except Exception as e:
             logger.warning(f"Failed to cache result for {image_id}: {e}")
 
@@ -673,11 +955,24 @@ Provide structured analysis that can be used for strategy extraction."""
         removed = 0
 
         try:
+            removed_ids = set()
             for cache_file in self._cache_dir.glob("*.json"):
                 if cache_file.stat().st_mtime < cutoff.timestamp():
                     cache_file.unlink()
+                    self._thumbnail_file(cache_file.stem).unlink(missing_ok=True)
+                    removed_ids.add(cache_file.stem)
                     removed += 1
 
+            if any(image_id in self._phash_index for image_id in removed_ids):
+                self._phash_index.remove(removed_ids)
+                self._phash_index_file.write_text(
+                    "".join(
+                        f"{i} {h:016x} {size[0]}x{size[1]}\n"
+                        for i, h, size in self._phash_index.items()
+                        if size is not None
+                    )
+                )
+
             logger.info(f"Cleaned up {removed} cached analysis files")
             return removed
 
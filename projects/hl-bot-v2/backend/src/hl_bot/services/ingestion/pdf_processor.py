@@ -6,9 +6,13 @@ Supports both text-based PDFs and scanned documents.
 
 import asyncio
 import hashlib
+import json
 import logging
+import os
+import re
 import shutil
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -37,12 +41,17 @@ class PageContent:
         images: list[Path],
         has_text: bool,
         ocr_text: str = "",
+        content_hash: str = "",
+        ocr_applied: bool = False,
     ):
         self.page_num = page_num
         self.text = text
         self.images = images
         self.has_text = has_text
         self.ocr_text = ocr_text
+        self.content_hash = content_hash
+        # Whether ocr_text holds an OCR result (possibly empty), cached or fresh
+        self.ocr_applied = ocr_applied
 
     def get_full_text(self) -> str:
         """Get combined text from extraction and OCR."""
@@ -94,8 +103,300 @@ class PDFInfo:
         )
 
 
+# ============================================================================
+# Page-level extraction (runs in worker processes)
+# ============================================================================
+
+PAGE_CACHE_DIRNAME = "page_cache"
+
+
+# Indirect references ("12 0 R") and the back-reference to the page tree
+_PDF_REF_RE = re.compile(r"(\d+) \d+ R")
+_PDF_PARENT_RE = re.compile(r"/Parent\s*\d+ \d+ R")
+
+
+def _object_digest(doc: Any, xref: int, memo: dict[int, str]) -> str:
+    """Hash a PDF object and everything it references, independent of xref numbers.
+
+    References are replaced by the digest of the object they point to, so a
+    font, image or Form XObject (and the resources it pulls in) contributes its
+    resolved content rather than an object number that changes between saves.
+    """
+    if xref in memo:
+        return memo[xref]
+    memo[xref] = "cycle"  # Placeholder for self-referencing structures
+
+    digest = hashlib.sha256()
+    try:
+        source = _PDF_PARENT_RE.sub("", doc.xref_object(xref, compressed=True))
+        digest.update(_resolve_refs(doc, source, memo).encode())
+        if doc.xref_is_stream(xref):
+            digest.update(doc.xref_stream_raw(xref) or b"")
+    except Exception:
+        digest.update(f"unreadable:{xref}".encode())
+
+    memo[xref] = digest.hexdigest()
+    return memo[xref]
+
+
+def _resolve_refs(doc: Any, source: str, memo: dict[int, str]) -> str:
+    """Replace indirect references in an object's source with their digests."""
+    return _PDF_REF_RE.sub(lambda m: _object_digest(doc, int(m.group(1)), memo), source)
+
+
+def _page_resources(doc: Any, page: Any) -> str:
+    """Return the page's resource dictionary source, following inheritance."""
+    xref = page.xref
+    while xref:
+        kind, value = doc.xref_get_key(xref, "Resources")
+        if kind != "null":
+            return value
+        kind, value = doc.xref_get_key(xref, "Parent")
+        xref = int(value.split()[0]) if kind == "xref" else 0
+    return ""
+
+
+def _page_content_hash(
+    doc: Any, page: Any, settings_key: str, memo: dict[int, str] | None = None
+) -> str:
+    """Hash a page's content stream and its resolved resources.
+
+    The resource dictionary is hashed recursively (fonts, images, Form
+    XObjects and their own resources), so identical pages hash identically
+    across PDF revisions and a revised document only re-extracts the pages
+    that actually changed.
+
+    Args:
+        doc: PyMuPDF document
+        page: PyMuPDF page
+        settings_key: Extraction settings that affect the cached output
+        memo: Object digests shared across pages of the same document
+
+    Returns:
+        Hex digest
+    """
+    memo = {} if memo is None else memo
+    digest = hashlib.sha256(settings_key.encode())
+    digest.update(repr((tuple(page.rect), page.rotation)).encode())
+    digest.update(page.read_contents() or b"")
+    digest.update(_resolve_refs(doc, _page_resources(doc, page), memo).encode())
+    return digest.hexdigest()
+
+
+def _read_page_cache(page_cache_dir: Path, content_hash: str) -> dict[str, Any] | None:
+    """Load a cached page entry, or None if missing/unreadable."""
+    entry_path = page_cache_dir / content_hash / "page.json"
+    try:
+        with open(entry_path, encoding="utf-8") as f:
+            entry: dict[str, Any] = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Images may have been pruned independently of the entry
+    entry["images"] = [str(page_cache_dir / content_hash / name) for name in entry["images"]]
+    if not all(Path(p).exists() for p in entry["images"]):
+        return None
+    return entry
+
+
+def _write_page_cache(page_cache_dir: Path, content_hash: str, entry: dict[str, Any]) -> None:
+    """Atomically write a cached page entry."""
+    entry_dir = page_cache_dir / content_hash
+    entry_dir.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "text": entry["text"],
+        "ocr_text": entry.get("ocr_text"),
+        "images": [Path(p).name for p in entry["images"]],
+    }
+    tmp_path = entry_dir / f"page.json.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, entry_dir / "page.json")
+
+
+def _extract_page_images(
+    page: Any,  # fitz.Page
+    page_num: int,
+    images_dir: Path,
+    min_image_size: tuple[int, int],
+) -> list[Path]:
+    """Extract embedded images from a PDF page.
+
+    Args:
+        page: PyMuPDF page object
+        page_num: Page number (0-indexed)
+        images_dir: Directory for extracted images
+        min_image_size: Minimum (width, height) to keep
+
+    Returns:
+        List of paths to extracted images
+    """
+    images: list[Path] = []
+    images_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        image_list = page.get_images()
+
+        for img_idx, img_info in enumerate(image_list):
+            try:
+                xref = img_info[0]
+                base_image = page.parent.extract_image(xref)
+
+                if not base_image:
+                    continue
+
+                image_bytes = base_image["image"]
+                image_ext = base_image["ext"]
+
+                # Save image
+                image_path = images_dir / f"page_{page_num + 1}_img_{img_idx}.{image_ext}"
+
+                with open(image_path, "wb") as img_file:
+                    img_file.write(image_bytes)
+
+                # Check image size
+                try:
+                    with Image.open(image_path) as img:
+                        width, height = img.size
+
+                        # Filter out small images (likely icons/logos)
+                        if width >= min_image_size[0] and height >= min_image_size[1]:
+                            images.append(image_path)
+                            logger.debug(
+                                f"Extracted image: {image_path.name} ({width}x{height})"
+                            )
+                        else:
+                            # Remove small image
+                            image_path.unlink()
+
+                except Exception as e:
+                    logger.warning(f"Failed to validate image {image_path}: {e}")
+                    image_path.unlink(missing_ok=True)
+
+            except Exception as e:
+                logger.warning(
+                    f"Failed to extract image {img_idx} from page {page_num + 1}: {e}"
+                )
+
+    except Exception as e:
+        logger.warning(f"Failed to get images from page {page_num + 1}: {e}")
+
+    return images
+
+
+def _extract_page_range(
+    pdf_path: str,
+    start: int,
+    end: int,
+    page_cache_dir: str,
+    extract_images: bool,
+    min_image_size: tuple[int, int],
+) -> list[dict[str, Any]]:
+    """Extract pages ``[start, end)`` with one document handle per library.
+
+    Cached pages (by content hash) are returned without re-extraction;
+    pdfplumber is only opened if at least one page misses the cache.
+
+    Returns:
+        One dict per page with page_num, content_hash, text, ocr_text, images
+        and cached flag
+    """
+    cache_dir = Path(page_cache_dir)
+    settings_key = f"images={extract_images};min={min_image_size[0]}x{min_image_size[1]}"
+    results: list[dict[str, Any]] = []
+    plumber_pdf = None
+    memo: dict[int, str] = {}
+
+    doc = fitz.open(pdf_path)
+    try:
+        for page_num in range(start, end):
+            try:
+                page = doc[page_num]
+                content_hash = _page_content_hash(doc, page, settings_key, memo)
+
+                cached = _read_page_cache(cache_dir, content_hash)
+                if cached is not None:
+                    results.append({
+                        "page_num": page_num + 1,
+                        "content_hash": content_hash,
+                        "cached": True,
+                        **cached,
+                    })
+                    continue
+
+                # Extract text with pdfplumber (better text extraction)
+                text = ""
+                try:
+                    if plumber_pdf is None:
+                        plumber_pdf = pdfplumber.open(pdf_path)
+                    text = (plumber_pdf.pages[page_num].extract_text() or "").strip()
+                except Exception as e:
+                    logger.warning(f"pdfplumber extraction failed for page {page_num + 1}: {e}")
+                    # Fallback to PyMuPDF
+                    try:
+                        text = page.get_text().strip()
+                    except Exception as e:
+                        logger.warning(f"PyMuPDF extraction failed for page {page_num + 1}: {e}")
+
+                # Extract images with PyMuPDF into the page's cache entry
+                images: list[Path] = []
+                if extract_images:
+                    images = _extract_page_images(
+                        page, page_num, cache_dir / content_hash, min_image_size
+                    )
+
+                entry = {"text": text, "ocr_text": None, "images": [str(p) for p in images]}
+                _write_page_cache(cache_dir, content_hash, entry)
+                results.append({
+                    "page_num": page_num + 1,
+                    "content_hash": content_hash,
+                    "cached": False,
+                    **entry,
+                })
+
+            except Exception as e:
+                logger.warning(f"Failed to extract page {page_num + 1}: {e}")
+                # Add empty page to maintain numbering
+                results.append({
+                    "page_num": page_num + 1,
+                    "content_hash": "",
+                    "cached": False,
+                    "text": "",
+                    "ocr_text": None,
+                    "images": [],
+                })
+    finally:
+        doc.close()
+        if plumber_pdf is not None:
+            plumber_pdf.close()
+
+    return results
+
+
+def _ocr_image(image_path: str) -> str:
+    """OCR a single image (runs in a worker process)."""
+    try:
+        import pytesseract
+
+        with Image.open(image_path) as img:
+            return pytesseract.image_to_string(img).strip()
+
+    except ImportError:
+        logger.warning("pytesseract not available, skipping OCR")
+        return ""
+    except Exception as e:
+        logger.warning(f"OCR failed for {image_path}: {e}")
+        return ""
+
+
 class PDFProcessor:
-    """Process PDF documents to extract educational content."""
+    """Process PDF documents to extract educational content.
+
+    Pages are sharded into contiguous ranges across a process pool (one
+    document handle per shard) and OCR is fanned out per image. Extracted
+    pages are cached by content hash, so re-processing a revised PDF only
+    touches the pages that changed.
+    """
 
     def __init__(
         self,
@@ -104,6 +405,8 @@ class PDFProcessor:
         min_image_size: tuple[int, int] = (100, 100),
         max_pages: int = 500,
         extract_images: bool = True,
+        workers: int | None = None,
+        min_pages_per_shard: int = 16,
     ):
         """Initialize PDF processor.
 
@@ -113,13 +416,21 @@ class PDFProcessor:
             min_image_size: Minimum image dimensions (width, height) to extract
             max_pages: Maximum number of pages to process
             extract_images: Whether to extract embedded images
+            workers: Process pool size for extraction and OCR (defaults to CPU count)
+            min_pages_per_shard: Smallest page range worth sending to a worker;
+                documents that fit in one shard are extracted in a thread
         """
         self._cache_dir = cache_dir or Path(tempfile.gettempdir()) / "hl_bot_pdf"
         self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._page_cache_dir = self._cache_dir / PAGE_CACHE_DIRNAME
+        self._page_cache_dir.mkdir(exist_ok=True)
         self._enable_ocr = enable_ocr
         self._min_image_size = min_image_size
         self._max_pages = max_pages
         self._extract_images = extract_images
+        self._workers = max(1, workers or os.cpu_count() or 1)
+        self._min_pages_per_shard = max(1, min_pages_per_shard)
+        self._pool: ProcessPoolExecutor | None = None
         logger.info(
             f"PDF processor initialized: cache={self._cache_dir}, "
             f"ocr={enable_ocr}, max_pages={max_pages}"
@@ -151,9 +462,6 @@ class PDFProcessor:
         logger.info(f"Processing PDF: {pdf_path}")
 
         extract_imgs = extract_images if extract_images is not None else self._extract_images
-        cache_key = self._cache_key(pdf_path)
-        work_dir = self._cache_dir / cache_key
-        work_dir.mkdir(parents=True, exist_ok=True)
 
         try:
             # Get metadata
@@ -168,11 +476,11 @@ class PDFProcessor:
             logger.info(f"Processing {num_pages} pages from {pdf_path.name}")
 
             # Extract content from all pages
-            pages = await self._extract_pages(pdf_path, work_dir, extract_imgs)
+            pages = await self._extract_pages(pdf_path, extract_imgs)
 
             # Check if OCR is needed
             if self._enable_ocr:
-                pages = await self._apply_ocr_if_needed(pages, work_dir)
+                pages = await self._apply_ocr_if_needed(pages)
 
             return PDFInfo(
                 filename=pdf_path.name,
@@ -258,14 +566,14 @@ class PDFProcessor:
     async def _extract_pages(
         self,
         pdf_path: Path,
-        work_dir: Path,
         extract_images: bool,
     ) -> list[PageContent]:
         """Extract content from all pages.
 
+        Images are written into the page cache entry of the page they belong to.
+
         Args:
             pdf_path: Path to PDF file
-            work_dir: Working directory for extracted content
             extract_images: Whether to extract images
 
         Returns:
@@ -273,58 +581,86 @@ class PDFProcessor:
         """
         loop = asyncio.get_event_loop()
 
-        def _extract() -> list[PageContent]:
-            pages: list[PageContent] = []
-
-            # Use PyMuPDF for images and pdfplumber for text
-            doc = fitz.open(pdf_path)
-
-            try:
-                for page_num in range(len(doc)):
-                    try:
-                        # Extract text with pdfplumber (better text extraction)
-                        text = self._extract_text_with_pdfplumber(pdf_path, page_num)
-
-                        # Extract images with PyMuPDF
-                        images: list[Path] = []
-                        if extract_images:
-                            images = self._extract_images_from_page(
-                                doc[page_num], page_num, work_dir
-                            )
-
-                        has_text = bool(text.strip())
+        def _count_pages() -> int:
+            with fitz.open(pdf_path) as doc:
+                return len(doc)
 
-                        pages.append(
-                            PageContent(
-                                page_num=page_num + 1,  # 1-indexed
-                                text=text,
-                                images=images,
-                                has_text=has_text,
-                            )
-                        )
+        num_pages = await loop.run_in_executor(None, _count_pages)
+        shards = self._page_shards(num_pages)
 
-                    except Exception as e:
-                        logger.warning(f"Failed to extract page {page_num + 1}: {e}")
-                        # Add empty page to maintain numbering
-                        pages.append(
-                            PageContent(
-                                page_num=page_num + 1,
-                                text="",
-                                images=[],
-                                has_text=False,
-                            )
-                        )
-
-            finally:
-                doc.close()
+        args = (str(self._page_cache_dir), extract_images, self._min_image_size)
+        if len(shards) == 1:
+            # Not worth the process hop for small documents
+            start, end = shards[0]
+            shard_results = [
+                await loop.run_in_executor(
+                    None, _extract_page_range, str(pdf_path), start, end, *args
+                )
+            ]
+        else:
+            pool = self._get_pool()
+            shard_results = await asyncio.gather(*[
+                loop.run_in_executor(
+                    pool, _extract_page_range, str(pdf_path), start, end, *args
+                )
+                for start, end in shards
+            ])
+
+        pages: list[PageContent] = []
+        cache_hits = 0
+        for shard in shard_results:
+            for entry in shard:
+                cache_hits += int(entry["cached"])
+                pages.append(
+                    PageContent(
+                        page_num=entry["page_num"],
+                        text=entry["text"],
+                        images=[Path(p) for p in entry["images"]],
+                        has_text=bool(entry["text"].strip()),
+                        ocr_text=entry["ocr_text"] or "",
+                        content_hash=entry["content_hash"],
+                        # The page cache stores None until the page is OCR'd
+                        ocr_applied=entry["ocr_text"] is not None,
+                    )
+                )
 
-            logger.info(f"Extracted {len(pages)} pages")
-            return pages
+        logger.info(
+            f"Extracted {len(pages)} pages in {len(shards)} shard(s), "
+            f"{cache_hits} from page cache"
+        )
+        return pages
 
-        return await loop.run_in_executor(None, _extract)
+    def _page_shards(self, num_pages: int) -> list[tuple[int, int]]:
+        """Split ``range(num_pages)`` into contiguous ranges, one per worker."""
+        if num_pages <= 0:
+            return [(0, 0)]
+        num_shards = max(1, min(self._workers, num_pages // self._min_pages_per_shard))
+        size, extra = divmod(num_pages, num_shards)
+        shards = []
+        start = 0
+        for i in range(num_shards):
+            end = start + size + (1 if i < extra else 0)
+            shards.append((start, end))
+            start = end
+        return shards
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Lazily create the worker process pool."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        return self._pool
+
+    def shutdown(self) -> None:
+        """Shut down the worker process pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
 
     def _extract_text_with_pdfplumber(self, pdf_path: Path, page_num: int) -> str:
-        """Extract text from a page using pdfplumber.
+        """Extract text from a single page using pdfplumber.
+
+        Opens the document for one page; bulk extraction goes through
+        ``_extract_page_range`` which keeps one handle per shard instead.
 
         Args:
             pdf_path: Path to PDF file
@@ -359,7 +695,7 @@ class PDFProcessor:
         page_num: int,
         work_dir: Path,
     ) -> list[Path]:
-        """Extract images from a PDF page.
+        """Extract images from a PDF page into ``work_dir/images``.
 
         Args:
             page: PyMuPDF page object
@@ -369,79 +705,31 @@ class PDFProcessor:
         Returns:
             List of paths to extracted images
         """
-        images: list[Path] = []
-        images_dir = work_dir / "images"
-        images_dir.mkdir(exist_ok=True)
-
-        try:
-            image_list = page.get_images()
-
-            for img_idx, img_info in enumerate(image_list):
-                try:
-                    xref = img_info[0]
-                    base_image = page.parent.extract_image(xref)
-
-                    if not base_image:
-                        continue
-
-                    image_bytes = base_image["image"]
-                    image_ext = base_image["ext"]
-
-                    # Save image
-                    image_path = images_dir / f"page_{page_num + 1}_img_{img_idx}.{image_ext}"
-
-                    with open(image_path, "wb") as img_file:
-                        img_file.write(image_bytes)
-
-                    # Check image size
-                    try:
-                        with Image.open(image_path) as img:
-                            width, height = img.size
-
-                            # Filter out small images (likely icons/logos)
-                            if (
-                                width >= self._min_image_size[0]
-                                and height >= self._min_image_size[1]
-                            ):
-                                images.append(image_path)
-                                logger.debug(
-                                    f"Extracted image: {image_path.name} ({width}x{height})"
-                                )
-                            else:
-                                # Remove small image
-                                image_path.unlink()
-
-                    except Exception as e:
-                        logger.warning(f"Failed to validate image {image_path}: {e}")
-                        image_path.unlink(missing_ok=True)
-
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to extract image {img_idx} from page {page_num + 1}: {e}"
-                    )
-
-        except Exception as e:
-            logger.warning(f"Failed to get images from page {page_num + 1}: {e}")
-
-        return images
+        return _extract_page_images(
+            page, page_num, work_dir / "images", self._min_image_size
+        )
 
     async def _apply_ocr_if_needed(
         self,
         pages: list[PageContent],
-        work_dir: Path,
     ) -> list[PageContent]:
         """Apply OCR to pages that have no text but have images.
 
+        Images are OCR'd in parallel on the process pool; results are written
+        back to the page cache so unchanged pages are never OCR'd twice.
+
         Args:
             pages: List of page contents
-            work_dir: Working directory
 
         Returns:
             Updated list of page contents with OCR text
         """
-        # Check if any pages need OCR
+        # Check if any pages need OCR (and don't already have it cached)
         pages_needing_ocr = [
-            page for page in pages if not page.has_text and len(page.images) > 0
+            page for page in pages
+            if not page.has_text
+            and len(page.images) > 0
+            and not page.ocr_applied
         ]
 
         if not pages_needing_ocr:
@@ -451,41 +739,39 @@ class PDFProcessor:
         logger.info(f"Applying OCR to {len(pages_needing_ocr)} pages")
 
         loop = asyncio.get_event_loop()
+        pool = self._get_pool()
+
+        # Fan out every image of every page at once
+        image_jobs = [(page, img_path) for page in pages_needing_ocr for img_path in page.images]
+        texts = await asyncio.gather(*[
+            loop.run_in_executor(pool, _ocr_image, str(img_path))
+            for _, img_path in image_jobs
+        ])
+
+        page_texts: dict[int, list[str]] = {id(page): [] for page in pages_needing_ocr}
+        for (page, _), text in zip(image_jobs, texts):
+            if text:
+                page_texts[id(page)].append(text)
+
+        def _store() -> None:
+            for page in pages_needing_ocr:
+                if not page.content_hash:
+                    continue
+                _write_page_cache(
+                    self._page_cache_dir,
+                    page.content_hash,
+                    {
+                        "text": page.text,
+                        "ocr_text": page.ocr_text,
+                        "images": [str(p) for p in page.images],
+                    },
+                )
 
-        async def _ocr_page(page: PageContent) -> PageContent:
-            """Apply OCR to a single page."""
-
-            def _do_ocr() -> str:
-                try:
-                    import pytesseract
-
-                    # OCR all images from this page
-                    texts = []
-                    for img_path in page.images:
-                        try:
-                            img = Image.open(img_path)
-                            text = pytesseract.image_to_string(img)
-                            if text.strip():
-                                texts.append(text.strip())
-                        except Exception as e:
-                            logger.warning(f"OCR failed for {img_path}: {e}")
-
-                    return "\n\n".join(texts)
-
-                except ImportError:
-                    logger.warning("pytesseract not available, skipping OCR")
-                    return ""
-                except Exception as e:
-                    logger.warning(f"OCR failed for page {page.page_num}: {e}")
-                    return ""
-
-            ocr_text = await loop.run_in_executor(None, _do_ocr)
-            page.ocr_text = ocr_text
-            return page
-
-        # Apply OCR to all pages that need it (with concurrency limit)
         for page in pages_needing_ocr:
-            await _ocr_page(page)
+            page.ocr_text = "\n\n".join(page_texts[id(page)])
+            page.ocr_applied = True
+
+        await loop.run_in_executor(None, _store)
 
         return pages
 
@@ -526,7 +812,12 @@ class PDFProcessor:
 
         def _cleanup() -> int:
             removed = 0
-            for item in self._cache_dir.iterdir():
+            # Page cache entries are pruned individually, not as one directory
+            items = [p for p in self._cache_dir.iterdir() if p != self._page_cache_dir]
+            if self._page_cache_dir.exists():
+                items.extend(self._page_cache_dir.iterdir())
+
+            for item in items:
                 if item.is_dir():
                     try:
                         if item.stat().st_mtime < cutoff:
@@ -0,0 +1,203 @@
+"""Bounded-queue staged pipeline for ingestion work.
+
+Items flow through a fixed sequence of async stages. Each stage has its own
+worker count and a bounded input queue, so a slow stage applies backpressure
+to the ones before it while the others keep working on later items.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class StageStats:
+    """Progress and throughput counters for one pipeline stage."""
+
+    name: str
+    workers: int
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    busy_seconds: float = 0.0
+    first_started_at: float | None = None
+    last_finished_at: float | None = None
+
+    @property
+    def processed(self) -> int:
+        """Items that left the stage (successfully or not)."""
+        return self.completed + self.failed
+
+    @property
+    def wall_seconds(self) -> float:
+        """Time between the first item entering and the last item leaving."""
+        if self.first_started_at is None or self.last_finished_at is None:
+            return 0.0
+        return max(0.0, self.last_finished_at - self.first_started_at)
+
+    @property
+    def throughput(self) -> float:
+        """Items processed per second of stage wall time."""
+        wall = self.wall_seconds
+        return self.processed / wall if wall > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of available worker time spent busy (0-1)."""
+        capacity = self.wall_seconds * self.workers
+        return min(1.0, self.busy_seconds / capacity) if capacity > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializable snapshot of the stats."""
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "throughput_per_sec": round(self.throughput, 4),
+            "utilization": round(self.utilization, 3),
+        }
+
+
+@dataclass
+class PipelineStage:
+    """One step of a :class:`StagedPipeline`.
+
+    The handler receives the previous stage's output (or the input item for the
+    first stage) and returns the value passed to the next stage.
+    """
+
+    name: str
+    handler: Callable[[Any], Awaitable[Any]]
+    workers: int = 1
+    queue_size: int = 4
+
+
+class StagedPipeline:
+    """Run items through async stages connected by bounded queues."""
+
+    def __init__(
+        self,
+        stages: list[PipelineStage],
+        on_progress: Callable[[StageStats], None] | None = None,
+    ):
+        """Initialize pipeline.
+
+        Args:
+            stages: Stages in execution order
+            on_progress: Called with a stage's stats whenever an item leaves it
+        """
+        if not stages:
+            raise ValueError("StagedPipeline requires at least one stage")
+        for stage in stages:
+            if stage.workers < 1:
+                raise ValueError(f"Stage '{stage.name}' needs at least one worker")
+
+        self._stages = stages
+        self._on_progress = on_progress
+        self.stats: dict[str, StageStats] = {
+            stage.name: StageStats(name=stage.name, workers=stage.workers)
+            for stage in stages
+        }
+
+    async def run(self, items: Iterable[Any]) -> list[Any]:
+        """Process all items through every stage.
+
+        A handler exception drops that item from later stages; the exception
+        takes the item's place in the results.
+
+        Args:
+            items: Inputs for the first stage
+
+        Returns:
+            Final stage outputs (or exceptions) in input order
+        """
+        items = list(items)
+        results: list[Any] = [None] * len(items)
+        queues: list[asyncio.Queue[Any]] = [
+            asyncio.Queue(maxsize=max(1, stage.queue_size)) for stage in self._stages
+        ]
+
+        async def _feed() -> None:
+            for index, item in enumerate(items):
+                await queues[0].put((index, item))
+
+        async def _work(stage_index: int) -> None:
+            stage = self._stages[stage_index]
+            stats = self.stats[stage.name]
+            inbox = queues[stage_index]
+            outbox = queues[stage_index + 1] if stage_index + 1 < len(queues) else None
+
+            while True:
+                entry = await inbox.get()
+                if entry is _STOP:
+                    return
+
+                index, payload = entry
+                started = time.monotonic()
+                if stats.first_started_at is None:
+                    stats.first_started_at = started
+                stats.in_flight += 1
+                failed = False
+
+                try:
+                    value = await stage.handler(payload)
+                except Exception as e:
+                    logger.warning(f"Stage '{stage.name}' failed for item {index}: {e}")
+                    stats.failed += 1
+                    results[index] = e
+                    failed = True
+                else:
+                    stats.completed += 1
+                finally:
+                    finished = time.monotonic()
+                    stats.in_flight -= 1
+                    stats.busy_seconds += finished - started
+                    stats.last_finished_at = finished
+
+                if self._on_progress is not None:
+                    self._on_progress(stats)
+
+                if failed:
+                    continue
+                if outbox is None:
+                    results[index] = value
+                else:
+                    await outbox.put((index, value))
+
+        feeder = asyncio.create_task(_feed())
+        workers = [
+            [asyncio.create_task(_work(i)) for _ in range(stage.workers)]
+            for i, stage in enumerate(self._stages)
+        ]
+
+        try:
+            await feeder
+            # Drain stage by stage: once a stage's workers have all stopped,
+            # nothing more can reach the next stage's queue.
+            for i, stage in enumerate(self._stages):
+                for _ in range(stage.workers):
+                    await queues[i].put(_STOP)
+                await asyncio.gather(*workers[i])
+        finally:
+            for task in [feeder, *(t for group in workers for t in group)]:
+                if not task.done():
+                    task.cancel()
+
+        for stats in self.stats.values():
+            logger.info(
+                f"Stage '{stats.name}': {stats.completed} ok, {stats.failed} failed, "
+                f"{stats.throughput:.3f}/s, utilization {stats.utilization:.0%}"
+            )
+
+        return results
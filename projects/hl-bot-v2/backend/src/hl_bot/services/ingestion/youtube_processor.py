@@ -7,10 +7,14 @@ and extracts video frames for image analysis.
 import asyncio
 import hashlib
 import logging
+import os
 import re
 import shutil
 import subprocess
 import tempfile
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -20,6 +24,12 @@ import aiofiles
 import yt_dlp
 from PIL import Image
 
+from hl_bot.services.ingestion.staged_pipeline import (
+    PipelineStage,
+    StagedPipeline,
+    StageStats,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,6 +53,7 @@ class VideoInfo:
         frames: list[Path],
         channel: str = "",
         upload_date: str = "",
+        analysis: Any = None,
     ):
         self.video_id = video_id
         self.title = title
@@ -53,6 +64,7 @@ class VideoInfo:
         self.frames = frames
         self.channel = channel
         self.upload_date = upload_date
+        self.analysis = analysis
 
     def __repr__(self) -> str:
         return (
@@ -61,8 +73,60 @@ class VideoInfo:
         )
 
 
+@dataclass
+class _VideoJob:
+    """Per-video state carried between pipeline stages."""
+
+    video_id: str
+    work_dir: Path
+    metadata: dict[str, Any] = field(default_factory=dict)
+    transcript: str = ""
+    frames: list[Path] = field(default_factory=list)
+
+    def to_video_info(self) -> VideoInfo:
+        return VideoInfo(
+            video_id=self.video_id,
+            title=self.metadata.get("title", "Unknown"),
+            description=self.metadata.get("description", ""),
+            duration=self.metadata.get("duration", 0),
+            url=f"https://www.youtube.com/watch?v={self.video_id}",
+            transcript=self.transcript,
+            frames=self.frames,
+            channel=self.metadata.get("channel", ""),
+            upload_date=self.metadata.get("upload_date", ""),
+        )
+
+
+# Whisper models loaded in this process (one per worker process in the pool)
+_WHISPER_MODELS: dict[str, Any] = {}
+
+
+def _whisper_transcribe(audio_path: str, model_name: str, cpu_threads: int) -> str:
+    """Transcribe an audio file with faster-whisper (runs in a worker process)."""
+    model = _WHISPER_MODELS.get(model_name)
+    if model is None:
+        from faster_whisper import WhisperModel
+
+        # CPU int8 for compatibility; threads split across pool processes
+        model = WhisperModel(
+            model_name, device="cpu", compute_type="int8", cpu_threads=cpu_threads
+        )
+        _WHISPER_MODELS[model_name] = model
+
+    segments, _ = model.transcribe(audio_path, language="en")
+
+    # Collect all segments
+    return " ".join(segment.text for segment in segments)
+
+
 class YouTubeProcessor:
-    """Process YouTube videos to extract educational content."""
+    """Process YouTube videos to extract educational content.
+
+    Playlists run through a staged pipeline (metadata -> transcript -> frames
+    -> optional analysis) with bounded queues between stages, so downloads,
+    Whisper transcription, frame extraction and LLM analysis of different
+    videos overlap instead of running one video at a time.
+    """
 
     def __init__(
         self,
@@ -70,6 +134,11 @@ class YouTubeProcessor:
         enable_whisper: bool = True,
         max_video_duration: int = 7200,  # 2 hours
         frame_interval: int = 30,  # Extract frame every N seconds
+        download_concurrency: int = 4,
+        whisper_workers: int | None = None,
+        analysis_workers: int = 2,
+        stage_queue_size: int = 4,
+        whisper_model: str = "base",
     ):
         """Initialize YouTube processor.
 
@@ -78,12 +147,25 @@ class YouTubeProcessor:
             enable_whisper: Whether to use Whisper for transcription fallback
             max_video_duration: Maximum video duration in seconds
             frame_interval: Extract frame every N seconds
+            download_concurrency: Concurrent workers for I/O-bound stages
+                (metadata, caption/video downloads)
+            whisper_workers: Whisper process pool size (defaults to CPU count)
+            analysis_workers: Concurrent workers for the analysis stage
+            stage_queue_size: Capacity of the queue in front of each stage
+            whisper_model: faster-whisper model name
         """
         self._cache_dir = cache_dir or Path(tempfile.gettempdir()) / "hl_bot_youtube"
         self._cache_dir.mkdir(parents=True, exist_ok=True)
         self._enable_whisper = enable_whisper
         self._max_duration = max_video_duration
         self._frame_interval = frame_interval
+        self._download_concurrency = max(1, download_concurrency)
+        self._whisper_workers = max(1, whisper_workers or os.cpu_count() or 1)
+        self._analysis_workers = max(1, analysis_workers)
+        self._stage_queue_size = max(1, stage_queue_size)
+        self._whisper_model = whisper_model
+        self._whisper_pool: ProcessPoolExecutor | None = None
+        self.last_pipeline_stats: dict[str, StageStats] = {}
         logger.info(
             f"YouTube processor initialized: cache={self._cache_dir}, "
             f"whisper={enable_whisper}, max_duration={max_video_duration}s"
@@ -94,6 +176,8 @@ class YouTubeProcessor:
         url: str,
         extract_frames: bool = True,
         prefer_captions: bool = True,
+        analyzer: Callable[[VideoInfo], Awaitable[Any]] | None = None,
+        on_progress: Callable[[StageStats], None] | None = None,
     ) -> list[VideoInfo]:
         """Process YouTube URL (single video or playlist).
 
@@ -101,6 +185,10 @@ class YouTubeProcessor:
             url: YouTube video or playlist URL
             extract_frames: Whether to extract video frames
             prefer_captions: Prefer existing captions over Whisper transcription
+            analyzer: Optional async analysis step (e.g. LLM strategy extraction)
+                run as the last pipeline stage; its result is stored on
+                ``VideoInfo.analysis``
+            on_progress: Called with a stage's stats whenever a video leaves it
 
         Returns:
             List of VideoInfo objects (single video or multiple from playlist)
@@ -115,18 +203,20 @@ class YouTubeProcessor:
             video_ids = await self._extract_video_ids(url)
             logger.info(f"Found {len(video_ids)} video(s) to process")
 
+            pipeline = self._build_pipeline(
+                extract_frames, prefer_captions, analyzer, on_progress
+            )
+            self.last_pipeline_stats = pipeline.stats
+            results = await pipeline.run(video_ids)
+
             videos = []
-            for i, video_id in enumerate(video_ids):
-                try:
-                    logger.info(f"Processing video {i+1}/{len(video_ids)}: {video_id}")
-                    video_info = await self._process_single_video(
-                        video_id, extract_frames, prefer_captions
-                    )
-                    videos.append(video_info)
-                except Exception as e:
-                    logger.error(f"Failed to process video {video_id}: {e}")
+            for video_id, result in zip(video_ids, results):
+                if isinstance(result, Exception):
                     # Continue with remaining videos
+                    logger.error(f"Failed to process video {video_id}: {result}")
+                    self._cleanup_work_dir(video_id)
                     continue
+                videos.append(result)
 
             if not videos:
                 raise YouTubeError("No videos were successfully processed")
@@ -137,6 +227,89 @@ class YouTubeProcessor:
             logger.error(f"YouTube processing failed: {e}")
             raise YouTubeError(f"Failed to process URL: {e}")
 
+    def _build_pipeline(
+        self,
+        extract_frames: bool,
+        prefer_captions: bool,
+        analyzer: Callable[[VideoInfo], Awaitable[Any]] | None,
+        on_progress: Callable[[StageStats], None] | None,
+    ) -> StagedPipeline:
+        """Assemble the per-video stages for a playlist run."""
+
+        async def _metadata_stage(video_id: str) -> _VideoJob:
+            job = _VideoJob(video_id=video_id, work_dir=self._work_dir(video_id))
+            job.metadata = await self._get_metadata(video_id)
+            self._check_duration(job.metadata.get("duration", 0))
+            return job
+
+        async def _transcript_stage(job: _VideoJob) -> _VideoJob:
+            job.transcript = await self._get_transcript(
+                job.video_id, job.work_dir, prefer_captions
+            )
+            return job
+
+        async def _frames_stage(job: _VideoJob) -> VideoInfo:
+            if extract_frames:
+                job.frames = await self._extract_frames(
+                    job.video_id, job.work_dir, job.metadata.get("duration", 0)
+                )
+            return job.to_video_info()
+
+        stages = [
+            PipelineStage("metadata", _metadata_stage, self._download_concurrency, self._stage_queue_size),
+            # Caption downloads are I/O; Whisper jobs queue on the process pool
+            PipelineStage(
+                "transcript",
+                _transcript_stage,
+                self._download_concurrency + self._whisper_workers,
+                self._stage_queue_size,
+            ),
+            PipelineStage("frames", _frames_stage, self._download_concurrency, self._stage_queue_size),
+        ]
+
+        if analyzer is not None:
+
+            async def _analysis_stage(video: VideoInfo) -> VideoInfo:
+                video.analysis = await analyzer(video)
+                return video
+
+            stages.append(
+                PipelineStage("analysis", _analysis_stage, self._analysis_workers, self._stage_queue_size)
+            )
+
+        return StagedPipeline(stages, on_progress=on_progress)
+
+    def _work_dir(self, video_id: str) -> Path:
+        """Create and return the working directory for a video."""
+        work_dir = self._cache_dir / self._cache_key(video_id)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        return work_dir
+
+    def _cleanup_work_dir(self, video_id: str) -> None:
+        """Remove a video's working directory after a failure."""
+        work_dir = self._cache_dir / self._cache_key(video_id)
+        if work_dir.exists():
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _check_duration(self, duration: int) -> None:
+        """Reject videos longer than the configured maximum."""
+        if duration > self._max_duration:
+            raise YouTubeError(
+                f"Video too long: {duration}s (max {self._max_duration}s)"
+            )
+
+    def _get_whisper_pool(self) -> ProcessPoolExecutor:
+        """Lazily create the Whisper process pool."""
+        if self._whisper_pool is None:
+            self._whisper_pool = ProcessPoolExecutor(max_workers=self._whisper_workers)
+        return self._whisper_pool
+
+    def shutdown(self) -> None:
+        """Shut down the Whisper process pool."""
+        if self._whisper_pool is not None:
+            self._whisper_pool.shutdown(wait=False, cancel_futures=True)
+            self._whisper_pool = None
+
     async def _extract_video_ids(self, url: str) -> list[str]:
         """Extract video IDs from URL (handles playlists).
 
@@ -177,70 +350,6 @@ class YouTubeProcessor:
 
         return await loop.run_in_executor(None, _extract)
 
-    async def _process_single_video(
-        self,
-        video_id: str,
-        extract_frames: bool,
-        prefer_captions: bool,
-    ) -> VideoInfo:
-        """Process a single video.
-
-        Args:
-            video_id: YouTube video ID
-            extract_frames: Whether to extract frames
-            prefer_captions: Prefer captions over Whisper
-
-        Returns:
-            VideoInfo object
-
-        Raises:
-            YouTubeError: If processing fails
-        """
-        video_url = f"https://www.youtube.com/watch?v={video_id}"
-        cache_key = self._cache_key(video_id)
-        work_dir = self._cache_dir / cache_key
-        work_dir.mkdir(parents=True, exist_ok=True)
-
-        try:
-            # Get video metadata
-            metadata = await self._get_metadata(video_id)
-
-            # Check duration
-            duration = metadata.get("duration", 0)
-            if duration > self._max_duration:
-                raise YouTubeError(
-                    f"Video too long: {duration}s (max {self._max_duration}s)"
-                )
-
-            # Get transcript
-            transcript = await self._get_transcript(
-                video_id, work_dir, prefer_captions
-            )
-
-            # Extract frames
-            frames: list[Path] = []
-            if extract_frames:
-                frames = await self._extract_frames(video_id, work_dir, duration)
-
-            return VideoInfo(
-                video_id=video_id,
-                title=metadata.get("title", "Unknown"),
-                description=metadata.get("description", ""),
-                duration=duration,
-                url=video_url,
-                transcript=transcript,
-                frames=frames,
-                channel=metadata.get("channel", ""),
-                upload_date=metadata.get("upload_date", ""),
-            )
-
-        except Exception as e:
-            logger.error(f"Failed to process video {video_id}: {e}")
-            # Clean up work directory on failure
-            if work_dir.exists():
-                shutil.rmtree(work_dir, ignore_errors=True)
-            raise YouTubeError(f"Video processing failed: {e}")
-
     async def _get_metadata(self, video_id: str) -> dict[str, Any]:
         """Get video metadata without downloading.
 
@@ -356,30 +465,24 @@ class YouTubeProcessor:
         Returns:
             Transcription text
         """
-        audio_file = work_dir / f"{video_id}.mp3"
+        # Distinct stem from the video download so yt-dlp's partial and
+        # intermediate files never collide
+        audio_file = work_dir / f"{video_id}_audio.mp3"
 
         # Download audio
         await self._download_audio(video_id, audio_file)
 
-        # Transcribe with faster-whisper
+        # Transcribe with faster-whisper in the process pool (CPU-bound)
         loop = asyncio.get_event_loop()
-
-        def _transcribe() -> str:
-            from faster_whisper import WhisperModel
-
-            # Use base model on CPU for compatibility
-            model = WhisperModel("base", device="cpu", compute_type="int8")
-            
-            segments, _ = model.transcribe(str(audio_file), language="en")
-            
-            # Collect all segments
-            transcript_parts = []
-            for segment in segments:
-                transcript_parts.append(segment.text)
-            
-            return " ".join(transcript_parts)
-
-        transcript = await loop.run_in_executor(None, _transcribe)
+        cpu_threads = max(1, (os.cpu_count() or 1) // self._whisper_workers)
+
+        transcript = await loop.run_in_executor(
+            self._get_whisper_pool(),
+            _whisper_transcribe,
+            str(audio_file),
+            self._whisper_model,
+            cpu_threads,
+        )
 
         # Clean up audio file
         audio_file.unlink(missing_ok=True)
@@ -431,7 +534,7 @@ class YouTubeProcessor:
         Returns:
             List of frame file paths
         """
-        video_file = work_dir / f"{video_id}.mp4"
+        video_file = work_dir / f"{video_id}_video.mp4"
         frames_dir = work_dir / "frames"
         frames_dir.mkdir(exist_ok=True)
 
@@ -5,7 +5,6 @@ Implements ControllerFX playbook setups: Breakout, Fakeout, Onion.
 """
 
 import asyncio
-import io
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -13,14 +12,11 @@ from decimal import Decimal
 from pathlib import Path
 from typing import Optional
 
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.dates import DateFormatter
-import mplfinance as mpf
-import pandas as pd
-
+from hl_bot.services.chart_rendering import (
+    ChartRenderer,
+    ChartRenderService,
+    get_chart_render_service,
+)
 from hl_bot.services.llm_client import LLMClient
 from hl_bot.types import (
     Candle,
@@ -160,88 +156,6 @@ class VisualSignalResult:
     chart_image: Optional[bytes] = None
 
 
-class ChartRenderer:
-    """Renders candle data to chart images for visual analysis."""
-    
-    def __init__(self, style: str = "charles"):
-        """Initialize chart renderer.
-        
-        Args:
-            style: mplfinance style ('charles', 'yahoo', 'nightclouds', etc.)
-        """
-        self.style = style
-    
-    def render_candles(
-        self,
-        candles: list[Candle],
-        title: str = "",
-        show_volume: bool = True,
-        highlight_range: Optional[tuple[float, float]] = None,
-        width: int = 1200,
-        height: int = 800,
-    ) -> bytes:
-        """Render candles to PNG image.
-        
-        Args:
-            candles: List of candle data
-            title: Chart title
-            show_volume: Whether to show volume
-            highlight_range: Optional (low, high) to highlight as range zone
-            width: Image width in pixels
-            height: Image height in pixels
-            
-        Returns:
-            PNG image bytes
-        """
-        if not candles:
-            raise ValueError("No candles to render")
-        
-        # Convert to DataFrame
-        df = pd.DataFrame([
-            {
-                'Date': c.timestamp,
-                'Open': float(c.open),
-                'High': float(c.high),
-                'Low': float(c.low),
-                'Close': float(c.close),
-                'Volume': float(c.volume) if c.volume else 0,
-            }
-            for c in candles
-        ])
-        df.set_index('Date', inplace=True)
-        
-        # Create figure
-        fig_ratio = (width / 100, height / 100)
-        
-        # Add horizontal lines for range if specified
-        addplots = []
-        if highlight_range:
-            low, high = highlight_range
-            addplots.append(mpf.make_addplot(
-                [low] * len(df), color='green', linestyle='--', alpha=0.7
-            ))
-            addplots.append(mpf.make_addplot(
-                [high] * len(df), color='red', linestyle='--', alpha=0.7
-            ))
-        
-        # Render to buffer
-        buf = io.BytesIO()
-        
-        mpf.plot(
-            df,
-            type='candle',
-            style=self.style,
-            title=title,
-            volume=show_volume,
-            figsize=fig_ratio,
-            savefig=dict(fname=buf, dpi=100, format='png'),
-            addplot=addplots if addplots else None,
-        )
-        
-        buf.seek(0)
-        return buf.read()
-
-
 class VisualSignalGenerator:
     """Generate trading signals using visual chart analysis."""
     
@@ -249,16 +163,21 @@ class VisualSignalGenerator:
         self,
         llm_client: Optional[LLMClient] = None,
         model: str = "claude-sonnet-4-20250514",
+        render_service: Optional[ChartRenderService] = None,
+        chart_backend: str = "mplfinance",
     ):
         """Initialize visual signal generator.
         
         Args:
             llm_client: LLM client for vision analysis
             model: Model to use for analysis
+            render_service: Chart rendering service (shared default if None)
+            chart_backend: Chart backend ('mplfinance' or 'raster')
         """
         self._llm = llm_client or LLMClient()
         self._model = model
-        self._renderer = ChartRenderer()
+        self._renderer = ChartRenderer(backend=chart_backend)
+        self._render_service = render_service or get_chart_render_service()
         
         logger.info(f"Visual signal generator initialized with model: {model}")
     
@@ -287,9 +206,11 @@ class VisualSignalGenerator:
         chart_image = None
         if render_chart:
             try:
-                chart_image = self._renderer.render_candles(
+                chart_image = await self._render_service.render_candles(
                     candles,
                     title=f"{symbol} {timeframe}",
+                    style=self._renderer.style,
+                    backend=self._renderer.backend,
                 )
             except Exception as e:
                 logger.warning(f"Chart rendering failed: {e}")
@@ -9,6 +9,7 @@ Principles:
 """
 
 import asyncio
+import logging
 import uuid
 from collections import defaultdict
 from dataclasses import dataclass, field
@@ -21,6 +22,7 @@ from typing import AsyncGenerator, Dict, List, Optional, Callable
 from pydantic import BaseModel, Field
 
 from src.hl_bot.types import Signal, SignalType, Trade, TradeStatus
+from src.hl_bot.services.chart_rendering import ChartRenderService, get_chart_render_service
 from src.hl_bot.services.trade_outcome_learner import TradeOutcomeLearner
 from src.hl_bot.trading.position import (
     Fill,
@@ -35,6 +37,8 @@ from src.hl_bot.trading.risk_config import RiskConfig
 from src.hl_bot.trading.audit_logger import AuditLogger
 from app.core.market.data import Candle
 
+logger = logging.getLogger(__name__)
+
 
 class BacktestStatus(StrEnum):
     """Backtest execution status."""
@@ -240,6 +244,7 @@ class BacktestEngine:
         signal_generator: Optional[Callable] = None,
         audit_dir: Optional[Path] = None,
         enable_learning: bool = True,
+        chart_service: Optional[ChartRenderService] = None,
     ):
         """Initialize backtest engine.
         
@@ -248,10 +253,12 @@ class BacktestEngine:
             signal_generator: Function to generate signals from candle data
             audit_dir: Directory for audit logs (optional)
             enable_learning: Whether to learn from trade outcomes
+            chart_service: Renders trade charts off the event loop (shared default if None)
         """
         self.config = config
         self.signal_generator = signal_generator
         self.enable_learning = enable_learning
+        self._chart_service = chart_service
         
         # Trade outcome learner - learns from every trade
         self.learner = TradeOutcomeLearner() if enable_learning else None
@@ -1098,55 +1105,17 @@ class BacktestEngine:
             return None
         
         try:
-            import io
-            import matplotlib
-            matplotlib.use('Agg')
-            import matplotlib.pyplot as plt
-            import matplotlib.patches as patches
-            from matplotlib.dates import DateFormatter
-            
-            # Prepare data
-            candles = self._recent_candles[-50:]  # Last 50 candles
-            
-            fig, ax = plt.subplots(figsize=(12, 6))
-            
-            # Plot candlesticks
-            for i, c in enumerate(candles):
-                color = 'green' if c.close >= c.open else 'red'
-                
-                # Body
-                body_bottom = min(c.open, c.close)
-                body_height = abs(c.close - c.open)
-                ax.add_patch(patches.Rectangle(
-                    (i - 0.3, body_bottom), 0.6, body_height,
-                    facecolor=color, edgecolor=color
-                ))
-                
-                # Wicks
-                ax.plot([i, i], [c.low, body_bottom], color=color, linewidth=1)
-                ax.plot([i, i], [body_bottom + body_height, c.high], color=color, linewidth=1)
+            chart_service = self._chart_service or get_chart_render_service()
+            exit_price = trade.exit_price if trade.exit_price else trade.entry_price
             
-            # Mark entry and exit
-            entry_price = float(trade.entry_price)
-            exit_price = float(trade.exit_price) if trade.exit_price else entry_price
-            
-            ax.axhline(y=entry_price, color='blue', linestyle='--', label=f'Entry: {entry_price:.2f}')
-            ax.axhline(y=exit_price, color='purple', linestyle='--', label=f'Exit: {exit_price:.2f}')
-            ax.axhline(y=float(trade.stop_loss), color='red', linestyle=':', label=f'SL: {float(trade.stop_loss):.2f}')
-            ax.axhline(y=float(trade.take_profit_1), color='green', linestyle=':', label=f'TP: {float(trade.take_profit_1):.2f}')
-            
-            # Styling
-            ax.set_title(f'{trade.symbol} - {trade.side.value.upper()} Trade')
-            ax.legend(loc='upper left')
-            ax.grid(True, alpha=0.3)
-            
-            # Save to bytes
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-            plt.close(fig)
-            buf.seek(0)
-            
-            return buf.read()
+            return await chart_service.render_trade_chart(
+                self._recent_candles[-50:],  # Last 50 candles
+                entry_price=float(trade.entry_price),
+                exit_price=float(exit_price),
+                stop_loss=float(trade.stop_loss),
+                take_profit=float(trade.take_profit_1),
+                title=f'{trade.symbol} - {trade.side.value.upper()} Trade',
+            )
         except Exception as e:
             logger.warning(f"Chart rendering failed: {e}")
             return None
@@ -0,0 +1,815 @@
+"""Tests for the vectorized candle pattern kernel.
+
+The kernel must be indistinguishable from the per-candle detectors it replaced,
+so most tests here are randomized equivalence checks against that reference,
+kept below as ReferenceCandlePatternDetector.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import numpy as np
+import pytest
+
+from app.core.market.data import Candle
+from app.core.patterns.candle_kernel import CandlePatternKernel
+from app.core.patterns.candles import (
+    PATTERN_FORMATS,
+    CandlePatternDetector,
+    CandlePatternType,
+    DetectedPattern,
+    PatternSignal,
+)
+
+
+class ReferenceCandlePatternDetector(CandlePatternDetector):
+    """The per-candle detectors the kernel replaced, kept as its specification.
+
+    Each rule is evaluated with plain Python on Candle properties, one candle
+    (or candle pair) at a time.
+    """
+
+    def detect_all_patterns_per_candle(self, candles: List[Candle]) -> List[DetectedPattern]:
+        """detect_all_patterns evaluated one candle at a time."""
+        if not candles:
+            return []
+
+        patterns = []
+
+        # Single candle patterns (check all candles)
+        for i, candle in enumerate(candles):
+            patterns.extend(self._detect_single_candle_patterns(candle, i))
+
+        # Multi-candle patterns (need at least 2 candles)
+        if len(candles) >= 2:
+            for i in range(1, len(candles)):
+                patterns.extend(
+                    self._detect_multi_candle_patterns(candles, i)
+                )
+
+        return patterns
+
+    def _detect_single_candle_patterns(
+        self, candle: Candle, index: int
+    ) -> List[DetectedPattern]:
+        """Detect patterns that can be identified from a single candle."""
+        patterns = []
+
+        # LE Candle (Liquidity Engine) - strong directional move
+        if pattern := self._detect_le_candle(candle, index):
+            patterns.append(pattern)
+
+        # Small Wick - minimal rejection, strong momentum
+        if pattern := self._detect_small_wick(candle, index):
+            patterns.append(pattern)
+
+        # Steeper Wick - long wick rejection
+        if pattern := self._detect_steeper_wick(candle, index):
+            patterns.append(pattern)
+
+        # Celery - narrow body with long wicks
+        if pattern := self._detect_celery(candle, index):
+            patterns.append(pattern)
+
+        # Doji
+        if pattern := self._detect_doji(candle, index):
+            patterns.append(pattern)
+
+        # Hammer / Shooting Star
+        if pattern := self._detect_hammer_shooting_star(candle, index):
+            patterns.append(pattern)
+
+        # Pin Bars
+        if pattern := self._detect_pin_bar(candle, index):
+            patterns.append(pattern)
+
+        # Strong Directional
+        if pattern := self._detect_strong_directional(candle, index):
+            patterns.append(pattern)
+
+        return patterns
+
+    def _detect_multi_candle_patterns(
+        self, candles: List[Candle], index: int
+    ) -> List[DetectedPattern]:
+        """Detect patterns that require multiple candles."""
+        patterns = []
+
+        current = candles[index]
+        previous = candles[index - 1]
+
+        # Engulfing patterns
+        if pattern := self._detect_engulfing(previous, current, index):
+            patterns.append(pattern)
+
+        # Inside/Outside bars
+        if pattern := self._detect_inside_outside_bar(previous, current, index):
+            patterns.append(pattern)
+
+        return patterns
+
+    def _detect_le_candle(
+        self, candle: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect Liquidity Engine candle - strong directional move.
+
+        Characteristics:
+        - Large body (>60% of range)
+        - Small wicks (<20% of range each)
+        - Strong momentum in one direction
+        """
+        if candle.total_range == 0:
+            return None
+
+        body_ratio = candle.body_size / candle.total_range
+        upper_wick_ratio = candle.wick_size_upper / candle.total_range
+        lower_wick_ratio = candle.wick_size_lower / candle.total_range
+
+        # Large body, small wicks
+        if body_ratio > self.body_threshold and \
+           upper_wick_ratio < 0.2 and lower_wick_ratio < 0.2:
+
+            signal = PatternSignal.BULLISH if candle.is_bullish else PatternSignal.BEARISH
+            strength = min(body_ratio, 1.0)  # Stronger with larger body
+
+            return DetectedPattern(
+                pattern_type=CandlePatternType.LE_CANDLE,
+                signal=signal,
+                strength=strength,
+                candle_index=index,
+                description=f"LE Candle: Strong {signal} momentum, {body_ratio:.1%} body",
+                metadata={
+                    "body_ratio": body_ratio,
+                    "upper_wick_ratio": upper_wick_ratio,
+                    "lower_wick_ratio": lower_wick_ratio,
+                }
+            )
+
+        return None
+
+    def _detect_small_wick(
+        self, candle: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect Small Wick candle - minimal rejection.
+
+        Characteristics:
+        - Very small wicks (<10% of range on one or both sides)
+        - Strong price acceptance
+        """
+        if candle.total_range == 0:
+            return None
+
+        upper_wick_ratio = candle.wick_size_upper / candle.total_range
+        lower_wick_ratio = candle.wick_size_lower / candle.total_range
+
+        # At least one wick must be very small
+        min_wick = min(upper_wick_ratio, lower_wick_ratio)
+
+        if min_wick < 0.1:
+            signal = PatternSignal.BULLISH if candle.is_bullish else PatternSignal.BEARISH
+            strength = 1.0 - min_wick  # Stronger with smaller wick
+
+            return DetectedPattern(
+                pattern_type=CandlePatternType.SMALL_WICK,
+                signal=signal,
+                strength=strength,
+                candle_index=index,
+                description=f"Small Wick: Clean {signal} move, minimal rejection",
+                metadata={
+                    "upper_wick_ratio": upper_wick_ratio,
+                    "lower_wick_ratio": lower_wick_ratio,
+                }
+            )
+
+        return None
+
+    def _detect_steeper_wick(
+        self, candle: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect Steeper Wick - long wick indicating rejection.
+
+        Characteristics:
+        - One wick is >50% of total range
+        - Indicates rejection at that price level
+        """
+        if candle.total_range == 0:
+            return None
+
+        upper_wick_ratio = candle.wick_size_upper / candle.total_range
+        lower_wick_ratio = candle.wick_size_lower / candle.total_range
+
+        # Long upper wick = bearish rejection
+        if upper_wick_ratio > 0.5:
+            return DetectedPattern(
+                pattern_type=CandlePatternType.STEEPER_WICK,
+                signal=PatternSignal.BEARISH,
+                strength=min(upper_wick_ratio, 1.0),
+                candle_index=index,
+                description=f"Steeper Wick: Upper wick rejection ({upper_wick_ratio:.1%})",
+                metadata={
+                    "wick_ratio": upper_wick_ratio,
+                    "direction": "upper",
+                }
+            )
+
+        # Long lower wick = bullish rejection
+        if lower_wick_ratio > 0.5:
+            return DetectedPattern(
+                pattern_type=CandlePatternType.STEEPER_WICK,
+                signal=PatternSignal.BULLISH,
+                strength=min(lower_wick_ratio, 1.0),
+                candle_index=index,
+                description=f"Steeper Wick: Lower wick rejection ({lower_wick_ratio:.1%})",
+                metadata={
+                    "wick_ratio": lower_wick_ratio,
+                    "direction": "lower",
+                }
+            )
+
+        return None
+
+    def _detect_celery(
+        self, candle: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect Celery pattern - narrow body with long wicks on both sides.
+
+        Characteristics:
+        - Small body (<20% of range)
+        - Long wicks on both sides (>30% each)
+        - Indicates indecision or equilibrium
+        """
+        if candle.total_range == 0:
+            return None
+
+        body_ratio = candle.body_size / candle.total_range
+        upper_wick_ratio = candle.wick_size_upper / candle.total_range
+        lower_wick_ratio = candle.wick_size_lower / candle.total_range
+
+        if body_ratio < 0.2 and \
+           upper_wick_ratio > self.wick_threshold and \
+           lower_wick_ratio > self.wick_threshold:
+
+            # Strength based on wick symmetry and body smallness
+            wick_balance = 1.0 - abs(upper_wick_ratio - lower_wick_ratio)
+            body_strength = 1.0 - (body_ratio / 0.2)
+            strength = (wick_balance + body_strength) / 2
+
+            return DetectedPattern(
+                pattern_type=CandlePatternType.CELERY,
+                signal=PatternSignal.NEUTRAL,
+                strength=strength,
+                candle_index=index,
+                description=f"Celery: Narrow body ({body_ratio:.1%}), long wicks both sides",
+                metadata={
+                    "body_ratio": body_ratio,
+                    "upper_wick_ratio": upper_wick_ratio,
+                    "lower_wick_ratio": lower_wick_ratio,
+                }
+            )
+
+        return None
+
+    def _detect_engulfing(
+        self, previous: Candle, current: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect Bullish/Bearish Engulfing patterns.
+
+        Characteristics:
+        - Current candle body completely engulfs previous candle body
+        - Reversal pattern
+        """
+        # Bullish Engulfing: bearish candle followed by bullish that engulfs it
+        if previous.is_bearish and current.is_bullish:
+            prev_body_low = min(previous.open, previous.close)
+            prev_body_high = max(previous.open, previous.close)
+            curr_body_low = min(current.open, current.close)
+            curr_body_high = max(current.open, current.close)
+
+            if curr_body_low <= prev_body_low and curr_body_high >= prev_body_high:
+                # Calculate coverage ratio
+                coverage = current.body_size / previous.body_size if previous.body_size > 0 else 0
+
+                if coverage >= self.engulfing_threshold:
+                    strength = min(coverage / 2.0, 1.0)  # Cap at 1.0
+
+                    return DetectedPattern(
+                        pattern_type=CandlePatternType.BULLISH_ENGULFING,
+                        signal=PatternSignal.BULLISH,
+                        strength=strength,
+                        candle_index=index,
+                        description=f"Bullish Engulfing: {coverage:.1%} coverage",
+                        metadata={
+                            "coverage_ratio": coverage,
+                            "previous_body": previous.body_size,
+                            "current_body": current.body_size,
+                        }
+                    )
+
+        # Bearish Engulfing: bullish candle followed by bearish that engulfs it
+        if previous.is_bullish and current.is_bearish:
+            prev_body_low = min(previous.open, previous.close)
+            prev_body_high = max(previous.open, previous.close)
+            curr_body_low = min(current.open, current.close)
+            curr_body_high = max(current.open, current.close)
+
+            if curr_body_low <= prev_body_low and curr_body_high >= prev_body_high:
+                coverage = current.body_size / previous.body_size if previous.body_size > 0 else 0
+
+                if coverage >= self.engulfing_threshold:
+                    strength = min(coverage / 2.0, 1.0)
+
+                    return DetectedPattern(
+                        pattern_type=CandlePatternType.BEARISH_ENGULFING,
+                        signal=PatternSignal.BEARISH,
+                        strength=strength,
+                        candle_index=index,
+                        description=f"Bearish Engulfing: {coverage:.1%} coverage",
+                        metadata={
+                            "coverage_ratio": coverage,
+                            "previous_body": previous.body_size,
+                            "current_body": current.body_size,
+                        }
+                    )
+
+        return None
+
+    def _detect_doji(
+        self, candle: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect Doji pattern - indecision candle.
+
+        Characteristics:
+        - Very small body (<10% of range by default)
+        - Can have wicks of any size
+        - Indicates indecision or potential reversal
+        """
+        if candle.total_range == 0:
+            return None
+
+        body_ratio = candle.body_size / candle.total_range
+
+        if body_ratio < self.doji_threshold:
+            strength = 1.0 - (body_ratio / self.doji_threshold)
+
+            return DetectedPattern(
+                pattern_type=CandlePatternType.DOJI,
+                signal=PatternSignal.NEUTRAL,
+                strength=strength,
+                candle_index=index,
+                description=f"Doji: Indecision, {body_ratio:.2%} body",
+                metadata={
+                    "body_ratio": body_ratio,
+                }
+            )
+
+        return None
+
+    def _detect_hammer_shooting_star(
+        self, candle: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect Hammer and Shooting Star patterns.
+
+        Hammer: Bullish reversal with long lower wick
+        Shooting Star: Bearish reversal with long upper wick
+        Inverted Hammer: Bullish with long upper wick
+        Hanging Man: Bearish with long lower wick
+        """
+        if candle.total_range == 0:
+            return None
+
+        body_ratio = candle.body_size / candle.total_range
+        upper_wick_ratio = candle.wick_size_upper / candle.total_range
+        lower_wick_ratio = candle.wick_size_lower / candle.total_range
+
+        # Small body required for all these patterns
+        if body_ratio > 0.3:
+            return None
+
+        # Hammer: Long lower wick (>2x body), small upper wick
+        if lower_wick_ratio > 0.6 and upper_wick_ratio <= 0.15:
+            strength = min(lower_wick_ratio, 1.0)
+            return DetectedPattern(
+                pattern_type=CandlePatternType.HAMMER,
+                signal=PatternSignal.BULLISH,
+                strength=strength,
+                candle_index=index,
+                description=f"Hammer: Bullish reversal, {lower_wick_ratio:.1%} lower wick",
+                metadata={
+                    "lower_wick_ratio": lower_wick_ratio,
+                    "body_ratio": body_ratio,
+                }
+            )
+
+        # Shooting Star: Long upper wick (>2x body), small lower wick
+        if upper_wick_ratio > 0.6 and lower_wick_ratio <= 0.15:
+            strength = min(upper_wick_ratio, 1.0)
+            return DetectedPattern(
+                pattern_type=CandlePatternType.SHOOTING_STAR,
+                signal=PatternSignal.BEARISH,
+                strength=strength,
+                candle_index=index,
+                description=f"Shooting Star: Bearish reversal, {upper_wick_ratio:.1%} upper wick",
+                metadata={
+                    "upper_wick_ratio": upper_wick_ratio,
+                    "body_ratio": body_ratio,
+                }
+            )
+
+        # Inverted Hammer: Long upper wick, at support
+        if upper_wick_ratio > 0.5 and lower_wick_ratio < 0.2 and body_ratio < 0.2:
+            strength = min(upper_wick_ratio, 1.0)
+            return DetectedPattern(
+                pattern_type=CandlePatternType.INVERTED_HAMMER,
+                signal=PatternSignal.BULLISH,
+                strength=strength,
+                candle_index=index,
+                description=f"Inverted Hammer: {upper_wick_ratio:.1%} upper wick",
+                metadata={
+                    "upper_wick_ratio": upper_wick_ratio,
+                    "body_ratio": body_ratio,
+                }
+            )
+
+        # Hanging Man: Long lower wick, at resistance
+        if lower_wick_ratio > 0.5 and upper_wick_ratio < 0.2 and body_ratio < 0.2:
+            strength = min(lower_wick_ratio, 1.0)
+            return DetectedPattern(
+                pattern_type=CandlePatternType.HANGING_MAN,
+                signal=PatternSignal.BEARISH,
+                strength=strength,
+                candle_index=index,
+                description=f"Hanging Man: {lower_wick_ratio:.1%} lower wick",
+                metadata={
+                    "lower_wick_ratio": lower_wick_ratio,
+                    "body_ratio": body_ratio,
+                }
+            )
+
+        return None
+
+    def _detect_pin_bar(
+        self, candle: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect Pin Bar patterns - strong rejection with long wick.
+
+        Similar to hammer/shooting star but with slightly different criteria.
+        Pin bars are strong reversal signals.
+        """
+        if candle.total_range == 0:
+            return None
+
+        body_ratio = candle.body_size / candle.total_range
+        upper_wick_ratio = candle.wick_size_upper / candle.total_range
+        lower_wick_ratio = candle.wick_size_lower / candle.total_range
+
+        # Pin bar needs small body and one dominant wick
+        if body_ratio > 0.25:
+            return None
+
+        # Bullish Pin Bar: Long lower wick
+        if lower_wick_ratio > 0.65 and lower_wick_ratio > (upper_wick_ratio * 3):
+            strength = min(lower_wick_ratio, 1.0)
+            return DetectedPattern(
+                pattern_type=CandlePatternType.PIN_BAR_BULLISH,
+                signal=PatternSignal.BULLISH,
+                strength=strength,
+                candle_index=index,
+                description=f"Bullish Pin Bar: Strong lower rejection ({lower_wick_ratio:.1%})",
+                metadata={
+                    "wick_ratio": lower_wick_ratio,
+                    "body_ratio": body_ratio,
+                }
+            )
+
+        # Bearish Pin Bar: Long upper wick
+        if upper_wick_ratio > 0.65 and upper_wick_ratio > (lower_wick_ratio * 3):
+            strength = min(upper_wick_ratio, 1.0)
+            return DetectedPattern(
+                pattern_type=CandlePatternType.PIN_BAR_BEARISH,
+                signal=PatternSignal.BEARISH,
+                strength=strength,
+                candle_index=index,
+                description=f"Bearish Pin Bar: Strong upper rejection ({upper_wick_ratio:.1%})",
+                metadata={
+                    "wick_ratio": upper_wick_ratio,
+                    "body_ratio": body_ratio,
+                }
+            )
+
+        return None
+
+    def _detect_strong_directional(
+        self, candle: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect strong directional candles - momentum indicators.
+
+        Characteristics:
+        - Large body (>70% of range)
+        - Minimal wicks
+        - Strong momentum
+        """
+        if candle.total_range == 0:
+            return None
+
+        body_ratio = candle.body_size / candle.total_range
+
+        if body_ratio > 0.7:
+            signal = PatternSignal.BULLISH if candle.is_bullish else PatternSignal.BEARISH
+            strength = min(body_ratio, 1.0)
+
+            pattern_type = (
+                CandlePatternType.STRONG_BULLISH if candle.is_bullish
+                else CandlePatternType.STRONG_BEARISH
+            )
+
+            return DetectedPattern(
+                pattern_type=pattern_type,
+                signal=signal,
+                strength=strength,
+                candle_index=index,
+                description=f"Strong {signal} candle: {body_ratio:.1%} body",
+                metadata={
+                    "body_ratio": body_ratio,
+                }
+            )
+
+        return None
+
+    def _detect_inside_outside_bar(
+        self, previous: Candle, current: Candle, index: int
+    ) -> Optional[DetectedPattern]:
+        """Detect Inside and Outside bars.
+
+        Inside Bar: Current candle's range is within previous candle's range
+        Outside Bar: Current candle's range engulfs previous candle's range
+        """
+        # Inside Bar: consolidation pattern
+        if current.high <= previous.high and current.low >= previous.low:
+            # Strength based on how much smaller the inside bar is
+            size_ratio = (
+                current.total_range / previous.total_range if previous.total_range > 0 else 0
+            )
+            strength = 1.0 - size_ratio  # Smaller inside bar = stronger pattern
+
+            return DetectedPattern(
+                pattern_type=CandlePatternType.INSIDE_BAR,
+                signal=PatternSignal.NEUTRAL,
+                strength=strength,
+                candle_index=index,
+                description=f"Inside Bar: Consolidation, {size_ratio:.1%} of previous range",
+                metadata={
+                    "size_ratio": size_ratio,
+                    "previous_range": previous.total_range,
+                    "current_range": current.total_range,
+                }
+            )
+
+        # Outside Bar: expansion/breakout pattern
+        if current.high > previous.high and current.low < previous.low:
+            size_ratio = (
+                current.total_range / previous.total_range if previous.total_range > 0 else 0
+            )
+            strength = min(size_ratio / 2.0, 1.0)  # Cap at 1.0
+
+            signal = PatternSignal.BULLISH if current.is_bullish else PatternSignal.BEARISH
+
+            return DetectedPattern(
+                pattern_type=CandlePatternType.OUTSIDE_BAR,
+                signal=signal,
+                strength=strength,
+                candle_index=index,
+                description=f"Outside Bar: Expansion, {size_ratio:.1%} of previous range",
+                metadata={
+                    "size_ratio": size_ratio,
+                    "previous_range": previous.total_range,
+                    "current_range": current.total_range,
+                }
+            )
+
+        return None
+
+
+def random_candles(rng: random.Random, count: int) -> List[Candle]:
+    """Generate candles mixing realistic bars with degenerate shapes.
+
+    Prices are rounded so exact threshold hits, flat bars, equal open/close
+    and identical consecutive bars all occur regularly.
+    """
+    base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    candles = []
+    price = 100.0
+
+    for i in range(count):
+        shape = rng.random()
+        if shape < 0.05:
+            # Flat bar (zero range)
+            open_price = close = high = low = price
+        elif shape < 0.10 and candles:
+            # Exact copy of the previous bar
+            prev = candles[-1]
+            open_price, high, low, close = prev.open, prev.high, prev.low, prev.close
+        else:
+            open_price = price
+            close = round(price + rng.choice([-1, 1]) * rng.randint(0, 20) / 4, 2)
+            high = round(max(open_price, close) + rng.randint(0, 20) / 4, 2)
+            low = round(min(open_price, close) - rng.randint(0, 20) / 4, 2)
+
+        candles.append(Candle(
+            timestamp=base_time + timedelta(minutes=5 * i),
+            open=open_price,
+            high=high,
+            low=low,
+            close=close,
+            volume=1000.0,
+            symbol="BTC-USD",
+            timeframe="5m",
+        ))
+        price = close
+
+    return candles
+
+
+def make_candle(open_price: float, high: float, low: float, close: float) -> Candle:
+    """Create a single test candle."""
+    return Candle(
+        timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        open=open_price,
+        high=high,
+        low=low,
+        close=close,
+        volume=1000.0,
+        symbol="BTC-USD",
+        timeframe="5m",
+    )
+
+
+def random_detector(rng: random.Random) -> ReferenceCandlePatternDetector:
+    """Detector with thresholds drawn from values that hit edge cases."""
+    return ReferenceCandlePatternDetector(
+        wick_threshold=rng.choice([0.2, 0.3, 0.4]),
+        body_threshold=rng.choice([0.5, 0.6, 0.7]),
+        engulfing_threshold=rng.choice([0.0, 0.95, 1.0]),
+        doji_threshold=rng.choice([0.0, 0.05, 0.1]),
+    )
+
+
+def assert_same_patterns(actual: List[DetectedPattern], expected: List[DetectedPattern]):
+    """Patterns are equal, down to the Python types of strengths and metadata."""
+    assert actual == expected
+    for got, want in zip(actual, expected):
+        assert type(got.strength) is type(want.strength)
+        assert {k: type(v) for k, v in got.metadata.items()} == \
+            {k: type(v) for k, v in want.metadata.items()}
+
+
+class TestKernelEquivalence:
+    """Property tests: kernel output equals the per-candle reference."""
+
+    @pytest.mark.parametrize("seed", range(25))
+    def test_matches_per_candle_path(self, seed):
+        """Random series produce identical patterns, strengths and metadata."""
+        rng = random.Random(seed)
+        candles = random_candles(rng, rng.randint(1, 300))
+        detector = random_detector(rng)
+
+        assert_same_patterns(
+            detector.detect_all_patterns(candles),
+            detector.detect_all_patterns_per_candle(candles),
+        )
+
+    @pytest.mark.parametrize("seed", range(25))
+    def test_last_n_matches_filtered_reference(self, seed):
+        """Materializing only the last N candles equals filtering the reference."""
+        rng = random.Random(1000 + seed)
+        candles = random_candles(rng, rng.randint(1, 200))
+        detector = random_detector(rng)
+        last_n: Optional[int] = rng.choice([None, rng.randint(0, 250)])
+
+        expected = [
+            p for p in detector.detect_all_patterns_per_candle(candles)
+            if last_n is None or p.candle_index >= len(candles) - last_n
+        ]
+
+        assert_same_patterns(detector.detect_all_patterns(candles, last_n=last_n), expected)
+
+    def test_patterns_at_index(self):
+        """get_patterns_at_index only materializes the requested candle."""
+        candles = random_candles(random.Random(7), 100)
+        detector = ReferenceCandlePatternDetector()
+        reference = detector.detect_all_patterns_per_candle(candles)
+
+        for index in (-1, 0, 1, 50, 99, 100):
+            expected = [p for p in reference if p.candle_index == index]
+            assert detector.get_patterns_at_index(candles, index) == expected
+
+
+class TestKernelDescriptions:
+    """Exact patterns for hand-built candles."""
+
+    def test_le_candle(self):
+        """Strength, description and metadata follow the candle's ratios."""
+        candle = make_candle(100.0, 111.0, 99.0, 110.0)
+
+        patterns = CandlePatternDetector().detect_all_patterns([candle])
+        le_candle = [p for p in patterns if p.pattern_type == CandlePatternType.LE_CANDLE]
+
+        assert len(le_candle) == 1
+        assert le_candle[0].signal == PatternSignal.BULLISH
+        assert le_candle[0].strength == pytest.approx(10 / 12)
+        assert le_candle[0].description == "LE Candle: Strong bullish momentum, 83.3% body"
+        assert le_candle[0].metadata == pytest.approx({
+            "body_ratio": 10 / 12,
+            "upper_wick_ratio": 1 / 12,
+            "lower_wick_ratio": 1 / 12,
+        })
+
+    def test_steeper_wick_side(self):
+        """Upper rejections are bearish, lower rejections bullish."""
+        upper = make_candle(100.0, 110.0, 99.0, 101.0)
+        lower = make_candle(101.0, 102.0, 92.0, 100.0)
+        detector = CandlePatternDetector()
+
+        for candle, signal, side in (
+            (upper, PatternSignal.BEARISH, "upper"),
+            (lower, PatternSignal.BULLISH, "lower"),
+        ):
+            steeper = [
+                p for p in detector.detect_all_patterns([candle])
+                if p.pattern_type == CandlePatternType.STEEPER_WICK
+            ]
+            assert len(steeper) == 1
+            assert steeper[0].signal == signal
+            assert steeper[0].metadata["direction"] == side
+            assert steeper[0].description.startswith(
+                f"Steeper Wick: {side.title()} wick rejection"
+            )
+
+    def test_inside_bar_after_flat_bar_has_integer_ratio(self):
+        """A zero-range previous candle gives a 0 size ratio, not a division."""
+        candles = [make_candle(100.0, 100.0, 100.0, 100.0), make_candle(100.0, 100.0, 100.0, 100.0)]
+
+        patterns = CandlePatternDetector().get_patterns_at_index(candles, 1)
+
+        assert len(patterns) == 1
+        inside = patterns[0]
+        assert inside.pattern_type == CandlePatternType.INSIDE_BAR
+        assert inside.strength == 1.0
+        assert inside.metadata == {"size_ratio": 0, "previous_range": 0.0, "current_range": 0.0}
+        assert type(inside.metadata["size_ratio"]) is int
+        assert inside.description == "Inside Bar: Consolidation, 0.0% of previous range"
+
+    def test_every_pattern_type_has_a_format(self):
+        """PATTERN_FORMATS describes every pattern type."""
+        assert set(PATTERN_FORMATS) == set(CandlePatternType)
+
+
+class TestKernelArrays:
+    """Tests for direct use of the kernel arrays."""
+
+    def test_masks_cover_every_pattern_type(self):
+        """Every pattern type has a mask and strength array of full length."""
+        kernel = CandlePatternKernel.from_candles(random_candles(random.Random(3), 50))
+
+        assert set(kernel.masks) == set(CandlePatternType)
+        for pattern_type in CandlePatternType:
+            assert kernel.masks[pattern_type].shape == (50,)
+            assert kernel.strengths[pattern_type].shape == (50,)
+
+    def test_mask_counts_match_reference(self):
+        """Mask totals equal the number of reference detections per type."""
+        candles = random_candles(random.Random(11), 500)
+        detector = ReferenceCandlePatternDetector()
+        kernel = detector.build_kernel(candles)
+        reference = detector.detect_all_patterns_per_candle(candles)
+
+        for pattern_type in CandlePatternType:
+            expected = sum(1 for p in reference if p.pattern_type == pattern_type)
+            assert int(kernel.masks[pattern_type].sum()) == expected
+
+    def test_hammer_family_masks_are_exclusive(self):
+        """At most one hammer-family and one pin bar mask is set per candle."""
+        kernel = CandlePatternKernel.from_candles(random_candles(random.Random(11), 500))
+
+        hammer_family = sum(kernel.masks[t].astype(int) for t in (
+            CandlePatternType.HAMMER,
+            CandlePatternType.SHOOTING_STAR,
+            CandlePatternType.INVERTED_HAMMER,
+            CandlePatternType.HANGING_MAN,
+        ))
+        pin_bars = (
+            kernel.masks[CandlePatternType.PIN_BAR_BULLISH].astype(int)
+            + kernel.masks[CandlePatternType.PIN_BAR_BEARISH].astype(int)
+        )
+        assert hammer_family.max() <= 1
+        assert pin_bars.max() <= 1
+
+    def test_mismatched_arrays_rejected(self):
+        """OHLC arrays must have equal length."""
+        with pytest.raises(ValueError):
+            CandlePatternKernel(np.ones(3), np.ones(3), np.ones(2), np.ones(3))
+
+    def test_empty_input(self):
+        """Empty series produce no patterns."""
+        detector = CandlePatternDetector()
+        assert detector.detect_all_patterns([]) == []
+        assert CandlePatternKernel.from_candles([]).patterns() == []
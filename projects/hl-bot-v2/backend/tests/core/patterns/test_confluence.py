@@ -253,6 +253,79 @@ class TestConvenienceFunction:
         assert score.signal is not None
 
 
+class TestAnalysisCache:
+    """Tests for the per-timeframe analysis cache."""
+    
+    def test_unchanged_timeframes_are_served_from_cache(self):
+        """Only timeframes with a new candle are re-analyzed."""
+        scorer = MultiTimeframeConfluenceScorer()
+        candles_15m = create_test_candles(60, timeframe="15m")
+        candles_4h = create_test_candles(60, timeframe="4h", start_price=90.0)
+        
+        first = scorer.score_confluence({"15m": candles_15m[:59], "4h": candles_4h}, "15m")
+        assert scorer.cache_info()["misses"] == 2
+        assert scorer.cache_info()["hits"] == 0
+        
+        # New 15m candle closes; the 4h series is unchanged
+        scorer.score_confluence({"15m": candles_15m, "4h": candles_4h}, "15m")
+        assert scorer.cache_hits == 1
+        assert scorer.cache_misses == 3
+        
+        again = scorer.score_confluence({"15m": candles_15m[:59], "4h": candles_4h}, "15m")
+        assert scorer.cache_hits == 3
+        assert again.to_dict() == first.to_dict()
+    
+    def test_cached_result_matches_uncached(self):
+        """Caching does not change the confluence result."""
+        mtf_data = {
+            "5m": create_test_candles(50, timeframe="5m", trend="sideways"),
+            "1h": create_test_candles(50, timeframe="1h", trend="bearish"),
+        }
+        cached = MultiTimeframeConfluenceScorer()
+        uncached = MultiTimeframeConfluenceScorer(cache_size=0)
+        
+        cached.score_confluence(mtf_data, "5m")
+        result = cached.score_confluence(mtf_data, "5m")
+        
+        assert cached.cache_hits == 2
+        assert uncached.score_confluence(mtf_data, "5m").to_dict() == result.to_dict()
+        assert uncached.cache_info()["size"] == 0
+    
+    def test_key_includes_symbol_and_detector_config(self):
+        """Different symbols or detector settings never share an entry."""
+        scorer = MultiTimeframeConfluenceScorer()
+        
+        scorer.analyze_timeframe(create_test_candles(30, symbol="BTC-USD"), "5m")
+        scorer.analyze_timeframe(create_test_candles(30, symbol="ETH-USD"), "5m")
+        assert scorer.cache_misses == 2
+        
+        scorer.pattern_detector.wick_threshold = 0.4
+        scorer.analyze_timeframe(create_test_candles(30, symbol="BTC-USD"), "5m")
+        assert scorer.cache_misses == 3
+        assert scorer.cache_hits == 0
+    
+    def test_cache_is_bounded_lru(self):
+        """Least recently used entries are evicted past cache_size."""
+        scorer = MultiTimeframeConfluenceScorer(cache_size=2)
+        series = [create_test_candles(20 + i) for i in range(3)]
+        
+        scorer.analyze_timeframe(series[0], "5m")
+        scorer.analyze_timeframe(series[1], "5m")
+        scorer.analyze_timeframe(series[0], "5m")  # refresh series[0]
+        scorer.analyze_timeframe(series[2], "5m")  # evicts series[1]
+        
+        assert scorer.cache_info()["size"] == 2
+        scorer.analyze_timeframe(series[0], "5m")
+        assert scorer.cache_hits == 2
+        scorer.analyze_timeframe(series[1], "5m")
+        assert scorer.cache_misses == 4
+        
+        scorer.clear_cache()
+        assert scorer.cache_info() == {
+            "hits": 0, "misses": 0, "hit_rate": 0.0, "size": 0, "max_size": 2,
+        }
+
+
 class TestTimeframeAnalysis:
     """Tests for TimeframeAnalysis component."""
     
@@ -0,0 +1,159 @@
+"""Tests for the process-pool multi-symbol signal scanner."""
+import os
+import signal as os_signal
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.market.data import Candle
+from app.core.patterns.scanner import (
+    SignalScanner,
+    decode_candles,
+    encode_candles,
+)
+from app.core.patterns.signals import SignalGenerationConfig, SignalGenerator
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TF_MINUTES = {"15m": 15, "1h": 60, "4h": 240}
+
+
+def make_candles(symbol: str, timeframe: str, count: int, trend: float) -> list[Candle]:
+    """Trending candles with a small zig-zag so swings and zones exist."""
+    candles = []
+    price = 100.0
+    for i in range(count):
+        close = price * (1 + trend) + (0.3 if i % 3 == 0 else -0.2)
+        candles.append(Candle(
+            timestamp=START + timedelta(minutes=i * TF_MINUTES[timeframe]),
+            open=price,
+            high=max(price, close) * 1.002,
+            low=min(price, close) * 0.998,
+            close=close,
+            volume=1000.0 + i,
+            symbol=symbol,
+            timeframe=timeframe,
+        ))
+        price = close
+    return candles
+
+
+def make_universe(symbols: list[str], bars_15m: int = 120) -> dict:
+    universe = {}
+    for n, symbol in enumerate(symbols):
+        trend = 0.002 if n % 2 == 0 else -0.002
+        universe[symbol] = {
+            "15m": make_candles(symbol, "15m", bars_15m, trend),
+            "1h": make_candles(symbol, "1h", 60, trend),
+            "4h": make_candles(symbol, "4h", 40, trend),
+        }
+    return universe
+
+
+def comparable(signal):
+    """Signal fields that are deterministic (id and creation time are not)."""
+    if signal is None:
+        return None
+    return signal.model_dump(exclude={"id", "timestamp"})
+
+
+def local_outcome(generator, mtf_data, symbol):
+    """What an in-process generator produces: a signal or an error message.
+    
+    Worker exceptions are reported per symbol, so errors must match too.
+    """
+    try:
+        return comparable(generator.generate_signal(mtf_data, "15m", symbol)), None
+    except Exception as e:
+        return None, str(e)
+
+
+def scanned_outcome(result):
+    return comparable(result.signal), result.error
+
+
+@pytest.fixture
+def config():
+    # Permissive thresholds so the synthetic data actually produces signals
+    return SignalGenerationConfig(
+        min_confluence_score=0.0,
+        min_agreement_percentage=0.0,
+        require_higher_tf_alignment=False,
+        min_risk_reward=0.5,
+        require_zone_confluence=False,
+    )
+
+
+@pytest.fixture
+def scanner(config):
+    scanner = SignalScanner(workers=2, config=config)
+    yield scanner
+    scanner.shutdown()
+
+
+def test_candle_encoding_round_trip():
+    """Packed arrays decode to identical candles."""
+    candles = make_candles("ETH-USD", "1h", 50, 0.001)
+
+    packed = encode_candles(candles)
+
+    assert packed.nbytes == 50 * 48
+    assert decode_candles(packed, "ETH-USD", "1h") == candles
+
+
+def test_results_match_in_process_generator(scanner, config):
+    """Every symbol streams back with the same signal as a local generator."""
+    symbols = [f"SYM{i}" for i in range(6)]
+    universe = make_universe(symbols)
+    local = SignalGenerator(config=config)
+
+    results = list(scanner.scan(universe, "15m"))
+
+    assert sorted(r.symbol for r in results) == symbols
+    for result in results:
+        assert result.latency_ms > 0
+        assert result.worker == scanner.worker_for(result.symbol)
+        assert scanned_outcome(result) == local_outcome(local, universe[result.symbol], result.symbol)
+
+
+def test_incremental_updates_stay_in_sync(scanner, config):
+    """Later scans ship only new bars and still match the full series."""
+    symbols = ["BTC-USD", "ETH-USD", "SOL-USD"]
+    full = make_universe(symbols, bars_15m=130)
+    local = SignalGenerator(config=config)
+
+    for bars in (120, 121, 125, 130):
+        universe = {
+            symbol: {**data, "15m": data["15m"][:bars]}
+            for symbol, data in full.items()
+        }
+        results = scanner.scan_all(universe, "15m")
+        for symbol in symbols:
+            assert scanned_outcome(results[symbol]) == local_outcome(local, universe[symbol], symbol)
+
+
+def test_worker_restart_resyncs(scanner, config):
+    """A worker that lost its buffers is resent the full window."""
+    universe = make_universe(["BTC-USD", "ETH-USD"])
+    scanner.scan_all(universe, "15m")
+
+    for pool in scanner._pools:
+        for pid in list(pool._processes):
+            os.kill(pid, os_signal.SIGKILL)
+
+    results = scanner.scan_all(universe, "15m")
+    local = SignalGenerator(config=config)
+
+    for symbol, result in results.items():
+        assert "terminated" not in (result.error or "")
+        assert scanned_outcome(result) == local_outcome(local, universe[symbol], symbol)
+
+
+@pytest.mark.asyncio
+async def test_scan_async_streams_all_symbols(scanner):
+    """The async iterator yields one result per symbol."""
+    universe = make_universe(["A", "B", "C", "D"])
+
+    symbols = [result.symbol async for result in scanner.scan_async(universe, "15m")]
+
+    assert sorted(symbols) == ["A", "B", "C", "D"]
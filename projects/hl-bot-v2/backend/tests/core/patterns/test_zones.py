@@ -417,6 +417,91 @@ class TestZoneAnalysis:
             assert not zone.broken, "Active zones should not be broken"
 
 
+class TestZoneIndexing:
+    """Tests for the sweep-line touch counter and midpoint index."""
+    
+    @staticmethod
+    def random_walk(seed: int, count: int) -> List[Candle]:
+        """Random-walk candles with occasional flat bars."""
+        import random
+        rng = random.Random(seed)
+        price = 100.0
+        price_data = []
+        for _ in range(count):
+            close = round(price + rng.gauss(0, 0.5), 2)
+            high = round(max(price, close) + abs(rng.gauss(0, 0.3)), 2)
+            low = round(min(price, close) - abs(rng.gauss(0, 0.3)), 2)
+            if rng.random() < 0.03:
+                close = high = low = price
+            price_data.append((price, high, low, close, rng.uniform(500, 1500)))
+            price = close
+        return create_test_candles(price_data)
+    
+    @pytest.mark.parametrize("seed", range(10))
+    def test_sweep_matches_per_zone_scan(self, seed):
+        """One sweep finds the same touches as scanning each zone separately."""
+        import random
+        rng = random.Random(seed)
+        candles = self.random_walk(seed, 400)
+        detector = SupportResistanceDetector()
+        
+        candidates = []
+        for _ in range(60):
+            start = rng.randrange(len(candles))
+            mid = rng.choice(candles).close
+            half = mid * rng.choice([0.0005, 0.001, 0.01])
+            candidates.append((start, mid + half, mid - half, rng.random() < 0.5))
+        
+        swept = detector._sweep_zone_touches(candles, candidates, 1000.0)
+        
+        for (start, top, bottom, is_resistance), touches in zip(candidates, swept):
+            expected = detector._find_zone_touches(
+                candles[start:], top, bottom, 1000.0, is_resistance
+            )
+            assert touches == expected
+    
+    @pytest.mark.parametrize("seed", range(5))
+    def test_index_queries_match_linear_scan(self, seed):
+        """Midpoint-indexed queries return exactly what a full scan would."""
+        candles = self.random_walk(100 + seed, 600)
+        detector = SupportResistanceDetector(lookback_window=600)
+        zones = detector.detect_zones(candles)
+        assert zones
+        
+        for price in (candles[-1].close, candles[-1].close * 1.04, zones[0].midpoint):
+            for pct in (0.005, 0.05, 0.2):
+                for types in (None, [ZoneType.RESISTANCE]):
+                    expected = [
+                        (z, z.distance_to_zone(price)) for z in zones
+                        if (not types or z.zone_type in types)
+                        and abs(z.distance_to_zone(price)) / price <= pct
+                    ]
+                    expected.sort(key=lambda x: abs(x[1]))
+                    assert detector.find_nearest_zones(zones, price, pct, types) == expected
+            
+            expected_active = [
+                z for z in zones
+                if not z.broken and z.touch_count > 0
+                and abs(z.distance_to_zone(price)) / price <= 0.10
+            ]
+            assert detector.get_active_zones(zones, price) == expected_active
+    
+    def test_prebuilt_index_accepted(self):
+        """A ZoneIndex can be passed in place of the zone list."""
+        from app.core.patterns.zones import ZoneIndex
+        
+        candles = self.random_walk(7, 300)
+        detector = SupportResistanceDetector(lookback_window=300)
+        zones = detector.detect_zones(candles)
+        price = candles[-1].close
+        
+        index = ZoneIndex(zones)
+        
+        assert len(index) == len(zones)
+        assert detector.find_nearest_zones(index, price) == detector.find_nearest_zones(zones, price)
+        assert detector.get_active_zones(index, price) == detector.get_active_zones(zones, price)
+
+
 class TestZoneStrengthClassification:
     """Tests for zone strength classification."""
     
@@ -10,8 +10,8 @@ from app.core.patterns.candles import (
     CandlePatternType,
     PatternSignal,
     DetectedPattern,
-    CandlePatternDetector,
 )
+from tests.core.patterns.test_candle_kernel import ReferenceCandlePatternDetector
 
 
 def create_candle(
@@ -45,8 +45,8 @@ class TestCandlePatternDetector:
     
     @pytest.fixture
     def detector(self):
-        """Create a detector with default settings."""
-        return CandlePatternDetector()
+        """Create a reference detector with default settings."""
+        return ReferenceCandlePatternDetector()
     
     # LE Candle Tests
     
@@ -558,7 +558,7 @@ class TestCandlePatternDetector:
     
     def test_custom_thresholds(self):
         """Test detector with custom thresholds."""
-        detector = CandlePatternDetector(
+        detector = ReferenceCandlePatternDetector(
             wick_threshold=0.4,
             body_threshold=0.7,
             engulfing_threshold=1.0,
@@ -667,7 +667,7 @@ class TestPatternMetadata:
     
     def test_metadata_contains_useful_info(self):
         """Test that pattern metadata contains useful information."""
-        detector = CandlePatternDetector()
+        detector = ReferenceCandlePatternDetector()
         candle = create_candle(100.0, 110.0, 98.0, 108.0)
         
         patterns = detector._detect_single_candle_patterns(candle, 0)
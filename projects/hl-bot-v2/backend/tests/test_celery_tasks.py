@@ -9,6 +9,7 @@ from unittest.mock import Mock, patch, AsyncMock
 from pathlib import Path
 
 # Import tasks
+from app.workers import tasks
 from app.workers.tasks import (
     process_youtube_video,
     process_youtube_playlist,
@@ -20,6 +21,14 @@ from app.workers.tasks import (
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_processors():
+    """Drop the per-process processors so each test sees its own mocks."""
+    tasks._processors.clear()
+    yield
+    tasks._processors.clear()
+
+
 class TestYouTubeTasks:
     """Tests for YouTube processing tasks."""
 
@@ -261,6 +270,40 @@ class TestCacheTasks:
         assert result["type"] == "pdf"
 
 
+class TestProcessorLifecycle:
+    """Tests for the per-worker-process processors."""
+
+    @patch("app.workers.tasks.PDFProcessor")
+    def test_processor_reused_and_shut_down(self, mock_processor):
+        """One processor serves every task until the worker process exits."""
+        mock_processor.side_effect = lambda **kwargs: Mock()
+        first = tasks.get_pdf_processor()
+        assert tasks.get_pdf_processor() is first
+        assert mock_processor.call_count == 1
+
+        tasks.shutdown_processors()
+
+        first.shutdown.assert_called_once()
+        assert tasks.get_pdf_processor() is not first
+
+    @patch("app.workers.tasks.YouTubeProcessor")
+    @patch("app.workers.tasks.run_async")
+    def test_youtube_tasks_share_one_processor(self, mock_run_async, mock_processor):
+        """Video and playlist tasks reuse the worker's processor and Whisper pool."""
+        mock_processor.side_effect = lambda **kwargs: Mock()
+        mock_run_async.return_value = [Mock(transcript="Test transcript", frames=[])]
+
+        process_youtube_video(url="https://youtube.com/watch?v=test_id")
+        process_youtube_playlist(url="https://youtube.com/playlist?list=test_playlist")
+
+        assert mock_processor.call_count == 1
+        processor = tasks.get_youtube_processor()
+
+        tasks.shutdown_processors()
+
+        processor.shutdown.assert_called_once()
+
+
 class TestTaskConfiguration:
     """Tests for task configuration."""
 
@@ -2,12 +2,14 @@
 
 import asyncio
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
+from hl_bot.services.ingestion import pdf_processor as pdf_processor_module
 from hl_bot.services.ingestion.pdf_processor import (
     PDFError,
     PDFInfo,
@@ -246,3 +248,136 @@ def test_cache_key_generation():
     # Different input should give different key
     key3 = processor._cache_key("other.pdf")
     assert key1 != key3
+
+
+@pytest.mark.asyncio
+async def test_sharded_extraction_and_page_cache(tmp_path):
+    """Pages are sharded across workers and unchanged pages hit the page cache."""
+    processor = PDFProcessor(
+        cache_dir=tmp_path / "cache", enable_ocr=False, workers=2, min_pages_per_shard=2
+    )
+
+    def _write_pdf(path: Path, revised_page: int | None = None) -> None:
+        c = canvas.Canvas(str(path), pagesize=letter)
+        for i in range(6):
+            label = "revised" if i == revised_page else "original"
+            c.drawString(100, 750, f"Page {i + 1} {label} content")
+            c.showPage()
+        c.save()
+
+    pdf_path = tmp_path / "course.pdf"
+    _write_pdf(pdf_path)
+
+    try:
+        assert processor._page_shards(6) == [(0, 3), (3, 6)]
+
+        first = await processor.process_file(pdf_path, extract_images=False)
+        assert [p.page_num for p in first.pages] == [1, 2, 3, 4, 5, 6]
+        assert "Page 4 original" in first.pages[3].text
+        assert all(p.content_hash for p in first.pages)
+
+        # Revise one page; every other page keeps its content hash
+        _write_pdf(pdf_path, revised_page=3)
+        second = await processor.process_file(pdf_path, extract_images=False)
+
+        changed = [
+            a.page_num for a, b in zip(first.pages, second.pages)
+            if a.content_hash != b.content_hash
+        ]
+        assert changed == [4]
+        assert "Page 4 revised" in second.pages[3].text
+        assert second.pages[0].text == first.pages[0].text
+    finally:
+        processor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_ocr_reapplied_after_page_cache_cleanup(tmp_path, monkeypatch):
+    """Pages whose cache entry was cleaned up are OCR'd again, not left empty."""
+    from PIL import Image
+
+    image_path = tmp_path / "chart.png"
+    Image.new("RGB", (400, 300), "white").save(image_path)
+    pdf_path = tmp_path / "scanned.pdf"
+    c = canvas.Canvas(str(pdf_path), pagesize=letter)
+    c.drawImage(str(image_path), 100, 300, width=400, height=300)
+    c.showPage()
+    c.save()
+
+    ocr_calls = []
+
+    def fake_ocr(path: str) -> str:
+        ocr_calls.append(path)
+        return "chart text"
+
+    monkeypatch.setattr(pdf_processor_module, "_ocr_image", fake_ocr)
+    processor = PDFProcessor(cache_dir=tmp_path / "cache", enable_ocr=True, workers=1)
+    # Threads see the patched OCR function
+    processor._pool = ThreadPoolExecutor(max_workers=1)
+
+    try:
+        first = await processor.process_file(pdf_path, extract_images=True)
+        assert first.pages[0].ocr_text == "chart text"
+        assert len(ocr_calls) == 1
+
+        # Served from the page cache without OCR
+        second = await processor.process_file(pdf_path, extract_images=True)
+        assert second.pages[0].ocr_text == "chart text"
+        assert len(ocr_calls) == 1
+
+        await asyncio.sleep(0.01)
+        assert await processor.cleanup_cache(max_age_days=0) > 0
+
+        third = await processor.process_file(pdf_path, extract_images=True)
+        assert third.pages[0].ocr_text == "chart text"
+        assert len(ocr_calls) == 2
+    finally:
+        processor.shutdown()
+
+
+def test_page_hash_covers_form_xobjects_and_fonts(tmp_path):
+    """Changes hidden in page resources change the page's content hash."""
+    import fitz
+
+    from hl_bot.services.ingestion.pdf_processor import _page_content_hash
+
+    def _hash(path: Path) -> str:
+        with fitz.open(path) as doc:
+            return _page_content_hash(doc, doc[0], "settings")
+
+    form_src = fitz.open()
+    form_src.new_page().insert_text((72, 72), "Drawn through a Form XObject")
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 400), "Page text", fontname="helv")
+    page.show_pdf_page(page.rect, form_src, 0)
+    original = tmp_path / "original.pdf"
+    doc.save(original)
+
+    # Same objects written with different xref numbers
+    with fitz.open(original) as copy:
+        renumbered = tmp_path / "renumbered.pdf"
+        copy.save(renumbered, garbage=4)
+    assert _hash(renumbered) == _hash(original)
+
+    # Edit the nested Form XObject; the page's own content stream is untouched
+    form_xref = next(
+        xref for xref in range(1, doc.xref_length())
+        if "/Subtype/Form" in doc.xref_object(xref, compressed=True)
+        and "/fullpage" not in doc.xref_object(xref, compressed=True)
+    )
+    doc.update_stream(form_xref, b"BT /helv 11 Tf 72 72 Td (Revised) Tj ET")
+    revised_form = tmp_path / "revised_form.pdf"
+    doc.save(revised_form)
+    assert _hash(revised_form) != _hash(original)
+
+    # Swap the font the page's text is drawn with
+    with fitz.open(original) as doc:
+        font_xref = next(
+            xref for xref in range(1, doc.xref_length())
+            if "/Type/Font" in doc.xref_object(xref, compressed=True)
+        )
+        doc.xref_set_key(font_xref, "BaseFont", "/Courier")
+        revised_font = tmp_path / "revised_font.pdf"
+        doc.save(revised_font)
+    assert _hash(revised_font) != _hash(original)
@@ -21,6 +21,7 @@ from src.hl_bot.trading.backtest import (
     BacktestTrade,
     BacktestMetrics,
 )
+from src.hl_bot.services.chart_rendering import ChartRenderService
 from src.hl_bot.types import Signal, SignalType, SetupType, MarketPhase, PatternType, Timeframe
 from app.core.market.data import Candle
 
@@ -505,6 +506,34 @@ class TestBacktestEngine:
             assert state.current_candle_index >= 0
             assert 0 <= state.progress_percent <= 100
 
+    @pytest.mark.asyncio
+    async def test_trade_chart_rendered_through_service(self):
+        """Trade charts are rendered off-loop and cached by the render service."""
+        service = ChartRenderService(max_workers=0)
+        engine = BacktestEngine(
+            config=BacktestConfig(), enable_learning=False, chart_service=service
+        )
+        engine._recent_candles = create_test_candles(60)
+        trade = BacktestTrade(
+            id="t1",
+            signal_id="s1",
+            symbol="BTC-USD",
+            side=SignalType.LONG,
+            entry_price=Decimal("40100"),
+            entry_time=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            position_size=Decimal("0.1"),
+            exit_price=Decimal("40400"),
+            stop_loss=Decimal("39900"),
+            take_profit_1=Decimal("40500"),
+        )
+        
+        first = await engine._render_trade_chart(trade)
+        second = await engine._render_trade_chart(trade)
+        
+        assert first.startswith(b"\x89PNG")
+        assert second is first
+        assert service.stats.misses == 1
+
 
 class TestBacktestConfig:
     """Test BacktestConfig validation."""
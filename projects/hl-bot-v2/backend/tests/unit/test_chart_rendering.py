@@ -0,0 +1,248 @@
+"""Tests for the off-loop chart rendering service."""
+
+import asyncio
+import io
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from hl_bot.services import chart_rendering
+from hl_bot.services.chart_rendering import ChartRenderer, ChartRenderService, pack_candles
+from hl_bot.services.raster_chart import PALETTES, render_raster_candles
+from hl_bot.types import Candle, Timeframe
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def make_candles(count: int = 30, start_price: float = 100.0) -> list[Candle]:
+    """Create a simple up-then-down candle window."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    candles = []
+    price = start_price
+    for i in range(count):
+        step = 1.0 if i < count // 2 else -1.0
+        open_, close = price, price + step
+        candles.append(Candle(
+            timestamp=start + timedelta(minutes=15 * i),
+            open=open_,
+            high=max(open_, close) + 0.5,
+            low=min(open_, close) - 0.5,
+            close=close,
+            volume=1000 + i,
+            timeframe=Timeframe.M15,
+            symbol="BTC",
+        ))
+        price = close
+    return candles
+
+
+@pytest.fixture
+def service():
+    """Service rendering on the default thread pool."""
+    return ChartRenderService(max_workers=0, cache_size=8)
+
+
+class TestPackCandles:
+    """Test candle packing."""
+
+    def test_naive_timestamps_are_utc(self) -> None:
+        """Naive and UTC-aware timestamps pack to the same row."""
+        aware = make_candles(2)
+        naive = [c.model_copy(update={"timestamp": c.timestamp.replace(tzinfo=None)}) for c in aware]
+
+        assert (pack_candles(aware) == pack_candles(naive)).all()
+        assert pack_candles(aware)[0, 0] == aware[0].timestamp.timestamp()
+
+
+class TestChartRenderService:
+    """Test cached off-loop rendering."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_window_is_cached(self, service: ChartRenderService) -> None:
+        """Rendering the same window twice renders once."""
+        candles = make_candles()
+
+        with patch.object(chart_rendering, "_render_job", wraps=chart_rendering._render_job) as job:
+            first = await service.render_candles(candles, title="BTC 15m")
+            second = await service.render_candles(list(candles), title="BTC 15m")
+
+        assert first.startswith(PNG_MAGIC)
+        assert second is first
+        assert job.call_count == 1
+        assert (service.stats.hits, service.stats.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_key_covers_candles_and_options(self, service: ChartRenderService) -> None:
+        """A changed candle or option is a different chart."""
+        candles = make_candles()
+        changed = candles[:-1] + [candles[-1].model_copy(update={"close": candles[-1].close + 0.1})]
+        options = {"style": "charles", "title": "BTC"}
+
+        base = ChartRenderService.cache_key("candles", pack_candles(candles), options)
+
+        assert base == ChartRenderService.cache_key("candles", pack_candles(candles), dict(options))
+        assert base != ChartRenderService.cache_key("candles", pack_candles(changed), options)
+        assert base != ChartRenderService.cache_key("candles", pack_candles(candles), {**options, "title": "ETH"})
+        assert base != ChartRenderService.cache_key("trade", pack_candles(candles), options)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_render(self, service: ChartRenderService) -> None:
+        """Identical requests in flight together are coalesced."""
+        candles = make_candles()
+
+        with patch.object(chart_rendering, "_render_job", wraps=chart_rendering._render_job) as job:
+            results = await asyncio.gather(*[
+                service.render_candles(candles, title="same") for _ in range(4)
+            ])
+
+        assert job.call_count == 1
+        assert all(r == results[0] for r in results)
+        assert service.stats.coalesced == 3
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self) -> None:
+        """The least recently used chart is evicted first."""
+        service = ChartRenderService(max_workers=0, cache_size=2)
+        windows = [make_candles(20, start_price=100 + i) for i in range(3)]
+
+        await service.render_candles(windows[0])
+        await service.render_candles(windows[1])
+        await service.render_candles(windows[0])  # Refresh window 0
+        await service.render_candles(windows[2])  # Evicts window 1
+
+        assert service.cache_entries == 2
+        await service.render_candles(windows[0])
+        assert service.stats.hits == 2
+        await service.render_candles(windows[1])
+        assert service.stats.misses == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_render_is_not_cached(self, service: ChartRenderService) -> None:
+        """Errors propagate and leave nothing in the cache."""
+        with pytest.raises(ValueError):
+            await service.render_candles([])
+
+        with patch.object(chart_rendering, "_render_job", side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                await service.render_candles(make_candles())
+
+        assert service.cache_entries == 0
+
+    @pytest.mark.asyncio
+    async def test_process_pool_keeps_loop_responsive(self) -> None:
+        """Renders in worker processes while the event loop keeps running."""
+        service = ChartRenderService(max_workers=1)
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker_task = asyncio.create_task(ticker())
+        try:
+            png = await service.render_trade_chart(
+                make_candles(), entry_price=101, exit_price=108,
+                stop_loss=Decimal("99"), take_profit=110, title="BTC - LONG Trade",
+            )
+        finally:
+            done.set()
+            await ticker_task
+            service.shutdown()
+
+        assert png.startswith(PNG_MAGIC)
+        assert ticks > 3
+
+    def test_shutdown_default_service(self) -> None:
+        """Shutting down the process-wide service stops its pool without creating one."""
+        with patch.object(chart_rendering, "_default_service", None):
+            chart_rendering.shutdown_chart_render_service()
+            assert chart_rendering._default_service is None
+
+            service = chart_rendering.get_chart_render_service()
+            with patch.object(chart_rendering, "ProcessPoolExecutor") as pool:
+                service._max_workers = 1
+                service._get_executor()
+                chart_rendering.shutdown_chart_render_service()
+
+            pool.return_value.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+            assert service._executor is None
+
+    def test_renderer_still_renders_synchronously(self) -> None:
+        """ChartRenderer keeps its direct API."""
+        png = ChartRenderer().render_candles(make_candles(), highlight_range=(99.0, 110.0))
+        assert png.startswith(PNG_MAGIC)
+
+
+class TestRasterBackend:
+    """Test the lightweight raster renderer."""
+
+    def decode(self, png: bytes) -> np.ndarray:
+        image = Image.open(io.BytesIO(png))
+        assert image.mode == "RGB"
+        return np.asarray(image)
+
+    def test_renders_fixed_size_deterministic_png(self) -> None:
+        """Same window and options give identical bytes at the requested size."""
+        renderer = ChartRenderer(backend="raster")
+        candles = make_candles()
+
+        first = renderer.render_candles(candles, title="BTC 15m", width=640, height=400)
+        second = renderer.render_candles(list(candles), title="BTC 15m", width=640, height=400)
+
+        assert first.startswith(PNG_MAGIC)
+        assert first == second
+        assert self.decode(first).shape == (400, 640, 3)
+
+    def test_draws_candles_volume_and_zones(self) -> None:
+        """Up and down candles use the palette colors; zones are shaded."""
+        palette = PALETTES["charles"]
+        rows = pack_candles(make_candles())
+
+        plain = self.decode(render_raster_candles(rows, show_volume=False))
+        zoned = self.decode(render_raster_candles(rows, show_volume=False, zones=[(102.0, 104.0)]))
+        with_volume = self.decode(render_raster_candles(rows))
+
+        colors = {tuple(p) for p in plain.reshape(-1, 3)}
+        assert palette.up in colors
+        assert palette.down in colors
+        assert (zoned != plain).any()
+        # Volume bars fill the bottom of the chart
+        assert (with_volume[-15] != palette.background).any(axis=1).any()
+        assert (plain[-15] == palette.background).all()
+
+    def test_unknown_backend_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            ChartRenderer(backend="svg")
+
+    @pytest.mark.asyncio
+    async def test_service_renders_with_backend(self, service: ChartRenderService) -> None:
+        """The backend is part of the cache key."""
+        candles = make_candles()
+
+        raster = await service.render_candles(candles, backend="raster")
+        default = await service.render_candles(candles)
+
+        assert raster == render_raster_candles(pack_candles(candles))
+        assert default != raster
+        assert service.stats.misses == 2
+
+    def test_does_not_import_matplotlib(self) -> None:
+        """Raster-only workers never load the matplotlib/pandas stack."""
+        code = (
+            "import sys\n"
+            "from hl_bot.services.chart_rendering import ChartRenderer, _init_worker\n"
+            "_init_worker('raster')\n"
+            "ChartRenderer(backend='raster').render_rows(__import__('numpy').array("
+            "[[0, 1, 2, 0.5, 1.5, 10]] * 5, dtype=float))\n"
+            "assert not {'matplotlib', 'pandas', 'mplfinance'} & set(sys.modules), sys.modules.keys()\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True, env={"PYTHONPATH": ":".join(sys.path)})
@@ -1,13 +1,14 @@
 """Tests for image analyzer service."""
 
 import asyncio
+import random
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
-from PIL import Image
+from PIL import Image, ImageDraw
 
 from hl_bot.services.ingestion.image_analyzer import (
     ChartAnalysisResult,
@@ -15,7 +16,11 @@ from hl_bot.services.ingestion.image_analyzer import (
     ImageAnalysis,
     ImageAnalyzer,
     ImageAnalyzerError,
+    PerceptualHashIndex,
     TrendAnalysis,
+    chart_thumbnail,
+    perceptual_hash,
+    thumbnails_match,
 )
 from hl_bot.services.llm_client import LLMClient
 
@@ -333,6 +338,242 @@ async def test_analyze_batch_filename_mismatch(image_analyzer, sample_image_byte
         await image_analyzer.analyze_batch(sources, filenames=filenames)
 
 
+# ============================================================================
+# Near-Duplicate Cache Tests
+# ============================================================================
+
+
+def make_chart(seed: int) -> Image.Image:
+    """Draw a random-walk candle chart."""
+    rng = random.Random(seed)
+    img = Image.new("RGB", (800, 600), color="white")
+    draw = ImageDraw.Draw(img)
+    price = 300.0
+    for i in range(60):
+        close = min(max(price + rng.gauss(0, 15), 50), 550)
+        color = "green" if close >= price else "red"
+        x = 20 + i * 12
+        draw.line([(x + 4, min(price, close) - 10), (x + 4, max(price, close) + 10)], fill=color)
+        draw.rectangle([x, min(price, close), x + 8, max(price, close)], fill=color)
+        price = close
+    return img
+
+
+def make_themed_chart(seed: int, candles: int = 80) -> Image.Image:
+    """Draw a random-walk chart on a fixed dark theme with grid, axis and title."""
+    rng = random.Random(seed)
+    img = Image.new("RGB", (1280, 720), color=(19, 23, 34))
+    draw = ImageDraw.Draw(img)
+    for y in range(40, 680, 60):
+        draw.line([(0, y), (1180, y)], fill=(42, 46, 57))
+    for x in range(0, 1180, 100):
+        draw.line([(x, 40), (x, 680)], fill=(42, 46, 57))
+    draw.rectangle([1180, 0, 1280, 720], fill=(30, 34, 45))
+    draw.rectangle([0, 0, 1280, 40], fill=(30, 34, 45))
+    draw.text((10, 10), "BTCUSD 15m", fill=(220, 220, 220))
+    price = 360.0
+    for i in range(candles):
+        close = min(max(price + rng.gauss(0, 12), 80), 640)
+        color = (38, 166, 154) if close >= price else (239, 83, 80)
+        x = 20 + i * 14
+        draw.line(
+            [(x + 5, min(price, close) - rng.uniform(2, 15)),
+             (x + 5, max(price, close) + rng.uniform(2, 15))],
+            fill=color,
+        )
+        draw.rectangle([x, min(price, close), x + 10, max(price, close) + 1], fill=color)
+        price = close
+    return img
+
+
+def encode(img: Image.Image, format: str = "PNG", **params) -> bytes:
+    buffer = BytesIO()
+    img.save(buffer, format=format, **params)
+    return buffer.getvalue()
+
+
+def test_perceptual_hash_tolerates_reencoding_and_crops():
+    """Copies of a chart hash close together; other charts do not."""
+    chart = make_chart(0)
+    phash = perceptual_hash(chart)
+
+    def distance(img):
+        return bin(phash ^ perceptual_hash(img)).count("1")
+
+    assert distance(Image.open(BytesIO(encode(chart, "JPEG", quality=60)))) <= 2
+    assert distance(chart.resize((400, 300))) <= 2
+    assert distance(chart.crop((0, 0, 780, 585))) <= 10
+    assert all(distance(make_chart(seed)) > 10 for seed in range(1, 6))
+
+
+def test_perceptual_hash_index_nearest():
+    """The closest hash within the distance is returned."""
+    index = PerceptualHashIndex()
+    index.add("a", 0b0000)
+    index.add("b", 0b1111)
+    index.add("c", 1 << 63)
+
+    assert index.nearest(0b0001, max_distance=2) == ("a", 1)
+    assert index.nearest(0b0111, max_distance=2) == ("b", 1)
+    assert index.nearest((1 << 63) | 1, max_distance=1) == ("c", 1)
+    assert index.nearest(0b0011_0000_0011, max_distance=1) is None
+
+    index.remove({"a"})
+    assert "a" not in index
+    assert index.nearest(0b0001, max_distance=1) is None
+
+
+def test_perceptual_hash_index_filters_by_aspect_ratio():
+    """Lookups with a size skip images of other aspect ratios, not other scales."""
+    index = PerceptualHashIndex()
+    index.add("wide", 0b0000, (1280, 720))
+    index.add("square", 0b0001, (800, 800))
+    index.add("unsized", 0b0000)
+
+    assert index.within(0b0000, max_distance=2) == [("wide", 0), ("unsized", 0), ("square", 1)]
+    assert index.nearest(0b0000, max_distance=2, size=(853, 480)) == ("wide", 0)
+    assert index.nearest(0b0000, max_distance=2, size=(300, 300)) == ("square", 1)
+    assert index.nearest(0b0000, max_distance=2, size=(1280, 960)) is None
+
+
+def test_thumbnails_tell_same_layout_charts_apart():
+    """Re-encoded copies match; a chart one candle shorter does not."""
+    chart = make_themed_chart(0)
+    thumbnail = chart_thumbnail(chart)
+    shorter = make_themed_chart(0, candles=79)
+
+    assert bin(perceptual_hash(chart) ^ perceptual_hash(shorter)).count("1") <= 4
+    copy = Image.open(BytesIO(encode(chart, "JPEG", quality=30)))
+    assert thumbnails_match(thumbnail, chart_thumbnail(copy))
+    assert not thumbnails_match(thumbnail, chart_thumbnail(shorter))
+    assert not thumbnails_match(thumbnail, chart_thumbnail(make_themed_chart(125)))
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_reuses_analysis(
+    image_analyzer, sample_analysis_response, mock_llm_client
+):
+    """A re-encoded copy of an analyzed chart is served from cache."""
+    mock_llm_client.analyze_image.return_value = sample_analysis_response
+    image_analyzer._phash_max_distance = 4
+    chart = make_chart(0)
+
+    original = await image_analyzer.analyze_image(
+        encode(chart), filename="course_a.png", use_structured_output=False
+    )
+    copy = await image_analyzer.analyze_image(
+        encode(chart.convert("RGB"), "JPEG", quality=70),
+        filename="course_b.jpg",
+        use_structured_output=False,
+    )
+    other = await image_analyzer.analyze_image(
+        encode(make_chart(1)), filename="other.png", use_structured_output=False
+    )
+
+    assert mock_llm_client.analyze_image.call_count == 2
+    assert copy.analysis == original.analysis
+    assert copy.filename == "course_b.jpg"
+    assert copy.format == "jpeg"
+    assert copy.image_id != original.image_id
+    assert other.image_id != original.image_id
+
+    stats = image_analyzer.cache_stats
+    assert (stats.exact_hits, stats.near_hits, stats.misses) == (0, 1, 2)
+    assert stats.hit_rate == pytest.approx(1 / 3)
+
+
+@pytest.mark.asyncio
+async def test_rescaled_copy_reuses_analysis(
+    image_analyzer, sample_analysis_response, mock_llm_client
+):
+    """A downscaled copy matches; a cropped copy is analyzed again."""
+    mock_llm_client.analyze_image.return_value = sample_analysis_response
+    image_analyzer._phash_max_distance = 4
+    chart = make_themed_chart(0)
+
+    original = await image_analyzer.analyze_image(encode(chart), use_structured_output=False)
+    smaller = await image_analyzer.analyze_image(
+        encode(chart.resize((853, 480)), "JPEG"), use_structured_output=False
+    )
+    assert mock_llm_client.analyze_image.call_count == 1
+    assert smaller.analysis == original.analysis
+    assert (smaller.width, smaller.height) == (853, 480)
+
+    await image_analyzer.analyze_image(
+        encode(chart.crop((0, 0, 1250, 700))), use_structured_output=False
+    )
+    assert mock_llm_client.analyze_image.call_count == 2
+    assert image_analyzer.cache_stats.near_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_same_layout_charts_are_not_near_duplicates(
+    mock_llm_client, sample_analysis_response, tmp_path
+):
+    """Different charts on the same theme get their own analyses."""
+    mock_llm_client.analyze_image.return_value = sample_analysis_response
+    analyzer = ImageAnalyzer(
+        llm_client=mock_llm_client, cache_dir=tmp_path / "cache", phash_max_distance=10
+    )
+
+    # Seed 125 is 10 bits from seed 0; one candle fewer is 2 bits away
+    for chart in [make_themed_chart(0), make_themed_chart(125), make_themed_chart(0, candles=79)]:
+        await analyzer.analyze_image(encode(chart), use_structured_output=False)
+
+    assert mock_llm_client.analyze_image.call_count == 3
+    assert analyzer.cache_stats.near_hits == 0
+
+
+def test_near_duplicate_lookup_off_by_default(image_analyzer):
+    """Only exact matches are reused unless near-duplicate lookup is enabled."""
+    assert image_analyzer._phash_max_distance is None
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_lookup_disabled(
+    mock_llm_client, sample_analysis_response, tmp_path
+):
+    """phash_max_distance=None only reuses exact matches."""
+    mock_llm_client.analyze_image.return_value = sample_analysis_response
+    analyzer = ImageAnalyzer(
+        llm_client=mock_llm_client, cache_dir=tmp_path / "cache", phash_max_distance=None
+    )
+    chart = make_chart(0)
+
+    await analyzer.analyze_image(encode(chart), use_structured_output=False)
+    await analyzer.analyze_image(encode(chart, "JPEG"), use_structured_output=False)
+
+    assert mock_llm_client.analyze_image.call_count == 2
+    assert analyzer.cache_stats.near_hits == 0
+
+
+@pytest.mark.asyncio
+async def test_phash_index_persists_and_follows_cleanup(
+    image_analyzer, sample_analysis_response, mock_llm_client
+):
+    """A new analyzer finds earlier analyses; cleaned-up ones stop matching."""
+    import os
+    import time
+
+    mock_llm_client.analyze_image.return_value = sample_analysis_response
+    image_analyzer._phash_max_distance = 4
+    chart = make_chart(0)
+    original = await image_analyzer.analyze_image(encode(chart), use_structured_output=False)
+
+    reopened = ImageAnalyzer(
+        llm_client=mock_llm_client, cache_dir=image_analyzer._cache_dir, phash_max_distance=4
+    )
+    await reopened.analyze_image(encode(chart, "JPEG"), use_structured_output=False)
+    assert reopened.cache_stats.near_hits == 1
+    assert mock_llm_client.analyze_image.call_count == 1
+
+    old_time = time.time() - 8 * 86400
+    os.utime(image_analyzer._cache_dir / f"{original.image_id}.json", (old_time, old_time))
+    assert await reopened.cleanup_cache(max_age_days=7) == 1
+    assert not (image_analyzer._cache_dir / f"{original.image_id}.thumb").exists()
+    assert len(ImageAnalyzer(cache_dir=image_analyzer._cache_dir)._phash_index) == 0
+
+
 # ============================================================================
 # Utility Tests
 # ============================================================================
@@ -0,0 +1,239 @@
+"""Tests for per-client send queues behind the position stream."""
+
+import asyncio
+import json
+import time
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+
+from hl_bot.api import json_encoding
+from hl_bot.api.send_queue import ClientSendQueue, SlowConsumerPolicy
+
+
+class FakeWebSocket:
+    """Records sent text; `delay` simulates a slow network, `stall` a stuck one."""
+
+    def __init__(self, delay: float = 0.0, stall: bool = False, fail: bool = False):
+        self.delay = delay
+        self.stall = stall
+        self.fail = fail
+        self.sent: list[dict] = []
+        self.closed_with: int | None = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        if self.fail:
+            raise ConnectionResetError("connection reset")
+        if self.stall:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed_with = code
+
+
+async def wait_until(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.005)
+
+
+def price_update(symbol: str, price: int) -> dict:
+    return {"type": "position_update", "event_type": "price_update", "symbol": symbol, "price": price}
+
+
+def fill(symbol: str, price: int) -> dict:
+    return {"type": "position_update", "event_type": "fill", "symbol": symbol, "price": price}
+
+
+class TestClientSendQueue:
+    """Slow-consumer policies of the send queue."""
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        queue = ClientSendQueue(send, max_size=3, policy=SlowConsumerPolicy.DROP_OLDEST)
+        for i in range(5):
+            assert queue.put(i)  # Writer not started yet: the queue fills up
+        queue.start()
+
+        await wait_until(lambda: len(sent) == 3)
+        assert sent == [2, 3, 4]
+        assert queue.dropped == 2
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_coalesced_message_moves_behind_newer_ones(self):
+        """The latest state for a key is never delivered before an older fill."""
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        queue = ClientSendQueue(send, policy=SlowConsumerPolicy.COALESCE)
+        queue.put("btc@1", key="BTC")
+        queue.put("fill")
+        queue.put("btc@2", key="BTC")
+        queue.start()
+
+        await wait_until(lambda: len(sent) == 2)
+        assert sent == ["fill", "btc@2"]
+        assert queue.coalesced == 1
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy(self):
+        reasons = []
+
+        async def on_failure(reason):
+            reasons.append(reason)
+
+        async def send(message):
+            pass
+
+        queue = ClientSendQueue(
+            send, max_size=1, policy=SlowConsumerPolicy.DISCONNECT, on_failure=on_failure
+        )
+        assert queue.put(1)
+        assert not queue.put(2)
+
+        await wait_until(lambda: reasons == ["send queue full"])
+        assert queue.closed
+
+    @pytest.mark.asyncio
+    async def test_stalled_send_times_out(self):
+        reasons = []
+
+        async def on_failure(reason):
+            reasons.append(reason)
+
+        queue = ClientSendQueue(
+            FakeWebSocket(stall=True).send_text, send_timeout=0.05, on_failure=on_failure
+        )
+        queue.start()
+        queue.put("{}")
+
+        await wait_until(lambda: len(reasons) == 1)
+        assert "timed out" in reasons[0]
+        await queue.close()
+
+
+class TestJsonEncoding:
+    """Broadcast payload encoding."""
+
+    def test_decimal_datetime_enum_semantics(self):
+        message = {
+            "price": Decimal("50123.45"),
+            "timestamp": datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC),
+            "policy": SlowConsumerPolicy.COALESCE,
+            "by_hour": {9: 1},
+        }
+
+        assert json.loads(json_encoding.dumps(message)) == {
+            "price": "50123.45",
+            "timestamp": "2024-01-02T03:04:05+00:00",
+            "policy": "coalesce",
+            "by_hour": {"9": 1},
+        }
+
+    def test_rejects_unknown_types(self):
+        with pytest.raises(TypeError):
+            json_encoding.dumps({"value": object()})
+
+
+class TestConnectionManager:
+    """Broadcasting to position stream clients."""
+
+    @pytest.fixture
+    def manager(self):
+        from hl_bot.api.v1.positions import ConnectionManager
+
+        return ConnectionManager(queue_size=100, policy=SlowConsumerPolicy.COALESCE)
+
+    @pytest.mark.asyncio
+    async def test_broadcast_does_not_wait_for_slow_clients(self, manager):
+        fast = [FakeWebSocket() for _ in range(20)]
+        slow, stalled = FakeWebSocket(delay=0.2), FakeWebSocket(stall=True)
+        for ws in [*fast, slow, stalled]:
+            await manager.connect(ws)
+
+        start = time.perf_counter()
+        for i in range(10):
+            await manager.broadcast(fill("BTC", i))
+        assert time.perf_counter() - start < 0.05
+
+        await wait_until(lambda: all(len(ws.sent) == 10 for ws in fast))
+        assert len(slow.sent) < 10
+
+        for ws in [*fast, slow, stalled]:
+            await manager.disconnect(ws)
+        assert manager.connection_count == 0
+
+    @pytest.mark.asyncio
+    async def test_backlogged_client_gets_latest_price_per_symbol(self, manager):
+        ws = FakeWebSocket(delay=0.05)
+        await manager.connect(ws)
+        manager.send(ws, {"type": "initial_state"})
+
+        for i in range(20):
+            await manager.broadcast(price_update("BTC", i))
+            await manager.broadcast(price_update("ETH", i))
+        await manager.broadcast(fill("BTC", 100))
+
+        # The fill was queued last, behind the coalesced price updates
+        await wait_until(lambda: ws.sent and ws.sent[-1].get("event_type") == "fill")
+
+        assert ws.sent[0] == {"type": "initial_state"}
+        assert len(ws.sent) < 10
+        assert [m["price"] for m in ws.sent if m.get("symbol") == "ETH"][-1] == 19
+        assert [m["price"] for m in ws.sent if m.get("symbol") == "BTC"][-1] == 100
+        await manager.disconnect(ws)
+
+    @pytest.mark.asyncio
+    async def test_failed_client_is_closed_and_removed(self, manager):
+        healthy, broken = FakeWebSocket(), FakeWebSocket(fail=True)
+        await manager.connect(healthy)
+        await manager.connect(broken)
+
+        await manager.broadcast(fill("BTC", 1))
+
+        await wait_until(lambda: manager.connection_count == 1)
+        assert broken.closed_with == 1013
+        assert not manager.send(broken, {"type": "ping"})
+        assert healthy.sent == [fill("BTC", 1)]
+        await manager.disconnect(healthy)
+
+    @pytest.mark.asyncio
+    async def test_broadcast_encodes_once(self, manager, monkeypatch):
+        from hl_bot.api.v1 import positions
+
+        calls = []
+
+        def counting_dumps(message):
+            calls.append(message)
+            return json_encoding.dumps(message)
+
+        monkeypatch.setattr(positions, "dumps", counting_dumps)
+        clients = [FakeWebSocket() for _ in range(20)]
+        for ws in clients:
+            await manager.connect(ws)
+
+        await manager.broadcast(fill("ETH", 7))
+
+        await wait_until(lambda: all(ws.sent for ws in clients))
+        assert len(calls) == 1
+        assert all(ws.sent == [fill("ETH", 7)] for ws in clients)
+        for ws in clients:
+            await manager.disconnect(ws)
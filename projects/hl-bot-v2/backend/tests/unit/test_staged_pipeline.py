@@ -0,0 +1,122 @@
+"""Tests for the bounded-queue staged pipeline."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from hl_bot.services.ingestion import YouTubeProcessor
+from hl_bot.services.ingestion.staged_pipeline import PipelineStage, StagedPipeline
+
+
+class TestStagedPipeline:
+    """Test staged pipeline execution."""
+
+    @pytest.mark.asyncio
+    async def test_results_preserve_input_order(self) -> None:
+        """Outputs come back in input order even when stages finish out of order."""
+
+        async def slow_for_small(x: int) -> int:
+            await asyncio.sleep(0.01 * (5 - x))
+            return x * 2
+
+        async def add_one(x: int) -> int:
+            return x + 1
+
+        pipeline = StagedPipeline(
+            [
+                PipelineStage("double", slow_for_small, workers=3, queue_size=2),
+                PipelineStage("inc", add_one, workers=2, queue_size=1),
+            ]
+        )
+
+        results = await pipeline.run(range(5))
+
+        assert results == [1, 3, 5, 7, 9]
+        assert pipeline.stats["double"].completed == 5
+        assert pipeline.stats["inc"].completed == 5
+
+    @pytest.mark.asyncio
+    async def test_failed_item_skips_later_stages(self) -> None:
+        """A failing item is reported as its exception and not passed on."""
+        seen: list[int] = []
+
+        async def fail_on_two(x: int) -> int:
+            if x == 2:
+                raise ValueError("boom")
+            return x
+
+        async def record(x: int) -> int:
+            seen.append(x)
+            return x
+
+        pipeline = StagedPipeline(
+            [PipelineStage("check", fail_on_two), PipelineStage("record", record)]
+        )
+
+        results = await pipeline.run([1, 2, 3])
+
+        assert results[0] == 1 and results[2] == 3
+        assert isinstance(results[1], ValueError)
+        assert sorted(seen) == [1, 3]
+        assert pipeline.stats["check"].failed == 1
+        assert pipeline.stats["record"].processed == 2
+
+    @pytest.mark.asyncio
+    async def test_stages_overlap(self) -> None:
+        """Concurrent workers keep more than one item in flight."""
+        in_flight = 0
+        peak = 0
+
+        async def tracked(x: int) -> int:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return x
+
+        pipeline = StagedPipeline(
+            [PipelineStage("a", tracked, workers=2), PipelineStage("b", tracked, workers=2)]
+        )
+        await pipeline.run(range(8))
+
+        assert peak >= 3
+        assert pipeline.stats["a"].throughput > 0
+
+    def test_rejects_empty_pipeline(self) -> None:
+        with pytest.raises(ValueError):
+            StagedPipeline([])
+
+
+class TestYouTubePlaylistPipeline:
+    """Test YouTubeProcessor.process_url over the staged pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_playlist_runs_all_stages(self, tmp_path: Path) -> None:
+        processor = YouTubeProcessor(cache_dir=tmp_path / "cache", download_concurrency=2)
+
+        async def fake_metadata(video_id: str) -> dict:
+            return {"title": f"Video {video_id}", "duration": 120 if video_id != "bad" else 99999}
+
+        async def fake_transcript(video_id: str, work_dir: Path, prefer: bool) -> str:
+            return f"transcript {video_id}"
+
+        async def fake_frames(video_id: str, work_dir: Path, duration: int) -> list[Path]:
+            return [work_dir / "frame_0000.jpg"]
+
+        async def analyzer(video):
+            return {"strategies": [video.video_id]}
+
+        with patch.object(processor, "_extract_video_ids", return_value=["v1", "bad", "v2"]), \
+             patch.object(processor, "_get_metadata", side_effect=fake_metadata), \
+             patch.object(processor, "_get_transcript", side_effect=fake_transcript), \
+             patch.object(processor, "_extract_frames", side_effect=fake_frames):
+            videos = await processor.process_url("https://youtube.com/playlist?list=x", analyzer=analyzer)
+
+        assert [v.video_id for v in videos] == ["v1", "v2"]
+        assert videos[0].transcript == "transcript v1"
+        assert videos[1].analysis == {"strategies": ["v2"]}
+        assert processor.last_pipeline_stats["metadata"].failed == 1
+        assert processor.last_pipeline_stats["analysis"].completed == 2
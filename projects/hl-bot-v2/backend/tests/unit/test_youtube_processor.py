@@ -118,11 +118,18 @@ Multiple   spaces.
     @pytest.mark.asyncio
     async def test_video_too_long_rejected(self, processor: YouTubeProcessor) -> None:
         """Test that videos exceeding max duration are rejected."""
-        with patch.object(processor, "_get_metadata") as mock_metadata:
+        with pytest.raises(YouTubeError, match="Video too long"):
+            processor._check_duration(10000)
+
+        with patch.object(processor, "_extract_video_ids", return_value=["test_id"]), \
+             patch.object(processor, "_get_metadata") as mock_metadata, \
+             patch.object(processor, "_get_transcript") as mock_transcript:
             mock_metadata.return_value = {"duration": 10000, "title": "Long Video"}
 
-            with pytest.raises(YouTubeError, match="Video too long"):
-                await processor._process_single_video("test_id", False, True)
+            with pytest.raises(YouTubeError, match="No videos were successfully processed"):
+                await processor.process_url("https://www.youtube.com/watch?v=test_id")
+
+            mock_transcript.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_process_url_error_handling(self, processor: YouTubeProcessor) -> None:
@@ -0,0 +1,152 @@
+"""Add strategy_performance_daily rollup table
+
+Revision ID: 20261018_0900
+Revises: 20260210_1251
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0900'
+down_revision: Union[str, None] = '20260210_1251'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the daily performance rollup table and backfill it."""
+    op.create_table(
+        'strategy_performance_daily',
+        sa.Column('scope', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('total_trades', sa.Integer(), nullable=False),
+        sa.Column('winning_trades', sa.Integer(), nullable=False),
+        sa.Column('losing_trades', sa.Integer(), nullable=False),
+        sa.Column('total_pnl_r', sa.Float(), nullable=False),
+        sa.Column('gross_profit_r', sa.Float(), nullable=False),
+        sa.Column('gross_loss_r', sa.Float(), nullable=False),
+        sa.Column('leading_losses', sa.Integer(), nullable=False),
+        sa.Column('trailing_losses', sa.Integer(), nullable=False),
+        sa.Column('max_consecutive_losses', sa.Integer(), nullable=False),
+        sa.Column('drawdown_profile', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('scope', 'day'),
+        sa.CheckConstraint('total_trades >= 0', name='check_daily_total_trades_positive'),
+    )
+
+    _backfill()
+
+
+# Tables as of this revision; the backfill must not depend on the live models
+trade_records = sa.table(
+    'trade_records',
+    sa.column('id', sa.String()),
+    sa.column('strategy_rule_id', sa.String()),
+    sa.column('entry_time', sa.DateTime()),
+    sa.column('exit_time', sa.DateTime()),
+    sa.column('outcome', sa.String()),
+    sa.column('pnl_r', sa.Float()),
+)
+
+strategy_performance_daily = sa.table(
+    'strategy_performance_daily',
+    sa.column('scope', sa.String()),
+    sa.column('day', sa.Date()),
+    sa.column('total_trades', sa.Integer()),
+    sa.column('winning_trades', sa.Integer()),
+    sa.column('losing_trades', sa.Integer()),
+    sa.column('total_pnl_r', sa.Float()),
+    sa.column('gross_profit_r', sa.Float()),
+    sa.column('gross_loss_r', sa.Float()),
+    sa.column('leading_losses', sa.Integer()),
+    sa.column('trailing_losses', sa.Integer()),
+    sa.column('max_consecutive_losses', sa.Integer()),
+    sa.column('drawdown_profile', sa.JSON()),
+    sa.column('created_at', sa.DateTime()),
+    sa.column('updated_at', sa.DateTime()),
+)
+
+
+def _summarize(trades) -> dict:
+    """Reduce one day's closed trades, in entry order, to a rollup row."""
+    row = {
+        'total_trades': 0, 'winning_trades': 0, 'losing_trades': 0,
+        'total_pnl_r': 0.0, 'gross_profit_r': 0.0, 'gross_loss_r': 0.0,
+        'leading_losses': 0, 'trailing_losses': 0, 'max_consecutive_losses': 0,
+    }
+    run = 0
+    leading = True
+    equity = peak = 0.0
+    profile = [[0.0, 0.0]]
+
+    for outcome, pnl_r in trades:
+        row['total_trades'] += 1
+        if outcome == 'loss':
+            row['losing_trades'] += 1
+            run += 1
+            row['max_consecutive_losses'] = max(row['max_consecutive_losses'], run)
+            if leading:
+                row['leading_losses'] += 1
+            if pnl_r and pnl_r < 0:
+                row['gross_loss_r'] += pnl_r
+        else:
+            run = 0
+            leading = False
+            if outcome == 'win':
+                row['winning_trades'] += 1
+                if pnl_r and pnl_r > 0:
+                    row['gross_profit_r'] += pnl_r
+
+        if pnl_r is not None:
+            row['total_pnl_r'] += pnl_r
+            equity += pnl_r
+            if equity > peak:
+                peak = equity
+                profile.append([equity, equity])
+            elif equity < profile[-1][1]:
+                profile[-1][1] = equity
+
+    row['trailing_losses'] = run
+    row['gross_loss_r'] = abs(row['gross_loss_r'])
+    row['drawdown_profile'] = profile
+    return row
+
+
+def _backfill() -> None:
+    """Roll up existing closed trades per strategy and for all strategies ('*')."""
+    trades = op.get_bind().execute(
+        sa.select(
+            trade_records.c.strategy_rule_id, trade_records.c.entry_time,
+            trade_records.c.outcome, trade_records.c.pnl_r,
+        ).where(
+            trade_records.c.exit_time.isnot(None)
+        ).order_by(trade_records.c.entry_time, trade_records.c.id)
+    )
+
+    groups = {}
+    for strategy_rule_id, entry_time, outcome, pnl_r in trades:
+        day = entry_time.date()
+        for scope in (strategy_rule_id, '*'):
+            groups.setdefault((scope, day), []).append((outcome, pnl_r))
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            'scope': scope, 'day': day, 'created_at': now, 'updated_at': now,
+            **_summarize(day_trades),
+        }
+        for (scope, day), day_trades in groups.items()
+    ]
+    if rows:
+        op.bulk_insert(strategy_performance_daily, rows)
+
+
+def downgrade() -> None:
+    """Drop the daily performance rollup table."""
+    op.drop_table('strategy_performance_daily')
@@ -0,0 +1,55 @@
+"""Add strategy_learning_state table and a trade close watermark column
+
+Revision ID: 20261018_1000
+Revises: 20261018_0900
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_1000'
+down_revision: Union[str, None] = '20261018_0900'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the per-strategy learning state table and the close watermark column."""
+    op.create_table(
+        'strategy_learning_state',
+        sa.Column('strategy_rule_id', sa.String(), nullable=False),
+        sa.Column('closed_through', sa.DateTime(), nullable=True),
+        sa.Column('total_trades', sa.Integer(), nullable=False),
+        sa.Column('winning_trades', sa.Integer(), nullable=False),
+        sa.Column('losing_trades', sa.Integer(), nullable=False),
+        sa.Column('breakeven_trades', sa.Integer(), nullable=False),
+        sa.Column('r_trades', sa.Integer(), nullable=False),
+        sa.Column('total_pnl_r', sa.Float(), nullable=False),
+        sa.Column('total_profit_usd', sa.Float(), nullable=False),
+        sa.Column('total_loss_usd', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['strategy_rule_id'], ['strategy_rules.id']),
+        sa.PrimaryKeyConstraint('strategy_rule_id'),
+        sa.CheckConstraint('total_trades >= 0', name='check_learning_state_trades_positive'),
+    )
+    op.add_column('trade_records', sa.Column('close_recorded_at', sa.DateTime(), nullable=True))
+    # Existing closes were last recorded no later than their last write
+    op.execute(
+        "UPDATE trade_records SET close_recorded_at = updated_at WHERE exit_time IS NOT NULL"
+    )
+    op.create_index(
+        'idx_trade_strategy_close_recorded', 'trade_records',
+        ['strategy_rule_id', 'close_recorded_at']
+    )
+
+
+def downgrade() -> None:
+    """Drop the learning state table and the close watermark column."""
+    op.drop_index('idx_trade_strategy_close_recorded', table_name='trade_records')
+    op.drop_column('trade_records', 'close_recorded_at')
+    op.drop_table('strategy_learning_state')
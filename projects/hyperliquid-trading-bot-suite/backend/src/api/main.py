@@ -16,6 +16,7 @@ from ..config import settings
 from .routes import health, ingestion, strategies, backtesting, trades, websocket
 from .routes import auth
 from .security.rate_limiter import RateLimitMiddleware, get_rate_limiter
+from ..knowledge.cache import close_async_cache_manager
 
 # Configure structured logging
 structlog.configure(
@@ -113,6 +114,12 @@ async def lifespan(app: FastAPI):
     except Exception:
         pass
     
+    # Cleanup async cache (pub/sub listener and connection pool)
+    try:
+        await close_async_cache_manager()
+    except Exception:
+        pass
+    
     # Cleanup resources
     # await cleanup_db()
     # await cleanup_redis()
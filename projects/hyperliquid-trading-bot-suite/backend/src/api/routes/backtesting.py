@@ -6,6 +6,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
 from pathlib import Path
 
+import numpy as np
 from fastapi import APIRouter, HTTPException, Query, UploadFile, File, BackgroundTasks, Depends
 from pydantic import BaseModel, Field, validator
 from sqlalchemy.orm import Session
@@ -13,16 +14,14 @@ import structlog
 
 from ...database import get_db
 from ...database.models import StrategyRuleDB
+from ...backtest.downsampling import DOWNSAMPLERS, downsample
+from ...backtest.result_store import HEARTBEAT_TIMEOUT, get_result_store
 from ...config import settings
 
 router = APIRouter()
 logger = structlog.get_logger()
 
 
-# In-memory backtest storage (replace with database in production)
-_backtest_tasks = {}
-
-
 class BacktestConfig(BaseModel):
     """Configuration for a backtest run."""
     name: str = Field(..., min_length=1, max_length=200)
@@ -106,16 +105,66 @@ class EquityPoint(BaseModel):
     drawdown_pct: float
 
 
+def _parse_timestamp(value: str) -> float:
+    """ISO 8601 string to epoch seconds (naive times are UTC, as stored)."""
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _get_backtest_or_404(backtest_id: str) -> Dict[str, Any]:
+    """Load a backtest's metadata or raise 404."""
+    try:
+        backtest_data = get_result_store().get(backtest_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid backtest ID format")
+    
+    if not backtest_data:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Backtest '{backtest_id}' not found"
+        )
+    
+    return backtest_data
+
+
+def _get_completed_backtest_or_400(backtest_id: str) -> Dict[str, Any]:
+    """Load a completed backtest's metadata or raise 404/400."""
+    backtest_data = _get_backtest_or_404(backtest_id)
+    
+    if backtest_data['status'] != 'completed':
+        raise HTTPException(
+            status_code=400,
+            detail=f"Backtest is {backtest_data['status']}, not completed"
+        )
+    
+    return backtest_data
+
+
+async def _heartbeat(backtest_id: str):
+    """Mark a backtest as still owned by this worker until cancelled."""
+    store = get_result_store()
+    while True:
+        await asyncio.sleep(HEARTBEAT_TIMEOUT / 4)
+        await asyncio.to_thread(store.heartbeat, backtest_id)
+
+
 async def _run_backtest_task(backtest_id: str, config: BacktestConfig, db: Session):
     """Background task for running backtest."""
+    heartbeat = asyncio.create_task(_heartbeat(backtest_id))
     try:
         # Lazy import to avoid loading dependencies on startup
         from ...backtest.backtest_engine import BacktestEngine
         from ...backtest.data_loader import DataLoader
         
-        _backtest_tasks[backtest_id]['status'] = 'running'
-        _backtest_tasks[backtest_id]['started_at'] = datetime.now(timezone.utc).isoformat()
-        _backtest_tasks[backtest_id]['progress'] = 0.1
+        store = get_result_store()
+        store.update(
+            backtest_id,
+            status='running',
+            started_at=datetime.now(timezone.utc).isoformat(),
+            progress=0.1
+        )
         
         # Validate strategies exist
         strategies = []
@@ -129,7 +178,7 @@ async def _run_backtest_task(backtest_id: str, config: BacktestConfig, db: Sessi
             
             strategies.append(strategy)
         
-        _backtest_tasks[backtest_id]['progress'] = 0.2
+        store.update(backtest_id, progress=0.2)
         
         # Initialize data loader
         data_loader = DataLoader()
@@ -150,7 +199,7 @@ async def _run_backtest_task(backtest_id: str, config: BacktestConfig, db: Sessi
             end_date=config.end_date
         )
         
-        _backtest_tasks[backtest_id]['progress'] = 0.4
+        store.update(backtest_id, progress=0.4)
         
         # Initialize backtest engine
         engine = BacktestEngine(
@@ -163,32 +212,36 @@ async def _run_backtest_task(backtest_id: str, config: BacktestConfig, db: Sessi
         for strategy in strategies:
             engine.add_strategy(strategy)
         
-        _backtest_tasks[backtest_id]['progress'] = 0.5
+        store.update(backtest_id, progress=0.5)
         
         # Run backtest
         logger.info("Running backtest", backtest_id=backtest_id)
         
         results = await engine.run(market_data)
         
-        _backtest_tasks[backtest_id]['progress'] = 0.9
+        store.update(backtest_id, progress=0.9)
         
-        # Store results
-        _backtest_tasks[backtest_id]['total_trades'] = results.total_trades
-        _backtest_tasks[backtest_id]['winning_trades'] = results.winning_trades
-        _backtest_tasks[backtest_id]['win_rate'] = results.win_rate
-        _backtest_tasks[backtest_id]['profit_factor'] = results.profit_factor
-        _backtest_tasks[backtest_id]['total_return'] = results.total_return
-        _backtest_tasks[backtest_id]['total_return_pct'] = results.total_return_pct
-        _backtest_tasks[backtest_id]['max_drawdown'] = results.max_drawdown
-        _backtest_tasks[backtest_id]['max_drawdown_pct'] = results.max_drawdown_pct
-        _backtest_tasks[backtest_id]['sharpe_ratio'] = results.sharpe_ratio
-        _backtest_tasks[backtest_id]['avg_r_multiple'] = results.avg_r_multiple
-        _backtest_tasks[backtest_id]['trades'] = results.trades
-        _backtest_tasks[backtest_id]['equity_curve'] = results.equity_curve
+        # Store results: series go to disk, not into the API process
+        await asyncio.to_thread(
+            store.save_results, backtest_id, results.trades, results.equity_curve
+        )
         
-        _backtest_tasks[backtest_id]['status'] = 'completed'
-        _backtest_tasks[backtest_id]['progress'] = 1.0
-        _backtest_tasks[backtest_id]['completed_at'] = datetime.now(timezone.utc).isoformat()
+        store.update(
+            backtest_id,
+            total_trades=results.total_trades,
+            winning_trades=results.winning_trades,
+            win_rate=results.win_rate,
+            profit_factor=results.profit_factor,
+            total_return=results.total_return,
+            total_return_pct=results.total_return_pct,
+            max_drawdown=results.max_drawdown,
+            max_drawdown_pct=results.max_drawdown_pct,
+            sharpe_ratio=results.sharpe_ratio,
+            avg_r_multiple=results.avg_r_multiple,
+            status='completed',
+            progress=1.0,
+            completed_at=datetime.now(timezone.utc).isoformat()
+        )
         
         logger.info(
             "Backtest completed",
@@ -199,8 +252,11 @@ async def _run_backtest_task(backtest_id: str, config: BacktestConfig, db: Sessi
         
     except Exception as e:
         logger.error("Backtest failed", backtest_id=backtest_id, error=str(e))
-        _backtest_tasks[backtest_id]['status'] = 'failed'
-        _backtest_tasks[backtest_id]['error'] = str(e)
+        store = get_result_store()
+        if backtest_id in store:  # Not deleted while running
+            store.update(backtest_id, status='failed', error=str(e))
+    finally:
+        heartbeat.cancel()
 
 
 @router.post("/start", summary="Start new backtest", status_code=202)
@@ -250,8 +306,7 @@ async def start_backtest(
     backtest_id = f"bt_{uuid.uuid4().hex[:12]}"
     
     # Initialize task tracking
-    _backtest_tasks[backtest_id] = {
-        'backtest_id': backtest_id,
+    get_result_store().create(backtest_id, {
         'name': config.name,
         'status': 'pending',
         'progress': 0.0,
@@ -269,10 +324,8 @@ async def start_backtest(
         'created_at': datetime.now(timezone.utc).isoformat(),
         'started_at': None,
         'completed_at': None,
-        'error': None,
-        'trades': [],
-        'equity_curve': []
-    }
+        'error': None
+    })
     
     # Queue background task
     background_tasks.add_task(_run_backtest_task, backtest_id, config, db)
@@ -378,26 +431,10 @@ async def list_backtests(
             detail="Invalid status. Must be one of: pending, running, completed, failed"
         )
     
-    # Filter backtests
-    backtests = list(_backtest_tasks.values())
-    
-    if status:
-        backtests = [b for b in backtests if b['status'] == status]
-    
-    # Sort by creation time (newest first)
-    backtests.sort(key=lambda b: b['created_at'], reverse=True)
-    
-    # Count total
-    total = len(backtests)
+    # Filter, sort by creation time (newest first) and paginate
+    total, backtests = get_result_store().list(status=status, limit=limit, offset=offset)
     
-    # Apply pagination
-    backtests = backtests[offset:offset + limit]
-    
-    # Serialize (exclude detailed results from list)
-    results = []
-    for bt in backtests:
-        result = {k: v for k, v in bt.items() if k not in ['trades', 'equity_curve']}
-        results.append(BacktestResult(**result))
+    results = [BacktestResult(**bt) for bt in backtests]
     
     logger.info("Backtest list requested", count=len(results), total=total)
     
@@ -419,20 +456,11 @@ async def get_backtest(backtest_id: str) -> BacktestResult:
     if not backtest_id.startswith('bt_'):
         raise HTTPException(status_code=400, detail="Invalid backtest ID format")
     
-    backtest_data = _backtest_tasks.get(backtest_id)
-    
-    if not backtest_data:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Backtest '{backtest_id}' not found"
-        )
-    
-    # Serialize (exclude trades and equity curve from summary)
-    result_data = {k: v for k, v in backtest_data.items() if k not in ['trades', 'equity_curve']}
+    backtest_data = _get_backtest_or_404(backtest_id)
     
     logger.info("Backtest details requested", backtest_id=backtest_id)
     
-    return BacktestResult(**result_data)
+    return BacktestResult(**backtest_data)
 
 
 @router.get("/{backtest_id}/trades", summary="Get backtest trades")
@@ -446,26 +474,12 @@ async def get_backtest_trades(
     if not backtest_id.startswith('bt_'):
         raise HTTPException(status_code=400, detail="Invalid backtest ID format")
     
-    backtest_data = _backtest_tasks.get(backtest_id)
+    _get_completed_backtest_or_400(backtest_id)
     
-    if not backtest_data:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Backtest '{backtest_id}' not found"
-        )
-    
-    if backtest_data['status'] != 'completed':
-        raise HTTPException(
-            status_code=400,
-            detail=f"Backtest is {backtest_data['status']}, not completed"
-        )
-    
-    # Get trades
-    all_trades = backtest_data.get('trades', [])
-    total = len(all_trades)
-    
-    # Apply pagination
-    trades = all_trades[offset:offset + limit]
+    # Read only the requested page from disk
+    store = get_result_store()
+    total = store.trade_count(backtest_id)
+    trades = store.get_trades(backtest_id, offset=offset, limit=limit)
     
     logger.info(
         "Backtest trades requested",
@@ -486,34 +500,72 @@ async def get_backtest_trades(
 
 
 @router.get("/{backtest_id}/equity-curve", summary="Get equity curve data")
-async def get_equity_curve(backtest_id: str) -> Dict[str, Any]:
-    """Get equity curve data for plotting."""
+async def get_equity_curve(
+    backtest_id: str,
+    start: Optional[str] = Query(None, description="Window start (ISO 8601)"),
+    end: Optional[str] = Query(None, description="Window end (ISO 8601)"),
+    points: Optional[int] = Query(
+        None, ge=4, le=20000,
+        description="Target number of points, e.g. the chart width in pixels (default: all)"
+    ),
+    method: str = Query("lttb", description="Downsampling method: lttb or minmax")
+) -> Dict[str, Any]:
+    """
+    Get equity curve data for plotting.
+    
+    The curve can be limited to a time window and downsampled server-side,
+    so the payload scales with the chart size rather than the backtest length:
+    - `lttb` (largest-triangle-three-buckets) keeps the visual shape
+    - `minmax` keeps each bucket's lowest and highest equity (drawdowns stay visible)
+    """
     # Validate backtest ID format
     if not backtest_id.startswith('bt_'):
         raise HTTPException(status_code=400, detail="Invalid backtest ID format")
     
-    backtest_data = _backtest_tasks.get(backtest_id)
-    
-    if not backtest_data:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Backtest '{backtest_id}' not found"
-        )
-    
-    if backtest_data['status'] != 'completed':
+    if method not in DOWNSAMPLERS:
         raise HTTPException(
             status_code=400,
-            detail=f"Backtest is {backtest_data['status']}, not completed"
+            detail=f"Invalid method. Must be one of: {', '.join(DOWNSAMPLERS)}"
         )
     
-    equity_curve = backtest_data.get('equity_curve', [])
+    try:
+        window = [_parse_timestamp(t) if t else None for t in (start, end)]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use ISO 8601")
+    
+    backtest_data = _get_completed_backtest_or_400(backtest_id)
+    store = get_result_store()
+    total = store.equity_length(backtest_id)
+    
+    if window == [None, None] and points is None:
+        equity_curve = store.get_equity_curve(backtest_id)
+        lo, hi = 0, total
+    else:
+        # Window and sample on the memory-mapped columns; only the kept points are decoded
+        columns = store.get_equity_columns(backtest_id)
+        timestamps = columns.get('timestamp', np.arange(total, dtype=np.float64))
+        lo = 0 if window[0] is None else int(np.searchsorted(timestamps, window[0], side='left'))
+        hi = total if window[1] is None else int(np.searchsorted(timestamps, window[1], side='right'))
+        hi = max(hi, lo)
+        
+        equity = columns.get('equity', np.zeros(total))
+        indices = downsample(timestamps[lo:hi], equity[lo:hi], points, method) + lo
+        equity_curve = store.get_equity_curve(backtest_id, indices=indices)
     
-    logger.info("Equity curve requested", backtest_id=backtest_id, points=len(equity_curve))
+    logger.info(
+        "Equity curve requested",
+        backtest_id=backtest_id,
+        points=len(equity_curve),
+        window_points=hi - lo
+    )
     
     return {
         "backtest_id": backtest_id,
         "equity_curve": equity_curve,
-        "initial_capital": backtest_data['config']['initial_capital']
+        "initial_capital": backtest_data['config']['initial_capital'],
+        "total_points": total,
+        "window_points": hi - lo,
+        "downsampled": len(equity_curve) < hi - lo
     }
 
 
@@ -524,15 +576,13 @@ async def delete_backtest(backtest_id: str) -> Dict[str, Any]:
     if not backtest_id.startswith('bt_'):
         raise HTTPException(status_code=400, detail="Invalid backtest ID format")
     
-    if backtest_id not in _backtest_tasks:
+    # Remove backtest and its stored results
+    if not get_result_store().delete(backtest_id):
         raise HTTPException(
             status_code=404,
             detail=f"Backtest '{backtest_id}' not found"
         )
     
-    # Remove backtest
-    del _backtest_tasks[backtest_id]
-    
     logger.info("Backtest deleted", backtest_id=backtest_id)
     
     return {"message": "Backtest deleted successfully", "backtest_id": backtest_id}
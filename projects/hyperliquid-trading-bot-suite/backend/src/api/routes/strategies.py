@@ -10,6 +10,7 @@ import structlog
 
 from ...database import get_db
 from ...database.models import StrategyRuleDB, TradeRecordDB
+from ...knowledge.cache import CacheKeys, CacheTTL, get_async_cache_manager
 from ...types import SourceType, EntryType
 
 router = APIRouter()
@@ -235,6 +236,12 @@ async def get_strategy(
 ) -> StrategyRule:
     """Get detailed information about a specific strategy."""
     try:
+        cache = await get_async_cache_manager()
+        cache_key = CacheKeys.strategy_detail(strategy_id)
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return StrategyRule(**cached)
+        
         strategy_db = db.query(StrategyRuleDB).filter(
             StrategyRuleDB.id == strategy_id
         ).first()
@@ -247,7 +254,9 @@ async def get_strategy(
         
         logger.info("Strategy details requested", strategy_id=strategy_id)
         
-        return _serialize_strategy(strategy_db)
+        strategy = _serialize_strategy(strategy_db)
+        await cache.set(cache_key, strategy.dict(), CacheTTL.STRATEGY_RULE)
+        return strategy
         
     except HTTPException:
         raise
@@ -285,6 +294,7 @@ async def update_strategy(
         
         db.commit()
         db.refresh(strategy_db)
+        await (await get_async_cache_manager()).delete(CacheKeys.strategy_detail(strategy_id))
         
         logger.info("Strategy updated", strategy_id=strategy_id)
         
@@ -421,6 +431,7 @@ async def delete_strategy(
         
         db.delete(strategy_db)
         db.commit()
+        await (await get_async_cache_manager()).delete(CacheKeys.strategy_detail(strategy_id))
         
         logger.info("Strategy deleted", strategy_id=strategy_id)
         
@@ -390,5 +390,6 @@ async def get_stream_status() -> Dict[str, Any]:
             "market_data": stats["market_data"],
             "total": stats["total"]
         },
-        "streams": stats["streams"]
+        "streams": stats["streams"],
+        "send_queues": stats["send_queues"]
     }
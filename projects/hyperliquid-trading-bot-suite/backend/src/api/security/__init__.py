@@ -20,6 +20,7 @@ from .auth import (
 )
 from .rate_limiter import (
     RateLimiter,
+    RateLimitAlgorithm,
     rate_limit,
     get_rate_limiter,
 )
@@ -52,6 +53,7 @@ __all__ = [
     "LoginRequest",
     # Rate limiting
     "RateLimiter",
+    "RateLimitAlgorithm",
     "rate_limit",
     "get_rate_limiter",
     # Key vault
@@ -1,12 +1,16 @@
 """
 Redis-based rate limiter implementation.
 
-Provides sliding window rate limiting for API endpoints.
+Provides rate limiting for API endpoints. By default each check is a single
+round trip: a Lua script applies the generic cell rate algorithm (GCRA)
+atomically on the Redis server. The original sliding-window log is kept as
+an alternative algorithm.
 """
 
+import math
 import time
 import asyncio
-from typing import Optional, Callable, Awaitable, Dict, Any
+from typing import Optional, Callable, Awaitable, Dict
 from functools import wraps
 from enum import Enum
 
@@ -46,24 +50,64 @@ class RateLimitTier(Enum):
         self.window_seconds = window_seconds
 
 
+class RateLimitAlgorithm(str, Enum):
+    """Algorithm used when Redis is available."""
+    GCRA = "gcra"  # One atomic Lua script call per check
+    SLIDING_WINDOW = "sliding_window"  # ZSET log, several commands per check
+
+
+# GCRA: the key holds the bucket's theoretical arrival time (TAT) in ms.
+# Requests are spaced `interval` ms apart on average, and up to `burst` may
+# arrive at once. Server time is used so app instances need not agree on clocks.
+#   KEYS[1] = bucket key, ARGV[1] = emission interval (ms), ARGV[2] = burst
+# Returns {allowed, remaining, ms until retry (denied) or until full reset}
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local allow_at = tat + interval - interval * burst
+if now < allow_at then
+    return {0, 0, allow_at - now}
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, math.floor((now - allow_at) / interval), new_tat - now}
+"""
+
+
 class RateLimiter:
     """
-    Redis-based sliding window rate limiter.
+    Redis-based rate limiter.
     
-    Uses a sliding window algorithm for more accurate rate limiting
-    compared to fixed windows.
+    With the default GCRA algorithm every check is one script call, so it
+    costs a single round trip and is atomic under concurrency. Without
+    Redis, the same algorithm runs in memory with O(1) work per check.
     """
     
-    def __init__(self, redis_url: Optional[str] = None):
+    # Expired in-memory buckets are swept once this many keys are tracked
+    FALLBACK_PRUNE_THRESHOLD = 10_000
+    
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        algorithm: Optional[RateLimitAlgorithm] = None
+    ):
         """
         Initialize rate limiter.
         
         Args:
             redis_url: Redis connection URL (uses settings if not provided)
+            algorithm: Redis algorithm (uses settings if not provided)
         """
         self._redis_url = redis_url or settings.redis_url
+        self.algorithm = RateLimitAlgorithm(algorithm or settings.rate_limit_algorithm)
         self._redis: Optional[redis.Redis] = None
-        self._fallback_limits: Dict[str, Dict[str, Any]] = {}  # In-memory fallback
+        self._gcra_script = None
+        # In-memory fallback: theoretical arrival time (monotonic) per key
+        self._fallback_limits: Dict[str, float] = {}
+        self._fallback_prune_at = self.FALLBACK_PRUNE_THRESHOLD
         self._enabled = True
     
     async def connect(self) -> None:
@@ -76,7 +120,9 @@ class RateLimiter:
             )
             # Test connection
             await self._redis.ping()
-            logger.info("Rate limiter connected to Redis")
+            # Runs via EVALSHA, loading the script on first use
+            self._gcra_script = self._redis.register_script(GCRA_SCRIPT)
+            logger.info("Rate limiter connected to Redis", algorithm=self.algorithm.value)
         except Exception as e:
             logger.error(f"Failed to connect to Redis for rate limiting: {e}")
             logger.warning("Rate limiter falling back to in-memory storage")
@@ -117,10 +163,31 @@ class RateLimiter:
             return True, max_requests, 0
         
         if self._redis:
+            if self.algorithm == RateLimitAlgorithm.GCRA:
+                return await self._check_redis_gcra(key, max_requests, window_seconds)
             return await self._check_redis(key, max_requests, window_seconds)
         else:
             return await self._check_memory(key, max_requests, window_seconds)
     
+    async def _check_redis_gcra(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int
+    ) -> tuple[bool, int, int]:
+        """Check rate limit with the GCRA script (one round trip)."""
+        interval_ms = max(1, round(window_seconds * 1000 / max_requests))
+        
+        # Separate key: the sliding window stores a ZSET under the plain key
+        allowed, remaining, wait_ms = await self._gcra_script(
+            keys=[f"{key}:gcra"],
+            args=[interval_ms, max_requests]
+        )
+        
+        if not allowed:
+            return False, 0, max(1, math.ceil(int(wait_ms) / 1000))
+        return True, int(remaining), math.ceil(int(wait_ms) / 1000)
+    
     async def _check_redis(
         self,
         key: str,
@@ -167,33 +234,34 @@ class RateLimiter:
         max_requests: int,
         window_seconds: int
     ) -> tuple[bool, int, int]:
-        """Check rate limit using in-memory storage (fallback)."""
-        now = time.time()
-        window_start = now - window_seconds
-        
-        if key not in self._fallback_limits:
-            self._fallback_limits[key] = {"requests": []}
-        
-        # Clean old entries
-        self._fallback_limits[key]["requests"] = [
-            ts for ts in self._fallback_limits[key]["requests"]
-            if ts > window_start
-        ]
-        
-        current_count = len(self._fallback_limits[key]["requests"])
+        """Check rate limit using in-memory GCRA (fallback)."""
+        now = time.monotonic()
+        interval = window_seconds / max_requests
         
-        if current_count >= max_requests:
-            oldest = min(self._fallback_limits[key]["requests"]) if self._fallback_limits[key]["requests"] else now
-            reset_time = int(oldest + window_seconds - now)
-            return False, 0, reset_time
+        tat = max(self._fallback_limits.get(key, now), now)
+        allow_at = tat + interval - window_seconds
         
-        # Add new request
-        self._fallback_limits[key]["requests"].append(now)
+        if now < allow_at:
+            return False, 0, max(1, math.ceil(allow_at - now))
         
-        remaining = max_requests - current_count - 1
-        reset_time = window_seconds
+        self._fallback_limits[key] = tat + interval
+        if len(self._fallback_limits) > self._fallback_prune_at:
+            self._prune_fallback(now)
         
-        return True, remaining, reset_time
+        # Small epsilon: (now - allow_at) is a whole multiple of the interval
+        # for a fresh bucket, but float rounding may land just below it
+        remaining = int((now - allow_at) / interval + 1e-9)
+        return True, remaining, math.ceil(tat + interval - now)
+    
+    def _prune_fallback(self, now: float) -> None:
+        """Drop in-memory buckets that have fully drained."""
+        self._fallback_limits = {
+            key: tat for key, tat in self._fallback_limits.items() if tat > now
+        }
+        # Sweep again only after the live set doubles: amortized O(1) per check
+        self._fallback_prune_at = max(
+            self.FALLBACK_PRUNE_THRESHOLD, 2 * len(self._fallback_limits)
+        )
     
     def get_key_for_request(
         self,
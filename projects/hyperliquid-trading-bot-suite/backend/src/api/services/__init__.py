@@ -1,6 +1,7 @@
 """API services package."""
 
 from .websocket_manager import WebSocketManager, StreamType
+from .send_queue import ClientSendQueue, SlowConsumerPolicy
 from .backtest_streaming import StreamingBacktestEngine, create_streaming_callbacks
 from .position_service import position_service
 from .trade_service import trade_service
@@ -8,6 +9,8 @@ from .trade_service import trade_service
 __all__ = [
     "WebSocketManager",
     "StreamType",
+    "ClientSendQueue",
+    "SlowConsumerPolicy",
     "StreamingBacktestEngine",
     "create_streaming_callbacks",
     "position_service",
@@ -0,0 +1,180 @@
+"""Per-connection outbound queues for WebSocket fan-out."""
+
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from collections import OrderedDict
+from enum import Enum
+import asyncio
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What to do when a client's outbound queue is full."""
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued message
+    COALESCE = "coalesce"  # Keep only the latest message per key, then drop oldest
+    DISCONNECT = "disconnect"  # Close the connection
+
+
+class ClientSendQueue:
+    """
+    Bounded outbound queue drained by a dedicated writer task.
+
+    Producers call `put`, which never waits on the network, so a broadcast
+    costs the same whether clients are fast, slow or stalled. Each writer
+    sends its own client's messages in order; a send that fails, or a
+    writer that completes no send for `send_timeout` (detected within twice
+    that), closes the queue and reports the client through `on_failure`.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Any], Awaitable[None]],
+        max_size: int = 256,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST,
+        send_timeout: float = 10.0,
+        on_failure: Optional[Callable[[str], Awaitable[None]]] = None
+    ):
+        """
+        Initialize queue.
+
+        Args:
+            send: Coroutine function delivering one message to the client
+            max_size: Maximum number of queued messages
+            policy: Slow-consumer policy applied when the queue is full
+            send_timeout: Seconds without a completed send before the client is dropped
+            on_failure: Called with a reason once the client is dropped
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self._send = send
+        self.max_size = max_size
+        self.policy = SlowConsumerPolicy(policy)
+        self.send_timeout = send_timeout
+        self._on_failure = on_failure
+
+        # Insertion-ordered; coalescable messages are stored under their key,
+        # all others under a unique token
+        self._pending: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._failure_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[asyncio.TimerHandle] = None
+        self._stalled = False
+        self._closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    @property
+    def closed(self) -> bool:
+        """Whether the queue no longer accepts messages."""
+        return self._closed
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    def put(self, message: Any, key: Optional[Hashable] = None) -> bool:
+        """
+        Queue a message without waiting.
+
+        Args:
+            message: Message to send
+            key: Coalescing key; with the COALESCE policy a queued message
+                with the same key is dropped in favour of this one
+
+        Returns:
+            False if the queue is closed (or was just closed for overflowing)
+        """
+        if self._closed:
+            return False
+
+        if key is not None and self.policy == SlowConsumerPolicy.COALESCE:
+            if key in self._pending:
+                # Latest wins and takes the newest place, after anything queued since
+                self._pending[key] = message
+                self._pending.move_to_end(key)
+                self.coalesced += 1
+                return True
+        else:
+            key = object()
+
+        if len(self._pending) >= self.max_size:
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                self._fail("send queue full")
+                return False
+            self._pending.popitem(last=False)
+            self.dropped += 1
+
+        self._pending[key] = message
+        self._wakeup.set()
+        return True
+
+    async def close(self) -> None:
+        """Stop the writer and discard queued messages."""
+        self._closed = True
+        self._pending.clear()
+        writer, self._writer = self._writer, None
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+            try:
+                await writer
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        """Writer loop: deliver queued messages in order, a batch per wakeup."""
+        while not self._closed:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # One watchdog timer per batch instead of a timeout per message
+            self._arm_watchdog()
+            try:
+                while self._pending:
+                    _, message = self._pending.popitem(last=False)
+                    await self._send(message)
+                    self.sent += 1
+            except asyncio.CancelledError:
+                if not self._stalled:
+                    raise
+                self._fail(f"send timed out after {self.send_timeout}s")
+                return
+            except Exception as e:
+                self._fail(str(e) or type(e).__name__)
+                return
+            finally:
+                if self._watchdog is not None:
+                    self._watchdog.cancel()
+
+    def _arm_watchdog(self) -> None:
+        """Check for progress once `send_timeout` has passed."""
+        self._watchdog = asyncio.get_running_loop().call_later(
+            self.send_timeout, self._check_progress, self.sent
+        )
+
+    def _check_progress(self, sent: int) -> None:
+        """Cancel the writer if no send completed since the watchdog was armed."""
+        if self._writer is None or self._closed:
+            return
+        if self.sent == sent:
+            self._stalled = True
+            self._writer.cancel()
+        else:
+            self._arm_watchdog()
+
+    def _fail(self, reason: str) -> None:
+        """Close the queue and report the client (once)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._pending.clear()
+        if self._on_failure is not None:
+            # Separate task: the handler usually closes this queue (and its writer)
+            self._failure_task = asyncio.get_running_loop().create_task(self._on_failure(reason))
@@ -9,8 +9,19 @@ import json
 from datetime import datetime
 import structlog
 
+from ...config import settings
+from .json_encoding import dumps
+from .send_queue import ClientSendQueue, SlowConsumerPolicy
+
 logger = structlog.get_logger()
 
+# Message types where only the latest state matters; with the COALESCE
+# policy a queued message of the same type is replaced by the newer one
+COALESCABLE_MESSAGE_TYPES = frozenset({"progress", "equity", "metrics", "ping"})
+
+# "Try again later": sent when a client is dropped for falling behind
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
 
 class StreamType(str, Enum):
     """Types of data streams."""
@@ -31,9 +42,31 @@ class WebSocketManager:
     - Broadcast to specific stream or all streams of a type
     - Connection health monitoring
     - Automatic cleanup on disconnect
+    - Per-connection send queues: broadcasts never wait on a slow client
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        slow_consumer_policy: Optional[SlowConsumerPolicy] = None,
+        send_timeout: Optional[float] = None
+    ):
+        """
+        Initialize manager.
+        
+        Args:
+            queue_size: Outbound messages buffered per connection
+            slow_consumer_policy: What to do when a connection's queue is full
+            send_timeout: Seconds a single send may take before the client is dropped
+            
+        Defaults come from the websocket_* settings.
+        """
+        self.queue_size = queue_size or settings.websocket_send_queue_size
+        self.slow_consumer_policy = SlowConsumerPolicy(
+            slow_consumer_policy or settings.websocket_slow_consumer_policy
+        )
+        self.send_timeout = send_timeout or settings.websocket_send_timeout
+        
         # Structure: {StreamType: {stream_id: Set[WebSocket]}}
         self._connections: Dict[StreamType, Dict[str, Set[WebSocket]]] = {
             StreamType.BACKTEST: defaultdict(set),
@@ -47,7 +80,14 @@ class WebSocketManager:
         # Connection metadata
         self._connection_metadata: Dict[WebSocket, Dict[str, Any]] = {}
         
-        logger.info("WebSocketManager initialized")
+        # Outbound queue (and writer task) per connection
+        self._queues: Dict[WebSocket, ClientSendQueue] = {}
+        
+        logger.info(
+            "WebSocketManager initialized",
+            queue_size=self.queue_size,
+            slow_consumer_policy=self.slow_consumer_policy.value
+        )
     
     async def connect(
         self,
@@ -75,6 +115,17 @@ class WebSocketManager:
         if metadata:
             self._connection_metadata[websocket] = metadata
         
+        # Start the connection's writer
+        queue = ClientSendQueue(
+            websocket.send_text,
+            max_size=self.queue_size,
+            policy=self.slow_consumer_policy,
+            send_timeout=self.send_timeout,
+            on_failure=lambda reason: self._drop_client(websocket, reason)
+        )
+        self._queues[websocket] = queue
+        queue.start()
+        
         logger.info(
             "WebSocket registered",
             stream_type=stream_type.value,
@@ -111,6 +162,11 @@ class WebSocketManager:
         # Remove metadata
         self._connection_metadata.pop(websocket, None)
         
+        # Stop the writer
+        queue = self._queues.pop(websocket, None)
+        if queue is not None:
+            await queue.close()
+        
         logger.info(
             "WebSocket unregistered",
             stream_type=stream_type.value,
@@ -127,38 +183,29 @@ class WebSocketManager:
         """
         Send a message to all connections watching a specific stream.
         
+        The message is encoded once, and the same JSON text is queued on
+        each connection and sent by its writer task, so this returns
+        without waiting on any client.
+        
         Args:
             stream_type: Type of stream
             stream_id: Stream identifier
             message: Message dictionary to send
             
         Returns:
-            Number of clients that received the message
+            Number of clients the message was queued for
         """
         if stream_id not in self._connections[stream_type]:
             return 0
         
-        connections = self._connections[stream_type][stream_id].copy()
+        payload = dumps(message)
+        key = message.get("type") if message.get("type") in COALESCABLE_MESSAGE_TYPES else None
         sent_count = 0
-        failed_sockets = []
         
-        # Broadcast to all connections
-        for websocket in connections:
-            try:
-                await websocket.send_json(message)
+        for websocket in list(self._connections[stream_type][stream_id]):
+            queue = self._queues.get(websocket)
+            if queue is not None and queue.put(payload, key):
                 sent_count += 1
-            except Exception as e:
-                logger.error(
-                    "Failed to send message",
-                    stream_type=stream_type.value,
-                    stream_id=stream_id,
-                    error=str(e)
-                )
-                failed_sockets.append(websocket)
-        
-        # Clean up failed connections
-        for websocket in failed_sockets:
-            await self.disconnect(websocket, stream_type, stream_id)
         
         return sent_count
     
@@ -356,6 +403,8 @@ class WebSocketManager:
                     "connections": len(connections)
                 })
         
+        queues = list(self._queues.values())
+        
         return {
             "backtest": sum(
                 len(conns) for conns in self._connections[StreamType.BACKTEST].values()
@@ -367,7 +416,15 @@ class WebSocketManager:
                 len(conns) for conns in self._connections[StreamType.MARKET_DATA].values()
             ),
             "total": self._count_total_connections(),
-            "streams": streams
+            "streams": streams,
+            "send_queues": {
+                "policy": self.slow_consumer_policy.value,
+                "max_size": self.queue_size,
+                "queued": sum(len(q) for q in queues),
+                "sent": sum(q.sent for q in queues),
+                "dropped": sum(q.dropped for q in queues),
+                "coalesced": sum(q.coalesced for q in queues)
+            }
         }
     
     def _count_total_connections(self) -> int:
@@ -401,23 +458,22 @@ class WebSocketManager:
         """
         Check and clean up stale connections.
         
+        Queues a ping on every connection; connections whose writer has
+        already failed (or whose queue overflows under the DISCONNECT
+        policy) are removed. Sockets that fail on the ping are dropped by
+        their writer.
+        
         Returns:
             Number of connections cleaned up
         """
         cleaned = 0
+        ping = dumps({"type": "ping", "timestamp": datetime.utcnow().isoformat()})
         
         for stream_type in StreamType:
             for stream_id in list(self._connections[stream_type].keys()):
-                connections = self._connections[stream_type][stream_id].copy()
-                
-                for websocket in connections:
-                    try:
-                        # Send ping to check if connection is alive
-                        await websocket.send_json({
-                            "type": "ping",
-                            "timestamp": datetime.utcnow().isoformat()
-                        })
-                    except Exception:
+                for websocket in list(self._connections[stream_type][stream_id]):
+                    queue = self._queues.get(websocket)
+                    if queue is None or not queue.put(ping, "ping"):
                         # Connection is dead, clean it up
                         await self.disconnect(websocket, stream_type, stream_id)
                         cleaned += 1
@@ -426,3 +482,24 @@ class WebSocketManager:
             logger.info("Cleaned up stale connections", count=cleaned)
         
         return cleaned
+    
+    async def _drop_client(self, websocket: WebSocket, reason: str) -> None:
+        """Close and unregister a connection whose writer gave up."""
+        stream = self._socket_to_stream.get(websocket)
+        logger.warning(
+            "Dropping WebSocket client",
+            stream_type=stream[0].value if stream else None,
+            stream_id=stream[1] if stream else None,
+            reason=reason
+        )
+        
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Client too slow"),
+                timeout=1.0
+            )
+        except Exception:
+            pass  # Already closed or stalled
+        
+        if stream is not None:
+            await self.disconnect(websocket, *stream)
@@ -7,10 +7,12 @@ This module provides comprehensive backtesting capabilities including:
 - Performance analysis and reporting
 - Risk metrics calculation
 - Comprehensive statistics analysis
+- Persistent result storage
 """
 
 from .data_loader import DataLoader, BacktestDataManager, DataRange
 from .backtest_engine import BacktestEngine, SimulatedPosition, BacktestState
+from .result_store import BacktestResultStore, get_result_store
 from .statistics import (
     BacktestStatisticsCalculator,
     ComprehensiveStatistics,
@@ -27,6 +29,8 @@ __all__ = [
     "BacktestEngine",
     "SimulatedPosition",
     "BacktestState",
+    "BacktestResultStore",
+    "get_result_store",
     "BacktestStatisticsCalculator",
     "ComprehensiveStatistics",
     "TradeStatistics",
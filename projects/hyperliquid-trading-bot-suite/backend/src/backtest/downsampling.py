@@ -0,0 +1,137 @@
+"""
+Downsampling of long time series for plotting.
+
+Both downsamplers return the indices of the points to keep, so every
+column of a series can be sampled at the same rows:
+
+- ``lttb``: Largest-Triangle-Three-Buckets. Keeps the visual shape of
+  the curve with one point per bucket.
+- ``min_max``: the lowest and highest point of each bucket, so peaks and
+  troughs (e.g. the maximum drawdown) are never dropped.
+
+The first and last points are always kept.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+DOWNSAMPLERS = ("lttb", "minmax")
+
+
+def _bucket_edges(length: int, buckets: int) -> np.ndarray:
+    """Edges splitting points 1..length-2 into equal buckets (first/last excluded)."""
+    return np.linspace(1, length - 1, buckets + 1).astype(np.int64)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Select ``points`` indices with Largest-Triangle-Three-Buckets.
+
+    Args:
+        x: Ascending x values (e.g. timestamps)
+        y: Values
+        points: Target number of points (at least 3)
+
+    Returns:
+        Sorted indices into x/y
+    """
+    length = len(x)
+    if points >= length or length <= 2:
+        return np.arange(length)
+    if points < 3:
+        raise ValueError("LTTB needs at least 3 points")
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = _bucket_edges(length, points - 2)
+
+    # Mean of each bucket: the third triangle vertex for the bucket before it
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, length - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        cx, cy = mean_x[bucket + 1], mean_y[bucket + 1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        areas = np.abs((ax - cx) * (y[start:stop] - ay) - (ax - x[start:stop]) * (cy - ay))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def min_max(y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Select up to ``points`` indices: each bucket's minimum and maximum.
+
+    Args:
+        y: Values
+        points: Target number of points (at least 4)
+
+    Returns:
+        Sorted indices into y
+    """
+    length = len(y)
+    if points >= length or length <= 2:
+        return np.arange(length)
+    if points < 4:
+        raise ValueError("Min/max downsampling needs at least 4 points")
+
+    y = np.asarray(y, dtype=np.float64)
+    edges = _bucket_edges(length, (points - 2) // 2)
+    inner = y[1:-1]
+    bucket_of = np.repeat(np.arange(len(edges) - 1), np.diff(edges))
+
+    lows = np.minimum.reduceat(inner, edges[:-1] - 1)
+    highs = np.maximum.reduceat(inner, edges[:-1] - 1)
+
+    # First index in each bucket equal to its minimum / maximum
+    _, first_low = np.unique(bucket_of[inner == lows[bucket_of]], return_index=True)
+    _, first_high = np.unique(bucket_of[inner == highs[bucket_of]], return_index=True)
+    low_idx = np.flatnonzero(inner == lows[bucket_of])[first_low] + 1
+    high_idx = np.flatnonzero(inner == highs[bucket_of])[first_high] + 1
+
+    return np.unique(np.concatenate(([0, length - 1], low_idx, high_idx)))
+
+
+def downsample(
+    x: np.ndarray,
+    y: np.ndarray,
+    points: Optional[int],
+    method: str = "lttb"
+) -> np.ndarray:
+    """
+    Indices of the points to keep with the given method.
+
+    Args:
+        x: Ascending x values
+        y: Values
+        points: Target number of points (None keeps every point)
+        method: One of DOWNSAMPLERS
+
+    Returns:
+        Sorted indices into x/y
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"Unknown downsampling method '{method}'")
+    if points is None:
+        return np.arange(len(x))
+    if method == "lttb":
+        return lttb(x, y, points)
+    return min_max(y, points)
+
+
+__all__ = [
+    "DOWNSAMPLERS",
+    "downsample",
+    "lttb",
+    "min_max",
+]
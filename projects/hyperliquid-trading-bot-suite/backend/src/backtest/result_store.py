@@ -0,0 +1,600 @@
+"""
+Persistent backtest result store.
+
+Each backtest gets a directory under the store root:
+
+    <root>/<backtest_id>/
+        meta.json          summary metrics, status, config
+        trades/            one file per trade field
+        equity/            one file per equity curve field
+
+Series are stored column by column as NumPy ``.npy`` files and read back
+memory-mapped, so paging trades or slicing the equity curve only touches
+the rows requested. Numbers, booleans and timestamps are fixed-width
+columns; everything else (strings, enums, nested values) is stored as
+UTF-8 JSON in a ``.bin`` file with an ``.offsets.npy`` index.
+
+Only a bounded LRU of metadata and a small (created_at, status) index for
+listing are kept in memory, so API memory stays flat however many
+backtests are run, and results survive restarts.
+
+Several API workers share one store root. Each backtest records the
+process running it (``owner``) and a ``heartbeat_at`` time, so a worker
+starting up only fails runs whose owner is gone, and a worker asked about
+a backtest another worker created reads its ``meta.json`` from disk.
+"""
+
+import dataclasses
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Column kinds
+FLOAT, INT, BOOL, TIME, JSON = "f", "i", "b", "t", "j"
+
+_NUMBER = (int, float, np.integer, np.floating)
+
+# Statuses a backtest can be left in if the process stops mid-run
+_ACTIVE_STATUSES = ("pending", "running")
+
+# Seconds without a heartbeat after which a run on another host counts as dead
+HEARTBEAT_TIMEOUT = 600
+
+
+def _process_identity(pid: int) -> Optional[str]:
+    """
+    Boot id and start time of a process, or None if it is not running.
+
+    Unlike the pid alone this cannot match a different process that reused
+    the pid (e.g. a restarted container). Linux only.
+    """
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            boot_id = f.read().strip()
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Field 22 (starttime), counted after the parenthesized command name
+    return f"{boot_id}:{stat.rsplit(')', 1)[1].split()[19]}"
+
+
+def _pid_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _current_owner() -> Dict[str, Any]:
+    pid = os.getpid()
+    return {"host": socket.gethostname(), "pid": pid, "process": _process_identity(pid)}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+def _to_record(item: Any) -> Dict[str, Any]:
+    """Turn a trade (dict, dataclass or pydantic model) into a flat dict."""
+    if isinstance(item, dict):
+        return item
+    if dataclasses.is_dataclass(item):
+        return {f.name: getattr(item, f.name) for f in dataclasses.fields(item)}
+    if hasattr(item, "model_dump"):
+        return item.model_dump()
+    if hasattr(item, "dict"):
+        return item.dict()
+    return vars(item)
+
+
+def _column_kind(values: List[Any]) -> str:
+    """Pick the narrowest column kind that holds every value."""
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, datetime) for v in present):
+        return TIME
+    if present and all(isinstance(v, bool) for v in present):
+        return BOOL if len(present) == len(values) else JSON
+    if all(isinstance(v, _NUMBER) and not isinstance(v, (bool, Enum)) for v in present):
+        if len(present) == len(values) and all(isinstance(v, (int, np.integer)) for v in present):
+            return INT
+        return FLOAT  # None is stored as NaN
+    return JSON
+
+
+def _to_epoch(value: Optional[datetime]) -> float:
+    if value is None:
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class _Section:
+    """Writes and reads one columnar section (trades or equity) of a backtest."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._schema: Optional[Dict[str, Any]] = None
+
+    @property
+    def schema(self) -> Dict[str, Any]:
+        if self._schema is None:
+            schema_file = self.path / "schema.json"
+            if schema_file.exists():
+                self._schema = json.loads(schema_file.read_text())
+            else:
+                self._schema = {"length": 0, "columns": {}}
+        return self._schema
+
+    def __len__(self) -> int:
+        return self.schema["length"]
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.schema["columns"])
+
+    def write(self, records: List[Dict[str, Any]]):
+        """Write records as columns, in order of first appearance of each key."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        names: Dict[str, None] = {}
+        for record in records:
+            names.update(dict.fromkeys(record))
+
+        columns = {}
+        for index, name in enumerate(names):
+            values = [record.get(name) for record in records]
+            kind = _column_kind(values)
+            stem = f"c{index}"
+            column = {"kind": kind, "file": stem}
+
+            if kind == TIME:
+                column["aware"] = any(v is not None and v.tzinfo is not None for v in values)
+                data = np.array([_to_epoch(v) for v in values], dtype=np.float64)
+            elif kind == BOOL:
+                data = np.array(values, dtype=np.bool_)
+            elif kind == INT:
+                data = np.array(values, dtype=np.int64)
+            elif kind == FLOAT:
+                data = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                encoded = [
+                    json.dumps(v, default=_json_default, separators=(",", ":")).encode()
+                    for v in values
+                ]
+                offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+                np.cumsum([len(e) for e in encoded], out=offsets[1:])
+                np.save(self.path / f"{stem}.offsets.npy", offsets)
+                (self.path / f"{stem}.bin").write_bytes(b"".join(encoded))
+                columns[name] = column
+                continue
+
+            np.save(self.path / f"{stem}.npy", data)
+            columns[name] = column
+
+        self._schema = {"length": len(records), "columns": columns}
+        (self.path / "schema.json").write_text(json.dumps(self._schema))
+
+    def column(self, name: str) -> np.ndarray:
+        """Memory-mapped fixed-width column (timestamps as epoch seconds)."""
+        column = self.schema["columns"][name]
+        if column["kind"] == JSON:
+            raise ValueError(f"Column '{name}' is not fixed-width")
+        return np.load(self.path / f"{column['file']}.npy", mmap_mode="r")
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Materialize rows [start, stop) as dicts."""
+        length = len(self)
+        stop = length if stop is None else min(stop, length)
+        start = min(max(start, 0), stop)
+        return self._rows(slice(start, stop), stop - start)
+
+    def take(self, indices: np.ndarray) -> List[Dict[str, Any]]:
+        """Materialize the rows at the given indices as dicts."""
+        return self._rows(np.asarray(indices, dtype=np.int64), len(indices))
+
+    def _rows(self, rows: Union[slice, np.ndarray], count: int) -> List[Dict[str, Any]]:
+        if count == 0:
+            return []
+
+        values_by_column = {}
+        for name, column in self.schema["columns"].items():
+            kind, stem = column["kind"], column["file"]
+            if kind == JSON:
+                values_by_column[name] = self._read_json(stem, rows, count)
+                continue
+
+            data = np.load(self.path / f"{stem}.npy", mmap_mode="r")[rows]
+            if kind == TIME:
+                tz = timezone.utc if column["aware"] else None
+                values_by_column[name] = [
+                    None if np.isnan(ts) else
+                    datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=tz)
+                    for ts in data.tolist()
+                ]
+            elif kind == FLOAT:
+                values_by_column[name] = [None if np.isnan(v) else v for v in data.tolist()]
+            else:
+                values_by_column[name] = data.tolist()
+
+        names = list(values_by_column)
+        return [
+            {name: values_by_column[name][i] for name in names}
+            for i in range(count)
+        ]
+
+    def _read_json(self, stem: str, rows: Union[slice, np.ndarray], count: int) -> List[Any]:
+        offsets = np.load(self.path / f"{stem}.offsets.npy", mmap_mode="r")
+        with open(self.path / f"{stem}.bin", "rb") as f:
+            if isinstance(rows, slice):
+                # One read covering the contiguous rows
+                bounds = offsets[rows.start:rows.stop + 1]
+                f.seek(int(bounds[0]))
+                blob = f.read(int(bounds[-1] - bounds[0]))
+                bounds = (bounds - bounds[0]).tolist()
+                return [json.loads(blob[bounds[i]:bounds[i + 1]]) for i in range(count)]
+
+            values = []
+            for row in rows.tolist():
+                f.seek(int(offsets[row]))
+                values.append(json.loads(f.read(int(offsets[row + 1] - offsets[row]))))
+            return values
+
+
+class BacktestResultStore:
+    """
+    On-disk store of backtest metadata, trades and equity curves.
+
+    Example:
+        >>> store = BacktestResultStore(Path("data/backtests"))
+        >>> store.create("bt_123", {"status": "pending", "created_at": ...})
+        >>> store.save_results("bt_123", trades, equity_curve)
+        >>> store.get_trades("bt_123", offset=0, limit=100)
+    """
+
+    def __init__(self, root: Union[str, Path], metadata_cache_size: int = 128):
+        """
+        Initialize result store.
+
+        Backtests left pending or running by a process that is no longer
+        alive are marked failed, since nothing will finish them; those
+        still owned by live workers are left alone.
+
+        Args:
+            root: Directory holding one subdirectory per backtest
+            metadata_cache_size: Maximum number of metadata entries kept in memory
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.metadata_cache_size = metadata_cache_size
+        self._metadata: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._index: Dict[str, Tuple[str, str]] = {}  # backtest_id -> (created_at, status)
+        self._lock = threading.RLock()
+        self._owner = _current_owner()
+        self._load_index()
+
+    def _load_index(self):
+        for meta_file in self.root.glob("*/meta.json"):
+            try:
+                meta = json.loads(meta_file.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable backtest metadata {meta_file}: {e}")
+                continue
+
+            if meta.get("status") in _ACTIVE_STATUSES and not self._owner_alive(meta):
+                meta["status"] = "failed"
+                meta["error"] = "Interrupted: the server stopped before the backtest finished"
+                self._write_meta(meta["backtest_id"], meta)
+
+            self._index[meta["backtest_id"]] = (meta.get("created_at") or "", meta["status"])
+
+        logger.info(f"Loaded {len(self._index)} stored backtests from {self.root}")
+
+    @staticmethod
+    def _owner_alive(meta: Dict[str, Any]) -> bool:
+        """Whether the process that owns an active backtest may still finish it."""
+        owner = meta.get("owner")
+        if not owner:
+            return False
+        if owner.get("host") == socket.gethostname():
+            if owner.get("process"):
+                return _process_identity(owner["pid"]) == owner["process"]
+            if not _pid_running(owner["pid"]):
+                return False
+
+        # Another host sharing the store (or no /proc): trust a recent heartbeat
+        try:
+            heartbeat = datetime.fromisoformat(meta["heartbeat_at"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return time.time() - heartbeat.timestamp() < HEARTBEAT_TIMEOUT
+
+    def _cache_is_current(self, meta: Dict[str, Any]) -> bool:
+        """Cached metadata is current unless another process may still change it."""
+        return meta.get("status") not in _ACTIVE_STATUSES or meta.get("owner") == self._owner
+
+    def _read_meta(self, backtest_id: str) -> Optional[Dict[str, Any]]:
+        """Read meta.json from disk (None if missing or unreadable)."""
+        try:
+            return json.loads((self._dir(backtest_id) / "meta.json").read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load metadata for {backtest_id}: {e}")
+            return None
+
+    def _dir(self, backtest_id: str) -> Path:
+        # IDs come from URLs: never let one escape the store root
+        if not backtest_id or Path(backtest_id).name != backtest_id or backtest_id.startswith("."):
+            raise ValueError(f"Invalid backtest ID: {backtest_id!r}")
+        return self.root / backtest_id
+
+    def _write_meta(self, backtest_id: str, meta: Dict[str, Any]):
+        """Atomically replace meta.json."""
+        directory = self._dir(backtest_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f, default=_json_default)
+        os.replace(tmp, directory / "meta.json")
+
+    def _remember(self, backtest_id: str, meta: Dict[str, Any]):
+        self._metadata[backtest_id] = meta
+        self._metadata.move_to_end(backtest_id)
+        while len(self._metadata) > self.metadata_cache_size:
+            self._metadata.popitem(last=False)
+        self._index[backtest_id] = (meta.get("created_at") or "", meta.get("status"))
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+
+    def create(self, backtest_id: str, meta: Dict[str, Any]):
+        """Store a new backtest's metadata, owned by this process."""
+        meta = {
+            **meta,
+            "backtest_id": backtest_id,
+            "owner": self._owner,
+            "heartbeat_at": _now_iso(),
+        }
+        with self._lock:
+            self._write_meta(backtest_id, meta)
+            self._remember(backtest_id, meta)
+
+    def update(self, backtest_id: str, **fields) -> Dict[str, Any]:
+        """
+        Update metadata fields and persist them (also a heartbeat).
+
+        Raises:
+            KeyError: If the backtest does not exist
+        """
+        with self._lock:
+            meta = self.get(backtest_id)
+            if meta is None:
+                raise KeyError(backtest_id)
+            meta = {**meta, **fields, "heartbeat_at": _now_iso()}
+            self._write_meta(backtest_id, meta)
+            self._remember(backtest_id, meta)
+            return meta
+
+    def heartbeat(self, backtest_id: str):
+        """Record that this process is still working on a backtest."""
+        try:
+            self.update(backtest_id)
+        except KeyError:
+            pass  # Deleted while running
+
+    def get(self, backtest_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a backtest's metadata (None if unknown).
+
+        Backtests created, or still being run, by other workers are read
+        from disk, so their progress is current.
+        """
+        with self._lock:
+            meta = self._metadata.get(backtest_id)
+            if meta is not None and self._cache_is_current(meta):
+                self._metadata.move_to_end(backtest_id)
+                return meta
+
+            if backtest_id not in self._index:
+                self._dir(backtest_id)  # Validate before touching the disk
+            meta = self._read_meta(backtest_id)
+            if meta is None:
+                # Deleted, possibly by another worker
+                self._index.pop(backtest_id, None)
+                self._metadata.pop(backtest_id, None)
+                return None
+
+            self._remember(backtest_id, meta)
+            return meta
+
+    def __contains__(self, backtest_id: str) -> bool:
+        if backtest_id in self._index:
+            return True
+        try:
+            return (self._dir(backtest_id) / "meta.json").exists()
+        except ValueError:
+            return False
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        List backtests, newest first.
+
+        Only the requested page's metadata is loaded, plus that of
+        backtests other workers created or are running, whose status may
+        have changed.
+
+        Returns:
+            Tuple of (total matching, metadata for the page)
+        """
+        with self._lock:
+            self._refresh_index()
+            ids = [
+                backtest_id for backtest_id, (_, s) in self._index.items()
+                if status is None or s == status
+            ]
+            ids.sort(key=lambda backtest_id: self._index[backtest_id][0], reverse=True)
+            page = ids[offset:None if limit is None else offset + limit]
+            metas = [self.get(backtest_id) for backtest_id in page]
+            return len(ids), [meta for meta in metas if meta is not None]
+
+    def _refresh_index(self):
+        """Pick up backtests other workers created, deleted or progressed."""
+        known = set(self._index)
+        on_disk = {
+            entry.name for entry in os.scandir(self.root)
+            if entry.is_dir() and not entry.name.startswith(".")
+        }
+        for backtest_id in known - on_disk:
+            self._index.pop(backtest_id, None)
+            self._metadata.pop(backtest_id, None)
+        for backtest_id in on_disk:
+            if backtest_id not in known or self._index[backtest_id][1] in _ACTIVE_STATUSES:
+                self.get(backtest_id)
+
+    def delete(self, backtest_id: str) -> bool:
+        """Delete a backtest and its results. Returns False if unknown."""
+        with self._lock:
+            if self.get(backtest_id) is None:
+                return False
+            del self._index[backtest_id]
+            self._metadata.pop(backtest_id, None)
+            shutil.rmtree(self._dir(backtest_id), ignore_errors=True)
+            return True
+
+    # ------------------------------------------------------------------
+    # Series
+    # ------------------------------------------------------------------
+
+    def save_results(
+        self,
+        backtest_id: str,
+        trades: Iterable[Any],
+        equity_curve: Iterable[Dict[str, Any]]
+    ):
+        """
+        Write a backtest's trades and equity curve as columns.
+
+        Equity curve ``timestamp`` values may be datetimes or ISO strings;
+        they are stored as epoch seconds.
+        """
+        equity_records = []
+        for point in equity_curve:
+            point = dict(point)
+            if isinstance(point.get("timestamp"), str):
+                point["timestamp"] = datetime.fromisoformat(point["timestamp"].replace("Z", "+00:00"))
+            equity_records.append(point)
+
+        directory = self._dir(backtest_id)
+        staging = Path(tempfile.mkdtemp(dir=self.root, prefix=f".{backtest_id}."))
+        try:
+            _Section(staging / "trades").write([_to_record(t) for t in trades])
+            _Section(staging / "equity").write(equity_records)
+
+            # Swap the finished sections in so readers never see a partial write
+            directory.mkdir(parents=True, exist_ok=True)
+            for name in ("trades", "equity"):
+                target = directory / name
+                if target.exists():
+                    shutil.rmtree(target)
+                os.replace(staging / name, target)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def trade_count(self, backtest_id: str) -> int:
+        return len(_Section(self._dir(backtest_id) / "trades"))
+
+    def get_trades(self, backtest_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read a page of trades."""
+        stop = None if limit is None else offset + limit
+        return _Section(self._dir(backtest_id) / "trades").read(offset, stop)
+
+    def equity_length(self, backtest_id: str) -> int:
+        return len(_Section(self._dir(backtest_id) / "equity"))
+
+    def get_equity_columns(self, backtest_id: str) -> Dict[str, np.ndarray]:
+        """
+        Memory-mapped fixed-width equity curve columns.
+
+        ``timestamp`` is in epoch seconds.
+        """
+        section = _Section(self._dir(backtest_id) / "equity")
+        return {
+            name: section.column(name)
+            for name in section.column_names
+            if section.schema["columns"][name]["kind"] != JSON
+        }
+
+    def get_equity_curve(
+        self,
+        backtest_id: str,
+        start: int = 0,
+        stop: Optional[int] = None,
+        indices: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read equity curve points [start, stop), or the points at ``indices``,
+        with timestamps as ISO strings.
+        """
+        section = _Section(self._dir(backtest_id) / "equity")
+        points = section.read(start, stop) if indices is None else section.take(indices)
+        for point in points:
+            if isinstance(point.get("timestamp"), datetime):
+                point["timestamp"] = point["timestamp"].isoformat()
+        return points
+
+
+_store: Optional[BacktestResultStore] = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> BacktestResultStore:
+    """Return the process-wide result store under ``settings.data_dir``."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BacktestResultStore(Path(settings.data_dir) / "backtests")
+        return _store
+
+
+__all__ = [
+    "HEARTBEAT_TIMEOUT",
+    "BacktestResultStore",
+    "get_result_store",
+]
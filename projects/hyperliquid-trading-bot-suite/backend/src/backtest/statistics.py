@@ -12,6 +12,10 @@ This module provides:
 - Risk metrics (drawdown analysis, value at risk)
 - Detailed statistical reports
 
+Equity-curve metrics (drawdowns, period returns, ratios) are computed with
+NumPy/pandas array operations, so post-processing stays fast for
+minute-resolution curves with millions of points.
+
 Author: Hyperliquid Trading Bot Suite
 """
 
@@ -24,6 +28,9 @@ from collections import defaultdict
 import statistics
 from enum import Enum
 
+import numpy as np
+import pandas as pd
+
 from ..types import (
     BacktestResult, TradeRecord, TradeOutcome, OrderSide,
     ExitReason
@@ -32,6 +39,45 @@ from ..types import (
 logger = logging.getLogger(__name__)
 
 
+def _to_datetime(timestamp: Any) -> datetime:
+    """Equity curve timestamp (ISO string or datetime) as a datetime."""
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp)
+    return timestamp
+
+
+def _equity_values(equity_curve: List[Dict[str, Any]]) -> np.ndarray:
+    """Equity column of the curve as a float array."""
+    return np.fromiter(
+        (point['equity'] for point in equity_curve), dtype=np.float64, count=len(equity_curve)
+    )
+
+
+def _wall_clock_times(equity_curve: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Timestamps as naive datetime64 values in their own time zone.
+    
+    Calendar periods follow the timestamps' local dates, as with
+    ``datetime.strftime`` on each point.
+    """
+    raw = [point['timestamp'] for point in equity_curve]
+    try:
+        times = pd.DatetimeIndex(pd.to_datetime(raw, format="ISO8601"))
+    except (ValueError, TypeError):
+        # Mixed UTC offsets (or naive and aware points): parse point by point
+        times = pd.DatetimeIndex([_to_datetime(t).replace(tzinfo=None) for t in raw])
+    if times.tz is not None:
+        times = times.tz_localize(None)
+    return times.values
+
+
+def _last_in_period(times: np.ndarray, unit: str) -> np.ndarray:
+    """Index of the last point (in curve order) of each calendar period, by period."""
+    keys = times.astype(f"datetime64[{unit}]")[::-1]
+    _, first_from_end = np.unique(keys, return_index=True)
+    return len(times) - 1 - first_from_end
+
+
 @dataclass
 class TradeStatistics:
     """Detailed trade-level statistics."""
@@ -370,53 +416,31 @@ class BacktestStatisticsCalculator:
             years = duration_days / 365.25
             stats.annualized_return = ((final_equity / initial_balance) ** (1 / years) - 1) * 100 if years > 0 else 0.0
         
-        # Calculate daily returns
-        daily_equity = self._aggregate_to_daily(equity_curve)
+        # Calendar-period returns (timestamps are parsed once for both)
+        times = _wall_clock_times(equity_curve)
+        daily_equity = self._aggregate_to_daily(equity_curve, times)
         stats.daily_returns = self._calculate_period_returns(daily_equity)
         
         if stats.daily_returns:
-            stats.avg_daily_return = statistics.mean(stats.daily_returns)
-            stats.std_daily_return = statistics.stdev(stats.daily_returns) if len(stats.daily_returns) > 1 else 0.0
+            daily_returns = np.asarray(stats.daily_returns)
+            stats.avg_daily_return = float(daily_returns.mean())
+            stats.std_daily_return = float(daily_returns.std(ddof=1)) if len(daily_returns) > 1 else 0.0
             
             # Find best/worst days
-            best_idx = stats.daily_returns.index(max(stats.daily_returns))
-            worst_idx = stats.daily_returns.index(min(stats.daily_returns))
-            
-            stats.best_day = {
-                'date': daily_equity[best_idx + 1]['timestamp'] if best_idx + 1 < len(daily_equity) else None,
-                'return': max(stats.daily_returns),
-                'return_pct': max(stats.daily_returns) * 100
-            }
-            
-            stats.worst_day = {
-                'date': daily_equity[worst_idx + 1]['timestamp'] if worst_idx + 1 < len(daily_equity) else None,
-                'return': min(stats.daily_returns),
-                'return_pct': min(stats.daily_returns) * 100
-            }
+            stats.best_day = self._period_extreme(daily_equity, daily_returns, np.argmax)
+            stats.worst_day = self._period_extreme(daily_equity, daily_returns, np.argmin)
         
-        # Calculate monthly returns
-        monthly_equity = self._aggregate_to_monthly(equity_curve)
+        monthly_equity = self._aggregate_to_monthly(equity_curve, times)
         stats.monthly_returns = self._calculate_period_returns(monthly_equity)
         
         if stats.monthly_returns:
-            stats.avg_monthly_return = statistics.mean(stats.monthly_returns)
-            stats.std_monthly_return = statistics.stdev(stats.monthly_returns) if len(stats.monthly_returns) > 1 else 0.0
+            monthly_returns = np.asarray(stats.monthly_returns)
+            stats.avg_monthly_return = float(monthly_returns.mean())
+            stats.std_monthly_return = float(monthly_returns.std(ddof=1)) if len(monthly_returns) > 1 else 0.0
             
             # Find best/worst months
-            best_idx = stats.monthly_returns.index(max(stats.monthly_returns))
-            worst_idx = stats.monthly_returns.index(min(stats.monthly_returns))
-            
-            stats.best_month = {
-                'date': monthly_equity[best_idx + 1]['timestamp'] if best_idx + 1 < len(monthly_equity) else None,
-                'return': max(stats.monthly_returns),
-                'return_pct': max(stats.monthly_returns) * 100
-            }
-            
-            stats.worst_month = {
-                'date': monthly_equity[worst_idx + 1]['timestamp'] if worst_idx + 1 < len(monthly_equity) else None,
-                'return': min(stats.monthly_returns),
-                'return_pct': min(stats.monthly_returns) * 100
-            }
+            stats.best_month = self._period_extreme(monthly_equity, monthly_returns, np.argmax)
+            stats.worst_month = self._period_extreme(monthly_equity, monthly_returns, np.argmin)
         
         return stats
     
@@ -443,27 +467,28 @@ class BacktestStatisticsCalculator:
         stats.recovery_time_days = drawdown_data['recovery_time_days']
         stats.drawdown_periods = drawdown_data['periods']
         
+        returns = np.asarray(daily_returns, dtype=np.float64)
+        daily_risk_free = self.risk_free_rate / 252
+        
         # Volatility
-        if daily_returns:
-            stats.volatility_daily = statistics.stdev(daily_returns) if len(daily_returns) > 1 else 0.0
+        if returns.size:
+            stats.volatility_daily = float(returns.std(ddof=1)) if returns.size > 1 else 0.0
             stats.volatility_annualized = stats.volatility_daily * (252 ** 0.5)  # Annualized
             
             # Downside deviation (for Sortino)
-            downside_returns = [r for r in daily_returns if r < self.risk_free_rate / 252]
-            stats.downside_deviation = statistics.stdev(downside_returns) if len(downside_returns) > 1 else 0.0
+            downside_returns = returns[returns < daily_risk_free]
+            stats.downside_deviation = float(downside_returns.std(ddof=1)) if downside_returns.size > 1 else 0.0
         
         # Risk-adjusted returns
-        if daily_returns and len(daily_returns) > 1:
-            avg_return = statistics.mean(daily_returns)
+        if returns.size > 1:
+            excess_return = float(returns.mean()) - daily_risk_free
             
             # Sharpe Ratio
             if stats.volatility_daily > 0:
-                excess_return = avg_return - (self.risk_free_rate / 252)
                 stats.sharpe_ratio = (excess_return / stats.volatility_daily) * (252 ** 0.5)  # Annualized
             
             # Sortino Ratio
             if stats.downside_deviation > 0:
-                excess_return = avg_return - (self.risk_free_rate / 252)
                 stats.sortino_ratio = (excess_return / stats.downside_deviation) * (252 ** 0.5)  # Annualized
         
         # Calmar Ratio
@@ -474,20 +499,19 @@ class BacktestStatisticsCalculator:
             stats.calmar_ratio = annualized_return / abs(stats.max_drawdown_percent) if stats.max_drawdown_percent != 0 else 0.0
         
         # Value at Risk (VaR)
-        if daily_returns and len(daily_returns) >= 20:  # Need sufficient data
-            sorted_returns = sorted(daily_returns)
+        if returns.size >= 20:  # Need sufficient data
+            sorted_returns = np.sort(returns)
             
             # 95% VaR
             var_95_idx = int(len(sorted_returns) * 0.05)
-            stats.var_95 = sorted_returns[var_95_idx] if var_95_idx < len(sorted_returns) else 0.0
+            stats.var_95 = float(sorted_returns[var_95_idx])
             
             # 99% VaR
             var_99_idx = int(len(sorted_returns) * 0.01)
-            stats.var_99 = sorted_returns[var_99_idx] if var_99_idx < len(sorted_returns) else 0.0
+            stats.var_99 = float(sorted_returns[var_99_idx])
             
             # CVaR (Expected Shortfall) - average of worst 5%
-            worst_5_pct = sorted_returns[:var_95_idx + 1]
-            stats.cvar_95 = statistics.mean(worst_5_pct) if worst_5_pct else 0.0
+            stats.cvar_95 = float(sorted_returns[:var_95_idx + 1].mean())
         
         return stats
     
@@ -613,74 +637,83 @@ class BacktestStatisticsCalculator:
             'current_type': current_type
         }
     
-    def _aggregate_to_daily(self, equity_curve: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _aggregate_to_daily(
+        self,
+        equity_curve: List[Dict[str, Any]],
+        times: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
         """Aggregate equity curve to daily granularity."""
         
         if not equity_curve:
             return []
-        
-        daily_data = {}
-        
-        for point in equity_curve:
-            timestamp = point['timestamp']
-            if isinstance(timestamp, str):
-                timestamp = datetime.fromisoformat(timestamp)
-            
-            date_str = timestamp.strftime("%Y-%m-%d")
-            
-            # Keep the last equity value for each day
-            daily_data[date_str] = {
-                'timestamp': timestamp.replace(hour=23, minute=59, second=59),
-                'equity': point['equity']
+        if times is None:
+            times = _wall_clock_times(equity_curve)
+        
+        # Keep the last equity value for each day
+        return [
+            {
+                'timestamp': _to_datetime(equity_curve[i]['timestamp']).replace(hour=23, minute=59, second=59),
+                'equity': equity_curve[i]['equity']
             }
-        
-        # Sort by date
-        return [daily_data[k] for k in sorted(daily_data.keys())]
+            for i in _last_in_period(times, 'D')
+        ]
     
-    def _aggregate_to_monthly(self, equity_curve: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _aggregate_to_monthly(
+        self,
+        equity_curve: List[Dict[str, Any]],
+        times: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
         """Aggregate equity curve to monthly granularity."""
         
         if not equity_curve:
             return []
-        
-        monthly_data = {}
-        
-        for point in equity_curve:
-            timestamp = point['timestamp']
-            if isinstance(timestamp, str):
-                timestamp = datetime.fromisoformat(timestamp)
-            
-            month_str = timestamp.strftime("%Y-%m")
-            
-            # Keep the last equity value for each month
-            monthly_data[month_str] = {
-                'timestamp': timestamp,
-                'equity': point['equity']
+        if times is None:
+            times = _wall_clock_times(equity_curve)
+        
+        # Keep the last equity value for each month
+        return [
+            {
+                'timestamp': _to_datetime(equity_curve[i]['timestamp']),
+                'equity': equity_curve[i]['equity']
             }
-        
-        # Sort by month
-        return [monthly_data[k] for k in sorted(monthly_data.keys())]
+            for i in _last_in_period(times, 'M')
+        ]
     
     def _calculate_period_returns(self, period_data: List[Dict[str, Any]]) -> List[float]:
-        """Calculate returns for periods."""
+        """Calculate returns for periods (periods after a non-positive equity are skipped)."""
         
         if len(period_data) < 2:
             return []
         
-        returns = []
-        
-        for i in range(1, len(period_data)):
-            prev_equity = period_data[i - 1]['equity']
-            curr_equity = period_data[i]['equity']
-            
-            if prev_equity > 0:
-                period_return = (curr_equity - prev_equity) / prev_equity
-                returns.append(period_return)
-        
-        return returns
+        equity = _equity_values(period_data)
+        previous, current = equity[:-1], equity[1:]
+        valid = previous > 0
+        return ((current[valid] - previous[valid]) / previous[valid]).tolist()
+    
+    def _period_extreme(
+        self,
+        period_data: List[Dict[str, Any]],
+        returns: np.ndarray,
+        pick
+    ) -> Dict[str, Any]:
+        """Best or worst period (``pick`` is np.argmax or np.argmin)."""
+        
+        idx = int(pick(returns))
+        period_return = float(returns[idx])
+        return {
+            'date': period_data[idx + 1]['timestamp'] if idx + 1 < len(period_data) else None,
+            'return': period_return,
+            'return_pct': period_return * 100
+        }
     
     def _calculate_drawdowns(self, equity_curve: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate drawdown analysis."""
+        """
+        Calculate drawdown analysis.
+        
+        A drawdown period starts at the first point below the running peak
+        and ends at the next new high; a period still open at the end of the
+        curve is not reported.
+        """
         
         if len(equity_curve) < 2:
             return {
@@ -693,72 +726,60 @@ class BacktestStatisticsCalculator:
                 'periods': []
             }
         
-        peak = equity_curve[0]['equity']
+        equity = _equity_values(equity_curve)
+        peaks = np.maximum.accumulate(equity)
+        dd = peaks - equity
+        underwater = np.flatnonzero(dd > 0)
+        
+        # Max drawdown (first point where it is reached)
         max_dd = 0.0
         max_dd_pct = 0.0
-        
-        drawdowns = []
-        current_dd_start = None
-        current_dd_peak = peak
-        
-        all_dds = []
-        
-        for i, point in enumerate(equity_curve):
-            equity = point['equity']
-            timestamp = point['timestamp']
-            if isinstance(timestamp, str):
-                timestamp = datetime.fromisoformat(timestamp)
-            
-            # Update peak
-            if equity > peak:
-                # Recovery - end current drawdown if any
-                if current_dd_start is not None:
-                    dd_duration = (timestamp - current_dd_start).total_seconds() / 86400
-                    drawdowns.append({
-                        'start': current_dd_start,
-                        'end': timestamp,
-                        'duration_days': dd_duration,
-                        'peak_equity': current_dd_peak,
-                        'trough_equity': peak,  # Peak is the recovery point
-                        'drawdown': current_dd_peak - peak,
-                        'drawdown_pct': ((current_dd_peak - peak) / current_dd_peak * 100) if current_dd_peak > 0 else 0.0
-                    })
-                    current_dd_start = None
-                
-                peak = equity
-                current_dd_peak = equity
-            
-            # Calculate current drawdown
-            dd = peak - equity
-            dd_pct = (dd / peak * 100) if peak > 0 else 0.0
-            
-            # Track all drawdowns
-            if dd > 0:
-                all_dds.append(dd)
-            
-            # Start new drawdown period
-            if dd > 0 and current_dd_start is None:
-                current_dd_start = timestamp
-                current_dd_peak = peak
-            
-            # Update max drawdown
-            if dd > max_dd:
-                max_dd = dd
-                max_dd_pct = dd_pct
+        if underwater.size:
+            worst = int(np.argmax(dd))
+            max_dd = float(dd[worst])
+            max_dd_pct = (max_dd / peaks[worst] * 100) if peaks[worst] > 0 else 0.0
         
         # Calculate averages
-        avg_dd = statistics.mean(all_dds) if all_dds else 0.0
-        avg_dd_pct = (avg_dd / peak * 100) if peak > 0 else 0.0
+        final_peak = float(peaks[-1])
+        avg_dd = float(dd[underwater].mean()) if underwater.size else 0.0
+        avg_dd_pct = (avg_dd / final_peak * 100) if final_peak > 0 else 0.0
+        
+        # Periods: the points between two new highs form a segment; a period
+        # runs from a segment's first underwater point to the next new high
+        new_high = np.zeros(len(equity), dtype=bool)
+        new_high[1:] = equity[1:] > peaks[:-1]
+        highs = np.flatnonzero(new_high)
+        segment_of = np.cumsum(new_high)
+        segments, first = np.unique(segment_of[underwater], return_index=True)
+        recovered = segments < len(highs)
+        starts = underwater[first][recovered]
+        ends = highs[segments[recovered]]
+        
+        drawdowns = []
+        for start_idx, end_idx in zip(starts, ends):
+            start = _to_datetime(equity_curve[start_idx]['timestamp'])
+            end = _to_datetime(equity_curve[end_idx]['timestamp'])
+            dd_peak = float(peaks[start_idx])
+            recovery_peak = float(peaks[end_idx - 1])
+            drawdowns.append({
+                'start': start,
+                'end': end,
+                'duration_days': (end - start).total_seconds() / 86400,
+                'peak_equity': dd_peak,
+                'trough_equity': recovery_peak,  # Peak is the recovery point
+                'drawdown': dd_peak - recovery_peak,
+                'drawdown_pct': ((dd_peak - recovery_peak) / dd_peak * 100) if dd_peak > 0 else 0.0
+            })
         
         # Max duration
-        max_duration = max([d['duration_days'] for d in drawdowns]) if drawdowns else 0.0
+        max_duration = max(d['duration_days'] for d in drawdowns) if drawdowns else 0.0
         
         # Recovery time (most recent drawdown)
         recovery_time = drawdowns[-1]['duration_days'] if drawdowns else 0.0
         
         return {
             'max_drawdown': max_dd,
-            'max_drawdown_pct': max_dd_pct,
+            'max_drawdown_pct': float(max_dd_pct),
             'avg_drawdown': avg_dd,
             'avg_drawdown_pct': avg_dd_pct,
             'max_duration_days': max_duration,
@@ -44,6 +44,8 @@ class Settings(BaseSettings):
     )
     redis_db: int = 0
     redis_max_connections: int = 10
+    cache_l1_max_entries: int = 1024  # In-process entries per AsyncCacheManager
+    cache_l1_ttl: float = 30.0  # seconds; upper bound on an in-process copy's age
 
     # LLM Configuration
     anthropic_api_key: Optional[str] = Field(
@@ -108,6 +110,7 @@ class Settings(BaseSettings):
         description="Secret key for JWT tokens (REQUIRED - set via SECRET_KEY env var)"
     )
     access_token_expire_minutes: int = 30
+    rate_limit_algorithm: str = "gcra"  # gcra | sliding_window
     
     @property
     def validated_secret_key(self) -> str:
@@ -128,6 +131,9 @@ class Settings(BaseSettings):
     
     # WebSocket
     websocket_heartbeat_interval: int = 30  # seconds
+    websocket_send_queue_size: int = 256  # Outbound messages buffered per client
+    websocket_slow_consumer_policy: str = "coalesce"  # drop_oldest | coalesce | disconnect
+    websocket_send_timeout: float = 10.0  # seconds before a stalled client is dropped
 
     @property
     def database_dsn(self) -> str:
@@ -9,7 +9,7 @@ from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 from sqlalchemy import (
-    Boolean, Column, DateTime, Float, ForeignKey, Integer, 
+    Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, 
     String, Text, JSON, Index, CheckConstraint, UniqueConstraint
 )
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
@@ -103,6 +103,7 @@ class TradeRecordDB(Base, TimestampMixin):
     exit_price = Column(Float, nullable=True)
     exit_time = Column(DateTime, nullable=True)
     exit_reason = Column(String(20), nullable=True)  # ExitReason enum
+    close_recorded_at = Column(DateTime, nullable=True)  # When the exit was written; never changes
     outcome = Column(String(20), default=TradeOutcome.PENDING.value, nullable=False, index=True)
     
     # P&L and sizing
@@ -134,6 +135,7 @@ class TradeRecordDB(Base, TimestampMixin):
         Index('idx_trade_asset_time', 'asset', 'entry_time'),
         Index('idx_trade_outcome_backtest', 'outcome', 'is_backtest'),
         Index('idx_trade_direction_time', 'direction', 'entry_time'),
+        Index('idx_trade_strategy_close_recorded', 'strategy_rule_id', 'close_recorded_at'),
     )
 
     @validates('direction')
@@ -155,6 +157,68 @@ class TradeRecordDB(Base, TimestampMixin):
         return exit_reason
 
 
+class StrategyPerformanceDailyDB(Base, TimestampMixin):
+    """
+    Per-day rollup of closed trades for one strategy rule.
+    
+    Rows with scope '*' cover all strategies. Maintained by
+    TradeRecordRepository when trades close; see knowledge.performance_rollup.
+    """
+    __tablename__ = 'strategy_performance_daily'
+    
+    scope = Column(String, primary_key=True)  # Strategy rule ID or '*'
+    day = Column(Date, primary_key=True)  # Entry date (UTC)
+    
+    # Additive totals
+    total_trades = Column(Integer, default=0, nullable=False)
+    winning_trades = Column(Integer, default=0, nullable=False)
+    losing_trades = Column(Integer, default=0, nullable=False)
+    total_pnl_r = Column(Float, default=0.0, nullable=False)
+    gross_profit_r = Column(Float, default=0.0, nullable=False)
+    gross_loss_r = Column(Float, default=0.0, nullable=False)
+    
+    # Loss streak state
+    leading_losses = Column(Integer, default=0, nullable=False)
+    trailing_losses = Column(Integer, default=0, nullable=False)
+    max_consecutive_losses = Column(Integer, default=0, nullable=False)
+    
+    # [[peak, trough], ...] equity offsets from the day's open
+    drawdown_profile = Column(JSON, nullable=False)
+    
+    __table_args__ = (
+        CheckConstraint('total_trades >= 0', name='check_daily_total_trades_positive'),
+    )
+
+
+class StrategyLearningStateDB(Base, TimestampMixin):
+    """
+    Running closed-trade statistics per strategy rule for the learning
+    feedback cycle.
+    
+    closed_through is the watermark: closed trades whose close was recorded
+    (close_recorded_at) at or before it are already folded into the totals.
+    See learning.feedback_loop.
+    """
+    __tablename__ = 'strategy_learning_state'
+    
+    strategy_rule_id = Column(String, ForeignKey('strategy_rules.id'), primary_key=True)
+    closed_through = Column(DateTime, nullable=True)
+    
+    # Cumulative totals
+    total_trades = Column(Integer, default=0, nullable=False)
+    winning_trades = Column(Integer, default=0, nullable=False)
+    losing_trades = Column(Integer, default=0, nullable=False)
+    breakeven_trades = Column(Integer, default=0, nullable=False)
+    r_trades = Column(Integer, default=0, nullable=False)  # Trades with a known R result
+    total_pnl_r = Column(Float, default=0.0, nullable=False)
+    total_profit_usd = Column(Float, default=0.0, nullable=False)
+    total_loss_usd = Column(Float, default=0.0, nullable=False)
+    
+    __table_args__ = (
+        CheckConstraint('total_trades >= 0', name='check_learning_state_trades_positive'),
+    )
+
+
 class LearningEntryDB(Base, TimestampMixin):
     """Database model for learning insights."""
     __tablename__ = 'learning_entries'
@@ -367,6 +431,8 @@ __all__ = [
     "TimestampMixin", 
     "StrategyRuleDB",
     "TradeRecordDB",
+    "StrategyPerformanceDailyDB",
+    "StrategyLearningStateDB",
     "LearningEntryDB",
     "CandleDataDB",
     "BacktestConfigDB",
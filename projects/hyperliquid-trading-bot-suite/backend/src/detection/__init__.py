@@ -32,6 +32,8 @@ from .cycle_classifier import (
     CycleHistory
 )
 
+from .cycle_features import CycleFeatureEngine
+
 from .confluence_scorer import (
     ConfluenceScorer,
     ConfluenceScore,
@@ -59,6 +61,7 @@ __all__ = [
     "CycleClassification",
     "CycleMetrics",
     "CycleHistory",
+    "CycleFeatureEngine",
     
     # Confluence Scoring
     "ConfluenceScorer",
@@ -10,6 +10,7 @@ Author: Hyperliquid Trading Bot Suite
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from dataclasses import asdict
 
 from ..types import (
@@ -18,6 +19,13 @@ from ..types import (
 )
 
 
+def _window_slopes(windows: np.ndarray) -> np.ndarray:
+    """Least-squares slope of each row of ``windows`` against 0..n-1."""
+    n = windows.shape[1]
+    x = np.arange(n) - (n - 1) / 2.0
+    return windows @ x / np.dot(x, x)
+
+
 class CandlePatternDetector:
     """Main candle pattern detection engine."""
     
@@ -58,7 +66,8 @@ class CandlePatternDetector:
         asset: str,
         timeframe: Timeframe,
         pattern_types: Optional[List[EntryType]] = None,
-        market_cycle: Optional[MarketCycle] = None
+        market_cycle: Optional[MarketCycle] = None,
+        last_n: Optional[int] = None
     ) -> List[PatternDetection]:
         """
         Detect patterns in a series of candles.
@@ -69,6 +78,9 @@ class CandlePatternDetector:
             timeframe: Timeframe of the candles
             pattern_types: Specific patterns to detect (None = detect all)
             market_cycle: Current market cycle context
+            last_n: Only evaluate the newest ``last_n`` candidate candles
+                (None = whole series). Useful for live/step-wise callers
+                that have already scanned the older candles.
             
         Returns:
             List of detected patterns with confidence scores
@@ -84,23 +96,30 @@ class CandlePatternDetector:
                            EntryType.STEEPER_WICK, EntryType.CELERY]
         
         # Analyze each candle (except first and last few for context)
-        for i in range(2, len(candles) - 1):
+        first = 2
+        if last_n is not None:
+            first = max(first, len(candles) - 1 - last_n)
+        indices = range(first, len(candles) - 1)
+        if not indices:
+            return []
+        
+        # Candle and context metrics for every analyzed candle, computed once
+        metrics_table = self._candle_metrics_table(candles, indices)
+        
+        for i, metrics in zip(indices, metrics_table):
             current_candle = candles[i]
             
-            # Get context candles
-            context_start = max(0, i - self.lookback_periods)
-            context_candles = candles[context_start:i+1]
-            
             # Detect each requested pattern type
             for pattern_type in pattern_types:
                 detection = self._detect_single_pattern(
                     current_candle=current_candle,
-                    context_candles=context_candles,
+                    context_candles=None,
                     candle_index=i,
                     pattern_type=pattern_type,
                     asset=asset,
                     timeframe=timeframe,
-                    market_cycle=market_cycle
+                    market_cycle=market_cycle,
+                    metrics=metrics
                 )
                 
                 if detection and detection.confidence >= self.min_confidence:
@@ -111,17 +130,23 @@ class CandlePatternDetector:
     def _detect_single_pattern(
         self,
         current_candle: CandleData,
-        context_candles: List[CandleData],
+        context_candles: Optional[List[CandleData]],
         candle_index: int,
         pattern_type: EntryType,
         asset: str,
         timeframe: Timeframe,
-        market_cycle: Optional[MarketCycle] = None
+        market_cycle: Optional[MarketCycle] = None,
+        metrics: Optional[Dict[str, float]] = None
     ) -> Optional[PatternDetection]:
-        """Detect a specific pattern type at a given candle."""
+        """Detect a specific pattern type at a given candle.
+        
+        ``metrics`` may be passed precomputed (see ``_candle_metrics_table``);
+        otherwise they are calculated from ``context_candles``.
+        """
         
         # Calculate candle metrics
-        metrics = self._calculate_candle_metrics(current_candle, context_candles)
+        if metrics is None:
+            metrics = self._calculate_candle_metrics(current_candle, context_candles)
         
         # Dispatch to specific pattern detector
         if pattern_type == EntryType.LE:
@@ -220,6 +245,110 @@ class CandlePatternDetector:
             
         return metrics
 
+    def _candle_metrics_table(
+        self,
+        candles: List[CandleData],
+        indices: range
+    ) -> List[Dict[str, float]]:
+        """
+        Calculate ``_calculate_candle_metrics`` for many candles at once.
+        
+        Per-candle values are computed as arrays over the whole series, and
+        context statistics come from rolling window views, so no context
+        list is sliced per candle. Volume and range averages equal the
+        per-candle path exactly; the trend slope uses the closed-form
+        least-squares solution, which can differ from ``np.polyfit`` by
+        floating point rounding.
+        
+        Args:
+            candles: Candle series in chronological order
+            indices: Consecutive candle indices to compute metrics for
+                (each index >= 1 so it has context)
+            
+        Returns:
+            One metrics dict per index, in order
+        """
+        if not len(indices):
+            return []
+        
+        lookback = self.lookback_periods
+        ohlcv = np.array(
+            [(c.open, c.high, c.low, c.close, c.volume) for c in candles],
+            dtype=float
+        )
+        opens, highs, lows, closes, volumes = ohlcv.T
+        idx = np.arange(indices.start, indices.stop)
+        
+        # Basic candle metrics
+        total_range = highs - lows
+        body_size = np.abs(closes - opens)
+        upper_wick = highs - np.maximum(opens, closes)
+        lower_wick = np.minimum(opens, closes) - lows
+        
+        # Context statistics: prior volumes/ranges and closes including
+        # the current candle, over up to ``lookback`` earlier candles
+        avg_volume = np.empty(len(idx))
+        avg_range = np.empty(len(idx))
+        trend_slope = np.empty(len(idx))
+        mean_close = np.empty(len(idx))
+        
+        # Windows of 3+ closes (lookback >= 2) are vectorized; tiny
+        # lookbacks only occur with custom settings
+        full = idx >= lookback if lookback >= 2 else np.zeros(len(idx), dtype=bool)
+        if full.any():
+            starts = idx[full] - lookback
+            prior_volumes = sliding_window_view(volumes, lookback)[starts]
+            prior_ranges = sliding_window_view(total_range, lookback)[starts]
+            context_closes = sliding_window_view(closes, lookback + 1)[starts]
+            avg_volume[full] = prior_volumes.mean(axis=1)
+            avg_range[full] = prior_ranges.mean(axis=1)
+            trend_slope[full] = _window_slopes(context_closes)
+            mean_close[full] = context_closes.mean(axis=1)
+        
+        # Candles near the start of the series have shorter context windows
+        for k in np.flatnonzero(~full):
+            i = idx[k]
+            start = max(0, i - lookback)
+            if i - start < 1:
+                # No context: neutral ratios and no trend
+                avg_volume[k] = avg_range[k] = trend_slope[k] = mean_close[k] = 0.0
+                continue
+            avg_volume[k] = np.mean(volumes[start:i])
+            avg_range[k] = np.mean(total_range[start:i])
+            if i - start < 2:
+                trend_slope[k] = mean_close[k] = 0.0
+            else:
+                trend_slope[k] = _window_slopes(closes[start:i + 1][np.newaxis])[0]
+                mean_close[k] = np.mean(closes[start:i + 1])
+        
+        table = []
+        rows = zip(
+            idx.tolist(), total_range[idx].tolist(), body_size[idx].tolist(),
+            upper_wick[idx].tolist(), lower_wick[idx].tolist(),
+            avg_volume.tolist(), avg_range.tolist(),
+            trend_slope.tolist(), mean_close.tolist()
+        )
+        for i, rng, body, upper, lower, vol_avg, rng_avg, slope, close_avg in rows:
+            candle = candles[i]
+            table.append({
+                'total_range': rng,
+                'body_size': body,
+                'upper_wick': upper,
+                'lower_wick': lower,
+                'body_ratio': body / rng if rng > 0 else 0,
+                'upper_wick_ratio': upper / body if body > 0 else float('inf'),
+                'lower_wick_ratio': lower / body if body > 0 else float('inf'),
+                'is_bullish': candle.is_bullish,
+                'is_bearish': candle.is_bearish,
+                'close_position': (candle.close - candle.low) / rng if rng > 0 else 0.5,
+                'volume_ratio': candle.volume / vol_avg if vol_avg > 0 else 1.0,
+                'range_ratio': rng / rng_avg if rng_avg > 0 else 1.0,
+                'trend_slope': slope,
+                'trend_strength': abs(slope) / close_avg if close_avg > 0 else 0,
+            })
+        
+        return table
+
     def _detect_le_candle(
         self, 
         candle: CandleData, 
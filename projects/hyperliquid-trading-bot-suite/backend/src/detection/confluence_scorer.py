@@ -292,7 +292,8 @@ class ConfluenceScorer:
         # 3. Classify market cycle
         cycle_classification = self.cycle_classifier.classify_cycle(
             candles=candles,
-            timeframe=timeframe
+            timeframe=timeframe,
+            asset=asset
         )
         analysis.cycle = cycle_classification
         analysis.market_cycle = cycle_classification.cycle
@@ -16,11 +16,29 @@ from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from collections import deque
+from functools import lru_cache
 import numpy as np
 
 from ..types import (
     CandleData, MarketCycle, Timeframe, OrderSide
 )
+from .cycle_features import (
+    CycleFeatureEngine, BODY_RATIO, BULLISH, BEARISH, WICK_RATIO, LARGE_WICK,
+    SWEEPS, REVERSALS
+)
+
+
+def _clip(value: float, lower: float, upper: float) -> float:
+    """Clamp a scalar (np.clip carries array overhead for single values)."""
+    return min(max(value, lower), upper)
+
+
+@lru_cache(maxsize=32)
+def _momentum_weights(lookback: int) -> np.ndarray:
+    """EMA-style weights for momentum, oldest candle first."""
+    weights = np.exp(np.linspace(-1, 0, lookback))
+    weights.flags.writeable = False
+    return weights
 
 
 @dataclass
@@ -159,11 +177,15 @@ class MarketCycleClassifier:
         
         # Cycle history
         self.history = CycleHistory()
+        
+        # Feature engines per (asset, timeframe) series, updated incrementally
+        self._feature_engines: Dict[Tuple[Optional[str], Optional[Timeframe]], CycleFeatureEngine] = {}
     
     def classify(
         self,
         candles: List[CandleData],
-        min_periods: int = 30
+        min_periods: int = 30,
+        features: Optional[CycleFeatureEngine] = None
     ) -> CycleClassification:
         """
         Classify current market cycle phase.
@@ -171,6 +193,8 @@ class MarketCycleClassifier:
         Args:
             candles: List of candle data in chronological order
             min_periods: Minimum number of candles required
+            features: Feature engine already synced with ``candles``
+                (built from the candles when omitted)
             
         Returns:
             CycleClassification with detailed cycle analysis
@@ -179,7 +203,7 @@ class MarketCycleClassifier:
             return self._empty_classification()
         
         # Calculate all metrics
-        metrics = self._calculate_metrics(candles)
+        metrics = self._calculate_metrics(candles, features)
         
         # Score each cycle type
         drive_score = self._score_drive_phase(metrics, candles)
@@ -238,57 +262,116 @@ class MarketCycleClassifier:
         
         return classification
     
-    def _calculate_metrics(self, candles: List[CandleData]) -> CycleMetrics:
+    def classify_cycle(
+        self,
+        candles: List[CandleData],
+        timeframe: Optional[Timeframe] = None,
+        asset: Optional[str] = None,
+        min_periods: int = 30
+    ) -> CycleClassification:
+        """
+        Classify a series that is re-classified as new candles arrive.
+        
+        Keeps one feature engine per (asset, timeframe), so when the series
+        has only gained or updated its newest candles, only those candles
+        are processed before classification.
+        
+        Args:
+            candles: List of candle data in chronological order
+            timeframe: Timeframe of the series
+            asset: Asset symbol of the series
+            min_periods: Minimum number of candles required
+            
+        Returns:
+            CycleClassification with detailed cycle analysis
+        """
+        key = (asset, timeframe)
+        window = self._feature_window()
+        
+        engine = self._feature_engines.get(key)
+        if engine is None or engine.window != window:
+            engine = CycleFeatureEngine(window)
+            self._feature_engines[key] = engine
+        engine.sync(candles)
+        
+        return self.classify(candles, min_periods=min_periods, features=engine)
+    
+    def _feature_window(self) -> int:
+        """Number of candles the metrics look back over."""
+        return max(
+            self.momentum_lookback,
+            20,  # momentum acceleration compares two 10-candle windows
+            self.volatility_lookback * 2,
+            self.structure_lookback,
+            self.liquidity_lookback
+        )
+    
+    def _calculate_metrics(
+        self,
+        candles: List[CandleData],
+        features: Optional[CycleFeatureEngine] = None
+    ) -> CycleMetrics:
         """Calculate comprehensive cycle metrics."""
+        if features is None:
+            features = CycleFeatureEngine.from_candles(candles, self._feature_window())
+        
         metrics = CycleMetrics()
         
         # Momentum metrics
-        metrics.momentum_score = self._calculate_momentum(candles, self.momentum_lookback)
-        metrics.momentum_acceleration = self._calculate_momentum_acceleration(candles)
-        metrics.directional_strength = self._calculate_directional_strength(candles)
+        metrics.momentum_score = self._calculate_momentum(features, self.momentum_lookback)
+        metrics.momentum_acceleration = self._calculate_momentum_acceleration(features)
+        metrics.directional_strength = self._calculate_directional_strength(features)
         
         # Volatility metrics
-        metrics.normalized_volatility = self._calculate_normalized_volatility(candles)
-        metrics.volatility_trend = self._calculate_volatility_trend(candles)
-        metrics.price_dispersion = self._calculate_price_dispersion(candles)
+        metrics.normalized_volatility = self._calculate_normalized_volatility(features)
+        metrics.volatility_trend = self._calculate_volatility_trend(features)
+        metrics.price_dispersion = self._calculate_price_dispersion(features)
         
         # Structure metrics
-        structure_data = self._analyze_structure(candles)
+        structure_data = self._analyze_structure(features)
         metrics.higher_highs_count = structure_data['higher_highs']
         metrics.lower_lows_count = structure_data['lower_lows']
         metrics.structure_breaks = structure_data['breaks']
         metrics.false_break_count = structure_data['false_breaks']
         
         # Liquidity metrics
-        liquidity_data = self._analyze_liquidity_events(candles)
+        liquidity_data = self._analyze_liquidity_events(features)
         metrics.wick_dominance = liquidity_data['wick_dominance']
         metrics.large_wick_count = liquidity_data['large_wicks']
         metrics.sweep_count = liquidity_data['sweeps']
         metrics.reversal_candle_count = liquidity_data['reversals']
         
         # Range metrics
-        range_data = self._analyze_range_behavior(candles)
+        range_data = self._analyze_range_behavior(features)
         metrics.price_oscillations = range_data['oscillations']
         metrics.mean_reversion_strength = range_data['mean_reversion']
         metrics.range_tightness = range_data['tightness']
         
         # Volume metrics
-        volume_data = self._analyze_volume(candles)
+        volume_data = self._analyze_volume(features)
         metrics.volume_trend = volume_data['trend']
         metrics.volume_spikes = volume_data['spikes']
         
         return metrics
     
-    def _calculate_momentum(self, candles: List[CandleData], lookback: int) -> float:
-        """Calculate momentum score (-1.0 to 1.0)."""
-        if len(candles) < lookback:
+    def _calculate_momentum(
+        self,
+        features: CycleFeatureEngine,
+        lookback: int,
+        offset: int = 0
+    ) -> float:
+        """Calculate momentum score (-1.0 to 1.0).
+        
+        ``offset`` skips the newest candles, e.g. to measure older momentum.
+        """
+        if len(features) - offset < lookback:
             return 0.0
         
-        recent = candles[-lookback:]
+        closes = features.closes(lookback, offset)
         
         # Calculate price rate of change
-        start_price = recent[0].close
-        end_price = recent[-1].close
+        start_price = closes[0]
+        end_price = closes[-1]
         
         if start_price == 0:
             return 0.0
@@ -296,81 +379,58 @@ class MarketCycleClassifier:
         roc = (end_price - start_price) / start_price
         
         # Normalize to -1 to 1 (assume 5% move = max momentum)
-        normalized = np.clip(roc / 0.05, -1.0, 1.0)
-        
-        # Apply EMA weighting (more recent candles = higher weight)
-        weights = np.exp(np.linspace(-1, 0, len(recent)))
-        weighted_changes = []
-        
-        for i in range(1, len(recent)):
-            change = (recent[i].close - recent[i-1].close) / recent[i-1].close
-            weighted_changes.append(change * weights[i])
+        normalized = _clip(roc / 0.05, -1.0, 1.0)
         
-        if weighted_changes:
-            weighted_momentum = np.sum(weighted_changes) / 0.05
+        if lookback > 1:
+            # Apply EMA weighting (more recent candles = higher weight)
+            weights = _momentum_weights(lookback)
+            changes = features.returns(lookback, offset)[1:]
+            weighted_momentum = np.dot(changes, weights[1:]) / 0.05
             # Blend raw and weighted momentum
-            return (normalized * 0.4 + np.clip(weighted_momentum, -1.0, 1.0) * 0.6)
+            return (normalized * 0.4 + _clip(weighted_momentum, -1.0, 1.0) * 0.6)
         
         return normalized
     
-    def _calculate_momentum_acceleration(self, candles: List[CandleData]) -> float:
+    def _calculate_momentum_acceleration(self, features: CycleFeatureEngine) -> float:
         """Calculate rate of change of momentum."""
-        if len(candles) < 20:
+        if len(features) < 20:
             return 0.0
         
         # Calculate momentum at two different points
-        recent_momentum = self._calculate_momentum(candles[-10:], 10)
-        older_momentum = self._calculate_momentum(candles[-20:-10], 10)
+        recent_momentum = self._calculate_momentum(features, 10)
+        older_momentum = self._calculate_momentum(features, 10, offset=10)
         
         # Acceleration is the difference
         return recent_momentum - older_momentum
     
-    def _calculate_directional_strength(self, candles: List[CandleData]) -> float:
+    def _calculate_directional_strength(self, features: CycleFeatureEngine) -> float:
         """Calculate directional strength (0.0 to 1.0)."""
-        if len(candles) < self.momentum_lookback:
+        lookback = self.momentum_lookback
+        if len(features) < lookback or lookback == 0:
             return 0.0
         
-        recent = candles[-self.momentum_lookback:]
-        
         # Count directional candles
-        bullish = sum(1 for c in recent if c.is_bullish)
-        bearish = sum(1 for c in recent if c.is_bearish)
-        total = len(recent)
+        bullish = int(features.column(BULLISH, lookback).sum())
+        bearish = int(features.column(BEARISH, lookback).sum())
         
         # Directional consistency
-        consistency = max(bullish, bearish) / total if total > 0 else 0.0
+        consistency = max(bullish, bearish) / lookback
         
         # Average body size (indicates conviction)
-        avg_body_ratio = np.mean([
-            c.body_size / c.total_range if c.total_range > 0 else 0.0
-            for c in recent
-        ])
+        avg_body_ratio = features.column(BODY_RATIO, lookback).mean()
         
         # Combine metrics
         return (consistency * 0.6 + avg_body_ratio * 0.4)
     
-    def _calculate_normalized_volatility(self, candles: List[CandleData]) -> float:
+    def _calculate_normalized_volatility(self, features: CycleFeatureEngine) -> float:
         """Calculate normalized volatility (0.0 to 1.0)."""
-        if len(candles) < self.volatility_lookback:
-            return 0.0
-        
-        recent = candles[-self.volatility_lookback:]
-        
-        # Calculate ATR (Average True Range)
-        true_ranges = []
-        for i in range(1, len(recent)):
-            tr = max(
-                recent[i].high - recent[i].low,
-                abs(recent[i].high - recent[i-1].close),
-                abs(recent[i].low - recent[i-1].close)
-            )
-            true_ranges.append(tr)
-        
-        if not true_ranges:
+        lookback = self.volatility_lookback
+        if len(features) < lookback or lookback < 2:
             return 0.0
         
-        atr = np.mean(true_ranges)
-        avg_price = np.mean([c.close for c in recent])
+        # ATR (Average True Range) against the average close
+        atr = features.atr(lookback)
+        avg_price = features.closes(lookback).mean()
         
         if avg_price == 0:
             return 0.0
@@ -379,25 +439,17 @@ class MarketCycleClassifier:
         normalized_atr = (atr / avg_price) * 100  # As percentage
         
         # Scale to 0-1 (assume 2% ATR = high volatility)
-        return np.clip(normalized_atr / 2.0, 0.0, 1.0)
+        return _clip(normalized_atr / 2.0, 0.0, 1.0)
     
-    def _calculate_volatility_trend(self, candles: List[CandleData]) -> float:
+    def _calculate_volatility_trend(self, features: CycleFeatureEngine) -> float:
         """Calculate if volatility is increasing or decreasing."""
-        if len(candles) < self.volatility_lookback * 2:
+        lookback = self.volatility_lookback
+        if len(features) < lookback * 2 or lookback == 0:
             return 0.0
         
-        # Split into two periods
-        mid_point = len(candles) - self.volatility_lookback
-        older_period = candles[mid_point - self.volatility_lookback:mid_point]
-        recent_period = candles[-self.volatility_lookback:]
-        
-        # Calculate volatility for each period
-        def period_volatility(period):
-            ranges = [c.total_range for c in period]
-            return np.std(ranges) if ranges else 0.0
-        
-        older_vol = period_volatility(older_period)
-        recent_vol = period_volatility(recent_period)
+        # Range volatility of the latest period and the one before it
+        older_vol = features.range_volatility(lookback, offset=lookback)
+        recent_vol = features.range_volatility(lookback)
         
         if older_vol == 0:
             return 0.0
@@ -405,29 +457,21 @@ class MarketCycleClassifier:
         # Return rate of change
         return (recent_vol - older_vol) / older_vol
     
-    def _calculate_price_dispersion(self, candles: List[CandleData]) -> float:
+    def _calculate_price_dispersion(self, features: CycleFeatureEngine) -> float:
         """Calculate how dispersed prices are from the mean."""
-        if len(candles) < self.volatility_lookback:
-            return 0.0
-        
-        recent = candles[-self.volatility_lookback:]
-        closes = [c.close for c in recent]
-        
-        mean_price = np.mean(closes)
-        std_price = np.std(closes)
-        
-        if mean_price == 0:
+        if len(features) < self.volatility_lookback or self.volatility_lookback == 0:
             return 0.0
         
         # Coefficient of variation
-        cv = (std_price / mean_price) * 100
+        cv = features.dispersion(self.volatility_lookback)
         
         # Normalize to 0-1
-        return np.clip(cv / 2.0, 0.0, 1.0)
+        return _clip(cv / 2.0, 0.0, 1.0)
     
-    def _analyze_structure(self, candles: List[CandleData]) -> Dict[str, int]:
+    def _analyze_structure(self, features: CycleFeatureEngine) -> Dict[str, int]:
         """Analyze market structure for HH/LL and breaks."""
-        if len(candles) < self.structure_lookback:
+        lookback = self.structure_lookback
+        if len(features) < lookback:
             return {
                 'higher_highs': 0,
                 'lower_lows': 0,
@@ -435,53 +479,43 @@ class MarketCycleClassifier:
                 'false_breaks': 0
             }
         
-        recent = candles[-self.structure_lookback:]
-        
-        # Simple swing detection (3-candle pattern)
-        swing_highs = []
-        swing_lows = []
-        
-        for i in range(2, len(recent) - 2):
-            # Swing high: higher than 2 candles on each side
-            if (recent[i].high > recent[i-1].high and 
-                recent[i].high > recent[i-2].high and
-                recent[i].high > recent[i+1].high and 
-                recent[i].high > recent[i+2].high):
-                swing_highs.append((i, recent[i].high))
-            
-            # Swing low: lower than 2 candles on each side
-            if (recent[i].low < recent[i-1].low and 
-                recent[i].low < recent[i-2].low and
-                recent[i].low < recent[i+1].low and 
-                recent[i].low < recent[i+2].low):
-                swing_lows.append((i, recent[i].low))
+        highs = features.highs(lookback)
+        lows = features.lows(lookback)
+        closes = features.closes(lookback)
+        
+        # Simple swing detection: higher/lower than 2 candles on each side
+        swing_high_idx = np.empty(0, dtype=int)
+        swing_low_idx = np.empty(0, dtype=int)
+        if lookback > 4:
+            mid = slice(2, lookback - 2)
+            is_swing_high = np.ones(lookback - 4, dtype=bool)
+            is_swing_low = np.ones(lookback - 4, dtype=bool)
+            for shift in (-2, -1, 1, 2):
+                neighbour = slice(2 + shift, lookback - 2 + shift)
+                is_swing_high &= highs[mid] > highs[neighbour]
+                is_swing_low &= lows[mid] < lows[neighbour]
+            swing_high_idx = np.flatnonzero(is_swing_high) + 2
+            swing_low_idx = np.flatnonzero(is_swing_low) + 2
+        
+        swing_highs = highs[swing_high_idx]
+        swing_lows = lows[swing_low_idx]
         
         # Count higher highs and lower lows
-        higher_highs = 0
-        for i in range(1, len(swing_highs)):
-            if swing_highs[i][1] > swing_highs[i-1][1]:
-                higher_highs += 1
-        
-        lower_lows = 0
-        for i in range(1, len(swing_lows)):
-            if swing_lows[i][1] < swing_lows[i-1][1]:
-                lower_lows += 1
+        higher_highs = int(np.count_nonzero(swing_highs[1:] > swing_highs[:-1]))
+        lower_lows = int(np.count_nonzero(swing_lows[1:] < swing_lows[:-1]))
         
         # Count structure breaks (price breaking significant levels)
         breaks = 0
         false_breaks = 0
         
-        if swing_highs:
-            for idx, high in swing_highs[:-1]:  # Don't include most recent
-                # Check if broken by subsequent candles
-                for future_candle in recent[idx+1:]:
-                    if future_candle.close > high:
-                        breaks += 1
-                        # Check if it was false break (reversed quickly)
-                        next_candles = recent[idx+2:idx+7] if idx+7 < len(recent) else recent[idx+2:]
-                        if any(c.close < high for c in next_candles):
-                            false_breaks += 1
-                        break
+        close_list = closes.tolist()
+        for idx, high in zip(swing_high_idx[:-1].tolist(), swing_highs[:-1].tolist()):  # Don't include most recent
+            # Check if broken by subsequent candles
+            if any(close > high for close in close_list[idx + 1:]):
+                breaks += 1
+                # Check if it was false break (reversed quickly)
+                if any(close < high for close in close_list[idx + 2:idx + 7]):
+                    false_breaks += 1
         
         return {
             'higher_highs': higher_highs,
@@ -490,9 +524,10 @@ class MarketCycleClassifier:
             'false_breaks': false_breaks
         }
     
-    def _analyze_liquidity_events(self, candles: List[CandleData]) -> Dict[str, Any]:
+    def _analyze_liquidity_events(self, features: CycleFeatureEngine) -> Dict[str, Any]:
         """Analyze liquidity events (wicks, sweeps, reversals)."""
-        if len(candles) < self.liquidity_lookback:
+        lookback = self.liquidity_lookback
+        if len(features) < lookback or lookback == 0:
             return {
                 'wick_dominance': 0.0,
                 'large_wicks': 0,
@@ -500,60 +535,16 @@ class MarketCycleClassifier:
                 'reversals': 0
             }
         
-        recent = candles[-self.liquidity_lookback:]
+        # Wick dominance and large wicks (wick > 50% of range)
+        wick_dominance = float(features.column(WICK_RATIO, lookback).sum()) / lookback
+        large_wick_count = int(features.column(LARGE_WICK, lookback).sum())
         
-        # Calculate wick dominance
-        total_wick_ratio = 0.0
-        large_wick_count = 0
+        # Sweeps: candle wicks beyond the previous two candles' high/low
+        # then closes back. The first two candles have no in-window reference.
+        sweep_count = int(features.column(SWEEPS, lookback)[2:].sum())
         
-        for candle in recent:
-            if candle.total_range > 0:
-                wick_ratio = (candle.upper_wick + candle.lower_wick) / candle.total_range
-                total_wick_ratio += wick_ratio
-                
-                # Large wick = wick > 50% of range
-                if max(candle.upper_wick, candle.lower_wick) / candle.total_range > 0.5:
-                    large_wick_count += 1
-        
-        wick_dominance = total_wick_ratio / len(recent) if recent else 0.0
-        
-        # Detect sweeps (candle wicks beyond previous high/low then closes back)
-        sweep_count = 0
-        
-        for i in range(2, len(recent)):
-            current = recent[i]
-            prev_high = max(recent[i-1].high, recent[i-2].high)
-            prev_low = min(recent[i-1].low, recent[i-2].low)
-            
-            # Bullish sweep: wicks below previous low but closes above
-            if current.low < prev_low and current.close > prev_low:
-                sweep_count += 1
-            
-            # Bearish sweep: wicks above previous high but closes below
-            if current.high > prev_high and current.close < prev_high:
-                sweep_count += 1
-        
-        # Count reversal candles (large wicks + opposite body)
-        reversal_count = 0
-        
-        for i in range(1, len(recent)):
-            current = recent[i]
-            prev = recent[i-1]
-            
-            if current.total_range == 0:
-                continue
-            
-            # Bullish reversal: bearish trend, large lower wick, bullish close
-            if (prev.is_bearish and 
-                current.lower_wick / current.total_range > 0.5 and 
-                current.is_bullish):
-                reversal_count += 1
-            
-            # Bearish reversal: bullish trend, large upper wick, bearish close
-            if (prev.is_bullish and 
-                current.upper_wick / current.total_range > 0.5 and 
-                current.is_bearish):
-                reversal_count += 1
+        # Reversal candles (large wick against the previous candle's body)
+        reversal_count = int(features.column(REVERSALS, lookback)[1:].sum())
         
         return {
             'wick_dominance': wick_dominance,
@@ -562,41 +553,31 @@ class MarketCycleClassifier:
             'reversals': reversal_count
         }
     
-    def _analyze_range_behavior(self, candles: List[CandleData]) -> Dict[str, Any]:
+    def _analyze_range_behavior(self, features: CycleFeatureEngine) -> Dict[str, Any]:
         """Analyze range-bound behavior characteristics."""
-        if len(candles) < self.volatility_lookback:
+        if len(features) < self.volatility_lookback or self.volatility_lookback == 0:
             return {
                 'oscillations': 0,
                 'mean_reversion': 0.0,
                 'tightness': 0.0
             }
         
-        recent = candles[-self.volatility_lookback:]
-        closes = np.array([c.close for c in recent])
+        closes = features.closes(self.volatility_lookback)
         
         # Calculate mean price
-        mean_price = np.mean(closes)
+        mean_price = closes.mean()
         
-        # Count oscillations around mean
-        oscillations = 0
-        for i in range(1, len(closes)):
-            # Price crosses mean
-            if (closes[i-1] < mean_price <= closes[i]) or (closes[i-1] > mean_price >= closes[i]):
-                oscillations += 1
+        # Count oscillations around mean (price crosses mean)
+        prev, cur = closes[:-1], closes[1:]
+        crosses = ((prev < mean_price) & (mean_price <= cur)) | ((prev > mean_price) & (mean_price >= cur))
+        oscillations = int(np.count_nonzero(crosses))
         
         # Calculate mean reversion strength
-        # (how often price returns to mean after deviation)
+        # (how often price moves back toward the mean without crossing it)
         deviations = closes - mean_price
-        mean_reversion_events = 0
-        
-        for i in range(1, len(deviations) - 1):
-            # If price deviates then moves back toward mean
-            if abs(deviations[i]) > abs(deviations[i+1]):
-                if (deviations[i] > 0 and deviations[i+1] >= 0) or \
-                   (deviations[i] < 0 and deviations[i+1] <= 0):
-                    mean_reversion_events += 1
-        
-        mean_reversion_strength = mean_reversion_events / len(deviations) if len(deviations) > 0 else 0.0
+        dev, nxt = deviations[1:-1], deviations[2:]
+        reverting = (np.abs(dev) > np.abs(nxt)) & (((dev > 0) & (nxt >= 0)) | ((dev < 0) & (nxt <= 0)))
+        mean_reversion_strength = int(np.count_nonzero(reverting)) / len(deviations)
         
         # Calculate range tightness
         price_range = np.max(closes) - np.min(closes)
@@ -613,32 +594,21 @@ class MarketCycleClassifier:
             'tightness': tightness
         }
     
-    def _analyze_volume(self, candles: List[CandleData]) -> Dict[str, Any]:
+    def _analyze_volume(self, features: CycleFeatureEngine) -> Dict[str, Any]:
         """Analyze volume characteristics."""
-        if len(candles) < self.volatility_lookback:
+        lookback = self.volatility_lookback
+        if len(features) < lookback or lookback == 0:
             return {
                 'trend': 0.0,
                 'spikes': 0
             }
         
-        recent = candles[-self.volatility_lookback:]
-        volumes = np.array([c.volume for c in recent])
-        
-        if len(volumes) == 0:
-            return {'trend': 0.0, 'spikes': 0}
-        
-        # Calculate volume trend using linear regression slope
-        x = np.arange(len(volumes))
-        if len(x) > 1:
-            slope = np.polyfit(x, volumes, 1)[0]
-            avg_volume = np.mean(volumes)
-            volume_trend = slope / avg_volume if avg_volume > 0 else 0.0
-        else:
-            volume_trend = 0.0
+        # Volume trend: regression slope relative to average volume
+        avg_volume = features.volumes(lookback).mean()
+        volume_trend = features.volume_slope(lookback) / avg_volume if avg_volume > 0 else 0.0
         
         # Count volume spikes (>2x average)
-        avg_volume = np.mean(volumes)
-        spike_count = np.sum(volumes > avg_volume * 2.0)
+        spike_count = np.count_nonzero(features.volume_ratios(lookback) > 2.0)
         
         return {
             'trend': float(volume_trend),
@@ -0,0 +1,390 @@
+"""
+Cycle Feature Engine
+
+Shared NumPy feature store for market cycle classification. Per-candle
+features (returns, true range, body/wick ratios, sweep and reversal flags)
+are derived once when a candle enters the engine; window statistics (ATR,
+rolling volatility, price dispersion, volume ratios) are computed as
+vectorized reductions over the newest rows.
+
+Appending a candle derives only that candle's row, so re-classifying a
+series after each new bar costs O(window) NumPy work instead of several
+Python passes over the whole candle list.
+
+Author: Hyperliquid Trading Bot Suite
+"""
+
+from typing import Optional, Sequence
+from datetime import datetime
+from collections import deque
+import numpy as np
+
+from ..types import CandleData
+
+
+# Raw columns
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+# Per-candle derived columns
+RETURN = 5        # close-to-close rate of change vs previous candle
+TRUE_RANGE = 6    # max(high - low, |high - prev close|, |low - prev close|)
+RANGE = 7         # high - low
+BODY_RATIO = 8    # body / range (0 for zero-range candles)
+WICK_RATIO = 9    # (upper + lower wick) / range (0 for zero-range candles)
+LARGE_WICK = 10   # 1 if the larger wick exceeds half the range
+SWEEPS = 11       # sweeps of the previous two candles' high/low (0-2)
+REVERSALS = 12    # 1 if the candle reverses the previous candle with a large wick
+BULLISH = 13
+BEARISH = 14
+
+_N_COLUMNS = 15
+
+
+def _std(values: np.ndarray) -> float:
+    """Population standard deviation without np.std's per-call overhead."""
+    if not len(values):
+        return 0.0
+    deviations = values - values.mean()
+    return float(np.sqrt(np.dot(deviations, deviations) / len(values)))
+
+
+class CycleFeatureEngine:
+    """
+    Rolling per-candle feature buffer for one candle series.
+
+    Holds the newest ``window`` candles. Rows are stored in a buffer with
+    spare capacity so appends are amortized O(1): when the buffer fills,
+    the newest rows are compacted to the front in a single copy.
+    """
+
+    def __init__(self, window: int = 64):
+        """
+        Initialize an empty engine.
+
+        Args:
+            window: Number of newest candles kept for window statistics
+        """
+        if window < 3:
+            raise ValueError("window must be at least 3 candles")
+
+        self.window = window
+        self._data = np.zeros((window * 2, _N_COLUMNS))
+        self._end = 0  # one past the newest row
+        self._count = 0  # candles ever ingested (bounded by window for len())
+        self._timestamps: deque = deque(maxlen=window)
+
+    @classmethod
+    def from_candles(cls, candles: Sequence[CandleData], window: int = 64) -> "CycleFeatureEngine":
+        """Build an engine from the newest ``window`` candles of a series."""
+        engine = cls(window)
+        engine.extend(candles[-window:])
+        return engine
+
+    def __len__(self) -> int:
+        """Number of candles currently held (at most ``window``)."""
+        return min(self._count, self.window)
+
+    @property
+    def last_timestamp(self) -> Optional[datetime]:
+        """Timestamp of the newest candle, or None when empty."""
+        return self._timestamps[-1] if self._timestamps else None
+
+    def append(self, candle: CandleData):
+        """Append one candle, deriving only its feature row."""
+        self.extend([candle])
+
+    def extend(self, candles: Sequence[CandleData]):
+        """Append candles in chronological order."""
+        if not candles:
+            return
+
+        if len(candles) >= self.window:
+            # Everything held now would be evicted anyway
+            self._reset()
+            candles = candles[-self.window:]
+        self._reserve(len(candles))
+
+        start = self._end
+        stop = start + len(candles)
+        self._data[start:stop, :VOLUME + 1] = [
+            (c.open, c.high, c.low, c.close, c.volume) for c in candles
+        ]
+        self._end = stop
+        self._count += len(candles)
+        self._timestamps.extend(c.timestamp for c in candles)
+        if stop - start == 1:
+            self._derive_row(start)
+        else:
+            self._derive(start, stop)
+
+    def replace_last(self, candle: CandleData):
+        """Replace the newest candle, e.g. when a forming bar updates."""
+        if not self._timestamps:
+            raise ValueError("no candle to replace")
+
+        self._end -= 1
+        self._count -= 1
+        self._timestamps.pop()
+        self.extend([candle])
+
+    def sync(self, candles: Sequence[CandleData]) -> bool:
+        """
+        Bring the engine in line with a candle series.
+
+        If the series continues what the engine already holds (same
+        newest candle, possibly updated, plus any newer candles), only the
+        difference is ingested. Otherwise the engine is rebuilt.
+
+        Args:
+            candles: Full candle series in chronological order
+
+        Returns:
+            True if the update was incremental, False if rebuilt
+        """
+        position = self._find_overlap(candles)
+        if position is None:
+            self._reset()
+            self.extend(candles)
+            return False
+
+        if not self._row_matches(self._end - 1, candles[position]):
+            self.replace_last(candles[position])
+        self.extend(candles[position + 1:])
+        return True
+
+    # ------------------------------------------------------------------
+    # Window accessors
+    # ------------------------------------------------------------------
+
+    def column(self, column: int, lookback: int, offset: int = 0) -> np.ndarray:
+        """
+        View of one feature column over a window of candles.
+
+        Args:
+            column: Column index (e.g. ``CLOSE``, ``TRUE_RANGE``)
+            lookback: Number of candles in the window
+            offset: How many of the newest candles to skip
+
+        Returns:
+            View of ``lookback`` values, oldest first (do not modify)
+        """
+        stop = self._end - offset
+        return self._data[stop - lookback:stop, column]
+
+    def closes(self, lookback: int, offset: int = 0) -> np.ndarray:
+        return self.column(CLOSE, lookback, offset)
+
+    def highs(self, lookback: int, offset: int = 0) -> np.ndarray:
+        return self.column(HIGH, lookback, offset)
+
+    def lows(self, lookback: int, offset: int = 0) -> np.ndarray:
+        return self.column(LOW, lookback, offset)
+
+    def volumes(self, lookback: int, offset: int = 0) -> np.ndarray:
+        return self.column(VOLUME, lookback, offset)
+
+    def returns(self, lookback: int, offset: int = 0) -> np.ndarray:
+        """Close-to-close returns; the first value depends on an older candle."""
+        return self.column(RETURN, lookback, offset)
+
+    # ------------------------------------------------------------------
+    # Window statistics
+    # ------------------------------------------------------------------
+
+    def atr(self, lookback: int) -> float:
+        """Average true range over the window (first candle excluded)."""
+        true_ranges = self.column(TRUE_RANGE, lookback)[1:]
+        return true_ranges.mean() if len(true_ranges) else 0.0
+
+    def range_volatility(self, lookback: int, offset: int = 0) -> float:
+        """Standard deviation of candle ranges over the window."""
+        return _std(self.column(RANGE, lookback, offset))
+
+    def dispersion(self, lookback: int) -> float:
+        """Coefficient of variation of closes over the window, in percent."""
+        closes = self.closes(lookback)
+        mean_price = closes.mean()
+        if mean_price == 0:
+            return 0.0
+        return (_std(closes) / mean_price) * 100
+
+    def volume_ratios(self, lookback: int) -> np.ndarray:
+        """Each volume divided by the window's average volume."""
+        volumes = self.volumes(lookback)
+        avg_volume = volumes.mean()
+        if avg_volume <= 0:
+            return np.zeros(len(volumes))
+        return volumes / avg_volume
+
+    def volume_slope(self, lookback: int) -> float:
+        """Least-squares slope of volume per candle over the window."""
+        volumes = self.volumes(lookback)
+        n = len(volumes)
+        if n < 2:
+            return 0.0
+        x = np.arange(n) - (n - 1) / 2.0
+        return float(np.dot(x, volumes) / np.dot(x, x))
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _reset(self):
+        self._end = 0
+        self._count = 0
+        self._timestamps.clear()
+
+    def _reserve(self, rows: int):
+        """Make room for ``rows`` appended rows, compacting if needed."""
+        if self._end + rows <= len(self._data):
+            return
+
+        # Keep two extra rows so retained candles keep their predecessors
+        keep = min(self._end, self.window - rows + 2)
+        if keep > 0:
+            self._data[:keep] = self._data[self._end - keep:self._end]
+        self._end = max(keep, 0)
+
+    def _derive(self, start: int, stop: int):
+        """Compute derived columns for rows ``start:stop`` in one pass."""
+        data = self._data
+        rows = data[start:stop]
+        opens, highs, lows, closes = rows[:, OPEN], rows[:, HIGH], rows[:, LOW], rows[:, CLOSE]
+
+        total_range = highs - lows
+        has_range = total_range > 0
+        safe_range = np.where(has_range, total_range, 1.0)
+        upper_wick_ratio = (highs - np.maximum(opens, closes)) / safe_range
+        lower_wick_ratio = (np.minimum(opens, closes) - lows) / safe_range
+        bullish = closes > opens
+        bearish = closes < opens
+
+        rows[:, RANGE] = total_range
+        rows[:, BODY_RATIO] = np.where(has_range, np.abs(closes - opens) / safe_range, 0.0)
+        rows[:, WICK_RATIO] = np.where(
+            has_range,
+            ((highs - np.maximum(opens, closes)) + (np.minimum(opens, closes) - lows)) / safe_range,
+            0.0
+        )
+        rows[:, LARGE_WICK] = has_range & (np.maximum(upper_wick_ratio, lower_wick_ratio) > 0.5)
+        rows[:, BULLISH] = bullish
+        rows[:, BEARISH] = bearish
+
+        # Features relative to earlier candles. Rows without enough history
+        # get NaN/0; window statistics never read them.
+        rows[:, RETURN] = np.nan
+        rows[:, TRUE_RANGE] = np.nan
+        rows[:, REVERSALS] = 0.0
+        rows[:, SWEEPS] = 0.0
+
+        first = max(start, 1)
+        if first < stop:
+            skip = first - start
+            prev = data[first - 1:stop - 1]
+            prev_close = prev[:, CLOSE]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rows[skip:, RETURN] = (closes[skip:] - prev_close) / prev_close
+            rows[skip:, TRUE_RANGE] = np.maximum(
+                np.maximum(total_range[skip:], np.abs(highs[skip:] - prev_close)),
+                np.abs(lows[skip:] - prev_close)
+            )
+            rows[skip:, REVERSALS] = has_range[skip:] & (
+                ((prev[:, BEARISH] > 0) & (lower_wick_ratio[skip:] > 0.5) & bullish[skip:]) |
+                ((prev[:, BULLISH] > 0) & (upper_wick_ratio[skip:] > 0.5) & bearish[skip:])
+            )
+
+        first = max(start, 2)
+        if first < stop:
+            skip = first - start
+            prev_high = np.maximum(data[first - 1:stop - 1, HIGH], data[first - 2:stop - 2, HIGH])
+            prev_low = np.minimum(data[first - 1:stop - 1, LOW], data[first - 2:stop - 2, LOW])
+            bullish_sweep = (lows[skip:] < prev_low) & (closes[skip:] > prev_low)
+            bearish_sweep = (highs[skip:] > prev_high) & (closes[skip:] < prev_high)
+            rows[skip:, SWEEPS] = bullish_sweep.astype(float) + bearish_sweep
+
+    def _derive_row(self, row: int):
+        """Scalar equivalent of ``_derive`` for a single appended row.
+        
+        Per-call NumPy overhead dominates for one row, so the same formulas
+        are evaluated on Python floats; results are bit-identical.
+        """
+        data = self._data
+        o, h, l, c = (float(v) for v in data[row, :CLOSE + 1])
+        total_range = h - l
+        upper_wick = h - max(o, c)
+        lower_wick = min(o, c) - l
+        bullish = c > o
+        bearish = c < o
+
+        values = [0.0] * (_N_COLUMNS - RETURN)
+        values[RANGE - RETURN] = total_range
+        values[BULLISH - RETURN] = bullish
+        values[BEARISH - RETURN] = bearish
+        if total_range > 0:
+            upper_ratio = upper_wick / total_range
+            lower_ratio = lower_wick / total_range
+            values[BODY_RATIO - RETURN] = abs(c - o) / total_range
+            values[WICK_RATIO - RETURN] = (upper_wick + lower_wick) / total_range
+            values[LARGE_WICK - RETURN] = max(upper_ratio, lower_ratio) > 0.5
+        else:
+            upper_ratio = lower_ratio = 0.0
+
+        values[RETURN - RETURN] = np.nan
+        values[TRUE_RANGE - RETURN] = np.nan
+        if row >= 1:
+            prev = data[row - 1]
+            prev_close = float(prev[CLOSE])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values[RETURN - RETURN] = np.float64(c - prev_close) / prev_close
+            values[TRUE_RANGE - RETURN] = max(total_range, abs(h - prev_close), abs(l - prev_close))
+            values[REVERSALS - RETURN] = total_range > 0 and (
+                (prev[BEARISH] > 0 and lower_ratio > 0.5 and bullish) or
+                (prev[BULLISH] > 0 and upper_ratio > 0.5 and bearish)
+            )
+
+        if row >= 2:
+            prev_high = float(max(data[row - 1, HIGH], data[row - 2, HIGH]))
+            prev_low = float(min(data[row - 1, LOW], data[row - 2, LOW]))
+            values[SWEEPS - RETURN] = (
+                int(l < prev_low and c > prev_low) + int(h > prev_high and c < prev_high)
+            )
+
+        data[row, RETURN:] = values
+
+    def _row_matches(self, row: int, candle: CandleData) -> bool:
+        values = self._data[row, :VOLUME + 1]
+        return (
+            values[OPEN] == candle.open and values[HIGH] == candle.high and
+            values[LOW] == candle.low and values[CLOSE] == candle.close and
+            values[VOLUME] == candle.volume
+        )
+
+    def _find_overlap(self, candles: Sequence[CandleData]) -> Optional[int]:
+        """Index in ``candles`` of the engine's newest candle, if it continues."""
+        size = len(self)
+        if not size or not candles:
+            return None
+
+        last_timestamp = self._timestamps[-1]
+        # The series must be at least as long as what we hold, and can only
+        # add up to a window's worth of candles before a rebuild is cheaper.
+        lowest = max(size - 1, len(candles) - 1 - self.window)
+        for position in range(len(candles) - 1, lowest - 1, -1):
+            timestamp = candles[position].timestamp
+            if timestamp == last_timestamp:
+                break
+            if timestamp < last_timestamp:
+                return None
+        else:
+            return None
+
+        # Guard against a different series sharing timestamps (another asset)
+        if size > 1 and (
+            candles[position - 1].timestamp != self._timestamps[-2] or
+            not self._row_matches(self._end - 2, candles[position - 1])
+        ):
+            return None
+
+        return position
+
+
+__all__ = ["CycleFeatureEngine"]
@@ -0,0 +1,221 @@
+"""Perceptual hash index for video frame deduplication.
+
+Frames are compared by the Hamming distance between their 64-bit perceptual
+hashes. A BK-tree organises hashes by their distance to each node, so a radius
+query only descends into the children whose edge distance lies within
+``[d - radius, d + radius]`` (triangle inequality) instead of scanning every
+previously seen hash.
+"""
+
+import json
+import logging
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two integer hashes."""
+    return (a ^ b).bit_count()
+
+
+class _Node:
+    """Single BK-tree node."""
+
+    __slots__ = ("hash_value", "source_id", "children")
+
+    def __init__(self, hash_value: int, source_id: Optional[str]):
+        self.hash_value = hash_value
+        self.source_id = source_id
+        self.children: Dict[int, "_Node"] = {}
+
+
+class PerceptualHashIndex:
+    """BK-tree over integer perceptual hashes supporting Hamming radius queries.
+
+    Each entry optionally carries a ``source_id`` (e.g. the video it came from)
+    so callers can ignore matches originating from a particular source.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, hash_value: int, source_id: Optional[str] = None) -> None:
+        """Insert a hash into the index.
+
+        Args:
+            hash_value: Perceptual hash as an integer
+            source_id: Optional identifier of the hash's origin
+        """
+        if self._root is None:
+            self._root = _Node(hash_value, source_id)
+            self._size = 1
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(hash_value, node.hash_value)
+            if distance == 0 and node.source_id == source_id:
+                return  # Exact duplicate from the same source
+
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _Node(hash_value, source_id)
+                self._size += 1
+                return
+            node = child
+
+    def query(
+        self,
+        hash_value: int,
+        radius: int,
+        exclude_source: Optional[str] = None,
+        first_only: bool = False
+    ) -> List[Tuple[int, int, Optional[str]]]:
+        """Find all indexed hashes within a Hamming radius.
+
+        Args:
+            hash_value: Hash to search around
+            radius: Maximum Hamming distance (inclusive)
+            exclude_source: Ignore entries with this source_id
+            first_only: Stop after the first match
+
+        Returns:
+            List of (hash_value, distance, source_id) tuples
+        """
+        matches: List[Tuple[int, int, Optional[str]]] = []
+        if self._root is None:
+            return matches
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(hash_value, node.hash_value)
+
+            if distance <= radius and (exclude_source is None or node.source_id != exclude_source):
+                matches.append((node.hash_value, distance, node.source_id))
+                if first_only:
+                    return matches
+
+            low, high = distance - radius, distance + radius
+            for edge, child in node.children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+
+        return matches
+
+    def contains_near(
+        self,
+        hash_value: int,
+        radius: int,
+        exclude_source: Optional[str] = None
+    ) -> bool:
+        """Check whether any indexed hash lies within ``radius`` of ``hash_value``."""
+        return bool(self.query(hash_value, radius, exclude_source, first_only=True))
+
+    def items(self) -> Iterator[Tuple[int, Optional[str]]]:
+        """Iterate over (hash_value, source_id), parents before children.
+
+        Re-inserting entries in this order rebuilds an identical tree.
+        """
+        if self._root is None:
+            return
+        queue = deque([self._root])
+        while queue:
+            node = queue.popleft()
+            yield node.hash_value, node.source_id
+            queue.extend(node.children.values())
+
+    def save(self, path: str) -> None:
+        """Persist the index to a JSON file (written atomically)."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        payload = {
+            "version": 1,
+            "entries": [[format(h, "016x"), source] for h, source in self.items()],
+        }
+        tmp_path = target.with_suffix(target.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, target)
+
+    @classmethod
+    def load(cls, path: str) -> "PerceptualHashIndex":
+        """Load an index saved with :meth:`save`.
+
+        A missing or unreadable file yields an empty index.
+        """
+        index = cls()
+        try:
+            with open(path) as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable frame hash index {path}: {str(e)}")
+            return index
+
+        for hex_hash, source_id in payload.get("entries", []):
+            index.add(int(hex_hash, 16), source_id)
+        return index
+
+
+class ChannelFrameIndexStore:
+    """Persists one :class:`PerceptualHashIndex` per channel on disk.
+
+    Lets a course series skip frames that were already seen in earlier videos
+    from the same channel.
+    """
+
+    def __init__(self, index_dir: str):
+        """Initialize the store.
+
+        Args:
+            index_dir: Directory holding one ``<channel>.json`` file per channel
+        """
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._indexes: Dict[str, PerceptualHashIndex] = {}
+
+    @staticmethod
+    def channel_key(video_info: Dict) -> Optional[str]:
+        """Derive a filesystem-safe channel key from yt-dlp video info."""
+        raw = (
+            video_info.get("channel_id")
+            or video_info.get("uploader_id")
+            or video_info.get("uploader")
+        )
+        if not raw:
+            return None
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", str(raw))
+
+    def _path(self, channel: str) -> Path:
+        return self.index_dir / f"{channel}.json"
+
+    def get(self, channel: str) -> PerceptualHashIndex:
+        """Return the (cached) index for a channel, loading it from disk if needed."""
+        if channel not in self._indexes:
+            self._indexes[channel] = PerceptualHashIndex.load(str(self._path(channel)))
+        return self._indexes[channel]
+
+    def save(self, channel: str) -> None:
+        """Write a channel's index back to disk."""
+        index = self._indexes.get(channel)
+        if index is not None:
+            index.save(str(self._path(channel)))
+
+
+__all__ = [
+    'PerceptualHashIndex',
+    'ChannelFrameIndexStore',
+    'hamming_distance'
+]
@@ -13,6 +13,7 @@ from ..types import SourceType
 from ..knowledge.models import StrategyRule, IngestionResponse
 from .strategy_extractor import LLMStrategyExtractor, StrategyExtractionError
 from .content_analyzer import ContentAnalyzer
+from .strategy_dedup import StrategyDeduplicator
 
 
 logger = logging.getLogger(__name__)
@@ -40,6 +41,7 @@ class IngestionOrchestrator:
         # Initialize components
         self.extractor = LLMStrategyExtractor(self.settings)
         self.analyzer = ContentAnalyzer()
+        self.deduplicator = StrategyDeduplicator()
         
         # Processing settings
         self.max_concurrent_extractions = 3
@@ -286,20 +288,21 @@ class IngestionOrchestrator:
                 return []
     
     def _deduplicate_strategies(self, strategies: List[StrategyRule]) -> List[StrategyRule]:
-        """Remove duplicate strategies based on name and content similarity."""
+        """Merge duplicate strategies based on name and content similarity.
+        
+        Identical names are always merged; otherwise rules are merged when the
+        MinHash similarity of their text and pattern conditions passes the
+        deduplicator's threshold.
+        """
         if not strategies:
             return []
         
-        unique_strategies = []
-        seen_names = set()
+        unique_strategies = self.deduplicator.deduplicate(strategies)
         
-        for strategy in strategies:
-            # Simple deduplication by name
-            if strategy.name.lower() not in seen_names:
-                unique_strategies.append(strategy)
-                seen_names.add(strategy.name.lower())
-            else:
-                logger.debug(f"Duplicate strategy filtered: {strategy.name}")
+        if len(unique_strategies) < len(strategies):
+            logger.debug(
+                f"Merged near-duplicate strategies: {len(strategies)} -> {len(unique_strategies)}"
+            )
         
         return unique_strategies
     
@@ -488,6 +491,7 @@ class IngestionOrchestrator:
             "max_concurrent_extractions": self.max_concurrent_extractions,
             "min_strategy_confidence": self.min_strategy_confidence,
             "retry_attempts": self.retry_attempts,
+            "dedup_similarity_threshold": self.deduplicator.similarity_threshold,
             "chunk_size": self.analyzer.max_chunk_size,
             "model": self.extractor.extraction_model,
             "temperature": self.extractor.temperature
@@ -0,0 +1,254 @@
+"""
+Near-duplicate detection for extracted strategy rules.
+
+Chunked extraction tends to produce several almost identical StrategyRules for
+the same setup (same conditions, slightly reworded name/description). This
+module fingerprints each rule with MinHash over its text and pattern
+conditions, groups candidates with locality-sensitive hashing (LSH banding),
+and merges groups whose estimated Jaccard similarity passes a threshold.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..knowledge.models import StrategyRule
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used for universal hashing of 64-bit token hashes
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _token_hash(token: str) -> int:
+    """Stable 64-bit hash of a token (independent of PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+
+
+def _value(field) -> str:
+    """String value of an enum or plain field."""
+    return str(getattr(field, "value", field)).lower()
+
+
+def strategy_features(strategy: StrategyRule, shingle_size: int = 3) -> Set[str]:
+    """
+    Build the feature set used to compare two strategy rules.
+
+    Features are word shingles of the name/description plus structural tokens
+    for the entry type, pattern conditions and timeframe alignments, so two
+    rules with reworded text but identical conditions still score as similar.
+
+    Args:
+        strategy: Strategy rule to fingerprint
+        shingle_size: Number of words per text shingle
+
+    Returns:
+        Set of feature strings
+    """
+    features: Set[str] = {f"entry:{_value(strategy.entry_type)}"}
+
+    text = f"{strategy.name} {strategy.description or ''}".lower()
+    words = _WORD_RE.findall(text)
+    if len(words) < shingle_size:
+        features.update(f"w:{word}" for word in words)
+    else:
+        for i in range(len(words) - shingle_size + 1):
+            features.add("s:" + " ".join(words[i:i + shingle_size]))
+
+    for condition in strategy.conditions:
+        params = ",".join(f"{k}={condition.params[k]}" for k in sorted(condition.params))
+        features.add(f"cond:{_value(condition.type)}@{_value(condition.timeframe)}")
+        features.add(
+            f"condp:{_value(condition.type)}@{_value(condition.timeframe)}"
+            f":{params}:{condition.required}"
+        )
+
+    for alignment in strategy.confluence_required:
+        features.add(
+            f"tf:{_value(alignment.higher_tf)}>{_value(alignment.lower_tf)}"
+            f":{alignment.bias_required.lower()}:{alignment.entry_pattern.lower()}"
+        )
+
+    return features
+
+
+class MinHasher:
+    """MinHash signatures with a fixed family of universal hash functions."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        """
+        Initialize the hasher.
+
+        Args:
+            num_perm: Number of hash permutations (signature length)
+            seed: Seed for the permutation coefficients
+        """
+        self.num_perm = num_perm
+        coefficients = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], "big") % (_MERSENNE_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:], "big") % _MERSENNE_PRIME
+            coefficients.append((a, b))
+        self._coefficients = coefficients
+
+    def signature(self, features: Iterable[str]) -> Tuple[int, ...]:
+        """Compute the MinHash signature of a feature set."""
+        hashes = [_token_hash(f) for f in features]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._coefficients
+        )
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity between two signatures."""
+        matches = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return matches / len(sig_a)
+
+
+class StrategyDeduplicator:
+    """
+    Merges near-duplicate strategy rules using MinHash + LSH.
+
+    Only rules sharing at least one LSH band are compared, so the cost is
+    roughly linear in the number of rules rather than quadratic.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.7,
+        num_perm: int = 128,
+        bands: int = 32
+    ):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            similarity_threshold: Estimated Jaccard similarity at or above which
+                two rules are treated as duplicates
+            num_perm: MinHash signature length
+            bands: Number of LSH bands (must divide num_perm)
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.similarity_threshold = similarity_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+
+    def find_groups(self, strategies: List[StrategyRule]) -> List[List[int]]:
+        """
+        Group strategy indices into near-duplicate clusters.
+
+        Args:
+            strategies: Strategy rules to group
+
+        Returns:
+            Groups of indices (each sorted, groups ordered by first member)
+        """
+        signatures = [self.hasher.signature(strategy_features(s)) for s in strategies]
+
+        # Union-find over candidate pairs that pass verification
+        parent = list(range(len(strategies)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i: int, j: int) -> None:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        # Exact name matches are always duplicates
+        by_name: Dict[str, int] = {}
+        for idx, strategy in enumerate(strategies):
+            key = strategy.name.strip().lower()
+            if key in by_name:
+                union(by_name[key], idx)
+            else:
+                by_name[key] = idx
+
+        checked: Set[Tuple[int, int]] = set()
+        for band in range(self.bands):
+            buckets: Dict[Tuple[int, ...], List[int]] = {}
+            start = band * self.rows
+            for idx, sig in enumerate(signatures):
+                buckets.setdefault(sig[start:start + self.rows], []).append(idx)
+
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                for pos, i in enumerate(members):
+                    for j in members[pos + 1:]:
+                        if (i, j) in checked:
+                            continue
+                        checked.add((i, j))
+                        if strategies[i].entry_type != strategies[j].entry_type:
+                            continue
+                        if MinHasher.similarity(signatures[i], signatures[j]) >= self.similarity_threshold:
+                            union(i, j)
+
+        groups: Dict[int, List[int]] = {}
+        for idx in range(len(strategies)):
+            groups.setdefault(find(idx), []).append(idx)
+
+        return sorted(groups.values(), key=lambda g: g[0])
+
+    def deduplicate(self, strategies: List[StrategyRule]) -> List[StrategyRule]:
+        """
+        Merge near-duplicate strategies.
+
+        Each group keeps its highest-confidence rule (earliest on ties), with
+        tags unioned across the group and the longest description retained.
+
+        Args:
+            strategies: Strategy rules, in extraction order
+
+        Returns:
+            Merged strategy rules in order of first appearance
+        """
+        if not strategies:
+            return []
+
+        merged: List[StrategyRule] = []
+        for group in self.find_groups(strategies):
+            members = [strategies[i] for i in group]
+            if len(members) == 1:
+                merged.append(members[0])
+                continue
+
+            best = max(members, key=lambda s: s.confidence)  # max() keeps the first on ties
+            merged.append(self._merge(best, members))
+            logger.debug(
+                f"Merged {len(members)} near-duplicate strategies into '{best.name}'"
+            )
+
+        return merged
+
+    @staticmethod
+    def _merge(best: StrategyRule, members: List[StrategyRule]) -> StrategyRule:
+        """Fold group members into the representative rule."""
+        tags: List[str] = []
+        for member in members:
+            for tag in member.tags:
+                if tag not in tags:
+                    tags.append(tag)
+
+        description: Optional[str] = best.description
+        for member in members:
+            if member.description and len(member.description) > len(description or ""):
+                description = member.description
+
+        return best.copy(update={"tags": tags, "description": description})
@@ -1,12 +1,14 @@
 """Video pipeline for extracting frames and transcripts from YouTube videos."""
 
 import asyncio
+import bisect
 import hashlib
 import json
 import logging
 import os
 import tempfile
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
@@ -19,6 +21,7 @@ import yt_dlp
 from PIL import Image
 
 from ..types import IngestionSource, SourceType, VideoFrame
+from .frame_hash_index import ChannelFrameIndexStore, PerceptualHashIndex
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -195,13 +198,15 @@ class AudioTranscriber:
 class FrameExtractor:
     """Handles video frame extraction and deduplication."""
     
-    def __init__(self, frame_interval: int = 10):
+    def __init__(self, frame_interval: int = 10, hash_workers: Optional[int] = None):
         """Initialize frame extractor.
         
         Args:
             frame_interval: Interval in seconds between extracted frames
+            hash_workers: Process pool size for perceptual hashing (defaults to CPU count)
         """
         self.frame_interval = frame_interval
+        self.hash_workers = hash_workers or os.cpu_count() or 1
     
     async def extract_frames(self, video_path: str, output_dir: str, duration: float) -> List[str]:
         """Extract frames from video at specified intervals.
@@ -259,64 +264,76 @@ class FrameExtractor:
     async def calculate_perceptual_hashes(self, frame_paths: List[str]) -> Dict[str, str]:
         """Calculate perceptual hashes for frame deduplication.
         
+        Hashing is CPU-bound, so frames are spread over a process pool rather
+        than decoded one by one on the event loop.
+        
         Args:
             frame_paths: List of frame file paths
             
         Returns:
             Dictionary mapping frame_path to perceptual_hash
         """
-        hashes = {}
+        if not frame_paths:
+            return {}
         
-        for frame_path in frame_paths:
-            try:
-                # Load image and calculate perceptual hash
-                with Image.open(frame_path) as img:
-                    # Convert to RGB if necessary
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    
-                    # Calculate hash using dhash (difference hash)
-                    hash_value = str(imagehash.dhash(img))
-                    hashes[frame_path] = hash_value
-                    
-            except Exception as e:
-                logger.warning(f"Failed to calculate hash for {frame_path}: {str(e)}")
-                hashes[frame_path] = "error"
+        workers = min(self.hash_workers, len(frame_paths))
+        chunksize = max(1, len(frame_paths) // (workers * 4))
+        
+        def _hash_all() -> List[str]:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(_compute_frame_hash, frame_paths, chunksize=chunksize))
+        
+        loop = asyncio.get_event_loop()
+        hash_values = await loop.run_in_executor(None, _hash_all)
+        
+        # Preserve frame order so deduplication keeps the earliest frame
+        hashes = dict(zip(frame_paths, hash_values))
         
         logger.info(f"Calculated perceptual hashes for {len(hashes)} frames")
         return hashes
     
-    def deduplicate_frames(self, frame_hashes: Dict[str, str], similarity_threshold: int = 5) -> List[str]:
+    def deduplicate_frames(
+        self,
+        frame_hashes: Dict[str, str],
+        similarity_threshold: int = 5,
+        seen_index: Optional[PerceptualHashIndex] = None,
+        source_id: Optional[str] = None
+    ) -> List[str]:
         """Remove duplicate/similar frames based on perceptual hashes.
         
+        Kept hashes go into a BK-tree so each lookup is a Hamming radius query
+        instead of a scan over every previously kept frame.
+        
         Args:
             frame_hashes: Dictionary mapping frame_path to perceptual_hash
             similarity_threshold: Hamming distance threshold for considering frames similar
+            seen_index: Optional cross-video index (e.g. per channel); frames near an
+                entry from another source are dropped, and kept frames are added to it
+            source_id: Identifier of the current video within ``seen_index``
             
         Returns:
             List of unique frame paths
         """
         unique_frames = []
-        seen_hashes = []
+        kept_index = PerceptualHashIndex()
         
         for frame_path, hash_str in frame_hashes.items():
             if hash_str == "error":
                 continue
             
             try:
-                current_hash = imagehash.hex_to_hash(hash_str)
+                current_hash = int(hash_str, 16)
                 
-                # Check if this frame is similar to any previously seen frame
-                is_duplicate = False
-                for seen_hash in seen_hashes:
-                    hamming_distance = current_hash - seen_hash
-                    if hamming_distance <= similarity_threshold:
-                        is_duplicate = True
-                        break
+                # Check if this frame is similar to any previously kept frame
+                is_duplicate = kept_index.contains_near(current_hash, similarity_threshold)
+                if not is_duplicate and seen_index is not None:
+                    is_duplicate = seen_index.contains_near(
+                        current_hash, similarity_threshold, exclude_source=source_id
+                    )
                 
                 if not is_duplicate:
                     unique_frames.append(frame_path)
-                    seen_hashes.append(current_hash)
+                    kept_index.add(current_hash)
                 else:
                     # Remove duplicate frame file
                     try:
@@ -328,13 +345,152 @@ class FrameExtractor:
                 logger.warning(f"Error processing hash for {frame_path}: {str(e)}")
                 continue
         
+        if seen_index is not None:
+            for frame_path in unique_frames:
+                seen_index.add(int(frame_hashes[frame_path], 16), source_id)
+        
         logger.info(f"Deduplicated frames: {len(frame_hashes)} -> {len(unique_frames)}")
         return unique_frames
 
 
+def _compute_frame_hash(frame_path: str) -> str:
+    """Compute the dhash of a single frame (runs in a worker process)."""
+    try:
+        # Load image and calculate perceptual hash
+        with Image.open(frame_path) as img:
+            # Convert to RGB if necessary
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            
+            # Calculate hash using dhash (difference hash)
+            return str(imagehash.dhash(img))
+            
+    except Exception as e:
+        logger.warning(f"Failed to calculate hash for {frame_path}: {str(e)}")
+        return "error"
+
+
+# Relative widening of bisected windows, far above float rounding error
+_BOUNDARY_SLACK = 1e-9
+
+
+class TranscriptIntervalIndex:
+    """Interval index over Whisper segments and a sorted word-start array.
+    
+    A segment is near a frame when it overlaps the window around it: it
+    starts in the window, ends in the window, or spans the whole window.
+    The first two are bisected from segments sorted by start and by end;
+    the third is found with a max-end tree over the start order, so a
+    lookup costs O((log n) * (k + 1)) no matter how long any segment is.
+    """
+    
+    def __init__(self, segments: List[Dict[str, Any]]):
+        """Build the index.
+        
+        Args:
+            segments: Whisper transcript segments (with optional 'words')
+        """
+        self.segments = segments
+        
+        bounds = [
+            (segment.get('start', 0), segment.get('end', 0), idx)
+            for idx, segment in enumerate(segments)
+        ]
+        by_start = sorted(bounds)
+        self._starts = [b[0] for b in by_start]
+        self._start_ids = [b[2] for b in by_start]
+        by_end = sorted(bounds, key=lambda b: (b[1], b[2]))
+        self._ends = [b[1] for b in by_end]
+        self._end_ids = [b[2] for b in by_end]
+        
+        # Segment tree of maximum end times over the start-sorted order
+        self._size = 1
+        while self._size < len(by_start):
+            self._size *= 2
+        self._max_end = [float('-inf')] * (2 * self._size)
+        for i, b in enumerate(by_start):
+            self._max_end[self._size + i] = b[1]
+        for node in range(self._size - 1, 0, -1):
+            self._max_end[node] = max(self._max_end[2 * node], self._max_end[2 * node + 1])
+        
+        words = []
+        for seg_idx, segment in enumerate(segments):
+            for word_idx, word_info in enumerate(segment.get('words', [])):
+                words.append((word_info.get('start', 0), seg_idx, word_idx))
+        words.sort()
+        self._word_starts = [w[0] for w in words]
+        self._word_keys = [(w[1], w[2]) for w in words]
+    
+    def segments_near(self, timestamp: float, window: float) -> List[int]:
+        """Indices of segments containing ``timestamp`` or with a boundary within ``window`` of it.
+        
+        Returns:
+            Segment indices in original transcript order
+        """
+        # Bisect a slightly wider window, then apply the exact original test:
+        # `timestamp + window` can round differently from `abs(start - timestamp)`
+        slack = _BOUNDARY_SLACK * (abs(timestamp) + window + 1)
+        low, high = timestamp - window - slack, timestamp + window + slack
+        found = set()
+        
+        # Starting or ending inside the window (this also covers segments
+        # with end < start, which the original check only matched this way)
+        first_start = bisect.bisect_left(self._starts, low)
+        found.update(self._start_ids[first_start:bisect.bisect_right(self._starts, high)])
+        first_end = bisect.bisect_left(self._ends, low)
+        found.update(self._end_ids[first_end:bisect.bisect_right(self._ends, high)])
+        
+        # Spanning the window: started before it and ends after it
+        self._collect_spanning(1, 0, self._size, first_start, high, found)
+        
+        return sorted(idx for idx in found if self._is_near(idx, timestamp, window))
+    
+    def _is_near(self, idx: int, timestamp: float, window: float) -> bool:
+        """The per-segment test the index narrows down to."""
+        seg_start = self.segments[idx].get('start', 0)
+        seg_end = self.segments[idx].get('end', 0)
+        return (seg_start <= timestamp <= seg_end
+                or abs(seg_start - timestamp) <= window
+                or abs(seg_end - timestamp) <= window)
+    
+    def _collect_spanning(
+        self, node: int, node_lo: int, node_hi: int, lo: int, threshold: float, found: set
+    ) -> None:
+        """Add start-order positions below ``lo`` whose end exceeds ``threshold``."""
+        if node_lo >= lo or self._max_end[node] <= threshold:
+            return
+        if node_hi - node_lo == 1:
+            found.add(self._start_ids[node_lo])
+            return
+        mid = (node_lo + node_hi) // 2
+        self._collect_spanning(2 * node, node_lo, mid, lo, threshold, found)
+        self._collect_spanning(2 * node + 1, mid, node_hi, lo, threshold, found)
+    
+    def words_near(self, timestamp: float, window: float, segment_ids: List[int]) -> List[Dict[str, Any]]:
+        """Words from the given segments starting within ``window`` of ``timestamp``.
+        
+        Returns:
+            Word dicts ordered by segment, then by position within the segment
+        """
+        allowed = set(segment_ids)
+        slack = _BOUNDARY_SLACK * (abs(timestamp) + window + 1)
+        lo = bisect.bisect_left(self._word_starts, timestamp - window - slack)
+        hi = bisect.bisect_right(self._word_starts, timestamp + window + slack)
+        
+        keys = sorted(
+            k for i, k in enumerate(self._word_keys[lo:hi], lo)
+            if k[0] in allowed and abs(self._word_starts[i] - timestamp) <= window
+        )
+        return [self.segments[seg_idx]['words'][word_idx] for seg_idx, word_idx in keys]
+
+
 class TranscriptFrameCorrelator:
     """Correlates transcript segments with video frames."""
     
+    # Seconds around a frame for including segments and individual words
+    SEGMENT_WINDOW_SECONDS = 30
+    WORD_WINDOW_SECONDS = 15
+    
     @staticmethod
     def correlate_transcript_with_frames(
         transcript_result: Dict[str, Any], 
@@ -353,34 +509,24 @@ class TranscriptFrameCorrelator:
         
         # Get transcript segments
         segments = transcript_result.get('segments', [])
+        index = TranscriptIntervalIndex(segments)
         
         for frame in frame_data:
             frame_timestamp = frame['timestamp_seconds']
             
-            # Find the closest transcript segment(s)
-            relevant_segments = []
-            
-            for segment in segments:
-                seg_start = segment.get('start', 0)
-                seg_end = segment.get('end', 0)
-                
-                # Check if frame timestamp falls within segment
-                if seg_start <= frame_timestamp <= seg_end:
-                    relevant_segments.append(segment)
-                # Also include segments that are close (within 30 seconds)
-                elif abs(seg_start - frame_timestamp) <= 30 or abs(seg_end - frame_timestamp) <= 30:
-                    relevant_segments.append(segment)
+            # Find segments containing the frame or within 30 seconds of it
+            segment_ids = index.segments_near(
+                frame_timestamp, TranscriptFrameCorrelator.SEGMENT_WINDOW_SECONDS
+            )
+            relevant_segments = [segments[i] for i in segment_ids]
             
             # Combine relevant segment texts
             combined_text = " ".join([seg.get('text', '').strip() for seg in relevant_segments])
             
             # Get word-level timestamps for more precise correlation
-            relevant_words = []
-            for segment in relevant_segments:
-                for word_info in segment.get('words', []):
-                    word_start = word_info.get('start', 0)
-                    if abs(word_start - frame_timestamp) <= 15:  # Within 15 seconds
-                        relevant_words.append(word_info)
+            relevant_words = index.words_near(
+                frame_timestamp, TranscriptFrameCorrelator.WORD_WINDOW_SECONDS, segment_ids
+            )
             
             correlated_entry = {
                 'frame_path': frame['frame_path'],
@@ -407,7 +553,8 @@ class VideoPipeline:
         output_dir: str = "/tmp/video_ingestion",
         whisper_model: str = "base",
         frame_interval: int = 10,
-        similarity_threshold: int = 5
+        similarity_threshold: int = 5,
+        frame_index_dir: Optional[str] = None
     ):
         """Initialize the video pipeline.
         
@@ -416,6 +563,8 @@ class VideoPipeline:
             whisper_model: Whisper model name for transcription
             frame_interval: Seconds between extracted frames
             similarity_threshold: Similarity threshold for frame deduplication
+            frame_index_dir: Directory for per-channel frame hash indexes
+                (defaults to ``<output_dir>/frame_index``)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -425,6 +574,9 @@ class VideoPipeline:
         self.frame_extractor = FrameExtractor(frame_interval)
         self.correlator = TranscriptFrameCorrelator()
         self.similarity_threshold = similarity_threshold
+        self.frame_index_store = ChannelFrameIndexStore(
+            frame_index_dir or str(self.output_dir / "frame_index")
+        )
     
     async def process_video_url(self, url: str) -> Dict[str, Any]:
         """Process a YouTube video URL through the complete pipeline.
@@ -467,9 +619,18 @@ class VideoPipeline:
             
             # Step 5: Calculate perceptual hashes and deduplicate
             frame_hashes = await self.frame_extractor.calculate_perceptual_hashes(frame_paths)
+            
+            # Skip frames already seen in earlier videos from the same channel
+            channel = ChannelFrameIndexStore.channel_key(video_info)
+            channel_index = self.frame_index_store.get(channel) if channel else None
             unique_frame_paths = self.frame_extractor.deduplicate_frames(
-                frame_hashes, self.similarity_threshold
+                frame_hashes,
+                self.similarity_threshold,
+                seen_index=channel_index,
+                source_id=video_info.get('id')
             )
+            if channel:
+                self.frame_index_store.save(channel)
             
             # Step 6: Prepare frame data for correlation
             frame_data = []
@@ -658,5 +819,6 @@ __all__ = [
     'AudioTranscriber',
     'FrameExtractor',
     'TranscriptFrameCorrelator',
+    'TranscriptIntervalIndex',
     'process_youtube_video'
 ]
\ No newline at end of file
@@ -30,15 +30,24 @@ from .repository import (
 
 from .cache import (
     CacheManager,
+    AsyncCacheManager,
     CacheKeys,
     CacheTTL,
     cache_manager,
     get_cache_manager,
+    get_async_cache_manager,
 )
 
 from .semantic_search import (
     EmbeddingGenerator,
     SemanticSearch,
+    get_rule_index,
+)
+
+from .vector_index import (
+    VectorIndex,
+    encode_vector,
+    decode_vector,
 )
 
 __all__ = [
@@ -67,12 +76,18 @@ __all__ = [
     
     # Caching
     "CacheManager",
+    "AsyncCacheManager",
     "CacheKeys",
     "CacheTTL",
     "cache_manager",
     "get_cache_manager",
+    "get_async_cache_manager",
     
     # Semantic Search
     "EmbeddingGenerator",
     "SemanticSearch",
+    "get_rule_index",
+    "VectorIndex",
+    "encode_vector",
+    "decode_vector",
 ]
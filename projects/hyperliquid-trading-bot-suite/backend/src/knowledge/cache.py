@@ -1,13 +1,24 @@
 """
 Redis caching layer for the knowledge base repository.
 Provides efficient caching for frequently accessed data.
+
+CacheManager is the synchronous client used by the repositories.
+AsyncCacheManager is for async code: it keeps a small in-process cache (L1)
+in front of Redis, and every instance drops L1 entries when any manager,
+sync or async, changes or deletes a key (announced over Redis pub/sub).
 """
 
 import json
+import time
+import asyncio
 import hashlib
+import inspect
+from collections import OrderedDict
 from datetime import timedelta
-from typing import Any, Optional, List, Union
+from fnmatch import fnmatchcase
+from typing import Any, Optional, List, Union, Dict, Tuple, Iterable
 from functools import wraps
+from uuid import uuid4
 
 import redis
 from redis.asyncio import Redis as AsyncRedis
@@ -16,6 +27,73 @@ from redis.exceptions import RedisError
 from ..config import settings
 
 
+# Keys fetched per SCAN call when deleting by pattern
+SCAN_COUNT = 500
+
+# Tag sets are sorted sets scored by each member's expiry (Unix seconds,
+# +inf without a TTL). Writing prunes expired members and keeps the tag key
+# alive exactly as long as its longest-lived member.
+# KEYS: cache key, tag keys...; ARGV: value, ttl seconds (0 = none), channel, message
+TAGGED_SET_SCRIPT = """
+local ttl = tonumber(ARGV[2])
+if ttl > 0 then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+else
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+local now = tonumber(redis.call('TIME')[1])
+for i = 2, #KEYS do
+    local tag = KEYS[i]
+    if ttl > 0 then
+        redis.call('ZADD', tag, now + ttl, KEYS[1])
+    else
+        redis.call('ZADD', tag, '+inf', KEYS[1])
+    end
+    redis.call('ZREMRANGEBYSCORE', tag, '-inf', now)
+    local last = redis.call('ZRANGE', tag, -1, -1, 'WITHSCORES')[2]
+    if last == 'inf' then
+        redis.call('PERSIST', tag)
+    else
+        redis.call('EXPIREAT', tag, math.ceil(tonumber(last)) + 1)
+    end
+end
+redis.call('PUBLISH', ARGV[3], ARGV[4])
+return 1
+"""
+
+# Deletes every key under the tags, and the tags, atomically; returns the keys.
+# KEYS: tag keys; ARGV: channel, origin
+INVALIDATE_TAGS_SCRIPT = """
+local keys = {}
+local seen = {}
+for _, tag in ipairs(KEYS) do
+    for _, key in ipairs(redis.call('ZRANGE', tag, 0, -1)) do
+        if not seen[key] then
+            seen[key] = true
+            keys[#keys + 1] = key
+        end
+    end
+end
+for i = 1, #keys, 500 do
+    redis.call('DEL', unpack(keys, i, math.min(i + 499, #keys)))
+end
+redis.call('DEL', unpack(KEYS))
+if #keys > 0 then
+    redis.call('PUBLISH', ARGV[1], cjson.encode({origin = ARGV[2], keys = keys}))
+end
+return keys
+"""
+
+
+def _invalidation_message(
+    origin: str,
+    keys: Iterable[str] = (),
+    pattern: Optional[str] = None
+) -> str:
+    """Encode an L1 invalidation announcement."""
+    return json.dumps({"origin": origin, "keys": list(keys), "pattern": pattern})
+
+
 class CacheManager:
     """Manages Redis cache operations."""
     
@@ -33,6 +111,7 @@ class CacheManager:
             decode_responses=True
         )
         self._client = redis.Redis(connection_pool=self._pool)
+        self._instance_id = uuid4().hex
         
     @property
     def client(self) -> redis.Redis:
@@ -59,10 +138,13 @@ class CacheManager:
         """Set value in cache with optional TTL (seconds)."""
         try:
             serialized = json.dumps(value, default=str)
-            if ttl:
-                return self.client.setex(key, ttl, serialized)
-            else:
-                return self.client.set(key, serialized)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(key, serialized, ex=ttl or None)
+            pipe.publish(
+                CacheKeys.invalidation_channel(),
+                _invalidation_message(self._instance_id, keys=[key])
+            )
+            return bool(pipe.execute()[0])
         except (RedisError, TypeError) as e:
             print(f"Cache set error for key {key}: {e}")
             return False
@@ -70,18 +152,32 @@ class CacheManager:
     def delete(self, *keys: str) -> int:
         """Delete keys from cache."""
         try:
-            return self.client.delete(*keys)
+            deleted = self.client.delete(*keys)
+            self._publish_invalidation(keys=keys)
+            return deleted
         except RedisError as e:
             print(f"Cache delete error: {e}")
             return 0
     
     def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern."""
+        """
+        Delete all keys matching pattern.
+        
+        Walks the keyspace with SCAN in batches, so Redis is never blocked
+        the way a single KEYS call blocks it on a large keyspace.
+        """
         try:
-            keys = self.client.keys(pattern)
-            if keys:
-                return self.client.delete(*keys)
-            return 0
+            deleted = 0
+            batch = []
+            for key in self.client.scan_iter(match=pattern, count=SCAN_COUNT):
+                batch.append(key)
+                if len(batch) >= SCAN_COUNT:
+                    deleted += self.client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += self.client.delete(*batch)
+            self._publish_invalidation(pattern=pattern)
+            return deleted
         except RedisError as e:
             print(f"Cache delete pattern error: {e}")
             return 0
@@ -114,6 +210,7 @@ class CacheManager:
         """Clear all cache (use with caution)."""
         try:
             self.client.flushdb()
+            self._publish_invalidation(pattern="*")
         except RedisError as e:
             print(f"Cache flush error: {e}")
     
@@ -147,6 +244,10 @@ class CacheManager:
             if ttl:
                 for key in mapping:
                     pipe.expire(key, ttl)
+            pipe.publish(
+                CacheKeys.invalidation_channel(),
+                _invalidation_message(self._instance_id, keys=mapping)
+            )
             pipe.execute()
             return True
         except (RedisError, TypeError) as e:
@@ -160,6 +261,17 @@ class CacheManager:
             self._pool.disconnect()
         except RedisError as e:
             print(f"Cache close error: {e}")
+    
+    def _publish_invalidation(
+        self,
+        keys: Iterable[str] = (),
+        pattern: Optional[str] = None
+    ) -> None:
+        """Tell AsyncCacheManager instances to drop local copies."""
+        self.client.publish(
+            CacheKeys.invalidation_channel(),
+            _invalidation_message(self._instance_id, keys=keys, pattern=pattern)
+        )
 
 
 # Cache key generators
@@ -168,11 +280,26 @@ class CacheKeys:
     
     PREFIX = "trading_bot"
     
+    @staticmethod
+    def invalidation_channel() -> str:
+        """Pub/sub channel announcing changed keys to local (L1) caches."""
+        return f"{CacheKeys.PREFIX}:cache:invalidate"
+    
+    @staticmethod
+    def tag(tag: str) -> str:
+        """Generate key of the sorted set holding the cache keys tagged `tag`."""
+        return f"{CacheKeys.PREFIX}:tag:{tag}"
+    
     @staticmethod
     def strategy_rule(rule_id: str) -> str:
         """Generate cache key for strategy rule."""
         return f"{CacheKeys.PREFIX}:strategy_rule:{rule_id}"
     
+    @staticmethod
+    def strategy_detail(strategy_id: str) -> str:
+        """Generate cache key for the strategy details API response."""
+        return f"{CacheKeys.PREFIX}:strategy_detail:{strategy_id}"
+    
     @staticmethod
     def strategy_rules_list(
         entry_type: Optional[str] = None,
@@ -232,20 +359,402 @@ class CacheTTL:
     SIMILAR_RULES = HOUR
 
 
+class LocalCache:
+    """
+    In-process LRU cache bounded by entry count and age.
+    
+    Values are stored serialized, so callers always get their own copy
+    and cannot change what other callers see.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        """
+        Initialize local cache.
+        
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Maximum age of an entry in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires_at, serialized value), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get serialized value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+    
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store serialized value; `ttl` can only shorten the local TTL."""
+        ttl = self.ttl if not ttl else min(ttl, self.ttl)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def delete(self, *keys: str) -> None:
+        """Drop keys."""
+        for key in keys:
+            self._entries.pop(key, None)
+    
+    def delete_pattern(self, pattern: str) -> None:
+        """Drop keys matching a Redis-style glob pattern."""
+        if pattern == "*":
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if fnmatchcase(k, pattern)]:
+            del self._entries[key]
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+
+class AsyncCacheManager:
+    """
+    Two-tier async cache: in-process L1 in front of Redis.
+    
+    Hot keys are served from L1 without touching the network. Every write
+    or delete is announced on a pub/sub channel, and each instance's
+    listener (see `start`) drops the affected L1 entries, so L1 copies are
+    stale for no longer than the announcement takes to arrive. Entries can
+    be tagged and then invalidated as a group without scanning keys.
+    """
+    
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        l1_max_entries: Optional[int] = None,
+        l1_ttl: Optional[float] = None
+    ):
+        """
+        Initialize cache manager.
+        
+        Args:
+            redis_url: Redis connection URL (uses settings if not provided)
+            l1_max_entries: Local cache size (uses settings if not provided)
+            l1_ttl: Local cache entry age limit in seconds (uses settings if not provided)
+        """
+        self.redis_url = redis_url or settings.redis_url
+        self._client = AsyncRedis.from_url(
+            self.redis_url,
+            db=settings.redis_db,
+            max_connections=settings.redis_max_connections,
+            decode_responses=True
+        )
+        self.l1 = LocalCache(
+            max_entries=l1_max_entries or settings.cache_l1_max_entries,
+            ttl=l1_ttl or settings.cache_l1_ttl
+        )
+        self._instance_id = uuid4().hex
+        self._tagged_set = self._client.register_script(TAGGED_SET_SCRIPT)
+        self._invalidate_tags = self._client.register_script(INVALIDATE_TAGS_SCRIPT)
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+        # Bumped by every write, delete and invalidation; values read before
+        # a bump are not stored in L1, since they may be the ones just replaced
+        self._generation = 0
+        
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+    
+    @property
+    def client(self) -> AsyncRedis:
+        """Get Redis client."""
+        return self._client
+    
+    async def start(self) -> None:
+        """Start listening for invalidations (L1 is bypassed until then)."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+    
+    async def close(self) -> None:
+        """Stop the listener and close the Redis connection."""
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.cancel()
+            try:
+                await listener
+            except asyncio.CancelledError:
+                pass
+        self._subscribed.clear()
+        self.l1.clear()
+        try:
+            await self._client.close()
+        except RedisError as e:
+            print(f"Cache close error: {e}")
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from L1, falling back to Redis."""
+        if not self._subscribed.is_set():
+            return await self._get_l2(key)
+        
+        value = self.l1.get(key)
+        if value is not None:
+            self.l1_hits += 1
+            return json.loads(value)
+        
+        generation = self._generation
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.ttl(key)  # The L1 copy must not outlive the Redis one
+            value, ttl = await pipe.execute()
+            if not value:
+                self.misses += 1
+                return None
+            self.l2_hits += 1
+            if generation == self._generation:
+                self.l1.set(key, value, max(ttl, 0))
+            return json.loads(value)
+        except (RedisError, json.JSONDecodeError) as e:
+            print(f"Cache get error for key {key}: {e}")
+            return None
+    
+    async def _get_l2(self, key: str) -> Optional[Any]:
+        """Get value from Redis only."""
+        try:
+            value = await self._client.get(key)
+            if not value:
+                self.misses += 1
+                return None
+            self.l2_hits += 1
+            return json.loads(value)
+        except (RedisError, json.JSONDecodeError) as e:
+            print(f"Cache get error for key {key}: {e}")
+            return None
+    
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = ()
+    ) -> bool:
+        """
+        Set value with optional TTL (seconds) and tags.
+        
+        Tags record the key in a sorted set per tag (see `invalidate_tags`),
+        written atomically with the value. Members are pruned once their
+        key has expired and a tag set expires with its last member; keys
+        cached without a TTL stay listed until the tag is invalidated.
+        """
+        self._generation += 1  # Reads in flight may return the old value
+        generation = self._generation
+        try:
+            serialized = json.dumps(value, default=str)
+            message = _invalidation_message(self._instance_id, keys=[key])
+            tag_keys = [CacheKeys.tag(tag) for tag in tags]
+            if tag_keys:
+                result = await self._tagged_set(
+                    keys=[key, *tag_keys],
+                    args=[serialized, ttl or 0, CacheKeys.invalidation_channel(), message]
+                )
+            else:
+                pipe = self._client.pipeline(transaction=False)
+                pipe.set(key, serialized, ex=ttl or None)
+                pipe.publish(CacheKeys.invalidation_channel(), message)
+                result = (await pipe.execute())[0]
+        except (RedisError, TypeError) as e:
+            print(f"Cache set error for key {key}: {e}")
+            return False
+        
+        # Another write may have landed while this one was in flight
+        superseded = generation != self._generation
+        # Reads issued before Redis applied the write may return the old value
+        self._generation += 1
+        if self._subscribed.is_set() and not superseded:
+            self.l1.set(key, serialized, ttl)
+        return bool(result)
+    
+    async def delete(self, *keys: str) -> int:
+        """Delete keys from both tiers."""
+        self._drop_l1(keys=keys)
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.delete(*keys)
+            pipe.publish(
+                CacheKeys.invalidation_channel(),
+                _invalidation_message(self._instance_id, keys=keys)
+            )
+            return (await pipe.execute())[0]
+        except RedisError as e:
+            print(f"Cache delete error: {e}")
+            return 0
+        finally:
+            # Reads issued before Redis applied the delete may have cached old values
+            self._drop_l1(keys=keys)
+    
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete all keys matching pattern, walking the keyspace with SCAN."""
+        self._drop_l1(pattern=pattern)
+        try:
+            deleted = 0
+            batch = []
+            async for key in self._client.scan_iter(match=pattern, count=SCAN_COUNT):
+                batch.append(key)
+                if len(batch) >= SCAN_COUNT:
+                    deleted += await self._client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await self._client.delete(*batch)
+            await self._client.publish(
+                CacheKeys.invalidation_channel(),
+                _invalidation_message(self._instance_id, pattern=pattern)
+            )
+            return deleted
+        except RedisError as e:
+            print(f"Cache delete pattern error: {e}")
+            return 0
+        finally:
+            # Reads issued before Redis applied the delete may have cached old values
+            self._drop_l1(pattern=pattern)
+    
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Delete every key recorded under the given tags, in one atomic script."""
+        if not tags:
+            return 0
+        try:
+            keys = await self._invalidate_tags(
+                keys=[CacheKeys.tag(tag) for tag in tags],
+                args=[CacheKeys.invalidation_channel(), self._instance_id]
+            )
+        except RedisError as e:
+            print(f"Cache invalidate tags error: {e}")
+            return 0
+        self._drop_l1(keys=keys)  # Reads in flight may return the deleted values
+        return len(keys)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit counters and L1 size."""
+        return {
+            "l1_entries": len(self.l1),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+        }
+    
+    async def _listen(self) -> None:
+        """Apply invalidations from all managers, resubscribing after errors."""
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(CacheKeys.invalidation_channel())
+                # Announcements may have been missed while unsubscribed
+                self.l1.clear()
+                self._subscribed.set()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._apply_invalidation(message["data"])
+            except RedisError as e:
+                print(f"Cache invalidation listener error: {e}")
+            finally:
+                # L1 is only trusted while invalidations are being received
+                self._subscribed.clear()
+                self.l1.clear()
+                try:
+                    await pubsub.close()
+                except RedisError:
+                    pass
+            await asyncio.sleep(1)
+    
+    def _apply_invalidation(self, data: str) -> None:
+        """Drop L1 entries named in an invalidation announcement."""
+        try:
+            message = json.loads(data)
+        except json.JSONDecodeError:
+            return
+        if message.get("origin") == self._instance_id:
+            return  # Already applied locally
+        self._drop_l1(keys=message.get("keys", ()), pattern=message.get("pattern"))
+    
+    def _drop_l1(self, keys: Iterable[str] = (), pattern: Optional[str] = None) -> None:
+        """Drop L1 entries and keep reads in flight from storing them again."""
+        self._generation += 1
+        self.l1.delete(*keys)
+        if pattern:
+            self.l1.delete_pattern(pattern)
+
+
+def _default_cache_key(func, args, kwargs) -> str:
+    """Cache key from the function name and a hash of its arguments."""
+    args_str = str(args) + str(kwargs)
+    key_hash = hashlib.md5(args_str.encode()).hexdigest()[:8]
+    return f"{CacheKeys.PREFIX}:{func.__name__}:{key_hash}"
+
+
 def cached(
     key_fn=None,
     ttl: int = CacheTTL.FIFTEEN_MINUTES,
-    cache_manager: Optional[CacheManager] = None
+    cache_manager: Optional[Union[CacheManager, AsyncCacheManager]] = None
 ):
     """
     Decorator for caching function results.
     
+    Plain functions need a CacheManager. Coroutine functions can use
+    either manager: an AsyncCacheManager is awaited directly, while the
+    blocking CacheManager calls run in a worker thread.
+    
     Args:
         key_fn: Function to generate cache key from function args
         ttl: Time to live in seconds
-        cache_manager: CacheManager instance (will create if not provided)
+        cache_manager: CacheManager or AsyncCacheManager instance
+            (caching is skipped if not provided)
     """
+    is_async_manager = isinstance(cache_manager, AsyncCacheManager)
+    
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            if is_async_manager:
+                cache_get, cache_set = cache_manager.get, cache_manager.set
+            elif cache_manager is not None:
+                async def cache_get(key):
+                    return await asyncio.to_thread(cache_manager.get, key)
+                
+                async def cache_set(key, value, ttl):
+                    return await asyncio.to_thread(cache_manager.set, key, value, ttl)
+            
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # Skip caching if no cache manager
+                if cache_manager is None:
+                    return await func(*args, **kwargs)
+                
+                if key_fn:
+                    cache_key = key_fn(*args, **kwargs)
+                else:
+                    cache_key = _default_cache_key(func, args, kwargs)
+                
+                cached_value = await cache_get(cache_key)
+                if cached_value is not None:
+                    return cached_value
+                
+                result = await func(*args, **kwargs)
+                await cache_set(cache_key, result, ttl)
+                return result
+            
+            return async_wrapper
+        
+        if is_async_manager:
+            raise TypeError(
+                f"cached: {func.__qualname__} is not a coroutine function; "
+                "use a CacheManager, not an AsyncCacheManager"
+            )
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Skip caching if no cache manager
@@ -256,11 +765,7 @@ def cached(
             if key_fn:
                 cache_key = key_fn(*args, **kwargs)
             else:
-                # Default key generation
-                func_name = func.__name__
-                args_str = str(args) + str(kwargs)
-                key_hash = hashlib.md5(args_str.encode()).hexdigest()[:8]
-                cache_key = f"{CacheKeys.PREFIX}:{func_name}:{key_hash}"
+                cache_key = _default_cache_key(func, args, kwargs)
             
             # Try to get from cache
             cached_value = cache_manager.get(cache_key)
@@ -285,11 +790,38 @@ def get_cache_manager() -> CacheManager:
     return cache_manager
 
 
+_async_cache_manager: Optional[AsyncCacheManager] = None
+
+
+async def get_async_cache_manager() -> AsyncCacheManager:
+    """Get or create the global async cache manager (listener started)."""
+    global _async_cache_manager
+    
+    if _async_cache_manager is None:
+        _async_cache_manager = AsyncCacheManager()
+        await _async_cache_manager.start()
+    
+    return _async_cache_manager
+
+
+async def close_async_cache_manager() -> None:
+    """Close the global async cache manager, if one was created."""
+    global _async_cache_manager
+    
+    if _async_cache_manager is not None:
+        await _async_cache_manager.close()
+        _async_cache_manager = None
+
+
 __all__ = [
     "CacheManager",
+    "AsyncCacheManager",
+    "LocalCache",
     "CacheKeys",
     "CacheTTL",
     "cached",
     "cache_manager",
     "get_cache_manager",
+    "get_async_cache_manager",
+    "close_async_cache_manager",
 ]
@@ -157,6 +157,7 @@ class TradeRecord(BaseModel):
     is_backtest: bool = Field(default=False, description="Whether this is a backtested trade")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    close_recorded_at: Optional[datetime] = Field(None, description="When the exit was recorded")
     
     @validator('exit_price')
     def validate_exit_price(cls, v, values):
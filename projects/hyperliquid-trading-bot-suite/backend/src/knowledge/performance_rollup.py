@@ -0,0 +1,209 @@
+"""
+Per-day performance rollups for closed trades.
+
+A day's closed trades (per strategy, and across all strategies) are reduced
+to a fixed summary that can be combined with other days in entry-time order
+to give exactly the statistics a full replay of the trades would:
+
+- counts and P&L sums add up
+- consecutive losses combine from each day's leading, trailing and longest
+  loss runs
+- drawdown combines from each day's drawdown profile: one (peak, trough)
+  pair per new intra-day equity high, relative to the day's opening equity.
+  Within a segment the running peak is constant, so the lowest equity in
+  the segment is the only point that can set the maximum drawdown.
+
+Statistics therefore cost O(days) instead of O(trades).
+
+RunningStatistics keeps a strategy's cumulative closed-trade totals up to a
+watermark, so the learning feedback cycle only folds in trades closed since
+its previous run.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+# Rollup scope holding every strategy's trades
+ALL_STRATEGIES = "*"
+
+
+@dataclass
+class DailyPerformance:
+    """Summary of one day's closed trades, in entry-time order."""
+    total_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    total_pnl_r: float = 0.0
+    gross_profit_r: float = 0.0
+    gross_loss_r: float = 0.0
+    leading_losses: int = 0
+    trailing_losses: int = 0
+    max_consecutive_losses: int = 0
+    drawdown_profile: List[Tuple[float, float]] = field(default_factory=lambda: [(0.0, 0.0)])
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Any]) -> "DailyPerformance":
+        """
+        Summarize trades (objects with ``outcome`` and ``pnl_r``).
+
+        Trades must be sorted by entry time.
+        """
+        summary = cls()
+        run = 0
+        leading = True
+        equity = 0.0
+        peak = 0.0
+        profile = [[0.0, 0.0]]
+
+        for trade in trades:
+            summary.total_trades += 1
+
+            if trade.outcome == 'loss':
+                summary.losing_trades += 1
+                run += 1
+                summary.max_consecutive_losses = max(summary.max_consecutive_losses, run)
+                if leading:
+                    summary.leading_losses += 1
+                if trade.pnl_r and trade.pnl_r < 0:
+                    summary.gross_loss_r += trade.pnl_r
+            else:
+                run = 0
+                leading = False
+                if trade.outcome == 'win':
+                    summary.winning_trades += 1
+                    if trade.pnl_r and trade.pnl_r > 0:
+                        summary.gross_profit_r += trade.pnl_r
+
+            if trade.pnl_r is not None:
+                summary.total_pnl_r += trade.pnl_r
+                equity += trade.pnl_r
+                if equity > peak:
+                    peak = equity
+                    profile.append([equity, equity])
+                elif equity < profile[-1][1]:
+                    profile[-1][1] = equity
+
+        summary.trailing_losses = run
+        summary.gross_loss_r = abs(summary.gross_loss_r)
+        summary.drawdown_profile = [(p, t) for p, t in profile]
+        return summary
+
+
+class PerformanceAccumulator:
+    """Combines daily summaries, in day order, into overall statistics."""
+
+    def __init__(self):
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.total_pnl_r = 0.0
+        self.gross_profit_r = 0.0
+        self.gross_loss_r = 0.0
+        self.max_consecutive_losses = 0
+        self.max_drawdown = 0.0
+        self._loss_run = 0
+        self._equity = 0.0
+        self._peak = 0.0
+
+    def add(self, day: DailyPerformance):
+        """Append the next day's summary."""
+        if day.total_trades == 0:
+            return
+
+        self.total_trades += day.total_trades
+        self.winning_trades += day.winning_trades
+        self.losing_trades += day.losing_trades
+        self.total_pnl_r += day.total_pnl_r
+        self.gross_profit_r += day.gross_profit_r
+        self.gross_loss_r += day.gross_loss_r
+
+        # A loss run can continue across days
+        if day.leading_losses == day.total_trades:
+            self._loss_run += day.total_trades
+        else:
+            self.max_consecutive_losses = max(
+                self.max_consecutive_losses, self._loss_run + day.leading_losses
+            )
+            self._loss_run = day.trailing_losses
+        self.max_consecutive_losses = max(
+            self.max_consecutive_losses, self._loss_run, day.max_consecutive_losses
+        )
+
+        for peak_offset, trough_offset in day.drawdown_profile:
+            peak = max(self._peak, self._equity + peak_offset)
+            if peak != 0:
+                drawdown = (peak - (self._equity + trough_offset)) / abs(peak)
+                self.max_drawdown = max(self.max_drawdown, drawdown)
+        self._peak = max(self._peak, self._equity + day.drawdown_profile[-1][0])
+        self._equity += day.total_pnl_r
+
+    @property
+    def profit_factor(self) -> Optional[float]:
+        return self.gross_profit_r / self.gross_loss_r if self.gross_loss_r > 0 else None
+
+
+@dataclass
+class RunningStatistics:
+    """Cumulative statistics of one strategy's trades closed up to a watermark."""
+    strategy_rule_id: str
+    closed_through: Optional[datetime] = None
+    total_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    breakeven_trades: int = 0
+    r_trades: int = 0
+    total_pnl_r: float = 0.0
+    total_profit_usd: float = 0.0
+    total_loss_usd: float = 0.0
+
+    def fold(self, trades: Iterable[Any], closed_through: datetime) -> int:
+        """
+        Add trades (objects with ``outcome``, ``pnl_r`` and ``pnl_usd``)
+        recorded after the current watermark and advance it.
+
+        Returns:
+            Number of trades folded in
+        """
+        folded = 0
+        for trade in trades:
+            folded += 1
+            self.total_trades += 1
+
+            if trade.outcome == 'win':
+                self.winning_trades += 1
+                if trade.pnl_usd is not None:
+                    self.total_profit_usd += trade.pnl_usd
+            elif trade.outcome == 'loss':
+                self.losing_trades += 1
+                if trade.pnl_usd is not None:
+                    self.total_loss_usd += trade.pnl_usd
+            elif trade.outcome == 'breakeven':
+                self.breakeven_trades += 1
+
+            if trade.pnl_r is not None:
+                self.r_trades += 1
+                self.total_pnl_r += trade.pnl_r
+
+        # Never move the watermark back, or trades would be folded in twice
+        if self.closed_through is None or closed_through > self.closed_through:
+            self.closed_through = closed_through
+        return folded
+
+    @property
+    def win_rate(self) -> float:
+        """Winning trades as a percentage of closed trades."""
+        return self.winning_trades / self.total_trades * 100 if self.total_trades else 0.0
+
+    @property
+    def avg_r_multiple(self) -> float:
+        return self.total_pnl_r / self.r_trades if self.r_trades else 0.0
+
+
+__all__ = [
+    "ALL_STRATEGIES",
+    "DailyPerformance",
+    "PerformanceAccumulator",
+    "RunningStatistics",
+]
@@ -5,18 +5,21 @@ Includes caching and semantic search capabilities.
 """
 
 import json
+import weakref
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Callable, Dict, List, Optional, Tuple, Any, Union
 from uuid import uuid4
 
-from sqlalchemy import and_, desc, func, or_, text
+from sqlalchemy import and_, desc, event, func, or_, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, NoResultFound
 
 from ..database import get_session
 from ..database.models import (
-    StrategyRuleDB, TradeRecordDB, LearningEntryDB, CandleDataDB,
-    BacktestConfigDB, BacktestResultDB, IngestionTaskDB
+    StrategyRuleDB, TradeRecordDB, StrategyPerformanceDailyDB, StrategyLearningStateDB,
+    LearningEntryDB,
+    CandleDataDB, BacktestConfigDB, BacktestResultDB, IngestionTaskDB
 )
 from .models import (
     StrategyRule, TradeRecord, LearningEntry, CandleData,
@@ -24,9 +27,59 @@ from .models import (
     ContentSource, RiskParameters, PriceActionSnapshot
 )
 from .cache import cache_manager, CacheKeys, CacheTTL
+from .performance_rollup import (
+    ALL_STRATEGIES, DailyPerformance, PerformanceAccumulator, RunningStatistics
+)
 from .semantic_search import SemanticSearch
 
 
+_AFTER_COMMIT_KEY = "knowledge_after_commit"
+
+
+def run_after_commit(session: Session, callback: Callable[[], Any]):
+    """
+    Run ``callback`` once the session's transaction commits.
+    
+    Side effects outside the database (vector index, change listeners)
+    must not see writes that may still roll back. Callbacks registered
+    inside a savepoint are dropped if that savepoint rolls back; with no
+    transaction in progress the callback runs immediately.
+    """
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    if transaction is None:
+        callback()
+        return
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append((transaction, callback))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session):
+    for _, callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        try:
+            callback()
+        except Exception as e:
+            print(f"Warning: After-commit callback failed: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_callbacks(session: Session, previous_transaction):
+    pending = session.info.get(_AFTER_COMMIT_KEY)
+    if not pending:
+        return
+    
+    def rolled_back(transaction) -> bool:
+        while transaction is not None:
+            if transaction is previous_transaction:
+                return True
+            transaction = transaction.parent
+        return False
+    
+    session.info[_AFTER_COMMIT_KEY] = [
+        (transaction, callback) for transaction, callback in pending
+        if not rolled_back(transaction)
+    ]
+
+
 class BaseRepository:
     """Base repository with common functionality."""
     
@@ -56,11 +109,56 @@ class BaseRepository:
 class StrategyRuleRepository(BaseRepository):
     """Repository for strategy rules with caching and semantic search."""
     
+    # In-memory rule indexes notified when rules change (held weakly)
+    _change_listeners: "weakref.WeakSet" = weakref.WeakSet()
+    
     def __init__(self, session: Optional[Session] = None, use_cache: bool = True):
         super().__init__(session)
         self.use_cache = use_cache
         self._semantic_search = None
     
+    @classmethod
+    def add_change_listener(cls, listener: Any):
+        """
+        Register a listener for rule changes.
+        
+        The listener's ``on_rules_changed(rule_ids)`` is called with the IDs
+        of created, updated or deleted rules after the writing transaction
+        commits; rolled-back changes are never reported.
+        """
+        cls._change_listeners.add(listener)
+    
+    def _notify_change(self, rule_ids: List[str]):
+        """Notify change listeners about changed rules once the transaction commits."""
+        run_after_commit(self.session, lambda: self._notify_listeners(rule_ids))
+    
+    def _invalidate_details_after_commit(self, rule_id: str):
+        """Drop the cached API details of a rule once the transaction commits."""
+        if self.use_cache:
+            run_after_commit(
+                self.session, lambda: cache_manager.delete(CacheKeys.strategy_detail(rule_id))
+            )
+    
+    @classmethod
+    def _notify_listeners(cls, rule_ids: List[str]):
+        """Call every change listener now."""
+        for listener in list(cls._change_listeners):
+            try:
+                listener.on_rules_changed(rule_ids)
+            except Exception as e:
+                print(f"Warning: Rule change listener failed: {e}")
+    
+    def _index_after_commit(self, rule_ids: List[str]):
+        """Embed rules now (reading this transaction) and index them once it commits."""
+        try:
+            embedded = self.semantic_search.embed_rules(rule_ids)
+        except Exception as e:
+            print(f"Warning: Could not generate embeddings for {len(rule_ids)} rules: {e}")
+            return
+        if embedded is not None:
+            index = self.semantic_search.index
+            run_after_commit(self.session, lambda: index.add_batch(*embedded))
+    
     @property
     def semantic_search(self) -> SemanticSearch:
         """Get semantic search instance (lazy initialization)."""
@@ -70,37 +168,37 @@ class StrategyRuleRepository(BaseRepository):
     
     def create(self, strategy_rule: StrategyRule) -> str:
         """Create a new strategy rule."""
-        db_rule = StrategyRuleDB(
-            id=strategy_rule.id or str(uuid4()),
-            name=strategy_rule.name,
-            source_type=strategy_rule.source.type.value,
-            source_ref=strategy_rule.source.ref,
-            source_timestamp=strategy_rule.source.timestamp,
-            source_page_number=strategy_rule.source.page_number,
-            entry_type=strategy_rule.entry_type.value,
-            conditions=[condition.dict() for condition in strategy_rule.conditions],
-            confluence_required=[tf.dict() for tf in strategy_rule.confluence_required],
-            risk_params=strategy_rule.risk_params.dict(),
-            confidence=strategy_rule.confidence,
-            description=strategy_rule.description,
-            tags=strategy_rule.tags or []
-        )
+        db_rule = self._to_db(strategy_rule)
         
         self.session.add(db_rule)
         self.session.flush()
         
         # Generate embedding for semantic search
-        try:
-            self.semantic_search.update_rule_embedding(db_rule.id)
-        except Exception as e:
-            print(f"Warning: Could not generate embedding for rule {db_rule.id}: {e}")
+        self._index_after_commit([db_rule.id])
         
         # Invalidate cache
         if self.use_cache:
             cache_manager.delete_pattern(f"{CacheKeys.PREFIX}:strategy_rules:*")
+        self._notify_change([db_rule.id])
         
         return db_rule.id
     
+    def create_many(self, strategy_rules: List[StrategyRule]) -> List[str]:
+        """Create several strategy rules, embedding them in batched requests."""
+        db_rules = [self._to_db(rule) for rule in strategy_rules]
+        
+        self.session.add_all(db_rules)
+        self.session.flush()
+        
+        rule_ids = [db_rule.id for db_rule in db_rules]
+        self._index_after_commit(rule_ids)
+        
+        if self.use_cache:
+            cache_manager.delete_pattern(f"{CacheKeys.PREFIX}:strategy_rules:*")
+        self._notify_change(rule_ids)
+        
+        return rule_ids
+    
     def get_by_id(self, rule_id: str, use_cache: bool = True) -> Optional[StrategyRule]:
         """Get strategy rule by ID with optional caching."""
         # Try cache first
@@ -124,6 +222,18 @@ class StrategyRuleRepository(BaseRepository):
         
         return rule
     
+    def get_by_ids(self, rule_ids: List[str]) -> List[StrategyRule]:
+        """Get strategy rules by ID in one query, in request order; missing IDs are skipped."""
+        if not rule_ids:
+            return []
+        
+        db_rules = self.session.query(StrategyRuleDB).filter(
+            StrategyRuleDB.id.in_(set(rule_ids))
+        ).all()
+        by_id = {db_rule.id: db_rule for db_rule in db_rules}
+        
+        return [self._to_pydantic(by_id[rule_id]) for rule_id in dict.fromkeys(rule_ids) if rule_id in by_id]
+    
     def get_all(
         self, 
         limit: int = 100, 
@@ -167,6 +277,17 @@ class StrategyRuleRepository(BaseRepository):
             updates['confidence'] = confidence
         
         result = self.session.query(StrategyRuleDB).filter_by(id=rule_id).update(updates)
+        
+        # Keep index metadata filters in step with the database
+        if result > 0:
+            fields = {'win_rate': win_rate}
+            if confidence is not None:
+                fields['confidence'] = confidence
+            index = self.semantic_search.index
+            run_after_commit(self.session, lambda: index.update_metadata(rule_id, **fields))
+            self._invalidate_details_after_commit(rule_id)
+            self._notify_change([rule_id])
+        
         return result > 0
     
     def increment_trade_count(self, rule_id: str) -> bool:
@@ -175,6 +296,8 @@ class StrategyRuleRepository(BaseRepository):
             'trade_count': StrategyRuleDB.trade_count + 1,
             'last_used': datetime.utcnow()
         })
+        if result > 0:
+            self._invalidate_details_after_commit(rule_id)
         return result > 0
     
     def search_by_text(self, query: str, limit: int = 20) -> List[StrategyRule]:
@@ -240,50 +363,16 @@ class StrategyRuleRepository(BaseRepository):
         Returns:
             List of tuples (StrategyRule, similarity_score)
         """
-        # Generate embedding for query
-        embedding = self.semantic_search.embedding_generator.generate_embedding(query_text)
-        if not embedding:
-            return []
-        
         try:
-            # Search using vector similarity
-            embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
-            
-            query = text("""
-                SELECT 
-                    sr.*,
-                    1 - (sr.embedding <=> :embedding::vector) as similarity
-                FROM strategy_rules sr
-                WHERE sr.embedding IS NOT NULL
-            """)
-            
-            if min_confidence:
-                query = text(str(query) + " AND sr.confidence >= :min_confidence")
-            
-            query = text(str(query) + """
-                ORDER BY sr.embedding <=> :embedding::vector
-                LIMIT :limit
-            """)
-            
-            params = {"embedding": embedding_str, "limit": limit}
-            if min_confidence:
-                params["min_confidence"] = min_confidence
-            
-            result = self.session.execute(query, params)
-            
-            similar_rules = []
-            for row in result:
-                rule = self.semantic_search._row_to_strategy_rule(row)
-                similarity = row.similarity
-                similar_rules.append((rule, similarity))
-            
-            return similar_rules
-            
+            results = self.semantic_search.search_text(query_text, limit, min_confidence)
+            if results:
+                return results
         except Exception as e:
             print(f"Semantic search failed, falling back to text search: {e}")
-            # Fallback to text-based search
-            rules = self.search_by_text(query_text, limit)
-            return [(rule, 0.5) for rule in rules]
+        
+        # Fallback to text-based search (e.g. nothing indexed yet)
+        rules = self.search_by_text(query_text, limit)
+        return [(rule, 0.5) for rule in rules]
     
     def delete(self, rule_id: str) -> bool:
         """Delete a strategy rule."""
@@ -294,8 +383,31 @@ class StrategyRuleRepository(BaseRepository):
             cache_manager.delete_pattern(f"{CacheKeys.PREFIX}:similar_rules:{rule_id}:*")
         
         result = self.session.query(StrategyRuleDB).filter_by(id=rule_id).delete()
+        if result > 0:
+            semantic_search = self.semantic_search
+            run_after_commit(self.session, lambda: semantic_search.remove_rule(rule_id))
+            self._invalidate_details_after_commit(rule_id)
+            self._notify_change([rule_id])
         return result > 0
     
+    def _to_db(self, strategy_rule: StrategyRule) -> StrategyRuleDB:
+        """Convert Pydantic model to database model."""
+        return StrategyRuleDB(
+            id=strategy_rule.id or str(uuid4()),
+            name=strategy_rule.name,
+            source_type=strategy_rule.source.type.value,
+            source_ref=strategy_rule.source.ref,
+            source_timestamp=strategy_rule.source.timestamp,
+            source_page_number=strategy_rule.source.page_number,
+            entry_type=strategy_rule.entry_type.value,
+            conditions=[condition.dict() for condition in strategy_rule.conditions],
+            confluence_required=[tf.dict() for tf in strategy_rule.confluence_required],
+            risk_params=strategy_rule.risk_params.dict(),
+            confidence=strategy_rule.confidence,
+            description=strategy_rule.description,
+            tags=strategy_rule.tags or []
+        )
+    
     def _to_pydantic(self, db_rule: StrategyRuleDB) -> StrategyRule:
         """Convert database model to Pydantic model."""
         return StrategyRule(
@@ -351,12 +463,17 @@ class TradeRecordRepository(BaseRepository):
             reasoning=trade_record.reasoning,
             price_action_context=trade_record.price_action_context.dict(),
             confidence=trade_record.confidence,
-            is_backtest=trade_record.is_backtest
+            is_backtest=trade_record.is_backtest,
+            close_recorded_at=datetime.utcnow() if trade_record.exit_time is not None else None
         )
         
         self.session.add(db_trade)
         self.session.flush()
         
+        # Trades recorded already closed (e.g. backtests) count immediately
+        if db_trade.exit_time is not None:
+            self._refresh_daily_performance(db_trade.strategy_rule_id, db_trade.entry_time.date())
+        
         # Invalidate relevant caches
         if self.use_cache:
             cache_manager.delete(CacheKeys.open_trades(trade_record.asset))
@@ -404,6 +521,81 @@ class TradeRecordRepository(BaseRepository):
         
         return [self._to_pydantic(trade) for trade in query.all()]
     
+    def get_by_strategy_rules(
+        self,
+        strategy_rule_ids: List[str],
+        limit: int = 100,
+        only_closed: bool = False
+    ) -> Dict[str, List[TradeRecord]]:
+        """
+        Get the most recent trades of several strategy rules in one query.
+        
+        Returns:
+            Dict mapping each strategy rule ID to at most ``limit`` trades,
+            newest entry first (as get_by_strategy_rule)
+        """
+        trades_by_rule: Dict[str, List[TradeRecord]] = {rule_id: [] for rule_id in strategy_rule_ids}
+        if not strategy_rule_ids:
+            return trades_by_rule
+        
+        ranked = self.session.query(
+            TradeRecordDB.id,
+            func.row_number().over(
+                partition_by=TradeRecordDB.strategy_rule_id,
+                order_by=(desc(TradeRecordDB.entry_time), TradeRecordDB.id)
+            ).label('rank')
+        ).filter(TradeRecordDB.strategy_rule_id.in_(strategy_rule_ids))
+        
+        if only_closed:
+            ranked = ranked.filter(TradeRecordDB.exit_time.isnot(None))
+        
+        ranked = ranked.subquery()
+        query = self.session.query(TradeRecordDB).join(
+            ranked, TradeRecordDB.id == ranked.c.id
+        ).filter(ranked.c.rank <= limit).order_by(ranked.c.rank)
+        
+        for db_trade in query.all():
+            trades_by_rule[db_trade.strategy_rule_id].append(self._to_pydantic(db_trade))
+        
+        return trades_by_rule
+    
+    def get_closed_recorded_between(
+        self,
+        strategy_rule_ids: List[str],
+        start: Optional[datetime],
+        end: datetime
+    ) -> Dict[str, List[TradeRecord]]:
+        """
+        Get closed trades of several strategy rules whose close was recorded in (start, end].
+        
+        Filters on ``close_recorded_at`` rather than ``exit_time``, so trades
+        recorded late or with a backdated exit are still picked up by the next
+        window. Unlike ``updated_at`` it is written once, so later writes to a
+        closed trade never bring it back into a window.
+        
+        Returns:
+            Dict mapping strategy rule IDs to their trades in recording order
+            (rules without such trades are left out)
+        """
+        trades_by_rule: Dict[str, List[TradeRecord]] = {}
+        if not strategy_rule_ids:
+            return trades_by_rule
+        
+        query = self.session.query(TradeRecordDB).filter(
+            TradeRecordDB.strategy_rule_id.in_(strategy_rule_ids),
+            TradeRecordDB.exit_time.isnot(None),
+            TradeRecordDB.close_recorded_at <= end
+        )
+        if start is not None:
+            query = query.filter(TradeRecordDB.close_recorded_at > start)
+        
+        query = query.order_by(TradeRecordDB.close_recorded_at, TradeRecordDB.id)
+        
+        for db_trade in query.all():
+            trades_by_rule.setdefault(db_trade.strategy_rule_id, []).append(self._to_pydantic(db_trade))
+        
+        return trades_by_rule
+    
     def get_open_trades(self, asset: Optional[str] = None, use_cache: bool = True) -> List[TradeRecord]:
         """Get all open trades with optional caching."""
         # Try cache first
@@ -446,13 +638,21 @@ class TradeRecordRepository(BaseRepository):
         pnl_usd: Optional[float] = None,
         fees_usd: Optional[float] = None
     ) -> bool:
-        """Update trade exit information."""
+        """
+        Record a trade's exit.
+        
+        A trade's exit is recorded once: trades that are already closed are
+        left unchanged and False is returned, since closed trades may already
+        be folded into learning statistics.
+        """
+        now = datetime.utcnow()
         updates = {
             'exit_price': exit_price,
-            'exit_time': datetime.utcnow(),
+            'exit_time': now,
             'exit_reason': exit_reason,
             'outcome': outcome,
-            'updated_at': datetime.utcnow()
+            'close_recorded_at': now,
+            'updated_at': now
         }
         
         if pnl_r is not None:
@@ -462,7 +662,17 @@ class TradeRecordRepository(BaseRepository):
         if fees_usd is not None:
             updates['fees_usd'] = fees_usd
         
-        result = self.session.query(TradeRecordDB).filter_by(id=trade_id).update(updates)
+        result = self.session.query(TradeRecordDB).filter(
+            TradeRecordDB.id == trade_id,
+            TradeRecordDB.exit_time.is_(None)
+        ).update(updates)
+        
+        # Update the daily rollups in the same transaction
+        if result > 0:
+            trade = self.session.query(
+                TradeRecordDB.strategy_rule_id, TradeRecordDB.entry_time
+            ).filter_by(id=trade_id).first()
+            self._refresh_daily_performance(trade.strategy_rule_id, trade.entry_time.date())
         
         # Invalidate caches
         if result > 0 and self.use_cache:
@@ -506,21 +716,30 @@ class TradeRecordRepository(BaseRepository):
         strategy_rule_id: Optional[str] = None,
         days_back: Optional[int] = None
     ) -> StrategyPerformance:
-        """Calculate performance statistics."""
-        query = self.session.query(TradeRecordDB).filter(
-            TradeRecordDB.exit_time.isnot(None)
-        )
+        """
+        Calculate performance statistics from the daily rollups.
         
-        if strategy_rule_id:
-            query = query.filter(TradeRecordDB.strategy_rule_id == strategy_rule_id)
+        Reads one rollup row per trading day; only the first day of a
+        ``days_back`` window (cut off mid-day) is summarized from its trades.
+        """
+        scope = strategy_rule_id or ALL_STRATEGIES
+        rollups = self.session.query(StrategyPerformanceDailyDB).filter(
+            StrategyPerformanceDailyDB.scope == scope
+        )
         
+        accumulator = PerformanceAccumulator()
         if days_back:
             cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-            query = query.filter(TradeRecordDB.entry_time >= cutoff_date)
+            next_day = cutoff_date.date() + timedelta(days=1)
+            accumulator.add(DailyPerformance.from_trades(
+                self._closed_trades(strategy_rule_id, cutoff_date, datetime.combine(next_day, datetime.min.time()))
+            ))
+            rollups = rollups.filter(StrategyPerformanceDailyDB.day >= next_day)
         
-        trades = query.all()
+        for row in rollups.order_by(StrategyPerformanceDailyDB.day):
+            accumulator.add(self._rollup_to_daily(row))
         
-        if not trades:
+        if accumulator.total_trades == 0:
             return StrategyPerformance(
                 strategy_rule_id=strategy_rule_id or "all",
                 total_trades=0,
@@ -528,65 +747,153 @@ class TradeRecordRepository(BaseRepository):
                 losing_trades=0,
                 win_rate=0.0,
                 avg_r_multiple=0.0,
+                max_consecutive_losses=0,
+                max_drawdown=0.0,
                 total_pnl_r=0.0
             )
         
-        winning_trades = [t for t in trades if t.outcome == 'win']
-        losing_trades = [t for t in trades if t.outcome == 'loss']
-        
-        total_pnl_r = sum(t.pnl_r for t in trades if t.pnl_r is not None)
-        avg_r_multiple = total_pnl_r / len(trades) if trades else 0
-        
-        # Calculate profit factor
-        gross_profit = sum(t.pnl_r for t in winning_trades if t.pnl_r and t.pnl_r > 0)
-        gross_loss = abs(sum(t.pnl_r for t in losing_trades if t.pnl_r and t.pnl_r < 0))
-        profit_factor = gross_profit / gross_loss if gross_loss > 0 else None
-        
         return StrategyPerformance(
             strategy_rule_id=strategy_rule_id or "all",
-            total_trades=len(trades),
-            winning_trades=len(winning_trades),
-            losing_trades=len(losing_trades),
-            win_rate=len(winning_trades) / len(trades),
-            avg_r_multiple=avg_r_multiple,
-            profit_factor=profit_factor,
-            max_consecutive_losses=self._calculate_max_consecutive_losses(trades),
-            max_drawdown=self._calculate_max_drawdown(trades),
-            total_pnl_r=total_pnl_r
+            total_trades=accumulator.total_trades,
+            winning_trades=accumulator.winning_trades,
+            losing_trades=accumulator.losing_trades,
+            win_rate=accumulator.winning_trades / accumulator.total_trades,
+            avg_r_multiple=accumulator.total_pnl_r / accumulator.total_trades,
+            profit_factor=accumulator.profit_factor,
+            max_consecutive_losses=accumulator.max_consecutive_losses,
+            # Drawdown is a fraction of peak R; falling below zero caps at 100%
+            max_drawdown=min(accumulator.max_drawdown, 1.0),
+            total_pnl_r=accumulator.total_pnl_r
         )
     
-    def _calculate_max_consecutive_losses(self, trades: List[TradeRecordDB]) -> int:
-        """Calculate maximum consecutive losses."""
-        max_consecutive = 0
-        current_consecutive = 0
+    def rebuild_performance_rollups(self) -> int:
+        """
+        Recompute every daily rollup from the closed trades.
         
-        for trade in sorted(trades, key=lambda t: t.entry_time):
-            if trade.outcome == 'loss':
-                current_consecutive += 1
-                max_consecutive = max(max_consecutive, current_consecutive)
-            else:
-                current_consecutive = 0
+        Used to backfill the rollup table; normal trade creation and exits
+        keep it up to date.
+        
+        Returns:
+            Number of rollup rows written
+        """
+        self.session.query(StrategyPerformanceDailyDB).delete()
+        
+        trades = self.session.query(
+            TradeRecordDB.strategy_rule_id, TradeRecordDB.entry_time,
+            TradeRecordDB.outcome, TradeRecordDB.pnl_r
+        ).filter(
+            TradeRecordDB.exit_time.isnot(None)
+        ).order_by(TradeRecordDB.entry_time, TradeRecordDB.id)
+        
+        groups: Dict[Tuple[str, Any], List[Any]] = {}
+        for trade in trades:
+            day = trade.entry_time.date()
+            groups.setdefault((trade.strategy_rule_id, day), []).append(trade)
+            groups.setdefault((ALL_STRATEGIES, day), []).append(trade)
         
-        return max_consecutive
+        for (scope, day), day_trades in groups.items():
+            row = StrategyPerformanceDailyDB(scope=scope, day=day)
+            self.session.add(row)
+            self._store_daily(row, DailyPerformance.from_trades(day_trades))
+        
+        self.session.flush()
+        return len(groups)
+    
+    def _refresh_daily_performance(self, strategy_rule_id: str, day):
+        """
+        Recompute a day's rollups for the strategy and for all strategies.
+        
+        Both rows are locked before the day's trades are read, so concurrent
+        transactions closing trades on the same day recompute one after the
+        other and the last one sees every committed trade.
+        """
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+        
+        # Lock in a fixed order so two transactions can't wait on each other
+        scopes = sorted({strategy_rule_id, ALL_STRATEGIES})
+        rows = {scope: self._lock_daily(scope, day) for scope in scopes}
+        
+        for scope, row in rows.items():
+            trades = self._closed_trades(
+                None if scope == ALL_STRATEGIES else scope, start, end
+            )
+            self._store_daily(row, DailyPerformance.from_trades(trades))
+        
+        self.session.flush()
     
-    def _calculate_max_drawdown(self, trades: List[TradeRecordDB]) -> float:
-        """Calculate maximum drawdown."""
-        if not trades:
-            return 0.0
+    def _lock_daily(self, scope: str, day) -> StrategyPerformanceDailyDB:
+        """
+        Lock a rollup row for update, creating it if missing.
         
-        equity = 0.0
-        peak = 0.0
-        max_dd = 0.0
+        The row is inserted with ``ON CONFLICT DO NOTHING`` first, so two
+        transactions creating the same day's row don't collide and both end
+        up waiting on the same row lock.
+        """
+        dialect = self.session.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            self.session.execute(
+                insert(StrategyPerformanceDailyDB)
+                .values(scope=scope, day=day, drawdown_profile=[])
+                .on_conflict_do_nothing(index_elements=['scope', 'day'])
+            )
         
-        for trade in sorted(trades, key=lambda t: t.entry_time):
-            if trade.pnl_r is not None:
-                equity += trade.pnl_r
-                if equity > peak:
-                    peak = equity
-                drawdown = (peak - equity) / abs(peak) if peak != 0 else 0
-                max_dd = max(max_dd, drawdown)
+        row = self.session.query(StrategyPerformanceDailyDB).filter_by(
+            scope=scope, day=day
+        ).with_for_update().populate_existing().one_or_none()
+        if row is None:
+            row = StrategyPerformanceDailyDB(scope=scope, day=day)
+            self.session.add(row)
+        return row
+    
+    def _closed_trades(self, strategy_rule_id: Optional[str], start: datetime, end: datetime):
+        """Closed trades entered in [start, end), in entry order."""
+        query = self.session.query(
+            TradeRecordDB.outcome, TradeRecordDB.pnl_r
+        ).filter(
+            TradeRecordDB.exit_time.isnot(None),
+            TradeRecordDB.entry_time >= start,
+            TradeRecordDB.entry_time < end
+        )
+        if strategy_rule_id:
+            query = query.filter(TradeRecordDB.strategy_rule_id == strategy_rule_id)
+        return query.order_by(TradeRecordDB.entry_time, TradeRecordDB.id).all()
+    
+    def _store_daily(self, row: StrategyPerformanceDailyDB, summary: DailyPerformance):
+        """Write a day's summary into its rollup row, deleting the row if empty."""
+        if summary.total_trades == 0:
+            if row in self.session.new:
+                self.session.expunge(row)
+            else:
+                self.session.delete(row)
+            return
         
-        return max_dd
+        row.total_trades = summary.total_trades
+        row.winning_trades = summary.winning_trades
+        row.losing_trades = summary.losing_trades
+        row.total_pnl_r = summary.total_pnl_r
+        row.gross_profit_r = summary.gross_profit_r
+        row.gross_loss_r = summary.gross_loss_r
+        row.leading_losses = summary.leading_losses
+        row.trailing_losses = summary.trailing_losses
+        row.max_consecutive_losses = summary.max_consecutive_losses
+        row.drawdown_profile = [list(pair) for pair in summary.drawdown_profile]
+    
+    def _rollup_to_daily(self, row: StrategyPerformanceDailyDB) -> DailyPerformance:
+        """Convert a rollup row to a daily summary."""
+        return DailyPerformance(
+            total_trades=row.total_trades,
+            winning_trades=row.winning_trades,
+            losing_trades=row.losing_trades,
+            total_pnl_r=row.total_pnl_r,
+            gross_profit_r=row.gross_profit_r,
+            gross_loss_r=row.gross_loss_r,
+            leading_losses=row.leading_losses,
+            trailing_losses=row.trailing_losses,
+            max_consecutive_losses=row.max_consecutive_losses,
+            drawdown_profile=[tuple(pair) for pair in row.drawdown_profile]
+        )
     
     def _to_pydantic(self, db_trade: TradeRecordDB) -> TradeRecord:
         """Convert database model to Pydantic model."""
@@ -612,7 +919,8 @@ class TradeRecordRepository(BaseRepository):
             confidence=db_trade.confidence,
             is_backtest=db_trade.is_backtest,
             created_at=db_trade.created_at,
-            updated_at=db_trade.updated_at
+            updated_at=db_trade.updated_at,
+            close_recorded_at=db_trade.close_recorded_at
         )
 
 
@@ -643,6 +951,80 @@ class LearningRepository(BaseRepository):
         
         return [self._to_pydantic(entry) for entry in query.all()]
     
+    def get_by_strategy_rules(self, strategy_rule_ids: List[str]) -> Dict[str, List[LearningEntry]]:
+        """Get learning entries for several strategy rules in one query."""
+        entries_by_rule: Dict[str, List[LearningEntry]] = {rule_id: [] for rule_id in strategy_rule_ids}
+        if not strategy_rule_ids:
+            return entries_by_rule
+        
+        query = self.session.query(LearningEntryDB).filter(
+            LearningEntryDB.strategy_rule_id.in_(strategy_rule_ids)
+        ).order_by(desc(LearningEntryDB.confidence))
+        
+        for db_entry in query.all():
+            entries_by_rule[db_entry.strategy_rule_id].append(self._to_pydantic(db_entry))
+        
+        return entries_by_rule
+    
+    def get_running_stats(self, strategy_rule_ids: List[str]) -> Dict[str, RunningStatistics]:
+        """
+        Get stored running statistics for several strategy rules.
+        
+        Rules never seen by a feedback cycle get empty statistics with no watermark.
+        """
+        stats = {rule_id: RunningStatistics(strategy_rule_id=rule_id) for rule_id in strategy_rule_ids}
+        if not strategy_rule_ids:
+            return stats
+        
+        rows = self.session.query(StrategyLearningStateDB).filter(
+            StrategyLearningStateDB.strategy_rule_id.in_(strategy_rule_ids)
+        )
+        for row in rows:
+            stats[row.strategy_rule_id] = RunningStatistics(
+                strategy_rule_id=row.strategy_rule_id,
+                closed_through=row.closed_through,
+                total_trades=row.total_trades,
+                winning_trades=row.winning_trades,
+                losing_trades=row.losing_trades,
+                breakeven_trades=row.breakeven_trades,
+                r_trades=row.r_trades,
+                total_pnl_r=row.total_pnl_r,
+                total_profit_usd=row.total_profit_usd,
+                total_loss_usd=row.total_loss_usd
+            )
+        
+        return stats
+    
+    def save_running_stats(self, stats: List[RunningStatistics]):
+        """Insert or update running statistics for several strategy rules."""
+        if not stats:
+            return
+        
+        rows = {
+            row.strategy_rule_id: row
+            for row in self.session.query(StrategyLearningStateDB).filter(
+                StrategyLearningStateDB.strategy_rule_id.in_([s.strategy_rule_id for s in stats])
+            )
+        }
+        
+        for item in stats:
+            row = rows.get(item.strategy_rule_id)
+            if row is None:
+                row = StrategyLearningStateDB(strategy_rule_id=item.strategy_rule_id)
+                self.session.add(row)
+            
+            row.closed_through = item.closed_through
+            row.total_trades = item.total_trades
+            row.winning_trades = item.winning_trades
+            row.losing_trades = item.losing_trades
+            row.breakeven_trades = item.breakeven_trades
+            row.r_trades = item.r_trades
+            row.total_pnl_r = item.total_pnl_r
+            row.total_profit_usd = item.total_profit_usd
+            row.total_loss_usd = item.total_loss_usd
+        
+        self.session.flush()
+    
     def get_high_confidence_insights(self, min_confidence: float = 0.7) -> List[LearningEntry]:
         """Get high confidence learning insights."""
         query = self.session.query(LearningEntryDB).filter(
@@ -1,10 +1,12 @@
 """
-Semantic search functionality using pgvector and embeddings.
+Semantic search functionality using a local vector index and embeddings.
 Enables finding similar strategy rules based on their descriptions and conditions.
 """
 
 import hashlib
-from typing import List, Optional, Tuple, Dict, Any
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple, Dict, Any, Sequence
 import numpy as np
 
 from sqlalchemy import text
@@ -14,6 +16,7 @@ from ..config import settings
 from ..database.models import StrategyRuleDB
 from .models import StrategyRule
 from .cache import cache_manager, CacheKeys, CacheTTL
+from .vector_index import VectorIndex
 
 
 class EmbeddingGenerator:
@@ -60,6 +63,45 @@ class EmbeddingGenerator:
             print(f"OpenAI embedding error: {e}")
             return self._generate_simple_embedding(text)
     
+    def generate_embeddings(self, texts: Sequence[str], batch_size: int = 100) -> np.ndarray:
+        """
+        Generate embeddings for many texts, batching API requests.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Maximum texts per embeddings API request
+            
+        Returns:
+            float32 array of shape (len(texts), embedding_dimension)
+        """
+        embeddings = np.empty((len(texts), self._embedding_dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch = list(texts[start:start + batch_size])
+            if self.openai_api_key:
+                vectors = self._generate_openai_embeddings(batch)
+            else:
+                vectors = [self._generate_simple_embedding(t) for t in batch]
+            embeddings[start:start + len(batch)] = vectors
+        return embeddings
+    
+    def _generate_openai_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for a batch of texts in one OpenAI request."""
+        try:
+            from openai import OpenAI
+            client = OpenAI(api_key=self.openai_api_key)
+            
+            response = client.embeddings.create(
+                model="text-embedding-3-small",
+                input=texts,
+                encoding_format="float"
+            )
+            
+            data = sorted(response.data, key=lambda item: item.index)
+            return [item.embedding for item in data]
+        except Exception as e:
+            print(f"OpenAI embedding error: {e}")
+            return [self._generate_simple_embedding(t) for t in texts]
+    
     def _generate_simple_embedding(self, text: str, dim: int = 1536) -> List[float]:
         """
         Generate simple hash-based embedding for development/testing.
@@ -87,19 +129,63 @@ class EmbeddingGenerator:
         return self._embedding_dim
 
 
+_rule_index: Optional[VectorIndex] = None
+_rule_index_lock = threading.Lock()
+
+
+def get_rule_index() -> VectorIndex:
+    """
+    Get the process-wide strategy rule vector index.
+    
+    The index is memory-mapped from ``<data_dir>/rule_index`` so it survives
+    restarts and is shared by every repository and the trade reasoner.
+    """
+    global _rule_index
+    if _rule_index is None:
+        with _rule_index_lock:
+            if _rule_index is None:
+                _rule_index = VectorIndex(
+                    EmbeddingGenerator().embedding_dimension,
+                    path=Path(settings.data_dir) / "rule_index"
+                )
+    return _rule_index
+
+
+def rule_index_metadata(rule: StrategyRuleDB) -> Dict[str, Any]:
+    """Metadata stored next to a rule's vector for filtering without the DB."""
+    return {
+        "entry_type": rule.entry_type,
+        "confidence": rule.confidence,
+        "win_rate": rule.win_rate,
+    }
+
+
+def _min_confidence_filter(min_confidence: Optional[float]):
+    """Build an index metadata predicate for a confidence floor."""
+    if not min_confidence:
+        return None
+    return lambda meta: (meta.get("confidence") or 0.0) >= min_confidence
+
+
+def _enum_value(value: Any) -> Any:
+    """Return an enum's value, or the value itself."""
+    return getattr(value, "value", value)
+
+
 class SemanticSearch:
     """Semantic search for strategy rules using vector similarity."""
     
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, index: Optional[VectorIndex] = None):
         """
         Initialize semantic search.
         
         Args:
             session: SQLAlchemy session
+            index: Rule vector index (defaults to the shared on-disk index)
         """
         self.session = session
         self.embedding_generator = EmbeddingGenerator()
-        self._ensure_pgvector_extension()
+        self.index = index if index is not None else get_rule_index()
     
     def _ensure_pgvector_extension(self):
         """Ensure pgvector extension is installed and enabled."""
@@ -162,8 +248,11 @@ class SemanticSearch:
         
         # Add conditions summary
         if rule.conditions:
+            # Freshly flushed rules still hold enums; use their values so the
+            # text matches the same rule read back from the database
             conditions_text = ", ".join(
-                f"{c.get('type', 'unknown')} on {c.get('timeframe', 'unknown')}"
+                f"{_enum_value(c.get('type', 'unknown'))} on "
+                f"{_enum_value(c.get('timeframe', 'unknown'))}"
                 for c in rule.conditions
             )
             parts.append(f"Conditions: {conditions_text}")
@@ -184,39 +273,104 @@ class SemanticSearch:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Get the rule
-            rule = self.session.query(StrategyRuleDB).filter_by(id=rule_id).first()
-            if not rule:
-                return False
-            
-            # Generate text representation
-            rule_text = self.generate_rule_embedding_text(rule)
+        return self.update_rule_embeddings([rule_id]) == 1
+    
+    def update_rule_embeddings(
+        self,
+        rule_ids: Optional[Sequence[str]] = None,
+        batch_size: int = 100
+    ) -> int:
+        """
+        Embed strategy rules in batches and upsert them into the index.
+        
+        Args:
+            rule_ids: Rules to embed (None re-embeds every rule)
+            batch_size: Maximum texts per embeddings API request
             
-            # Generate embedding
-            embedding = self.embedding_generator.generate_embedding(rule_text)
-            if not embedding:
-                return False
+        Returns:
+            Number of rules written to the index
+        """
+        try:
+            embedded = self.embed_rules(rule_ids, batch_size=batch_size)
+            if embedded is None:
+                return 0
+            self.index.add_batch(*embedded)
+            return len(embedded[0])
             
-            # Update rule with embedding
-            # Note: This requires the embedding column to exist
-            try:
-                embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
-                self.session.execute(
-                    text(f"UPDATE strategy_rules SET embedding = :embedding WHERE id = :id"),
-                    {"embedding": embedding_str, "id": rule_id}
-                )
-                self.session.commit()
-                return True
-            except Exception as e:
-                print(f"Error updating embedding (pgvector might not be available): {e}")
-                self.session.rollback()
-                return False
-                
         except Exception as e:
-            print(f"Error updating rule embedding: {e}")
-            self.session.rollback()
-            return False
+            print(f"Error updating rule embeddings: {e}")
+            return 0
+    
+    def embed_rules(
+        self,
+        rule_ids: Optional[Sequence[str]] = None,
+        batch_size: int = 100
+    ) -> Optional[Tuple[List[str], np.ndarray, List[Dict[str, Any]]]]:
+        """
+        Embed strategy rules as this session sees them, without indexing them.
+        
+        Returns:
+            (rule IDs, embeddings, index metadata) for ``VectorIndex.add_batch``,
+            or None if no rules matched
+        """
+        query = self.session.query(StrategyRuleDB)
+        if rule_ids is not None:
+            if not rule_ids:
+                return None
+            query = query.filter(StrategyRuleDB.id.in_(list(rule_ids)))
+        rules = query.all()
+        if not rules:
+            return None
+        
+        embeddings = self.embedding_generator.generate_embeddings(
+            [self.generate_rule_embedding_text(rule) for rule in rules],
+            batch_size=batch_size
+        )
+        return (
+            [rule.id for rule in rules],
+            embeddings,
+            [rule_index_metadata(rule) for rule in rules]
+        )
+    
+    def rebuild_index(self, batch_size: int = 100) -> int:
+        """
+        Rebuild the vector index from every rule in the database.
+        
+        Returns:
+            Number of rules indexed
+        """
+        self.index.clear()
+        return self.update_rule_embeddings(None, batch_size=batch_size)
+    
+    def remove_rule(self, rule_id: str) -> bool:
+        """Remove a rule from the vector index."""
+        return self.index.remove(rule_id)
+    
+    def search_text(
+        self,
+        query_text: str,
+        limit: int = 20,
+        min_confidence: Optional[float] = None
+    ) -> List[Tuple[StrategyRule, float]]:
+        """
+        Search the vector index for rules similar to free text.
+        
+        Args:
+            query_text: Search query text
+            limit: Maximum number of results
+            min_confidence: Minimum confidence filter
+            
+        Returns:
+            List of tuples (StrategyRule, similarity_score)
+        """
+        embedding = self.embedding_generator.generate_embedding(query_text)
+        if not embedding:
+            return []
+        
+        matches = self.index.search(
+            embedding, k=limit, where=_min_confidence_filter(min_confidence)
+        )
+        return self._load_matches(matches)
     
     def find_similar_rules(
         self,
@@ -251,8 +405,11 @@ class SemanticSearch:
             if not ref_rule:
                 return []
             
-            # Try vector similarity search
-            similar_rules = self._vector_similarity_search(rule_id, limit, min_confidence)
+            # Try the local vector index, then pgvector for rules not indexed yet
+            if rule_id in self.index:
+                similar_rules = self._index_similarity_search(rule_id, limit, min_confidence)
+            else:
+                similar_rules = self._vector_similarity_search(rule_id, limit, min_confidence)
             
             if not similar_rules:
                 # Fallback to tag-based similarity
@@ -271,13 +428,41 @@ class SemanticSearch:
             print(f"Error finding similar rules: {e}")
             return []
     
+    def _index_similarity_search(
+        self,
+        rule_id: str,
+        limit: int,
+        min_confidence: Optional[float]
+    ) -> List[Tuple[StrategyRule, float]]:
+        """Perform vector similarity search using the local index."""
+        matches = self.index.similar_to(
+            rule_id, k=limit, where=_min_confidence_filter(min_confidence)
+        )
+        return self._load_matches(matches)
+    
+    def _load_matches(self, matches: List[Tuple[str, float]]) -> List[Tuple[StrategyRule, float]]:
+        """Load index matches from the database in one query, keeping their order."""
+        if not matches:
+            return []
+        
+        ids = [rule_id for rule_id, _ in matches]
+        db_rules = {
+            rule.id: rule
+            for rule in self.session.query(StrategyRuleDB).filter(StrategyRuleDB.id.in_(ids))
+        }
+        return [
+            (self._db_to_strategy_rule(db_rules[rule_id]), score)
+            for rule_id, score in matches
+            if rule_id in db_rules
+        ]
+    
     def _vector_similarity_search(
         self,
         rule_id: str,
         limit: int,
         min_confidence: Optional[float]
     ) -> List[Tuple[StrategyRule, float]]:
-        """Perform vector similarity search using pgvector."""
+        """Perform vector similarity search using pgvector (legacy embedding column)."""
         try:
             # Build query with cosine similarity
             query = text("""
@@ -432,4 +617,5 @@ class SemanticSearch:
 __all__ = [
     "EmbeddingGenerator",
     "SemanticSearch",
+    "get_rule_index",
 ]
@@ -0,0 +1,404 @@
+"""
+In-process vector index for strategy rule embeddings.
+
+Stores unit-normalized float32 vectors in a memory-mapped file so cosine
+similarity is a single matrix-vector product. Exact brute-force search is
+used: strategy rule counts are in the thousands at most, where one matmul
+over the mapped matrix is faster than maintaining an ANN graph.
+
+Vectors move between components in a compact binary format (little-endian
+float32) instead of comma-joined strings.
+
+An on-disk index is shared by every process on the host (API workers,
+ingestion writers): writes hold an exclusive ``fcntl`` lock, reload the
+manifest and persist before releasing it, and reads reload the manifest
+whenever another process has replaced it.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    # No cross-process locking (e.g. Windows); one process per index
+    HAS_FCNTL = False
+
+
+VECTOR_DTYPE = np.dtype("<f4")
+
+
+def encode_vector(vector: Union[Sequence[float], np.ndarray]) -> bytes:
+    """Encode a vector as little-endian float32 bytes."""
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def decode_vector(data: bytes) -> np.ndarray:
+    """Decode bytes produced by ``encode_vector`` (read-only, zero-copy)."""
+    return np.frombuffer(data, dtype=VECTOR_DTYPE)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over strategy rule embeddings.
+
+    Each entry has an id, a vector and a small metadata dict (e.g. rule
+    confidence and entry type) so searches can be filtered without a
+    database round trip. When created with a ``path`` the vectors live in
+    ``<path>/vectors.f32`` (memory-mapped) and ids/metadata in
+    ``<path>/index.json``; every write is persisted before it returns, under
+    a lock on ``<path>/index.lock``, so processes sharing the directory
+    never assign the same row or overwrite each other's manifest.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    MANIFEST_FILE = "index.json"
+    LOCK_FILE = "index.lock"
+
+    def __init__(self, dim: int, path: Optional[Union[str, Path]] = None, capacity: int = 256):
+        """
+        Initialize an empty index, or open the one stored at ``path``.
+
+        Args:
+            dim: Vector dimension
+            path: Directory for the memory-mapped index (None = in memory)
+            capacity: Initial row capacity
+        """
+        self.dim = dim
+        self.path = Path(path) if path else None
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._vectors = self._allocate(max(capacity, 1))
+
+        # Cross-process lock state; the descriptor is reopened after a fork
+        self._lock_fd: Optional[int] = None
+        self._lock_pid: Optional[int] = None
+        self._lock_depth = 0
+        self._manifest_stamp: Optional[Tuple[int, int, int]] = None
+
+        if self.path is not None:
+            self.refresh()
+
+    def __len__(self) -> int:
+        with self._locked():
+            return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        with self._locked():
+            return item_id in self._rows
+
+    @property
+    def ids(self) -> List[str]:
+        """Ids in row order."""
+        with self._locked():
+            return list(self._ids)
+
+    def get(self, item_id: str) -> Optional[np.ndarray]:
+        """Get the normalized vector for an id."""
+        with self._locked():
+            row = self._rows.get(item_id)
+            return None if row is None else np.array(self._vectors[row])
+
+    def metadata(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Get the metadata stored with an id."""
+        with self._locked():
+            return self._metadata.get(item_id)
+
+    def refresh(self):
+        """Reload ids and metadata if another process changed the manifest."""
+        with self._locked():
+            pass
+
+    def add(
+        self,
+        item_id: str,
+        vector: Union[Sequence[float], np.ndarray, bytes],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Insert or replace one vector."""
+        if isinstance(vector, bytes):
+            vector = decode_vector(vector)
+        self.add_batch([item_id], np.asarray(vector, dtype=VECTOR_DTYPE)[np.newaxis], [metadata])
+
+    def add_batch(
+        self,
+        item_ids: Sequence[str],
+        vectors: np.ndarray,
+        metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+    ):
+        """
+        Insert or replace many vectors at once.
+
+        Args:
+            item_ids: Ids, one per row of ``vectors``
+            vectors: Array of shape (len(item_ids), dim)
+            metadata: Optional metadata per id
+        """
+        vectors = np.asarray(vectors, dtype=VECTOR_DTYPE)
+        if vectors.ndim != 2 or vectors.shape != (len(item_ids), self.dim):
+            raise ValueError(
+                f"Expected vectors of shape ({len(item_ids)}, {self.dim}), got {vectors.shape}"
+            )
+        if metadata is None:
+            metadata = [None] * len(item_ids)
+
+        vectors = _normalize(vectors)
+        with self._locked(exclusive=True):
+            new_ids = [i for i in dict.fromkeys(item_ids) if i not in self._rows]
+            self._reserve(len(self._ids) + len(new_ids))
+            for item_id in new_ids:
+                self._rows[item_id] = len(self._ids)
+                self._ids.append(item_id)
+
+            rows = [self._rows[item_id] for item_id in item_ids]
+            self._vectors[rows] = vectors
+            for item_id, meta in zip(item_ids, metadata):
+                if meta is not None:
+                    self._metadata[item_id] = dict(meta)
+                else:
+                    self._metadata.setdefault(item_id, {})
+            self._persist()
+
+    def update_metadata(self, item_id: str, **fields: Any) -> bool:
+        """Update metadata fields for an id already in the index."""
+        with self._locked(exclusive=True):
+            if item_id not in self._rows:
+                return False
+            self._metadata[item_id].update(fields)
+            self._persist()
+            return True
+
+    def remove(self, item_id: str) -> bool:
+        """Remove an id (the last row is moved into its slot)."""
+        with self._locked(exclusive=True):
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                return False
+
+            last = len(self._ids) - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = moved_id
+                self._rows[moved_id] = row
+            self._ids.pop()
+            self._metadata.pop(item_id, None)
+            self._persist()
+            return True
+
+    def search(
+        self,
+        query: Union[Sequence[float], np.ndarray, bytes],
+        k: int = 10,
+        exclude: Iterable[str] = (),
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the ``k`` most similar entries to a query vector.
+
+        Args:
+            query: Query vector (any scale) or its binary encoding
+            k: Number of results
+            exclude: Ids to leave out (e.g. the query rule itself)
+            where: Metadata predicate entries must satisfy
+
+        Returns:
+            List of (id, cosine similarity), most similar first
+        """
+        if isinstance(query, bytes):
+            query = decode_vector(query)
+        query = np.asarray(query, dtype=VECTOR_DTYPE)
+        if query.shape != (self.dim,):
+            raise ValueError(f"Expected query of shape ({self.dim},), got {query.shape}")
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        with self._locked():
+            count = len(self._ids)
+            if count == 0 or k <= 0:
+                return []
+            scores = self._vectors[:count] @ query
+
+            excluded = [self._rows[i] for i in exclude if i in self._rows]
+            if where is not None:
+                excluded.extend(
+                    row for row, item_id in enumerate(self._ids)
+                    if not where(self._metadata.get(item_id, {}))
+                )
+            if excluded:
+                scores[excluded] = -np.inf
+
+            k = min(k, count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                (self._ids[row], float(scores[row]))
+                for row in top
+                if scores[row] != -np.inf
+            ]
+
+    def similar_to(
+        self,
+        item_id: str,
+        k: int = 10,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """Find the ``k`` entries most similar to an indexed id (excluding itself)."""
+        with self._locked():
+            vector = self.get(item_id)
+            if vector is None:
+                return []
+            return self.search(vector, k=k, exclude=(item_id,), where=where)
+
+    def save(self):
+        """Flush vectors and write the id/metadata manifest (writes already do this)."""
+        with self._locked(exclusive=True):
+            self._persist()
+
+    def clear(self):
+        """Remove all entries."""
+        with self._locked(exclusive=True):
+            self._ids.clear()
+            self._rows.clear()
+            self._metadata.clear()
+            self._persist()
+
+    @contextmanager
+    def _locked(self, exclusive: bool = False):
+        """
+        Hold the thread lock and, for an on-disk index, the file lock.
+
+        The outermost acquisition takes a shared (read) or exclusive (write)
+        ``flock`` and reloads the manifest if another process replaced it;
+        nested acquisitions in the same thread only re-enter the thread lock.
+        """
+        with self._lock:
+            outermost = self._lock_depth == 0 and self.path is not None
+            if outermost and HAS_FCNTL:
+                fcntl.flock(self._lock_file(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                if outermost:
+                    stamp = self._stat_manifest()
+                    if stamp is not None and stamp != self._manifest_stamp:
+                        self._load()
+                        self._manifest_stamp = stamp
+                yield
+            finally:
+                self._lock_depth -= 1
+                if outermost and HAS_FCNTL:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _lock_file(self) -> int:
+        """Open the lock file once per process."""
+        pid = os.getpid()
+        if self._lock_pid != pid:
+            if self._lock_fd is not None:
+                # Inherited across a fork: the parent's descriptor shares its lock
+                os.close(self._lock_fd)
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._lock_fd = os.open(self.path / self.LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+            self._lock_pid = pid
+        return self._lock_fd
+
+    def _stat_manifest(self) -> Optional[Tuple[int, int, int]]:
+        """Identify the current manifest file (each write replaces it)."""
+        try:
+            stat = os.stat(self.path / self.MANIFEST_FILE)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _persist(self):
+        """Flush vectors and replace the manifest (caller holds the write lock)."""
+        if self.path is None:
+            return
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        manifest = {
+            "dim": self.dim,
+            "ids": self._ids,
+            "metadata": self._metadata,
+        }
+        tmp = self.path / f"{self.MANIFEST_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self.path / self.MANIFEST_FILE)
+        self._manifest_stamp = self._stat_manifest()
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """Allocate vector storage for ``capacity`` rows."""
+        if self.path is None:
+            return np.zeros((capacity, self.dim), dtype=VECTOR_DTYPE)
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        file_path = self.path / self.VECTORS_FILE
+        existing = file_path.stat().st_size if file_path.exists() else 0
+        needed = capacity * self.dim * VECTOR_DTYPE.itemsize
+        if existing < needed:
+            with open(file_path, "ab") as f:
+                f.truncate(needed)
+        rows = max(existing, needed) // (self.dim * VECTOR_DTYPE.itemsize)
+        return np.memmap(file_path, dtype=VECTOR_DTYPE, mode="r+", shape=(rows, self.dim))
+
+    def _reserve(self, rows: int):
+        """Grow storage (doubling) to hold at least ``rows`` vectors."""
+        capacity = len(self._vectors)
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+
+        if self.path is None:
+            grown = np.zeros((capacity, self.dim), dtype=VECTOR_DTYPE)
+            grown[:len(self._ids)] = self._vectors[:len(self._ids)]
+            self._vectors = grown
+        else:
+            # Extending the file keeps existing rows in place
+            self._vectors.flush()
+            del self._vectors
+            self._vectors = self._allocate(capacity)
+
+    def _load(self):
+        """Load ids and metadata from the manifest."""
+        with open(self.path / self.MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        if manifest.get("dim") != self.dim:
+            raise ValueError(
+                f"Index at {self.path} has dimension {manifest.get('dim')}, expected {self.dim}"
+            )
+
+        ids = manifest.get("ids", [])
+        if len(ids) > len(self._vectors):
+            # The writer already extended the file; map it as it is
+            self._vectors.flush()
+            del self._vectors
+            self._vectors = self._allocate(len(ids))
+        self._ids = list(ids)
+        self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+        metadata = manifest.get("metadata", {})
+        self._metadata = {item_id: metadata.get(item_id, {}) for item_id in self._ids}
+
+
+__all__ = [
+    "VectorIndex",
+    "encode_vector",
+    "decode_vector",
+]
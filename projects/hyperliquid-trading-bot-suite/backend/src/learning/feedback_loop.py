@@ -26,6 +26,7 @@ import statistics
 from sqlalchemy.orm import Session
 
 from ..types import StrategyRule, TradeRecord, LearningEntry
+from ..knowledge.performance_rollup import RunningStatistics
 from ..knowledge.repository import (
     StrategyRuleRepository, TradeRecordRepository, LearningRepository
 )
@@ -161,7 +162,10 @@ class FeedbackLoop:
         min_trades_for_update: int = 10,
         confidence_update_threshold: float = 0.05,
         learning_confidence_threshold: float = 0.6,
-        improvement_window_days: int = 30
+        improvement_window_days: int = 30,
+        pattern_window_trades: int = 100,
+        max_workers: Optional[int] = None,
+        close_settle_seconds: float = 60.0
     ):
         """
         Initialize feedback loop.
@@ -172,6 +176,12 @@ class FeedbackLoop:
             confidence_update_threshold: Minimum change to trigger update
             learning_confidence_threshold: Minimum confidence for storing learnings
             improvement_window_days: Days to look back for improvement tracking
+            pattern_window_trades: Most recent trades per strategy mined for patterns
+            max_workers: Processes for analyzing strategies in parallel (None = in-process)
+            close_settle_seconds: Trade closes recorded within this long of a
+                cycle are left for the next one, so transactions still
+                committing (and clock skew between hosts) can't slip behind
+                the watermark
         """
         self._session = session
         self._own_session = session is None
@@ -180,6 +190,9 @@ class FeedbackLoop:
         self.confidence_update_threshold = confidence_update_threshold
         self.learning_confidence_threshold = learning_confidence_threshold
         self.improvement_window_days = improvement_window_days
+        self.pattern_window_trades = pattern_window_trades
+        self.max_workers = max_workers
+        self.close_settle_seconds = close_settle_seconds
         
         self.outcome_analyzer = OutcomeAnalyzer(
             min_trades_for_analysis=min_trades_for_update,
@@ -208,22 +221,37 @@ class FeedbackLoop:
     def run_feedback_cycle(
         self,
         strategy_ids: Optional[List[str]] = None,
-        force_update: bool = False
+        force_update: bool = False,
+        full_rescan: bool = False
     ) -> List[StrategyAnalysis]:
         """
         Run a complete feedback cycle: analyze, update, store learnings.
         
+        Each strategy keeps stored running statistics and a watermark on the
+        trades' ``close_recorded_at``. Only trades whose close was recorded
+        since the watermark are loaded and folded in, and only strategies with
+        such trades are re-analyzed. A late or backdated close is still picked
+        up, since it is found by when it was recorded rather than its exit
+        time, and a closed trade is folded in once however often it is written
+        afterwards. Strategies, trades and learnings are each loaded with one
+        grouped query per cycle.
+        
         Args:
             strategy_ids: Specific strategies to analyze (or all if None)
-            force_update: Force update even if below minimum trades
+            force_update: Force update even if below minimum trades, and
+                re-analyze strategies without new closed trades
+            full_rescan: Discard stored statistics and fold in every closed
+                trade again (e.g. after importing backdated trades)
             
         Returns:
-            List of StrategyAnalysis results
+            List of StrategyAnalysis results for the re-analyzed strategies
         """
         logger.info(
             f"Starting feedback cycle for "
             f"{len(strategy_ids) if strategy_ids else 'all'} strategies"
         )
+        # Closes recorded up to here are settled and can be folded in
+        recorded_through = datetime.utcnow() - timedelta(seconds=self.close_settle_seconds)
         
         with StrategyRuleRepository(self._session) as strategy_repo, \
              TradeRecordRepository(self._session) as trade_repo, \
@@ -231,11 +259,7 @@ class FeedbackLoop:
             
             # Get strategies to analyze
             if strategy_ids:
-                strategies = [
-                    strategy_repo.get_by_id(sid) 
-                    for sid in strategy_ids 
-                    if strategy_repo.get_by_id(sid)
-                ]
+                strategies = strategy_repo.get_by_ids(strategy_ids)
             else:
                 strategies = strategy_repo.get_all(limit=1000)
             
@@ -243,22 +267,52 @@ class FeedbackLoop:
                 logger.warning("No strategies found to analyze")
                 return []
             
-            # Gather trades for each strategy
-            trades_by_strategy = {}
-            existing_learnings = {}
+            all_ids = [strategy.id for strategy in strategies]
+            
+            # Fold trades closed since each strategy's watermark into its statistics
+            if full_rescan:
+                running_stats = {sid: RunningStatistics(strategy_rule_id=sid) for sid in all_ids}
+            else:
+                running_stats = learning_repo.get_running_stats(all_ids)
             
+            watermarks = [stats.closed_through for stats in running_stats.values()]
+            since = None if None in watermarks else min(watermarks)
+            new_trades = trade_repo.get_closed_recorded_between(all_ids, since, recorded_through)
+            
+            changed = []
             for strategy in strategies:
-                trades = trade_repo.get_by_strategy_rule(strategy.id)
-                trades_by_strategy[strategy.id] = trades
-                
-                learnings = learning_repo.get_by_strategy_rule(strategy.id)
-                existing_learnings[strategy.id] = learnings
+                stats = running_stats[strategy.id]
+                trades = [
+                    t for t in new_trades.get(strategy.id, [])
+                    if stats.closed_through is None or t.close_recorded_at > stats.closed_through
+                ]
+                if stats.fold(trades, recorded_through) or force_update:
+                    changed.append(strategy)
+            
+            learning_repo.save_running_stats(list(running_stats.values()))
+            
+            if not changed:
+                self._session.commit()
+                logger.info(
+                    f"Feedback cycle complete: no new closed trades for "
+                    f"{len(strategies)} strategies"
+                )
+                return []
+            
+            # Gather pattern windows and learnings for strategies with new results
+            changed_ids = [strategy.id for strategy in changed]
+            trades_by_strategy = trade_repo.get_by_strategy_rules(
+                changed_ids, limit=self.pattern_window_trades
+            )
+            existing_learnings = learning_repo.get_by_strategy_rules(changed_ids)
             
-            # Analyze all strategies
+            # Analyze changed strategies
             analyses = self.outcome_analyzer.analyze_all_strategies(
-                strategies,
+                changed,
                 trades_by_strategy,
-                existing_learnings
+                existing_learnings,
+                running_stats=running_stats,
+                max_workers=self.max_workers
             )
             
             # Apply learnings
@@ -284,7 +338,8 @@ class FeedbackLoop:
             self._session.commit()
             
             logger.info(
-                f"Feedback cycle complete: {len(analyses)} strategies analyzed, "
+                f"Feedback cycle complete: {len(analyses)} of {len(strategies)} "
+                f"strategies analyzed, "
                 f"{updates_count} confidence scores updated, "
                 f"{learnings_count} new insights stored"
             )
@@ -663,7 +718,8 @@ class FeedbackLoop:
 def run_feedback_cycle(
     strategy_ids: Optional[List[str]] = None,
     force_update: bool = False,
-    session: Optional[Session] = None
+    session: Optional[Session] = None,
+    max_workers: Optional[int] = None
 ) -> List[StrategyAnalysis]:
     """
     Convenience function to run a feedback cycle.
@@ -672,11 +728,12 @@ def run_feedback_cycle(
         strategy_ids: Specific strategies to analyze
         force_update: Force update even if below minimum trades
         session: Database session
+        max_workers: Processes for parallel strategy analysis
         
     Returns:
         List of StrategyAnalysis results
     """
-    with FeedbackLoop(session=session) as feedback_loop:
+    with FeedbackLoop(session=session, max_workers=max_workers) as feedback_loop:
         return feedback_loop.run_feedback_cycle(
             strategy_ids=strategy_ids,
             force_update=force_update
@@ -17,6 +17,7 @@ Author: Hyperliquid Trading Bot Suite
 """
 
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass, field
@@ -28,6 +29,7 @@ from ..types import (
     MarketCycle, OrderSide, ExitReason
 )
 from ..knowledge.models import StrategyPerformance
+from ..knowledge.performance_rollup import RunningStatistics
 from ..backtest.statistics import (
     BacktestStatisticsCalculator, TradeStatistics, ComprehensiveStatistics
 )
@@ -152,7 +154,8 @@ class OutcomeAnalyzer:
         self,
         strategy_rule: StrategyRule,
         trades: List[TradeRecord],
-        existing_learnings: Optional[List[LearningEntry]] = None
+        existing_learnings: Optional[List[LearningEntry]] = None,
+        running_stats: Optional[RunningStatistics] = None
     ) -> StrategyAnalysis:
         """
         Analyze all trades for a specific strategy and generate insights.
@@ -161,6 +164,8 @@ class OutcomeAnalyzer:
             strategy_rule: The strategy rule being analyzed
             trades: All trades executed with this strategy
             existing_learnings: Previous learning entries (to avoid duplicates)
+            running_stats: Stored cumulative statistics; when given, performance
+                metrics come from these and ``trades`` is only mined for patterns
             
         Returns:
             StrategyAnalysis with complete analysis and recommendations
@@ -176,21 +181,26 @@ class OutcomeAnalyzer:
             old_confidence=strategy_rule.confidence
         )
         
+        trade_count = running_stats.total_trades if running_stats is not None else len(trades)
+        
         # Need minimum trades for meaningful analysis
-        if len(trades) < self.min_trades_for_analysis:
+        if trade_count < self.min_trades_for_analysis:
             logger.info(
-                f"Insufficient trades ({len(trades)}) for analysis "
+                f"Insufficient trades ({trade_count}) for analysis "
                 f"(minimum: {self.min_trades_for_analysis})"
             )
-            analysis.total_trades = len(trades)
+            analysis.total_trades = trade_count
             analysis.new_confidence = strategy_rule.confidence
             analysis.recommendations.append(
-                f"Need {self.min_trades_for_analysis - len(trades)} more trades for meaningful analysis"
+                f"Need {self.min_trades_for_analysis - trade_count} more trades for meaningful analysis"
             )
             return analysis
         
         # Calculate basic statistics
-        trade_stats = self.stats_calculator.calculate_trade_statistics(trades)
+        if running_stats is not None:
+            trade_stats = self._running_trade_statistics(running_stats)
+        else:
+            trade_stats = self.stats_calculator.calculate_trade_statistics(trades)
         
         analysis.total_trades = trade_stats.total_trades
         analysis.win_rate = trade_stats.win_rate
@@ -246,29 +256,44 @@ class OutcomeAnalyzer:
         self,
         strategies: List[StrategyRule],
         trades_by_strategy: Dict[str, List[TradeRecord]],
-        existing_learnings: Optional[Dict[str, List[LearningEntry]]] = None
+        existing_learnings: Optional[Dict[str, List[LearningEntry]]] = None,
+        running_stats: Optional[Dict[str, RunningStatistics]] = None,
+        max_workers: Optional[int] = None
     ) -> List[StrategyAnalysis]:
         """
         Analyze all strategies and their trades.
         
+        Strategies are independent, so with ``max_workers`` > 1 they are
+        analyzed in a process pool. Results keep the order of ``strategies``.
+        
         Args:
             strategies: List of strategy rules
             trades_by_strategy: Dict mapping strategy_rule_id to trades
             existing_learnings: Dict mapping strategy_rule_id to learning entries
+            running_stats: Dict mapping strategy_rule_id to stored statistics
+            max_workers: Worker processes (None or 1 analyzes in-process)
             
         Returns:
             List of StrategyAnalysis objects
         """
         logger.info(f"Analyzing {len(strategies)} strategies")
         
-        analyses = []
-        
-        for strategy in strategies:
-            trades = trades_by_strategy.get(strategy.id, [])
-            learnings = existing_learnings.get(strategy.id, []) if existing_learnings else None
-            
-            analysis = self.analyze_strategy(strategy, trades, learnings)
-            analyses.append(analysis)
+        trades = [trades_by_strategy.get(s.id, []) for s in strategies]
+        learnings = [
+            existing_learnings.get(s.id, []) if existing_learnings else None
+            for s in strategies
+        ]
+        stats = [running_stats.get(s.id) if running_stats else None for s in strategies]
+        
+        if max_workers and max_workers > 1 and len(strategies) > 1:
+            workers = min(max_workers, len(strategies))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                analyses = list(pool.map(
+                    self.analyze_strategy, strategies, trades, learnings, stats,
+                    chunksize=max(1, len(strategies) // (workers * 4))
+                ))
+        else:
+            analyses = list(map(self.analyze_strategy, strategies, trades, learnings, stats))
         
         logger.info(f"Completed analysis of {len(analyses)} strategies")
         return analyses
@@ -808,6 +833,26 @@ class OutcomeAnalyzer:
         
         return asset_win_rates[:5]  # Top 5 assets
     
+    def _running_trade_statistics(self, running: RunningStatistics) -> TradeStatistics:
+        """Trade statistics used for confidence scoring, from stored running totals."""
+        stats = TradeStatistics()
+        stats.total_trades = running.total_trades
+        stats.winning_trades = running.winning_trades
+        stats.losing_trades = running.losing_trades
+        stats.breakeven_trades = running.breakeven_trades
+        stats.win_rate = running.win_rate
+        stats.loss_rate = (
+            running.losing_trades / running.total_trades * 100 if running.total_trades else 0.0
+        )
+        stats.total_profit = running.total_profit_usd
+        stats.total_loss = running.total_loss_usd
+        stats.avg_r_multiple = running.avg_r_multiple
+        stats.expectancy_r = stats.avg_r_multiple
+        stats.profit_factor = (
+            abs(stats.total_profit / stats.total_loss) if stats.total_loss != 0 else 0.0
+        )
+        return stats
+    
     # ===== CONFIDENCE CALCULATION =====
     
     def _calculate_new_confidence(
@@ -13,6 +13,7 @@ from .risk_manager import (
     AssetExposure
 )
 from .trade_reasoner import TradeReasoner, TradeReasoning
+from .strategy_index import StrategyMatchIndex
 
 __all__ = [
     "HyperliquidClient",
@@ -29,5 +30,6 @@ __all__ = [
     "DailyRiskMetrics",
     "AssetExposure",
     "TradeReasoner",
-    "TradeReasoning"
+    "TradeReasoning",
+    "StrategyMatchIndex"
 ]
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+In-memory strategy rule index for trade reasoning.
+
+Matching a setup against the knowledge base used to query every rule of the
+setup's entry type and re-derive its score on each analysis. This index
+loads the rules once, precomputes the parts of the match score that only
+depend on the rule, and buckets rules by entry type so a match query is a
+single pass over one bucket with no database round trip.
+
+The index listens to StrategyRuleRepository change notifications and
+reloads changed rules on the next query.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from ..knowledge.models import StrategyRule
+from ..knowledge.repository import StrategyRuleRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+# Match score weights (see StrategyMatchIndex.score)
+CONFIDENCE_WEIGHT = 0.4
+CYCLE_BONUS = 0.2
+ALIGNMENT_BONUS = 0.2
+WIN_RATE_BONUS = 0.2
+
+
+@dataclass(frozen=True)
+class IndexedRule:
+    """A strategy rule with its precomputed match features."""
+    rule: StrategyRule
+    confidence_score: float
+    win_rate_bonus: float
+    cycles: FrozenSet[str]
+    tf_pairs: Tuple[Tuple[str, str], ...]
+
+    @classmethod
+    def from_rule(cls, rule: StrategyRule) -> "IndexedRule":
+        win_rate_bonus = WIN_RATE_BONUS if rule.win_rate and rule.win_rate > 0.5 else 0.0
+
+        cycles = frozenset(
+            condition.params.get("cycle")
+            for condition in rule.conditions
+            if condition.type.value == "cycle" and condition.params.get("cycle") is not None
+        )
+        tf_pairs = tuple(dict.fromkeys(
+            (alignment.higher_tf.value, alignment.lower_tf.value)
+            for alignment in rule.confluence_required
+        ))
+        return cls(
+            rule=rule,
+            confidence_score=rule.confidence * CONFIDENCE_WEIGHT,
+            win_rate_bonus=win_rate_bonus,
+            cycles=cycles,
+            tf_pairs=tf_pairs
+        )
+
+    @property
+    def base_score(self) -> float:
+        """Score terms that do not depend on the setup."""
+        return self.confidence_score + self.win_rate_bonus
+
+    @property
+    def sort_key(self) -> Tuple[float, float, str]:
+        """Repository order: confidence, then win rate (unknown last), descending; then ID."""
+        win_rate = self.rule.win_rate if self.rule.win_rate is not None else -1.0
+        return (-self.rule.confidence, -win_rate, self.rule.id)
+
+
+class _Bucket:
+    """Rules of one entry type in repository order."""
+
+    def __init__(self, entries: Iterable[IndexedRule]):
+        self.entries = sorted(entries, key=lambda e: e.sort_key)
+        # Best base score from each position on, for early exit
+        self.max_base_from: List[float] = [0.0] * len(self.entries)
+        running = float("-inf")
+        for i in range(len(self.entries) - 1, -1, -1):
+            running = max(running, self.entries[i].base_score)
+            self.max_base_from[i] = running
+
+
+class StrategyMatchIndex:
+    """
+    Strategy rules bucketed by entry type with precomputed match scores.
+
+    A rule's match score for a setup is::
+
+        confidence * 0.4
+        + 0.2 if the rule has a cycle condition for the higher TF cycle
+        + 0.2 if any required TF alignment pair is present in the analysis
+        + 0.2 if the rule's win rate is above 50%
+
+    The confidence and win rate terms are precomputed per rule; the cycle
+    and alignment terms are set/tuple lookups. Ties go to the rule that
+    comes first in repository order (highest confidence, then win rate),
+    then to the lowest rule ID so results are deterministic.
+    """
+
+    def __init__(self, min_confidence: float = 0.3, max_age: Optional[float] = 300.0):
+        """
+        Initialize an empty index.
+
+        Args:
+            min_confidence: Rules below this confidence are never matched
+            max_age: Seconds before a full reload (catches changes made by
+                other processes); None disables periodic reloads
+        """
+        self.min_confidence = min_confidence
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+        self._rules: Dict[str, IndexedRule] = {}
+        self._loaded_at: Optional[float] = None
+        self._pending: Set[str] = set()
+        StrategyRuleRepository.add_change_listener(self)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def on_rules_changed(self, rule_ids: Optional[Iterable[str]] = None):
+        """
+        Repository change notification.
+
+        Args:
+            rule_ids: Changed rule IDs (None invalidates the whole index)
+        """
+        with self._lock:
+            if rule_ids is None:
+                self._loaded_at = None
+                self._pending.clear()
+            elif self._loaded_at is not None:
+                self._pending.update(rule_ids)
+
+    def invalidate(self):
+        """Force a full reload on the next query."""
+        self.on_rules_changed(None)
+
+    def load(self, repository: StrategyRuleRepository):
+        """Load every rule above the confidence floor from the repository."""
+        rules = repository.get_all(limit=None, min_confidence=self.min_confidence)
+        entries = [IndexedRule.from_rule(rule) for rule in rules]
+
+        with self._lock:
+            self._rules = {entry.rule.id: entry for entry in entries}
+            self._rebuild_buckets(set(self._entry_type(e) for e in entries), reset=True)
+            self._pending.clear()
+            self._loaded_at = time.monotonic()
+
+        logger.debug(f"Strategy match index loaded {len(entries)} rules")
+
+    def best_match(
+        self,
+        repository: StrategyRuleRepository,
+        entry_type: str,
+        cycle: Optional[str] = None,
+        timeframes: Iterable[str] = ()
+    ) -> Optional[StrategyRule]:
+        """
+        Find the best matching rule for a setup.
+
+        Args:
+            repository: Repository to (re)load rules from when stale
+            entry_type: Lower timeframe entry pattern value
+            cycle: Higher timeframe market cycle value
+            timeframes: Timeframe values present in the analysis
+
+        Returns:
+            Highest scoring rule, or None if no rule of the entry type exists
+        """
+        self._refresh(repository)
+        bucket = self._buckets.get(entry_type)
+        if bucket is None:
+            return None
+
+        timeframes = timeframes if isinstance(timeframes, (set, frozenset, dict)) else set(timeframes)
+        max_bonus = (CYCLE_BONUS if cycle else 0.0) + ALIGNMENT_BONUS
+
+        best_rule = None
+        best_score = 0.0
+        for i, entry in enumerate(bucket.entries):
+            # Margin keeps the bound safe from float rounding in score()
+            if bucket.max_base_from[i] + max_bonus < best_score - 1e-9:
+                break
+
+            score = self.score(entry, cycle, timeframes)
+            if score > best_score:
+                best_score = score
+                best_rule = entry.rule
+
+        return best_rule
+
+    @staticmethod
+    def score(entry: IndexedRule, cycle: Optional[str], timeframes) -> float:
+        """Match score of an indexed rule for a setup."""
+        score = entry.confidence_score
+        if cycle and cycle in entry.cycles:
+            score += CYCLE_BONUS
+        for higher_tf, lower_tf in entry.tf_pairs:
+            if higher_tf in timeframes and lower_tf in timeframes:
+                score += ALIGNMENT_BONUS
+                break
+        return score + entry.win_rate_bonus
+
+    def _refresh(self, repository: StrategyRuleRepository):
+        """Reload the index or changed rules if needed."""
+        stale = (
+            self._loaded_at is None
+            or (self.max_age is not None and time.monotonic() - self._loaded_at > self.max_age)
+        )
+        if stale:
+            self.load(repository)
+            return
+        if not self._pending:
+            return
+
+        with self._lock:
+            pending, self._pending = self._pending, set()
+
+        changed = {}
+        for rule_id in pending:
+            rule = repository.get_by_id(rule_id, use_cache=False)
+            changed[rule_id] = (
+                IndexedRule.from_rule(rule)
+                if rule is not None and rule.confidence >= self.min_confidence
+                else None
+            )
+
+        with self._lock:
+            entry_types = set()
+            for rule_id, entry in changed.items():
+                old = self._rules.pop(rule_id, None)
+                if old is not None:
+                    entry_types.add(self._entry_type(old))
+                if entry is not None:
+                    self._rules[rule_id] = entry
+                    entry_types.add(self._entry_type(entry))
+            self._rebuild_buckets(entry_types)
+
+    def _rebuild_buckets(self, entry_types: Set[str], reset: bool = False):
+        """Rebuild buckets for the given entry types from ``self._rules``."""
+        buckets = {} if reset else dict(self._buckets)
+        for entry_type in entry_types:
+            entries = [e for e in self._rules.values() if self._entry_type(e) == entry_type]
+            if entries:
+                buckets[entry_type] = _Bucket(entries)
+            else:
+                buckets.pop(entry_type, None)
+        # Swap in a new dict so concurrent queries see a consistent view
+        self._buckets = buckets
+
+    @staticmethod
+    def _entry_type(entry: IndexedRule) -> str:
+        entry_type = entry.rule.entry_type
+        return getattr(entry_type, "value", entry_type)
+
+
+__all__ = [
+    "IndexedRule",
+    "StrategyMatchIndex",
+]
@@ -33,6 +33,9 @@ from ..types import (
 )
 from ..detection.confluence_scorer import ConfluenceScore, TimeframeAnalysis, SignalGeneration
 from ..knowledge.repository import StrategyRuleRepository
+from ..knowledge.semantic_search import get_rule_index
+from ..knowledge.vector_index import VectorIndex
+from .strategy_index import StrategyMatchIndex
 from ..knowledge.models import StrategyRule, TradeRecord, PriceActionSnapshot
 
 
@@ -124,7 +127,9 @@ class TradeReasoner:
         self,
         anthropic_api_key: Optional[str] = None,
         model: str = "claude-sonnet-4-20250514",
-        use_llm: bool = True
+        use_llm: bool = True,
+        rule_index: Optional[VectorIndex] = None,
+        strategy_index: Optional[StrategyMatchIndex] = None
     ):
         """
         Initialize trade reasoner.
@@ -133,9 +138,13 @@ class TradeReasoner:
             anthropic_api_key: Anthropic API key (or use ANTHROPIC_API_KEY env var)
             model: Claude model to use (Sonnet for speed/cost balance)
             use_llm: Whether to use LLM or just rule-based reasoning
+            rule_index: Strategy rule vector index (defaults to the shared index)
+            strategy_index: In-memory index used to match setups to strategy rules
         """
         self.use_llm = use_llm and HAS_ANTHROPIC
         self.model = model
+        self._rule_index = rule_index
+        self.strategy_index = strategy_index or StrategyMatchIndex()
         
         if self.use_llm:
             api_key = anthropic_api_key or os.getenv("ANTHROPIC_API_KEY")
@@ -318,60 +327,50 @@ Format your response as JSON with these fields:
         Matches based on entry type, market cycle, and required conditions.
         """
         try:
-            # Get all strategies with matching entry type
+            # Matching needs the lower timeframe entry pattern
             if not confluence_score.lower_tf_pattern:
                 return None
             
-            strategies = repository.get_all(
+            # Scored from the in-memory index (confidence, cycle condition,
+            # timeframe alignment and win rate); no database query unless stale
+            cycle = confluence_score.higher_tf_cycle
+            best_strategy = self.strategy_index.best_match(
+                repository,
                 entry_type=confluence_score.lower_tf_pattern.value,
-                min_confidence=0.3  # Only consider strategies with some confidence
+                cycle=cycle.value if cycle else None,
+                timeframes=confluence_score.timeframe_analyses
             )
             
-            if not strategies:
-                return None
-            
-            # Score each strategy by how well it matches current conditions
-            best_strategy = None
-            best_score = 0.0
-            
-            for strategy in strategies:
-                score = 0.0
-                
-                # Base score from strategy confidence
-                score += strategy.confidence * 0.4
-                
-                # Bonus for cycle match
-                if confluence_score.higher_tf_cycle:
-                    # Check if any condition specifies this cycle
-                    for condition in strategy.conditions:
-                        if (condition.type.value == "cycle" and 
-                            condition.params.get("cycle") == confluence_score.higher_tf_cycle.value):
-                            score += 0.2
-                            break
-                
-                # Bonus for timeframe alignment
-                if strategy.confluence_required:
-                    for alignment in strategy.confluence_required:
-                        # Check if alignment matches our analysis
-                        if (alignment.higher_tf.value in confluence_score.timeframe_analyses and
-                            alignment.lower_tf.value in confluence_score.timeframe_analyses):
-                            score += 0.2
-                            break
-                
-                # Bonus for recent success (if win_rate exists)
-                if strategy.win_rate and strategy.win_rate > 0.5:
-                    score += 0.2
-                
-                if score > best_score:
-                    best_score = score
-                    best_strategy = strategy
-            
             return best_strategy
             
         except Exception as e:
             logger.error(f"Error finding matching strategy: {e}")
             return None
     
+    def find_similar_strategies(
+        self,
+        strategy_id: str,
+        limit: int = 5,
+        min_confidence: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Find strategy rules similar to a matched strategy.
+        
+        Reads the in-process vector index only (no database round trip), so
+        it is cheap enough to call for every analyzed setup.
+        
+        Returns:
+            List of (strategy rule ID, cosine similarity), most similar first
+        """
+        if self._rule_index is None:
+            self._rule_index = get_rule_index()
+        
+        where = None
+        if min_confidence is not None:
+            where = lambda meta: (meta.get("confidence") or 0.0) >= min_confidence
+        
+        return self._rule_index.similar_to(strategy_id, k=limit, where=where)
+    
     def _describe_setup_type(
         self,
         confluence_score: ConfluenceScore,
@@ -0,0 +1,209 @@
+"""
+Unit tests for the on-disk backtest result store.
+"""
+
+import json
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.backtest.result_store import HEARTBEAT_TIMEOUT, BacktestResultStore
+from src.types import ExitReason, OrderSide, TradeOutcome, TradeRecord
+
+
+def make_trades(count):
+    start = datetime(2024, 1, 1)
+    trades = []
+    for i in range(count):
+        closed = i % 3 != 0
+        trades.append(TradeRecord(
+            id=f"trade-{i}",
+            strategy_rule_id="rule-1",
+            asset="BTC",
+            direction=OrderSide.LONG if i % 2 else OrderSide.SHORT,
+            entry_price=100.0 + i,
+            entry_time=start + timedelta(hours=i),
+            quantity=0.5,
+            exit_price=105.0 + i if closed else None,
+            exit_time=start + timedelta(hours=i, minutes=30) if closed else None,
+            exit_reason=ExitReason.TP1 if closed else None,
+            outcome=TradeOutcome.WIN if closed else TradeOutcome.PENDING,
+            pnl_absolute=2.5 * i,
+            reasoning=f"Setup {i} — pullback into demand",
+            take_profit_levels=[110.0 + i, 120.0 + i],
+        ))
+    return trades
+
+
+def make_equity(count):
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            'timestamp': (start + timedelta(minutes=i)).isoformat(),
+            'equity': 10000.0 + i,
+            'balance': 10000.0,
+            'open_positions': i % 3,
+            'drawdown': 0.0,
+            'drawdown_pct': 0,
+        }
+        for i in range(count)
+    ]
+
+
+def make_meta(created_at, status='completed'):
+    return {
+        'name': 'Test',
+        'status': status,
+        'progress': 1.0 if status == 'completed' else 0.0,
+        'config': {
+            'name': 'Test',
+            'symbol': 'BTC',
+            'start_date': '2024-01-01T00:00:00Z',
+            'end_date': '2024-02-01T00:00:00Z',
+            'strategy_ids': ['rule-1'],
+            'initial_capital': 10000,
+        },
+        'created_at': created_at,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BacktestResultStore(tmp_path / "backtests", metadata_cache_size=2)
+
+
+class TestBacktestResultStore:
+    """Test cases for storing and reading results."""
+
+    def test_trades_round_trip(self, store):
+        """Trades read back with their types, page by page."""
+        trades = make_trades(10)
+        store.create("bt_1", make_meta("2024-01-01"))
+        store.save_results("bt_1", trades, make_equity(5))
+
+        assert store.trade_count("bt_1") == 10
+        page = store.get_trades("bt_1", offset=3, limit=4)
+
+        assert [t['id'] for t in page] == [f"trade-{i}" for i in range(3, 7)]
+        first = page[0]
+        assert first['direction'] == OrderSide.LONG.value
+        assert first['entry_time'] == trades[3].entry_time
+        assert first['exit_price'] is None
+        assert first['exit_time'] is None
+        assert first['outcome'] == TradeOutcome.PENDING.value
+        assert first['take_profit_levels'] == [113.0, 123.0]
+        assert first['reasoning'] == trades[3].reasoning
+        assert page[1]['exit_reason'] == ExitReason.TP1.value
+        assert page[1]['exit_time'] == trades[4].exit_time
+        assert store.get_trades("bt_1", offset=9, limit=5)[0]['id'] == "trade-9"
+        assert store.get_trades("bt_1", offset=20, limit=5) == []
+
+    def test_equity_round_trip(self, store):
+        """The equity curve reads back as stored, with memory-mapped columns."""
+        equity = make_equity(50)
+        store.create("bt_1", make_meta("2024-01-01"))
+        store.save_results("bt_1", [], equity)
+
+        assert store.get_equity_curve("bt_1") == equity
+        assert store.get_equity_curve("bt_1", 10, 12) == equity[10:12]
+
+        columns = store.get_equity_columns("bt_1")
+        assert isinstance(columns['equity'], np.memmap)
+        assert columns['timestamp'][1] - columns['timestamp'][0] == 60
+        assert store.trade_count("bt_1") == 0
+
+    def test_equity_indexed_read(self, store):
+        """Selected rows (e.g. a downsampled window) decode only those points."""
+        equity = make_equity(50)
+        store.create("bt_1", make_meta("2024-01-01"))
+        store.save_results("bt_1", [], equity)
+
+        indices = np.array([0, 7, 8, 31, 49])
+        assert store.get_equity_curve("bt_1", indices=indices) == [equity[i] for i in indices]
+        assert store.get_equity_curve("bt_1", indices=np.array([], dtype=np.int64)) == []
+
+    def test_metadata_is_lru_bounded_and_persistent(self, store, tmp_path):
+        """Only a few metadata entries stay in memory; all survive a restart."""
+        for i in range(5):
+            store.create(f"bt_{i}", make_meta(f"2024-01-0{i + 1}"))
+        store.update("bt_0", progress=0.5)
+
+        assert len(store._metadata) == 2
+        assert store.get("bt_3")['created_at'] == "2024-01-04"
+
+        reopened = BacktestResultStore(tmp_path / "backtests")
+        total, page = reopened.list(limit=2, offset=1)
+        assert total == 5
+        assert [m['backtest_id'] for m in page] == ["bt_3", "bt_2"]
+        assert reopened.get("bt_0")['progress'] == 0.5
+
+    def set_owner(self, store, backtest_id, **fields):
+        """Rewrite a backtest's owner record, as if another process created it."""
+        meta_file = store.root / backtest_id / "meta.json"
+        meta = json.loads(meta_file.read_text())
+        meta['owner'].update(fields.pop('owner', {}))
+        meta.update(fields)
+        meta_file.write_text(json.dumps(meta))
+
+    def test_interrupted_backtests_marked_failed(self, store, tmp_path):
+        """A backtest whose owning process stopped is failed on reload."""
+        exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                                capture_output=True, text=True)
+        store.create("bt_run", make_meta("2024-01-01", status='running'))
+        store.create("bt_done", make_meta("2024-01-02"))
+        self.set_owner(store, "bt_run", owner={'pid': int(exited.stdout), 'process': "gone"})
+
+        reopened = BacktestResultStore(tmp_path / "backtests")
+
+        assert reopened.get("bt_run")['status'] == 'failed'
+        assert reopened.get("bt_run")['error']
+        assert reopened.get("bt_done")['status'] == 'completed'
+        assert reopened.list(status='failed')[0] == 1
+
+    def test_live_owners_keep_their_backtests(self, store, tmp_path):
+        """Runs owned by live workers, here or on another host, are left running."""
+        store.create("bt_here", make_meta("2024-01-01", status='running'))
+        store.create("bt_remote", make_meta("2024-01-02", status='running'))
+        store.create("bt_stale", make_meta("2024-01-03", status='running'))
+        self.set_owner(store, "bt_remote", owner={'host': "other-host"})
+        stale = datetime.now(timezone.utc) - timedelta(seconds=HEARTBEAT_TIMEOUT + 1)
+        self.set_owner(store, "bt_stale", owner={'host': "other-host"}, heartbeat_at=stale.isoformat())
+
+        reopened = BacktestResultStore(tmp_path / "backtests")
+
+        assert reopened.get("bt_here")['status'] == 'running'
+        assert reopened.get("bt_remote")['status'] == 'running'
+        assert reopened.get("bt_stale")['status'] == 'failed'
+
+    def test_workers_see_each_others_backtests(self, store, tmp_path):
+        """Another worker's backtests are found, with current progress."""
+        other = BacktestResultStore(tmp_path / "backtests")
+        other._owner = {**other._owner, 'process': "another-worker"}
+        other.create("bt_other", make_meta("2024-01-01", status='running'))
+
+        assert "bt_other" in store
+        assert store.get("bt_other")['progress'] == 0.0
+        other.update("bt_other", progress=0.5)
+        assert store.get("bt_other")['progress'] == 0.5
+        assert store.list(status='running')[0] == 1
+
+        other.delete("bt_other")
+        assert store.get("bt_other") is None
+        assert store.list()[0] == 0
+
+    def test_delete(self, store):
+        store.create("bt_1", make_meta("2024-01-01"))
+        store.save_results("bt_1", make_trades(2), make_equity(2))
+
+        assert store.delete("bt_1")
+        assert store.get("bt_1") is None
+        assert not (store.root / "bt_1").exists()
+        assert not store.delete("bt_1")
+
+    def test_rejects_path_ids(self, store):
+        with pytest.raises(ValueError):
+            store.create("../escape", make_meta("2024-01-01"))
+
@@ -0,0 +1,247 @@
+"""
+Equivalence tests and benchmark for the vectorized equity-curve statistics.
+
+The reference functions below are the original point-by-point loops; the
+array implementation must reproduce them (exactly for aggregation and
+drawdown periods, within float tolerance for means and deviations).
+"""
+
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from src.backtest.statistics import BacktestStatisticsCalculator
+
+
+# ===== REFERENCE (LOOP) IMPLEMENTATION =====
+
+def _parse(timestamp):
+    return datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+
+
+def reference_aggregate(equity_curve: List[Dict[str, Any]], key: str, end_of_day: bool):
+    data = {}
+    for point in equity_curve:
+        timestamp = _parse(point['timestamp'])
+        if end_of_day:
+            stamp = timestamp.replace(hour=23, minute=59, second=59)
+        else:
+            stamp = timestamp
+        data[timestamp.strftime(key)] = {'timestamp': stamp, 'equity': point['equity']}
+    return [data[k] for k in sorted(data.keys())]
+
+
+def reference_period_returns(period_data):
+    returns = []
+    for i in range(1, len(period_data)):
+        prev_equity = period_data[i - 1]['equity']
+        curr_equity = period_data[i]['equity']
+        if prev_equity > 0:
+            returns.append((curr_equity - prev_equity) / prev_equity)
+    return returns
+
+
+def reference_drawdowns(equity_curve):
+    peak = equity_curve[0]['equity']
+    max_dd = 0.0
+    max_dd_pct = 0.0
+    drawdowns = []
+    current_dd_start = None
+    current_dd_peak = peak
+    all_dds = []
+
+    for point in equity_curve:
+        equity = point['equity']
+        timestamp = _parse(point['timestamp'])
+        if equity > peak:
+            if current_dd_start is not None:
+                drawdowns.append({
+                    'start': current_dd_start,
+                    'end': timestamp,
+                    'duration_days': (timestamp - current_dd_start).total_seconds() / 86400,
+                    'peak_equity': current_dd_peak,
+                    'trough_equity': peak,
+                    'drawdown': current_dd_peak - peak,
+                    'drawdown_pct': ((current_dd_peak - peak) / current_dd_peak * 100) if current_dd_peak > 0 else 0.0
+                })
+                current_dd_start = None
+            peak = equity
+            current_dd_peak = equity
+
+        dd = peak - equity
+        dd_pct = (dd / peak * 100) if peak > 0 else 0.0
+        if dd > 0:
+            all_dds.append(dd)
+        if dd > 0 and current_dd_start is None:
+            current_dd_start = timestamp
+            current_dd_peak = peak
+        if dd > max_dd:
+            max_dd = dd
+            max_dd_pct = dd_pct
+
+    avg_dd = statistics.mean(all_dds) if all_dds else 0.0
+    return {
+        'max_drawdown': max_dd,
+        'max_drawdown_pct': max_dd_pct,
+        'avg_drawdown': avg_dd,
+        'avg_drawdown_pct': (avg_dd / peak * 100) if peak > 0 else 0.0,
+        'max_duration_days': max([d['duration_days'] for d in drawdowns]) if drawdowns else 0.0,
+        'recovery_time_days': drawdowns[-1]['duration_days'] if drawdowns else 0.0,
+        'periods': drawdowns
+    }
+
+
+def reference_post_processing(equity_curve):
+    """The loop-based work behind return and risk statistics."""
+    daily = reference_aggregate(equity_curve, "%Y-%m-%d", True)
+    monthly = reference_aggregate(equity_curve, "%Y-%m", False)
+    daily_returns = reference_period_returns(daily)
+    monthly_returns = reference_period_returns(monthly)
+    drawdowns = reference_drawdowns(equity_curve)
+    return daily_returns, monthly_returns, drawdowns
+
+
+# ===== FIXTURES =====
+
+def make_curve(points: int, seed: int = 0, step=timedelta(minutes=1), tz=None, as_string=True):
+    """Random-walk equity with flat stretches that touch the running peak."""
+    rng = np.random.default_rng(seed)
+    moves = np.round(rng.normal(0, 4, points), 2)
+    moves[rng.random(points) < 0.2] = 0.0
+    equity = 10000.0 + np.cumsum(moves)
+    start = datetime(2024, 1, 30, 22, 0, tzinfo=tz)
+    curve = []
+    for i, value in enumerate(equity.tolist()):
+        timestamp = start + i * step
+        curve.append({
+            'timestamp': timestamp.isoformat() if as_string else timestamp,
+            'equity': value,
+        })
+    return curve
+
+
+CURVES = {
+    "iso_strings": lambda: make_curve(20_000, seed=1),
+    "datetimes": lambda: make_curve(5_000, seed=2, step=timedelta(minutes=17), as_string=False),
+    "utc_offset": lambda: make_curve(5_000, seed=3, step=timedelta(minutes=31), tz=timezone(timedelta(hours=5))),
+    "hourly": lambda: make_curve(3_000, seed=4, step=timedelta(hours=1)),
+}
+
+
+@pytest.fixture(params=list(CURVES))
+def equity_curve(request):
+    return CURVES[request.param]()
+
+
+# ===== EQUIVALENCE TESTS =====
+
+def test_period_aggregation_matches_loop(equity_curve):
+    """Daily and monthly aggregation keep the same points and timestamps."""
+    calculator = BacktestStatisticsCalculator()
+
+    assert calculator._aggregate_to_daily(equity_curve) == reference_aggregate(equity_curve, "%Y-%m-%d", True)
+    assert calculator._aggregate_to_monthly(equity_curve) == reference_aggregate(equity_curve, "%Y-%m", False)
+
+
+def test_drawdowns_match_loop(equity_curve):
+    """Drawdown metrics and periods match the point-by-point calculation."""
+    calculator = BacktestStatisticsCalculator()
+    result = calculator._calculate_drawdowns(equity_curve)
+    expected = reference_drawdowns(equity_curve)
+
+    assert expected['periods']
+    assert result['periods'] == expected['periods']
+    for key in ('max_drawdown', 'max_drawdown_pct', 'max_duration_days', 'recovery_time_days'):
+        assert result[key] == expected[key]
+    assert result['avg_drawdown'] == pytest.approx(expected['avg_drawdown'], rel=1e-12)
+    assert result['avg_drawdown_pct'] == pytest.approx(expected['avg_drawdown_pct'], rel=1e-12)
+
+
+def test_drawdown_period_ends_on_new_high_not_equal_peak():
+    """Returning to the peak without exceeding it keeps the period open."""
+    start = datetime(2024, 1, 1)
+    values = [100.0, 90.0, 100.0, 95.0, 101.0, 99.0]
+    curve = [{'timestamp': start + timedelta(days=i), 'equity': v} for i, v in enumerate(values)]
+
+    periods = BacktestStatisticsCalculator()._calculate_drawdowns(curve)['periods']
+
+    assert periods == reference_drawdowns(curve)['periods']
+    assert len(periods) == 1
+    assert periods[0]['start'] == start + timedelta(days=1)
+    assert periods[0]['end'] == start + timedelta(days=4)
+
+
+def test_mixed_utc_offsets_use_local_dates():
+    """Points with different offsets are bucketed by their own calendar date."""
+    points = [
+        ("2024-01-01T23:30:00+02:00", 100.0),
+        ("2024-01-01T22:45:00+00:00", 101.0),
+        ("2024-01-02T00:15:00+01:00", 102.0),
+        ("2024-01-02T10:00:00-05:00", 103.0),
+    ]
+    curve = [{'timestamp': t, 'equity': e} for t, e in points]
+
+    daily = BacktestStatisticsCalculator()._aggregate_to_daily(curve)
+
+    assert daily == reference_aggregate(curve, "%Y-%m-%d", True)
+    assert [d['equity'] for d in daily] == [101.0, 103.0]
+
+
+def test_return_and_risk_statistics_match_loop(equity_curve):
+    """Period returns, ratios and VaR agree with the loop implementation."""
+    calculator = BacktestStatisticsCalculator(risk_free_rate=0.03)
+    returns = calculator.calculate_return_statistics(equity_curve, 10000.0, 90.0)
+    risk = calculator.calculate_risk_statistics(equity_curve, returns.daily_returns, 90.0)
+    daily_returns, monthly_returns, _ = reference_post_processing(equity_curve)
+
+    assert returns.daily_returns == daily_returns
+    assert returns.monthly_returns == monthly_returns
+    assert returns.avg_daily_return == pytest.approx(statistics.mean(daily_returns), rel=1e-9)
+    assert returns.std_daily_return == pytest.approx(statistics.stdev(daily_returns), rel=1e-9)
+    assert returns.best_day['return'] == max(daily_returns)
+    assert returns.worst_month['return'] == min(monthly_returns)
+
+    daily_risk_free = 0.03 / 252
+    volatility = statistics.stdev(daily_returns)
+    downside = statistics.stdev([r for r in daily_returns if r < daily_risk_free])
+    excess = statistics.mean(daily_returns) - daily_risk_free
+    assert risk.volatility_daily == pytest.approx(volatility, rel=1e-9)
+    assert risk.sharpe_ratio == pytest.approx(excess / volatility * 252 ** 0.5, rel=1e-9)
+    assert risk.sortino_ratio == pytest.approx(excess / downside * 252 ** 0.5, rel=1e-9)
+
+    if len(daily_returns) >= 20:
+        ordered = sorted(daily_returns)
+        index = int(len(ordered) * 0.05)
+        assert risk.var_95 == ordered[index]
+        assert risk.cvar_95 == pytest.approx(statistics.mean(ordered[:index + 1]), rel=1e-9)
+
+
+# ===== BENCHMARK =====
+
+@pytest.mark.performance
+@pytest.mark.slow
+def test_benchmark_one_million_points():
+    """Vectorized post-processing of a 1M-point minute curve vs the loops."""
+    curve = make_curve(1_000_000, seed=5)
+    calculator = BacktestStatisticsCalculator()
+
+    start = time.perf_counter()
+    returns = calculator.calculate_return_statistics(curve, 10000.0, 694.0)
+    risk = calculator.calculate_risk_statistics(curve, returns.daily_returns, 694.0)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    daily_returns, _, drawdowns = reference_post_processing(curve)
+    loops = time.perf_counter() - start
+
+    print(f"\n1M-point statistics - loops: {loops:.2f}s, vectorized: {vectorized:.2f}s, "
+          f"speedup: {loops / vectorized:.1f}x")
+
+    assert returns.daily_returns == daily_returns
+    assert risk.max_drawdown == drawdowns['max_drawdown']
+    assert risk.drawdown_periods == drawdowns['periods']
+    assert vectorized * 3 < loops
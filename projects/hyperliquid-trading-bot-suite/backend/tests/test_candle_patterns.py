@@ -0,0 +1,137 @@
+"""
+Test suite for Candle Pattern Detector
+
+Tests the precomputed per-candle metrics table against the per-candle
+context path and the newest-K (``last_n``) detection option.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+
+from src.detection.candle_patterns import CandlePatternDetector
+from src.types import CandleData, EntryType, MarketCycle, Timeframe
+
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def random_candles(seed: int, count: int) -> List[CandleData]:
+    """Random walk candles with flat and repeated bars mixed in."""
+    rng = random.Random(seed)
+    candles = []
+    price = 100.0
+
+    for i in range(count):
+        shape = rng.random()
+        if shape < 0.05:
+            open_price = close = high = low = price
+        elif shape < 0.10 and candles:
+            prev = candles[-1]
+            open_price, high, low, close = prev.open, prev.high, prev.low, prev.close
+        else:
+            open_price = price
+            close = round(price + rng.choice([-1, 1]) * rng.randint(0, 20) / 4, 2)
+            high = round(max(open_price, close) + rng.randint(0, 20) / 4, 2)
+            low = round(min(open_price, close) - rng.randint(0, 20) / 4, 2)
+
+        candles.append(CandleData(
+            timestamp=BASE_TIME + timedelta(minutes=15 * i),
+            open=open_price,
+            high=high,
+            low=low,
+            close=close,
+            volume=float(rng.choice([100, 300, 1000, 5000])),
+            timeframe=Timeframe.M15
+        ))
+        price = close
+
+    return candles
+
+
+def assert_metrics_equal(actual: dict, expected: dict):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if key in ('trend_slope', 'trend_strength'):
+            # Closed-form slope vs np.polyfit: equal up to rounding
+            assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+        else:
+            assert actual[key] == value, key
+
+
+class TestCandleMetricsTable:
+    """Test cases for the precomputed metrics table."""
+
+    @pytest.mark.parametrize("lookback", [20, 5, 2, 1, 0])
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_per_candle_metrics(self, seed, lookback):
+        """Table rows equal metrics computed from sliced context lists."""
+        candles = random_candles(seed, 80)
+        detector = CandlePatternDetector()
+        detector.lookback_periods = lookback
+        indices = range(2, len(candles) - 1)
+
+        table = detector._candle_metrics_table(candles, indices)
+
+        assert len(table) == len(indices)
+        for i, metrics in zip(indices, table):
+            context = candles[max(0, i - lookback):i + 1]
+            expected = detector._calculate_candle_metrics(candles[i], context)
+            assert_metrics_equal(metrics, expected)
+
+    def test_empty_indices(self):
+        """No indices produce an empty table."""
+        detector = CandlePatternDetector()
+        assert detector._candle_metrics_table(random_candles(1, 10), range(5, 5)) == []
+
+
+class TestDetectPatterns:
+    """Test cases for detect_patterns."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.detector = CandlePatternDetector()
+        self.detector.min_confidence = 0.0
+
+    def test_detects_patterns_on_every_candidate(self):
+        """Every candle except the first two and the last is analyzed."""
+        candles = random_candles(4, 120)
+
+        patterns = self.detector.detect_patterns(candles, "BTC", Timeframe.M15)
+
+        indices = {p.candle_index for p in patterns}
+        assert indices
+        assert min(indices) >= 2
+        assert max(indices) <= len(candles) - 2
+
+    @pytest.mark.parametrize("last_n", [0, 1, 5, 50, 500])
+    def test_last_n_matches_filtered_full_scan(self, last_n):
+        """Evaluating only the newest candles equals filtering a full scan."""
+        candles = random_candles(5, 100)
+
+        full = self.detector.detect_patterns(
+            candles, "BTC", Timeframe.M15, market_cycle=MarketCycle.RANGE
+        )
+        newest = self.detector.detect_patterns(
+            candles, "BTC", Timeframe.M15, market_cycle=MarketCycle.RANGE, last_n=last_n
+        )
+
+        expected = [p for p in full if p.candle_index >= len(candles) - 1 - last_n]
+        assert [(p.candle_index, p.pattern_type, p.confidence) for p in newest] == \
+            [(p.candle_index, p.pattern_type, p.confidence) for p in expected]
+
+    def test_pattern_type_filter(self):
+        """Only requested pattern types are returned."""
+        candles = random_candles(6, 100)
+
+        patterns = self.detector.detect_patterns(
+            candles, "BTC", Timeframe.M15, pattern_types=[EntryType.CELERY]
+        )
+
+        assert all(p.pattern_type == EntryType.CELERY for p in patterns)
+
+    def test_short_series(self):
+        """Fewer than three candles produce no patterns."""
+        assert self.detector.detect_patterns(random_candles(7, 2), "BTC", Timeframe.M15) == []
@@ -0,0 +1,268 @@
+"""
+Test suite for Market Cycle Classifier
+
+Tests the shared cycle feature engine (bulk build, incremental appends,
+forming-bar updates) and the classifier metrics computed from it.
+"""
+
+import random
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.detection.cycle_classifier import MarketCycleClassifier, CycleClassification
+from src.detection.cycle_features import CycleFeatureEngine
+from src.types import CandleData, Timeframe
+
+
+BASE_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def random_candles(seed: int, count: int, start: int = 0) -> List[CandleData]:
+    """Random walk candles, including flat bars and repeated bars."""
+    rng = random.Random(seed)
+    candles = []
+    price = 100.0
+
+    for i in range(count):
+        shape = rng.random()
+        if shape < 0.05:
+            open_price = close = high = low = price
+        elif shape < 0.10 and candles:
+            prev = candles[-1]
+            open_price, high, low, close = prev.open, prev.high, prev.low, prev.close
+        else:
+            open_price = price
+            close = round(price + rng.choice([-1, 1]) * rng.randint(0, 20) / 4, 2)
+            high = round(max(open_price, close) + rng.randint(0, 20) / 4, 2)
+            low = round(min(open_price, close) - rng.randint(0, 20) / 4, 2)
+
+        candles.append(CandleData(
+            timestamp=BASE_TIME + timedelta(minutes=15 * (start + i)),
+            open=open_price,
+            high=high,
+            low=low,
+            close=close,
+            volume=float(rng.choice([100, 300, 1000, 5000])),
+            timeframe=Timeframe.M15
+        ))
+        price = close
+
+    return candles
+
+
+def reference_liquidity(candles: List[CandleData], lookback: int) -> dict:
+    """Per-candle reference for liquidity events, straight from CandleData."""
+    recent = candles[-lookback:]
+    wick_total = 0.0
+    large_wicks = 0
+    for c in recent:
+        if c.total_range > 0:
+            wick_total += (c.upper_wick + c.lower_wick) / c.total_range
+            if max(c.upper_wick, c.lower_wick) / c.total_range > 0.5:
+                large_wicks += 1
+
+    sweeps = 0
+    for i in range(2, len(recent)):
+        prev_high = max(recent[i - 1].high, recent[i - 2].high)
+        prev_low = min(recent[i - 1].low, recent[i - 2].low)
+        sweeps += recent[i].low < prev_low and recent[i].close > prev_low
+        sweeps += recent[i].high > prev_high and recent[i].close < prev_high
+
+    reversals = 0
+    for prev, cur in zip(recent, recent[1:]):
+        if cur.total_range == 0:
+            continue
+        if prev.is_bearish and cur.lower_wick / cur.total_range > 0.5 and cur.is_bullish:
+            reversals += 1
+        if prev.is_bullish and cur.upper_wick / cur.total_range > 0.5 and cur.is_bearish:
+            reversals += 1
+
+    return {
+        'wick_dominance': wick_total / len(recent),
+        'large_wicks': large_wicks,
+        'sweeps': sweeps,
+        'reversals': reversals
+    }
+
+
+class TestCycleFeatureEngine:
+    """Test cases for CycleFeatureEngine."""
+
+    def test_window_bounds_length(self):
+        """The engine holds at most ``window`` candles."""
+        engine = CycleFeatureEngine.from_candles(random_candles(1, 100), window=40)
+
+        assert len(engine) == 40
+        assert len(CycleFeatureEngine.from_candles(random_candles(1, 10), window=40)) == 10
+
+    def test_window_statistics(self):
+        """Window statistics match direct NumPy computations on the candles."""
+        candles = random_candles(2, 60)
+        engine = CycleFeatureEngine.from_candles(candles, window=40)
+        recent = candles[-20:]
+
+        true_ranges = [
+            max(c.high - c.low, abs(c.high - p.close), abs(c.low - p.close))
+            for p, c in zip(recent, recent[1:])
+        ]
+        closes = np.array([c.close for c in recent])
+        volumes = np.array([c.volume for c in recent])
+
+        assert engine.atr(20) == pytest.approx(np.mean(true_ranges))
+        assert engine.range_volatility(20) == pytest.approx(np.std([c.total_range for c in recent]))
+        assert engine.dispersion(20) == pytest.approx(np.std(closes) / np.mean(closes) * 100)
+        assert engine.volume_slope(20) == pytest.approx(np.polyfit(np.arange(20), volumes, 1)[0])
+        assert np.allclose(engine.volume_ratios(20), volumes / volumes.mean())
+        assert np.allclose(engine.returns(20)[1:], np.diff(closes) / closes[:-1])
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_appends_match_bulk_build(self, seed):
+        """Appending one candle at a time equals building from the full series."""
+        candles = random_candles(seed, 200)
+        engine = CycleFeatureEngine(window=40)
+
+        for i, candle in enumerate(candles):
+            engine.append(candle)
+            if i % 17 == 0:
+                fresh = CycleFeatureEngine.from_candles(candles[:i + 1], window=40)
+                # The fresh engine's two oldest rows lack predecessors
+                lookback = min(len(fresh), 40)
+                assert np.array_equal(
+                    engine.column(slice(None), lookback)[2:],
+                    fresh.column(slice(None), lookback)[2:],
+                    equal_nan=True
+                )
+
+    def test_sync_appends_only_new_candles(self):
+        """A series that continues the held one is updated incrementally."""
+        candles = random_candles(3, 120)
+        engine = CycleFeatureEngine.from_candles(candles[:100], window=40)
+
+        assert engine.sync(candles[:101]) is True
+        assert engine.sync(candles[:110]) is True
+        assert engine.last_timestamp == candles[109].timestamp
+
+    def test_sync_updates_forming_candle(self):
+        """A changed newest candle replaces the held one."""
+        candles = random_candles(4, 80)
+        engine = CycleFeatureEngine.from_candles(candles, window=40)
+        last = candles[-1]
+        updated = CandleData(
+            timestamp=last.timestamp, open=last.open, high=last.high + 2,
+            low=last.low, close=last.high + 1, volume=last.volume + 10,
+            timeframe=last.timeframe
+        )
+        series = candles[:-1] + [updated]
+
+        assert engine.sync(series) is True
+        assert engine.closes(1)[0] == updated.close
+        fresh = CycleFeatureEngine.from_candles(series, window=40)
+        assert np.array_equal(
+            engine.column(slice(None), 38), fresh.column(slice(None), 38), equal_nan=True
+        )
+
+    def test_sync_rebuilds_for_other_series(self):
+        """Sharing timestamps with different prices forces a rebuild."""
+        engine = CycleFeatureEngine.from_candles(random_candles(5, 80), window=40)
+        other = random_candles(6, 81)
+
+        assert engine.sync(other) is False
+        assert engine.closes(1)[0] == other[-1].close
+
+    def test_sync_rebuilds_for_shorter_series(self):
+        """A series shorter than what is held cannot be served incrementally."""
+        candles = random_candles(7, 30)
+        engine = CycleFeatureEngine.from_candles(candles, window=40)
+
+        assert engine.sync(candles[:20]) is False
+        assert len(engine) == 20
+
+    def test_window_too_small(self):
+        """Windows too small for predecessor features are rejected."""
+        with pytest.raises(ValueError):
+            CycleFeatureEngine(window=2)
+
+
+class TestCycleMetrics:
+    """Test cases for classifier metrics computed from the feature engine."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.classifier = MarketCycleClassifier()
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_liquidity_events_match_reference(self, seed):
+        """Liquidity metrics equal a per-candle computation."""
+        candles = random_candles(seed, 50)
+        metrics = self.classifier._calculate_metrics(candles)
+        expected = reference_liquidity(candles, self.classifier.liquidity_lookback)
+
+        assert metrics.wick_dominance == pytest.approx(expected['wick_dominance'])
+        assert metrics.large_wick_count == expected['large_wicks']
+        assert metrics.sweep_count == expected['sweeps']
+        assert metrics.reversal_candle_count == expected['reversals']
+
+    def test_short_series_has_zero_metrics(self):
+        """Metrics needing more history than available stay at zero."""
+        metrics = self.classifier._calculate_metrics(random_candles(8, 12))
+
+        assert metrics.normalized_volatility == 0.0
+        assert metrics.volatility_trend == 0.0
+        assert metrics.momentum_acceleration == 0.0
+        assert metrics.structure_breaks == 0
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_incremental_metrics_match_full_rebuild(self, seed):
+        """Metrics from a synced engine equal metrics built from scratch."""
+        candles = random_candles(seed, 150)
+        window = self.classifier._feature_window()
+        engine = CycleFeatureEngine(window)
+
+        for end in range(30, len(candles) + 1, 3):
+            engine.sync(candles[:end])
+            incremental = self.classifier._calculate_metrics(candles[:end], engine)
+            full = self.classifier._calculate_metrics(candles[:end])
+            assert asdict(incremental) == asdict(full)
+
+
+class TestClassifyCycle:
+    """Test cases for the incremental classify_cycle entry point."""
+
+    def test_matches_classify(self):
+        """classify_cycle returns the same classification as classify."""
+        candles = random_candles(11, 120)
+        incremental = MarketCycleClassifier()
+        reference = MarketCycleClassifier()
+
+        for end in range(40, 121, 5):
+            got = incremental.classify_cycle(candles[:end], Timeframe.M15, asset="BTC")
+            want = reference.classify(candles[:end])
+            assert isinstance(got, CycleClassification)
+            assert (got.cycle, got.confidence, got.sub_phase) == \
+                (want.cycle, want.confidence, want.sub_phase)
+            assert asdict(got.metrics) == asdict(want.metrics)
+
+    def test_engines_kept_per_asset_and_timeframe(self):
+        """Each (asset, timeframe) series gets its own feature engine."""
+        classifier = MarketCycleClassifier()
+        btc = random_candles(12, 60)
+        eth = random_candles(13, 60)
+
+        classifier.classify_cycle(btc, Timeframe.M15, asset="BTC")
+        classifier.classify_cycle(eth, Timeframe.M15, asset="ETH")
+        classifier.classify_cycle(btc, Timeframe.H1, asset="BTC")
+
+        assert set(classifier._feature_engines) == {
+            ("BTC", Timeframe.M15), ("ETH", Timeframe.M15), ("BTC", Timeframe.H1)
+        }
+
+    def test_insufficient_data(self):
+        """Short series return the empty classification."""
+        result = MarketCycleClassifier().classify_cycle(random_candles(14, 10), Timeframe.M15)
+
+        assert result.sub_phase == "insufficient_data"
+        assert result.confidence == 0.0
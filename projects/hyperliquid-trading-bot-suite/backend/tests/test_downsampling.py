@@ -0,0 +1,86 @@
+"""
+Unit tests for equity curve downsampling.
+"""
+
+import numpy as np
+import pytest
+
+from src.backtest.downsampling import downsample, lttb, min_max
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    x = np.arange(10_000, dtype=np.float64) * 60
+    y = 10_000 + np.cumsum(rng.normal(0, 5, len(x)))
+    return x, y
+
+
+class TestLTTB:
+    """Test cases for Largest-Triangle-Three-Buckets."""
+
+    def test_exact_point_count_and_endpoints(self, series):
+        x, y = series
+        indices = lttb(x, y, 500)
+
+        assert len(indices) == 500
+        assert indices[0] == 0
+        assert indices[-1] == len(x) - 1
+        assert np.all(np.diff(indices) > 0)
+
+    def test_keeps_spike(self, series):
+        """An isolated spike is the largest triangle in its bucket."""
+        x, y = series
+        y = y.copy()
+        y[4321] += 1_000
+        assert 4321 in lttb(x, y, 200)
+
+    def test_short_series_unchanged(self):
+        x = np.arange(5, dtype=np.float64)
+        assert lttb(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+
+    def test_too_few_points(self, series):
+        with pytest.raises(ValueError):
+            lttb(*series, 2)
+
+
+class TestMinMax:
+    """Test cases for min/max-per-bucket downsampling."""
+
+    def test_keeps_extremes(self, series):
+        x, y = series
+        indices = min_max(y, 400)
+
+        assert len(indices) <= 400
+        assert indices[0] == 0
+        assert indices[-1] == len(y) - 1
+        assert np.all(np.diff(indices) > 0)
+        assert int(np.argmin(y)) in indices
+        assert int(np.argmax(y)) in indices
+
+    def test_matches_per_bucket_loop(self, series):
+        """Each bucket contributes its first minimum and first maximum."""
+        _, y = series
+        indices = set(min_max(y, 50).tolist())
+
+        edges = np.linspace(1, len(y) - 1, 25).astype(np.int64)
+        expected = {0, len(y) - 1}
+        for start, stop in zip(edges[:-1], edges[1:]):
+            expected.add(start + int(np.argmin(y[start:stop])))
+            expected.add(start + int(np.argmax(y[start:stop])))
+        assert indices == expected
+
+    def test_flat_series(self):
+        y = np.ones(1_000)
+        indices = min_max(y, 100)
+        assert indices[0] == 0 and indices[-1] == 999
+        assert len(indices) <= 100
+
+
+def test_downsample_dispatch(series):
+    x, y = series
+    assert len(downsample(x, y, None)) == len(x)
+    assert downsample(x, y, 300, "lttb").tolist() == lttb(x, y, 300).tolist()
+    assert downsample(x, y, 300, "minmax").tolist() == min_max(y, 300).tolist()
+    with pytest.raises(ValueError):
+        downsample(x, y, 300, "average")
@@ -0,0 +1,84 @@
+"""
+Tests for the perceptual hash BK-tree used in video frame deduplication.
+"""
+
+import random
+
+import pytest
+
+from src.ingestion.frame_hash_index import (
+    ChannelFrameIndexStore,
+    PerceptualHashIndex,
+    hamming_distance
+)
+
+
+@pytest.fixture
+def random_hashes():
+    """Deterministic set of random 64-bit hashes."""
+    rng = random.Random(42)
+    return [rng.getrandbits(64) for _ in range(500)]
+
+
+def test_query_matches_brute_force(random_hashes):
+    """Radius queries return exactly the brute-force neighbour set."""
+    index = PerceptualHashIndex()
+    for h in random_hashes:
+        index.add(h)
+
+    rng = random.Random(7)
+    for _ in range(50):
+        probe = rng.choice(random_hashes) ^ (1 << rng.randrange(64))
+        for radius in (0, 3, 10, 24):
+            expected = {h for h in random_hashes if hamming_distance(h, probe) <= radius}
+            found = {h for h, _, _ in index.query(probe, radius)}
+            assert found == expected
+
+
+def test_exclude_source():
+    """Entries from the excluded source are ignored."""
+    index = PerceptualHashIndex()
+    index.add(0xFFFF0000FFFF0000, "video_a")
+
+    assert index.contains_near(0xFFFF0000FFFF0001, 2)
+    assert not index.contains_near(0xFFFF0000FFFF0001, 2, exclude_source="video_a")
+    assert index.contains_near(0xFFFF0000FFFF0001, 2, exclude_source="video_b")
+
+
+def test_duplicate_from_same_source_not_stored_twice():
+    index = PerceptualHashIndex()
+    index.add(123, "video_a")
+    index.add(123, "video_a")
+    index.add(123, "video_b")
+
+    assert len(index) == 2
+
+
+def test_save_and_load_roundtrip(tmp_path, random_hashes):
+    index = PerceptualHashIndex()
+    for i, h in enumerate(random_hashes):
+        index.add(h, f"video_{i % 3}")
+
+    path = tmp_path / "index.json"
+    index.save(str(path))
+    loaded = PerceptualHashIndex.load(str(path))
+
+    assert len(loaded) == len(index)
+    assert list(loaded.items()) == list(index.items())
+
+
+def test_load_missing_file_returns_empty(tmp_path):
+    assert len(PerceptualHashIndex.load(str(tmp_path / "missing.json"))) == 0
+
+
+def test_channel_store_persists_per_channel(tmp_path):
+    store = ChannelFrameIndexStore(str(tmp_path))
+    channel = ChannelFrameIndexStore.channel_key({"channel_id": "UC/abc def"})
+    assert channel == "UC_abc_def"
+
+    store.get(channel).add(42, "video_a")
+    store.save(channel)
+
+    reloaded = ChannelFrameIndexStore(str(tmp_path))
+    assert reloaded.get(channel).contains_near(43, 1)
+    assert len(reloaded.get("other_channel")) == 0
@@ -0,0 +1,360 @@
+"""
+Unit tests for the batch-loaded, incremental feedback cycle.
+"""
+
+import random
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from src.database.models import TradeRecordDB
+from src.knowledge.models import (
+    StrategyRule, TradeRecord, LearningEntry, ContentSource, RiskParameters,
+    PatternCondition, PriceActionSnapshot
+)
+from src.knowledge.repository import (
+    StrategyRuleRepository, TradeRecordRepository, LearningRepository
+)
+from src.learning.feedback_loop import FeedbackLoop
+from src.learning.outcome_analyzer import OutcomeAnalyzer, StrategyAnalysis
+from src import types
+from src.types import EntryType, OrderSide, PatternType, SourceType, Timeframe
+
+
+def make_rule(name: str) -> StrategyRule:
+    return StrategyRule(
+        id=str(uuid4()),
+        name=name,
+        source=ContentSource(type=SourceType.MANUAL, ref="test"),
+        entry_type=EntryType.LE,
+        conditions=[PatternCondition(type=PatternType.CANDLE, timeframe=Timeframe.M15)],
+        risk_params=RiskParameters(sl_distance="below_low"),
+        confidence=0.5
+    )
+
+
+def make_trade(rule_id: str, entry_time: datetime) -> TradeRecord:
+    return TradeRecord(
+        id=str(uuid4()),
+        strategy_rule_id=rule_id,
+        asset="BTC-USD",
+        direction=OrderSide.LONG,
+        entry_price=100.0,
+        entry_time=entry_time,
+        position_size=1.0,
+        stop_loss=95.0,
+        take_profit_levels=[110.0],
+        reasoning="Test trade",
+        price_action_context=PriceActionSnapshot(timeframes={}),
+        confidence=0.6
+    )
+
+
+def close_trades(trade_repo, trade_ids, rng):
+    for trade_id in trade_ids:
+        outcome = rng.choice(['win', 'loss', 'breakeven'])
+        pnl_r = {'win': 2.0, 'loss': -1.0, 'breakeven': 0.0}[outcome]
+        trade_repo.update_trade_exit(
+            trade_id, 101.0, 'tp1', outcome,
+            pnl_r=rng.choice([pnl_r, None]), pnl_usd=pnl_r * 10
+        )
+
+
+def expected_totals(trade_repo, rule_id):
+    trades = trade_repo.get_by_strategy_rule(rule_id, limit=10_000, only_closed=True)
+    r_values = [t.pnl_r for t in trades if t.pnl_r is not None]
+    return {
+        'total_trades': len(trades),
+        'winning_trades': sum(t.outcome == 'win' for t in trades),
+        'losing_trades': sum(t.outcome == 'loss' for t in trades),
+        'r_trades': len(r_values),
+        'total_pnl_r': sum(r_values),
+        'total_loss_usd': sum(t.pnl_usd for t in trades if t.outcome == 'loss'),
+    }
+
+
+class QueryCounter:
+    """Counts SQL statements issued on an engine."""
+
+    def __init__(self, engine):
+        self.count = 0
+        self.engine = engine
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def close(self):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@pytest.fixture
+def repos(test_session):
+    rule_repo = StrategyRuleRepository(session=test_session, use_cache=False)
+    rule_repo._semantic_search = Mock()
+    trade_repo = TradeRecordRepository(session=test_session, use_cache=False)
+    learning_repo = LearningRepository(session=test_session)
+    return rule_repo, trade_repo, learning_repo
+
+
+def seed(repos, rng, rule_count, trades_per_rule=6):
+    """Create rules with open trades; return rule IDs and open trade IDs per rule."""
+    rule_repo, trade_repo, _ = repos
+    rule_ids = rule_repo.create_many([make_rule(f"Rule {i}") for i in range(rule_count)])
+    open_trades = {}
+    now = datetime.utcnow()
+    for rule_id in rule_ids:
+        open_trades[rule_id] = [
+            trade_repo.create(make_trade(rule_id, now - timedelta(hours=rng.uniform(1, 200))))
+            for _ in range(trades_per_rule)
+        ]
+    return rule_ids, open_trades
+
+
+def stub_analyzer(loop):
+    """Replace per-strategy analysis with a recorder of its inputs."""
+    calls = []
+
+    def analyze(strategy, trades, learnings=None, running_stats=None):
+        calls.append((strategy.id, len(trades), running_stats))
+        return StrategyAnalysis(
+            strategy_rule_id=strategy.id,
+            strategy_name=strategy.name,
+            total_trades=running_stats.total_trades
+        )
+
+    loop.outcome_analyzer.analyze_strategy = analyze
+    return calls
+
+
+class TestBatchQueries:
+    """Test cases for grouped repository queries."""
+
+    def test_grouped_queries_match_per_strategy(self, repos):
+        """Grouped trades and learnings equal the per-strategy queries."""
+        rule_repo, trade_repo, learning_repo = repos
+        rng = random.Random(0)
+        rule_ids, open_trades = seed(repos, rng, 4, trades_per_rule=8)
+        close_trades(trade_repo, open_trades[rule_ids[0]][:5], rng)
+        for rule_id in rule_ids[:2]:
+            learning_repo.create(LearningEntry(
+                strategy_rule_id=rule_id,
+                insight="Works well in drive cycles",
+                confidence=0.7,
+                impact_type="success_factor"
+            ))
+
+        for only_closed in (False, True):
+            grouped = trade_repo.get_by_strategy_rules(rule_ids, limit=3, only_closed=only_closed)
+            for rule_id in rule_ids:
+                single = trade_repo.get_by_strategy_rule(rule_id, limit=3, only_closed=only_closed)
+                assert [t.id for t in grouped[rule_id]] == [t.id for t in single]
+
+        learnings = learning_repo.get_by_strategy_rules(rule_ids)
+        for rule_id in rule_ids:
+            assert [e.id for e in learnings[rule_id]] == [
+                e.id for e in learning_repo.get_by_strategy_rule(rule_id)
+            ]
+
+    def test_get_by_ids_keeps_request_order(self, repos):
+        """Rules come back in request order with missing IDs skipped."""
+        rule_repo, _, _ = repos
+        rule_ids = rule_repo.create_many([make_rule(f"Rule {i}") for i in range(3)])
+
+        rules = rule_repo.get_by_ids([rule_ids[2], "missing", rule_ids[0], rule_ids[2]])
+
+        assert [r.id for r in rules] == [rule_ids[2], rule_ids[0]]
+
+
+class TestIncrementalFeedbackCycle:
+    """Test cases for watermarked running statistics."""
+
+    def test_folds_only_new_closed_trades(self, test_session, repos):
+        """Each cycle folds in trades closed since the last one, exactly once."""
+        _, trade_repo, learning_repo = repos
+        rng = random.Random(1)
+        rule_ids, open_trades = seed(repos, rng, 3)
+        for rule_id in rule_ids:
+            close_trades(trade_repo, open_trades[rule_id][:3], rng)
+
+        loop = FeedbackLoop(session=test_session, close_settle_seconds=0)
+        calls = stub_analyzer(loop)
+
+        analyses = loop.run_feedback_cycle()
+        assert sorted(a.strategy_rule_id for a in analyses) == sorted(rule_ids)
+
+        # Nothing closed since: no strategy is re-analyzed
+        calls.clear()
+        assert loop.run_feedback_cycle() == []
+        assert calls == []
+
+        # New closes for one strategy only
+        close_trades(trade_repo, open_trades[rule_ids[1]][3:], rng)
+        analyses = loop.run_feedback_cycle()
+        assert [a.strategy_rule_id for a in analyses] == [rule_ids[1]]
+        assert calls[0][1] == len(open_trades[rule_ids[1]])
+
+        stored = learning_repo.get_running_stats(rule_ids)
+        for rule_id in rule_ids:
+            expected = expected_totals(trade_repo, rule_id)
+            stats = stored[rule_id]
+            assert stats.total_trades == expected['total_trades']
+            assert stats.winning_trades == expected['winning_trades']
+            assert stats.losing_trades == expected['losing_trades']
+            assert stats.r_trades == expected['r_trades']
+            assert stats.total_pnl_r == pytest.approx(expected['total_pnl_r'])
+            assert stats.total_loss_usd == pytest.approx(expected['total_loss_usd'])
+
+    def test_late_recorded_closes_are_folded(self, test_session, repos):
+        """A close recorded after a cycle is folded in even if its exit is older."""
+        _, trade_repo, learning_repo = repos
+        rng = random.Random(5)
+        rule_ids, open_trades = seed(repos, rng, 1)
+        rule_id = rule_ids[0]
+        close_trades(trade_repo, open_trades[rule_id][:2], rng)
+
+        loop = FeedbackLoop(session=test_session, close_settle_seconds=0)
+        stub_analyzer(loop)
+        loop.run_feedback_cycle()
+
+        # Imported already closed, with an exit before the last cycle
+        trade = make_trade(rule_id, datetime.utcnow() - timedelta(days=2))
+        trade.outcome = types.TradeOutcome.LOSS
+        trade.exit_time = datetime.utcnow() - timedelta(days=1)
+        trade.pnl_r = -1.0
+        trade.pnl_usd = -10.0
+        trade_repo.create(trade)
+
+        analyses = loop.run_feedback_cycle()
+
+        assert [a.strategy_rule_id for a in analyses] == [rule_id]
+        stats = learning_repo.get_running_stats([rule_id])[rule_id]
+        assert stats.total_trades == expected_totals(trade_repo, rule_id)['total_trades'] == 3
+
+    def test_rewritten_closed_trades_are_not_folded_again(self, test_session, repos):
+        """Later writes to a closed trade leave its folded close alone."""
+        _, trade_repo, learning_repo = repos
+        rng = random.Random(7)
+        rule_ids, open_trades = seed(repos, rng, 1)
+        rule_id = rule_ids[0]
+        closed = open_trades[rule_id][:2]
+        close_trades(trade_repo, closed, rng)
+
+        loop = FeedbackLoop(session=test_session, close_settle_seconds=0)
+        stub_analyzer(loop)
+        loop.run_feedback_cycle()
+        before = learning_repo.get_running_stats([rule_id])[rule_id]
+
+        # A second exit for a closed trade is rejected
+        assert not trade_repo.update_trade_exit(closed[0], 90.0, 'stop_loss', 'loss', pnl_r=-1.0)
+        # Any other write still bumps updated_at
+        db_trade = test_session.query(TradeRecordDB).filter_by(id=closed[1]).one()
+        db_trade.reasoning = "Reviewed"
+        test_session.flush()
+        assert db_trade.updated_at > before.closed_through
+
+        assert loop.run_feedback_cycle() == []
+        stats = learning_repo.get_running_stats([rule_id])[rule_id]
+        assert stats.total_trades == expected_totals(trade_repo, rule_id)['total_trades'] == 2
+        assert stats.total_pnl_r == pytest.approx(before.total_pnl_r)
+
+    def test_unsettled_closes_wait_for_next_cycle(self, test_session, repos):
+        """Closes inside the settle window are left for a later cycle, not lost."""
+        _, trade_repo, learning_repo = repos
+        rng = random.Random(6)
+        rule_ids, open_trades = seed(repos, rng, 1)
+        rule_id = rule_ids[0]
+        close_trades(trade_repo, open_trades[rule_id][:3], rng)
+
+        loop = FeedbackLoop(session=test_session, close_settle_seconds=3600)
+        stub_analyzer(loop)
+        assert loop.run_feedback_cycle() == []
+
+        loop.close_settle_seconds = 0
+        loop.run_feedback_cycle()
+        loop.close_settle_seconds = 3600
+        loop.run_feedback_cycle()
+
+        # The watermark never moves back, so nothing is folded twice
+        stats = learning_repo.get_running_stats([rule_id])[rule_id]
+        assert stats.total_trades == 3
+
+    def test_full_rescan_rebuilds_statistics(self, test_session, repos):
+        """A full rescan recomputes the same totals from scratch."""
+        _, trade_repo, learning_repo = repos
+        rng = random.Random(2)
+        rule_ids, open_trades = seed(repos, rng, 2)
+        for rule_id in rule_ids:
+            close_trades(trade_repo, open_trades[rule_id][:4], rng)
+
+        loop = FeedbackLoop(session=test_session, close_settle_seconds=0)
+        stub_analyzer(loop)
+        loop.run_feedback_cycle()
+        before = learning_repo.get_running_stats(rule_ids)
+
+        analyses = loop.run_feedback_cycle(full_rescan=True)
+
+        assert len(analyses) == 2
+        after = learning_repo.get_running_stats(rule_ids)
+        for rule_id in rule_ids:
+            assert after[rule_id].total_trades == before[rule_id].total_trades
+            assert after[rule_id].total_pnl_r == pytest.approx(before[rule_id].total_pnl_r)
+
+    def test_query_count_independent_of_strategy_count(self, test_session, repos, test_db_engine):
+        """A cycle issues the same number of queries for few or many strategies."""
+        _, trade_repo, _ = repos
+        rng = random.Random(3)
+
+        counts = []
+        for rule_count in (2, 10):
+            rule_ids, open_trades = seed(repos, rng, rule_count)
+            for rule_id in rule_ids:
+                close_trades(trade_repo, open_trades[rule_id][:2], rng)
+            test_session.commit()
+
+            loop = FeedbackLoop(session=test_session, close_settle_seconds=0)
+            stub_analyzer(loop)
+            counter = QueryCounter(test_db_engine)
+            try:
+                analyses = loop.run_feedback_cycle(strategy_ids=rule_ids)
+            finally:
+                counter.close()
+            assert len(analyses) == rule_count
+            counts.append(counter.count)
+
+        assert counts[0] == counts[1]
+
+
+def analyzer_trades(rng, rule_id, count):
+    """Trades in the shape OutcomeAnalyzer's pattern mining reads."""
+    trades = []
+    for i in range(count):
+        outcome = rng.choice([types.TradeOutcome.WIN, types.TradeOutcome.LOSS])
+        pnl_r = 2.0 if outcome == types.TradeOutcome.WIN else -1.0
+        trades.append(types.TradeRecord(
+            strategy_rule_id=rule_id,
+            asset=rng.choice(["BTC", "ETH"]),
+            entry_time=datetime(2026, 1, 1) + timedelta(hours=i),
+            exit_time=datetime(2026, 1, 1) + timedelta(hours=i + 1),
+            outcome=outcome,
+            pnl_absolute=pnl_r * 10,
+            pnl_r_multiple=pnl_r
+        ))
+    return trades
+
+
+def test_parallel_analysis_matches_sequential():
+    """Process-pool analysis returns the same analyses, in order."""
+    rng = random.Random(4)
+    strategies = [make_rule(f"Rule {i}") for i in range(4)]
+    trades = {s.id: analyzer_trades(rng, s.id, rng.randint(5, 25)) for s in strategies}
+    analyzer = OutcomeAnalyzer(min_trades_for_analysis=10)
+
+    sequential = analyzer.analyze_all_strategies(strategies, trades)
+    parallel = analyzer.analyze_all_strategies(strategies, trades, max_workers=2)
+
+    assert [str(a) for a in parallel] == [str(a) for a in sequential]
+    assert [a.new_confidence for a in parallel] == [a.new_confidence for a in sequential]
@@ -0,0 +1,468 @@
+"""
+Unit tests for the knowledge base cache layers.
+"""
+
+import asyncio
+import json
+from fnmatch import fnmatchcase
+
+import pytest
+
+from src.knowledge import cache as cache_module
+from src.knowledge.cache import (
+    INVALIDATE_TAGS_SCRIPT,
+    TAGGED_SET_SCRIPT,
+    AsyncCacheManager,
+    CacheKeys,
+    CacheManager,
+    LocalCache,
+    _invalidation_message,
+    cached,
+)
+
+
+class FakeClock:
+    """Stands in for time.monotonic."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.tags = {}
+        self.published = []
+        self.calls = 0
+
+    # Commands (shared by the sync and async fakes)
+    def _set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex if ex else -1
+        return True
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _ttl(self, key):
+        return self.ttls.get(key, -2)
+
+    def _delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            deleted += self.data.pop(key, None) is not None
+            deleted += self.tags.pop(key, None) is not None
+        return deleted
+
+    def _publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+        return 1
+
+    def _scan(self, match):
+        return [key for key in list(self.data) if fnmatchcase(key, match)]
+
+    def keys(self, pattern):
+        raise AssertionError("KEYS must not be used")
+
+    # Python equivalents of the Lua scripts (tag scores are left out)
+    def _tagged_set(self, keys, args):
+        key, *tag_keys = keys
+        value, ttl, channel, message = args
+        self._set(key, value, ex=ttl)
+        for tag_key in tag_keys:
+            self.tags.setdefault(tag_key, set()).add(key)
+        self._publish(channel, message)
+        return 1
+
+    def _invalidate_tags(self, keys, args):
+        channel, origin = args
+        members = list(dict.fromkeys(m for tag_key in keys for m in sorted(self.tags.get(tag_key, ()))))
+        self._delete(*members, *keys)
+        if members:
+            self._publish(channel, json.dumps({"origin": origin, "keys": members}))
+        return members
+
+    def register_script(self, script):
+        command = {
+            TAGGED_SET_SCRIPT: self._tagged_set,
+            INVALIDATE_TAGS_SCRIPT: self._invalidate_tags,
+        }[script]
+
+        async def call(keys=None, args=None):
+            self.calls += 1
+            return command(keys, args)
+        return call
+
+
+class FakePipeline:
+    """Queues commands and runs them on execute."""
+
+    def __init__(self, redis, is_async):
+        self._redis = redis
+        self._is_async = is_async
+        self._commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, f"_{name}")
+        return lambda *args, **kwargs: self._commands.append((command, args, kwargs))
+
+    def _run(self):
+        self._redis.calls += 1
+        return [command(*args, **kwargs) for command, args, kwargs in self._commands]
+
+    def execute(self):
+        if self._is_async:
+            async def run():
+                return self._run()
+            return run()
+        return self._run()
+
+
+class DelayedPipeline(FakePipeline):
+    """Runs its commands on execute but holds the reply until released."""
+
+    def __init__(self, redis, release, run_on_release=False):
+        super().__init__(redis, is_async=True)
+        self._release = release
+        self._run_on_release = run_on_release
+
+    def execute(self):
+        async def run():
+            result = None if self._run_on_release else self._run()
+            await self._release.wait()
+            return self._run() if self._run_on_release else result
+        return run()
+
+
+class FakeSyncRedis(FakeRedis):
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self, is_async=False)
+
+    def __getattr__(self, name):
+        command = getattr(self, f"_{name}")
+
+        def call(*args, **kwargs):
+            self.calls += 1
+            return command(*args, **kwargs)
+        return call
+
+    def scan_iter(self, match=None, count=None):
+        self.calls += 1
+        yield from self._scan(match)
+
+
+class FakeAsyncRedis(FakeRedis):
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self, is_async=True)
+
+    def __getattr__(self, name):
+        command = getattr(self, f"_{name}")
+
+        async def call(*args, **kwargs):
+            self.calls += 1
+            return command(*args, **kwargs)
+        return call
+
+    async def scan_iter(self, match=None, count=None):
+        self.calls += 1
+        for key in self._scan(match):
+            yield key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def manager():
+    manager = AsyncCacheManager(redis_url="redis://unused", l1_max_entries=100, l1_ttl=30)
+    manager._client = FakeAsyncRedis()
+    manager._tagged_set = manager._client.register_script(TAGGED_SET_SCRIPT)
+    manager._invalidate_tags = manager._client.register_script(INVALIDATE_TAGS_SCRIPT)
+    manager._subscribed.set()  # As if the invalidation listener were running
+    return manager
+
+
+class TestLocalCache:
+    """Test cases for the in-process L1."""
+
+    def test_evicts_least_recently_used(self):
+        local = LocalCache(max_entries=2)
+        local.set("a", "1")
+        local.set("b", "2")
+        local.get("a")
+        local.set("c", "3")
+
+        assert "a" in local and "c" in local
+        assert "b" not in local
+
+    def test_entries_expire(self, clock):
+        local = LocalCache(ttl=30)
+        local.set("a", "1")
+        local.set("b", "2", ttl=5)  # Redis TTL shorter than the L1 limit
+        local.set("c", "3", ttl=300)  # ...and longer
+
+        clock.now += 6
+        assert local.get("a") == "1"
+        assert local.get("b") is None
+
+        clock.now += 25
+        assert local.get("a") is None
+        assert local.get("c") is None
+
+    def test_delete_pattern(self):
+        local = LocalCache()
+        for key in ["t:stats:1", "t:stats:2", "t:rule:1"]:
+            local.set(key, "{}")
+
+        local.delete_pattern("t:stats:*")
+        assert [key for key in ["t:stats:1", "t:stats:2", "t:rule:1"] if key in local] == ["t:rule:1"]
+
+        local.delete_pattern("*")
+        assert len(local) == 0
+
+
+class TestAsyncCacheManager:
+    """Test cases for the two-tier async cache."""
+
+    @pytest.mark.asyncio
+    async def test_hot_reads_are_served_from_l1(self, manager):
+        await manager._client.set("k", json.dumps({"rule": 1}), ex=60)
+
+        assert await manager.get("k") == {"rule": 1}
+        calls = manager._client.calls
+        for _ in range(100):
+            assert await manager.get("k") == {"rule": 1}
+
+        assert manager._client.calls == calls
+        assert manager.get_stats()["l1_hits"] == 100
+
+    @pytest.mark.asyncio
+    async def test_l1_values_are_copies(self, manager):
+        await manager.set("k", {"levels": [1, 2]})
+
+        (await manager.get("k"))["levels"].append(3)
+        assert await manager.get("k") == {"levels": [1, 2]}
+
+    @pytest.mark.asyncio
+    async def test_l1_unused_until_subscribed(self, manager):
+        manager._subscribed.clear()
+        await manager.set("k", 1)
+
+        assert await manager.get("k") == 1
+        assert len(manager.l1) == 0
+
+    @pytest.mark.asyncio
+    async def test_writes_and_deletes_are_announced(self, manager):
+        await manager.set("k", 1)
+        await manager.delete("k")
+        await manager.delete_pattern("trading_bot:stats:*")
+
+        channel = CacheKeys.invalidation_channel()
+        assert [c for c, _ in manager._client.published] == [channel] * 3
+        assert [m["keys"] for _, m in manager._client.published] == [["k"], ["k"], []]
+        assert manager._client.published[2][1]["pattern"] == "trading_bot:stats:*"
+        assert await manager.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_remote_invalidation_drops_l1_entries(self, manager):
+        await manager.set("trading_bot:stats:a", 1)
+        await manager.set("trading_bot:stats:b", 2)
+        await manager.set("trading_bot:rule:1", 3)
+
+        manager._apply_invalidation(_invalidation_message("other", keys=["trading_bot:rule:1"]))
+        manager._apply_invalidation(_invalidation_message("other", pattern="trading_bot:stats:*"))
+
+        assert len(manager.l1) == 0
+
+    @pytest.mark.asyncio
+    async def test_own_announcements_are_ignored(self, manager):
+        await manager.set("k", 1)
+
+        _, message = manager._client.published[-1]
+        manager._apply_invalidation(json.dumps(message))
+        assert "k" in manager.l1
+
+    @pytest.mark.asyncio
+    async def test_read_racing_an_invalidation_is_not_cached(self, manager):
+        await manager._client.set("k", json.dumps(1))
+        real_execute = FakePipeline.execute
+
+        def execute_then_invalidate(pipe):
+            manager._apply_invalidation(_invalidation_message("other", keys=["k"]))
+            return real_execute(pipe)
+
+        FakePipeline.execute = execute_then_invalidate
+        try:
+            assert await manager.get("k") == 1
+        finally:
+            FakePipeline.execute = real_execute
+        assert "k" not in manager.l1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("operation", [
+        lambda m: m.delete("k"),
+        lambda m: m.delete_pattern("k*"),
+        lambda m: m.set("k", 2, ttl=60),
+    ])
+    async def test_read_racing_a_local_write_is_not_cached(self, manager, operation):
+        """A read whose reply is in flight across a local write leaves L1 alone."""
+        await manager._client.set("k", json.dumps(1), ex=60)
+        release = asyncio.Event()
+        manager._client.pipeline = lambda transaction=True: DelayedPipeline(
+            manager._client, release
+        )
+
+        read = asyncio.create_task(manager.get("k"))
+        await asyncio.sleep(0)  # The old value has been read, the reply is delayed
+        del manager._client.pipeline
+        await operation(manager)
+        release.set()
+        assert await read == 1
+
+        expected = json.loads(manager._client.data["k"]) if "k" in manager._client.data else None
+        assert await manager.get("k") == expected
+        assert manager.l1.get("k") in (None, json.dumps(expected))
+
+    @pytest.mark.asyncio
+    async def test_read_issued_during_a_delete_is_not_cached(self, manager):
+        """A read that beats a delete to Redis does not outlive the delete in L1."""
+        await manager._client.set("k", json.dumps(1), ex=60)
+        release = asyncio.Event()
+        manager._client.pipeline = lambda transaction=True: DelayedPipeline(
+            manager._client, release, run_on_release=True
+        )
+
+        delete = asyncio.create_task(manager.delete("k"))
+        await asyncio.sleep(0)  # The delete has not reached Redis yet
+        del manager._client.pipeline
+        assert await manager.get("k") == 1
+        release.set()
+        await delete
+
+        assert "k" not in manager.l1
+        assert await manager.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tags(self, manager):
+        await manager.set("rule:1", 1, ttl=60, tags=["rules"])
+        await manager.set("rule:2", 2, ttl=60, tags=["rules", "btc"])
+        await manager.set("trade:1", 3, ttl=60, tags=["trades"])
+
+        assert await manager.invalidate_tags("rules") == 2
+
+        assert await manager.get("rule:1") is None
+        assert await manager.get("rule:2") is None
+        assert await manager.get("trade:1") == 3
+        assert CacheKeys.tag("rules") not in manager._client.tags
+        assert await manager.invalidate_tags() == 0
+
+    @pytest.mark.asyncio
+    async def test_tagged_set_is_one_script_call(self, manager):
+        calls = manager._client.calls
+        await manager.set("rule:1", 1, ttl=60, tags=["rules", "btc"])
+
+        assert manager._client.calls == calls + 1
+        assert manager._client.ttls["rule:1"] == 60
+        assert manager._client.published[-1][1]["keys"] == ["rule:1"]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tags_drops_local_copies(self, manager):
+        await manager.set("rule:1", 1, ttl=60, tags=["rules"])
+        assert "rule:1" in manager.l1
+
+        await manager.invalidate_tags("rules")
+
+        assert "rule:1" not in manager.l1
+        channel, message = manager._client.published[-1]
+        assert channel == CacheKeys.invalidation_channel()
+        assert message == {"origin": manager._instance_id, "keys": ["rule:1"]}
+
+
+class TestSyncCacheManager:
+    """Test cases for the synchronous manager's invalidation."""
+
+    def test_delete_pattern_scans_and_announces(self):
+        manager = CacheManager(redis_url="redis://unused")
+        manager._client = FakeSyncRedis()
+        for i in range(3):
+            manager.set(f"trading_bot:stats:{i}", i)
+        manager.set("trading_bot:rule:1", "r")
+
+        assert manager.delete_pattern("trading_bot:stats:*") == 3
+
+        assert list(manager._client.data) == ["trading_bot:rule:1"]
+        assert manager._client.published[-1][1]["pattern"] == "trading_bot:stats:*"
+
+
+class TestCachedDecorator:
+    """Test cases for the cached decorator."""
+
+    @pytest.mark.asyncio
+    async def test_coroutine_functions_use_async_manager(self, manager):
+        calls = []
+
+        @cached(key_fn=lambda rule_id: f"rule:{rule_id}", ttl=60, cache_manager=manager)
+        async def load_rule(rule_id):
+            calls.append(rule_id)
+            return {"id": rule_id}
+
+        assert await load_rule("a") == {"id": "a"}
+        assert await load_rule("a") == {"id": "a"}
+        assert calls == ["a"]
+        assert manager._client.ttls["rule:a"] == 60
+
+    @pytest.mark.asyncio
+    async def test_without_manager_calls_through(self):
+        @cached()
+        async def compute(x):
+            return x * 2
+
+        assert await compute(2) == 4
+
+    @pytest.mark.asyncio
+    async def test_coroutine_functions_with_sync_manager(self):
+        manager = CacheManager(redis_url="redis://unused")
+        manager._client = FakeSyncRedis()
+        calls = []
+
+        @cached(key_fn=lambda rule_id: f"rule:{rule_id}", ttl=60, cache_manager=manager)
+        async def load_rule(rule_id):
+            calls.append(rule_id)
+            return {"id": rule_id}
+
+        assert await load_rule("a") == {"id": "a"}
+        assert await load_rule("a") == {"id": "a"}
+        assert calls == ["a"]
+        assert manager._client.ttls["rule:a"] == 60
+
+    def test_sync_functions_reject_async_manager(self, manager):
+        with pytest.raises(TypeError):
+            @cached(cache_manager=manager)
+            def compute(x):
+                return x * 2
+
+    def test_sync_functions_keep_working(self):
+        manager = CacheManager(redis_url="redis://unused")
+        manager._client = FakeSyncRedis()
+        calls = []
+
+        @cached(ttl=60, cache_manager=manager)
+        def compute(x):
+            calls.append(x)
+            return x * 2
+
+        assert compute(2) == 4
+        assert compute(2) == 4
+        assert calls == [2]
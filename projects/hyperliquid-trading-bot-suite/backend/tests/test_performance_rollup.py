@@ -0,0 +1,234 @@
+"""
+Unit tests for the daily performance rollups behind
+TradeRecordRepository.get_performance_stats.
+"""
+
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from src.database.models import StrategyPerformanceDailyDB, TradeRecordDB
+from src.knowledge.models import PriceActionSnapshot, TradeRecord
+from src.knowledge.performance_rollup import DailyPerformance, PerformanceAccumulator
+from src.knowledge.repository import TradeRecordRepository
+from src.types import OrderSide, TradeOutcome
+
+
+def reference_stats(trades):
+    """Full replay of closed trades in entry order."""
+    trades = sorted(trades, key=lambda t: t.entry_time)
+    wins = [t for t in trades if t.outcome == 'win']
+    losses = [t for t in trades if t.outcome == 'loss']
+    total_pnl_r = sum(t.pnl_r for t in trades if t.pnl_r is not None)
+    gross_profit = sum(t.pnl_r for t in wins if t.pnl_r and t.pnl_r > 0)
+    gross_loss = abs(sum(t.pnl_r for t in losses if t.pnl_r and t.pnl_r < 0))
+
+    max_run = run = 0
+    for t in trades:
+        run = run + 1 if t.outcome == 'loss' else 0
+        max_run = max(max_run, run)
+
+    equity = peak = max_dd = 0.0
+    for t in trades:
+        if t.pnl_r is not None:
+            equity += t.pnl_r
+            peak = max(peak, equity)
+            max_dd = max(max_dd, (peak - equity) / abs(peak) if peak != 0 else 0)
+
+    return {
+        'total_trades': len(trades),
+        'winning_trades': len(wins),
+        'losing_trades': len(losses),
+        'total_pnl_r': total_pnl_r,
+        'profit_factor': gross_profit / gross_loss if gross_loss > 0 else None,
+        'max_consecutive_losses': max_run,
+        'max_drawdown': max_dd,
+    }
+
+
+def random_outcome(rng: random.Random):
+    outcome = rng.choice(['win', 'loss', 'loss', 'breakeven'])
+    if outcome == 'win':
+        pnl = rng.choice([0.5, 1.0, 2.0, 3.0, None])
+    elif outcome == 'loss':
+        pnl = rng.choice([-1.0, -0.5, None])
+    else:
+        pnl = 0.0
+    return outcome, pnl
+
+
+def make_trade(rule_id: str, entry_time: datetime) -> TradeRecord:
+    return TradeRecord(
+        id=str(uuid4()),
+        strategy_rule_id=rule_id,
+        asset="BTC-USD",
+        direction=OrderSide.LONG,
+        entry_price=100.0,
+        entry_time=entry_time,
+        position_size=1.0,
+        stop_loss=95.0,
+        take_profit_levels=[110.0],
+        reasoning="Test trade",
+        price_action_context=PriceActionSnapshot(timeframes={}),
+        confidence=0.6
+    )
+
+
+class TestDailyPerformance:
+    """Test cases for combining daily summaries."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_combined_days_match_full_replay(self, seed):
+        """Summaries split at arbitrary points combine to the full result."""
+        rng = random.Random(seed)
+        trades = []
+        for i in range(rng.randint(1, 60)):
+            outcome, pnl = random_outcome(rng)
+            trades.append(SimpleNamespace(entry_time=i, outcome=outcome, pnl_r=pnl))
+
+        cuts = sorted(rng.sample(range(len(trades) + 1), min(5, len(trades) + 1)))
+        accumulator = PerformanceAccumulator()
+        for start, end in zip([0] + cuts, cuts + [len(trades)]):
+            accumulator.add(DailyPerformance.from_trades(trades[start:end]))
+
+        expected = reference_stats(trades)
+        assert accumulator.total_trades == expected['total_trades']
+        assert accumulator.losing_trades == expected['losing_trades']
+        assert accumulator.max_consecutive_losses == expected['max_consecutive_losses']
+        assert accumulator.max_drawdown == pytest.approx(expected['max_drawdown'])
+        assert accumulator.total_pnl_r == pytest.approx(expected['total_pnl_r'])
+
+
+class TestPerformanceRollups:
+    """Test cases for rollups maintained by TradeRecordRepository."""
+
+    def setup_trades(self, repo, rng, rule_ids):
+        """Create trades over two weeks; close most of them in random order."""
+        now = datetime.utcnow()
+        open_ids = []
+        for _ in range(120):
+            entry_time = now - timedelta(days=rng.uniform(0.1, 14), minutes=rng.randint(0, 600))
+            trade = make_trade(rng.choice(rule_ids), entry_time)
+            if rng.random() < 0.3:
+                outcome, pnl = random_outcome(rng)
+                trade.outcome = TradeOutcome(outcome)
+                trade.exit_time = entry_time + timedelta(hours=1)
+                trade.pnl_r = pnl
+            else:
+                open_ids.append(trade.id)
+            repo.create(trade)
+
+        rng.shuffle(open_ids)
+        for trade_id in open_ids[:int(len(open_ids) * 0.8)]:
+            outcome, pnl = random_outcome(rng)
+            repo.update_trade_exit(trade_id, 101.0, 'take_profit', outcome, pnl_r=pnl)
+
+    def assert_stats_match(self, repo, rule_id, days_back=None):
+        query = repo.session.query(TradeRecordDB).filter(TradeRecordDB.exit_time.isnot(None))
+        if rule_id:
+            query = query.filter(TradeRecordDB.strategy_rule_id == rule_id)
+        if days_back:
+            query = query.filter(
+                TradeRecordDB.entry_time >= datetime.utcnow() - timedelta(days=days_back)
+            )
+        expected = reference_stats(query.all())
+
+        stats = repo.get_performance_stats(strategy_rule_id=rule_id, days_back=days_back)
+
+        assert stats.total_trades == expected['total_trades']
+        assert stats.winning_trades == expected['winning_trades']
+        assert stats.losing_trades == expected['losing_trades']
+        assert stats.total_pnl_r == pytest.approx(expected['total_pnl_r'])
+        assert stats.max_consecutive_losses == expected['max_consecutive_losses']
+        assert stats.max_drawdown == pytest.approx(min(expected['max_drawdown'], 1.0))
+        if expected['profit_factor'] is None:
+            assert stats.profit_factor is None
+        else:
+            assert stats.profit_factor == pytest.approx(expected['profit_factor'])
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_stats_match_full_replay(self, test_session, seed):
+        """Rollup statistics equal replaying every closed trade."""
+        repo = TradeRecordRepository(session=test_session, use_cache=False)
+        rule_ids = [str(uuid4()) for _ in range(3)]
+        self.setup_trades(repo, random.Random(seed), rule_ids)
+
+        for rule_id in rule_ids + [None]:
+            for days_back in (None, 3, 7):
+                self.assert_stats_match(repo, rule_id, days_back)
+
+    def test_rebuild_matches_incremental(self, test_session):
+        """Rebuilding from trades reproduces the incrementally kept rows."""
+        repo = TradeRecordRepository(session=test_session, use_cache=False)
+        self.setup_trades(repo, random.Random(7), [str(uuid4()) for _ in range(2)])
+
+        def snapshot():
+            return sorted(
+                (r.scope, r.day, r.total_trades, r.losing_trades, r.max_consecutive_losses,
+                 round(r.total_pnl_r, 9), [[round(v, 9) for v in p] for p in r.drawdown_profile])
+                for r in test_session.query(StrategyPerformanceDailyDB)
+            )
+
+        incremental = snapshot()
+        repo.rebuild_performance_rollups()
+
+        assert snapshot() == incremental
+
+    def test_rows_locked_before_trades_are_read(self, test_session):
+        """Both rollup rows are claimed before the day's trades are summarized."""
+        repo = TradeRecordRepository(session=test_session, use_cache=False)
+        rule_id = str(uuid4())
+        trade = make_trade(rule_id, datetime.utcnow() - timedelta(hours=3))
+        repo.create(trade)
+        test_session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(" ".join(statement.split()))
+
+        engine = test_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            repo.update_trade_exit(trade.id, 101.0, 'take_profit', 'win', pnl_r=1.0)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        claims = [
+            i for i, sql in enumerate(statements)
+            if sql.startswith("INSERT INTO strategy_performance_daily")
+        ]
+        reads = [
+            i for i, sql in enumerate(statements)
+            if sql.startswith("SELECT trade_records.outcome")
+        ]
+        assert len(claims) == 2 and len(reads) == 2
+        assert all(statements[i].endswith("DO NOTHING") for i in claims)
+        assert max(claims) < min(reads)
+
+        # A second transaction on the same day updates the existing rows
+        other = make_trade(str(uuid4()), trade.entry_time + timedelta(minutes=5))
+        other.outcome = TradeOutcome.LOSS
+        other.exit_time = other.entry_time + timedelta(hours=1)
+        other.pnl_r = -1.0
+        repo.create(other)
+        test_session.commit()
+
+        day = trade.entry_time.date()
+        rows = {
+            r.scope: r.total_trades
+            for r in test_session.query(StrategyPerformanceDailyDB).filter_by(day=day)
+        }
+        assert rows == {rule_id: 1, other.strategy_rule_id: 1, '*': 2}
+
+    def test_no_trades(self, test_session):
+        """Empty rollups give zeroed statistics."""
+        repo = TradeRecordRepository(session=test_session, use_cache=False)
+        stats = repo.get_performance_stats()
+
+        assert stats.total_trades == 0
+        assert stats.strategy_rule_id == "all"
@@ -0,0 +1,125 @@
+"""
+Unit tests for the API rate limiter.
+"""
+
+import pytest
+
+from src.api.security import rate_limiter as rate_limiter_module
+from src.api.security.rate_limiter import RateLimitAlgorithm, RateLimiter
+
+
+class FakeClock:
+    """Stands in for time.monotonic."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeScript:
+    """Records script calls and returns a canned reply."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    async def __call__(self, keys=None, args=None):
+        self.calls.append((keys, args))
+        return self.reply
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    return clock
+
+
+class TestInMemoryGCRA:
+    """Test cases for the in-memory fallback."""
+
+    @pytest.mark.asyncio
+    async def test_allows_burst_then_denies(self, clock):
+        limiter = RateLimiter(redis_url="redis://unused")
+
+        results = [await limiter.is_allowed("k", 5, 60) for _ in range(6)]
+
+        assert [allowed for allowed, _, _ in results] == [True] * 5 + [False]
+        assert [remaining for _, remaining, _ in results[:5]] == [4, 3, 2, 1, 0]
+        # One request frees up every 60 / 5 = 12 seconds
+        assert results[5][2] == 12
+
+    @pytest.mark.asyncio
+    async def test_requests_are_released_at_the_emission_rate(self, clock):
+        limiter = RateLimiter(redis_url="redis://unused")
+        for _ in range(5):
+            await limiter.is_allowed("k", 5, 60)
+
+        clock.now += 11.9
+        assert not (await limiter.is_allowed("k", 5, 60))[0]
+        clock.now += 0.1
+        assert (await limiter.is_allowed("k", 5, 60))[:2] == (True, 0)
+
+        clock.now += 60
+        allowed, remaining, reset = await limiter.is_allowed("k", 5, 60)
+        assert allowed and remaining == 4 and reset == 12
+
+    @pytest.mark.asyncio
+    async def test_keys_are_independent(self, clock):
+        limiter = RateLimiter(redis_url="redis://unused")
+        for _ in range(5):
+            await limiter.is_allowed("a", 5, 60)
+
+        assert not (await limiter.is_allowed("a", 5, 60))[0]
+        assert (await limiter.is_allowed("b", 5, 60))[0]
+
+    @pytest.mark.asyncio
+    async def test_drained_buckets_are_pruned(self, clock, monkeypatch):
+        monkeypatch.setattr(RateLimiter, "FALLBACK_PRUNE_THRESHOLD", 10)
+        limiter = RateLimiter(redis_url="redis://unused")
+        for i in range(10):
+            await limiter.is_allowed(f"old:{i}", 5, 60)
+
+        clock.now += 120
+        await limiter.is_allowed("new:0", 5, 60)
+
+        assert set(limiter._fallback_limits) == {"new:0"}
+
+    @pytest.mark.asyncio
+    async def test_disabled_limiter_allows_everything(self, clock):
+        limiter = RateLimiter(redis_url="redis://unused")
+        limiter.disable()
+
+        assert all([(await limiter.is_allowed("k", 1, 60))[0] for _ in range(10)])
+
+
+class TestRedisGCRA:
+    """Test cases for the Redis script path."""
+
+    def make_limiter(self, reply):
+        limiter = RateLimiter(redis_url="redis://unused", algorithm=RateLimitAlgorithm.GCRA)
+        limiter._redis = object()  # Connected; only the script is called
+        limiter._gcra_script = FakeScript(reply)
+        return limiter
+
+    def test_default_algorithm_is_gcra(self):
+        assert RateLimiter(redis_url="redis://unused").algorithm == RateLimitAlgorithm.GCRA
+
+    @pytest.mark.asyncio
+    async def test_single_script_call_per_check(self):
+        limiter = self.make_limiter([1, 6, 8571])
+
+        result = await limiter.is_allowed("ratelimit:read:ip:1.2.3.4", 7, 60)
+
+        assert result == (True, 6, 9)
+        assert limiter._gcra_script.calls == [
+            (["ratelimit:read:ip:1.2.3.4:gcra"], [8571, 7])
+        ]
+
+    @pytest.mark.asyncio
+    async def test_denied_reply_maps_to_retry_after(self):
+        limiter = self.make_limiter([0, 0, 250])
+
+        assert await limiter.is_allowed("k", 5, 60) == (False, 0, 1)
@@ -0,0 +1,125 @@
+"""
+Tests for MinHash/LSH near-duplicate strategy merging.
+"""
+
+import pytest
+
+from src.ingestion.strategy_dedup import (
+    MinHasher,
+    StrategyDeduplicator,
+    strategy_features
+)
+from src.knowledge.models import (
+    ContentSource,
+    PatternCondition,
+    RiskParameters,
+    StrategyRule,
+    TimeframeAlignment
+)
+from src.types import EntryType, PatternType, SourceType, Timeframe
+
+
+def make_rule(
+    name: str,
+    description: str = "",
+    entry_type: EntryType = EntryType.LE,
+    wick_ratio: float = 2.0,
+    confidence: float = 0.5,
+    tags=None
+) -> StrategyRule:
+    return StrategyRule(
+        name=name,
+        description=description or None,
+        source=ContentSource(type=SourceType.VIDEO, ref="course.mp4"),
+        entry_type=entry_type,
+        conditions=[
+            PatternCondition(
+                type=PatternType.CANDLE,
+                timeframe=Timeframe.M15,
+                params={"wickRatio": wick_ratio, "closePosition": "upper"}
+            ),
+            PatternCondition(type=PatternType.ZONE, timeframe=Timeframe.H4, params={})
+        ],
+        confluence_required=[
+            TimeframeAlignment(
+                higher_tf=Timeframe.H4,
+                lower_tf=Timeframe.M15,
+                bias_required="bullish",
+                entry_pattern="le_candle"
+            )
+        ],
+        risk_params=RiskParameters(sl_distance="below_low"),
+        confidence=confidence,
+        tags=list(tags or [])
+    )
+
+
+DESCRIPTION = (
+    "Wait for price to sweep liquidity below the 4h demand zone, then enter "
+    "on a liquidity engulfing candle on the 15 minute chart with stop below the low"
+)
+
+
+@pytest.fixture
+def deduplicator():
+    return StrategyDeduplicator(similarity_threshold=0.7)
+
+
+def test_identical_signatures_have_similarity_one():
+    hasher = MinHasher(num_perm=64)
+    features = strategy_features(make_rule("LE at demand", DESCRIPTION))
+    assert MinHasher.similarity(hasher.signature(features), hasher.signature(features)) == 1.0
+
+
+def test_reworded_duplicates_are_merged(deduplicator):
+    rules = [
+        make_rule("LE Candle at 4H Demand", DESCRIPTION, confidence=0.6, tags=["chunk1"]),
+        make_rule("LE candle at 4h demand zone", DESCRIPTION, confidence=0.8, tags=["chunk2"]),
+    ]
+
+    merged = deduplicator.deduplicate(rules)
+
+    assert len(merged) == 1
+    assert merged[0].confidence == 0.8
+    assert merged[0].tags == ["chunk1", "chunk2"]
+
+
+def test_different_conditions_are_kept(deduplicator):
+    rules = [
+        make_rule("Breakout retest", "Enter on the retest of the broken range high",
+                  entry_type=EntryType.BREAKOUT),
+        make_rule("LE at demand", DESCRIPTION),
+    ]
+
+    assert len(deduplicator.deduplicate(rules)) == 2
+
+
+def test_same_text_different_entry_type_not_merged(deduplicator):
+    rules = [
+        make_rule("Range play", DESCRIPTION, entry_type=EntryType.ONION),
+        make_rule("Range play setup", DESCRIPTION, entry_type=EntryType.FAKEOUT),
+    ]
+
+    assert len(deduplicator.deduplicate(rules)) == 2
+
+
+def test_exact_name_always_merged_and_order_preserved(deduplicator):
+    rules = [
+        make_rule("First", "alpha beta gamma", entry_type=EntryType.CELERY),
+        make_rule("Second", DESCRIPTION),
+        make_rule("first", "completely different words here", entry_type=EntryType.CELERY),
+    ]
+
+    merged = deduplicator.deduplicate(rules)
+
+    assert [r.name for r in merged] == ["First", "Second"]
+    assert merged[0].description == "completely different words here"
+
+
+def test_many_copies_collapse_to_one(deduplicator):
+    rules = [make_rule(f"LE candle at 4h demand v{i}", DESCRIPTION) for i in range(50)]
+    rules.append(make_rule("Breakout", "break and retest of range high", entry_type=EntryType.BREAKOUT))
+
+    merged = deduplicator.deduplicate(rules)
+
+    assert len(merged) == 2
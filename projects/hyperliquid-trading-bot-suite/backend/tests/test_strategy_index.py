@@ -0,0 +1,182 @@
+"""
+Unit tests for the in-memory strategy match index used by TradeReasoner.
+"""
+
+import random
+from unittest.mock import Mock
+from uuid import uuid4
+
+import pytest
+
+from src.knowledge.models import (
+    StrategyRule, ContentSource, RiskParameters, PatternCondition, TimeframeAlignment
+)
+from src.knowledge.repository import StrategyRuleRepository
+from src.trading.strategy_index import IndexedRule, StrategyMatchIndex
+from src.types import EntryType, MarketCycle, PatternType, SourceType, Timeframe
+
+
+ENTRY_TYPES = [EntryType.LE, EntryType.SMALL_WICK, EntryType.CELERY]
+CYCLES = [MarketCycle.DRIVE, MarketCycle.RANGE, MarketCycle.LIQUIDITY]
+TIMEFRAMES = [Timeframe.M15, Timeframe.H1, Timeframe.H4, Timeframe.D1]
+
+
+def random_rule(rng: random.Random) -> StrategyRule:
+    conditions = [PatternCondition(type=PatternType.CANDLE, timeframe=Timeframe.M15)]
+    if rng.random() < 0.5:
+        conditions.append(PatternCondition(
+            type=PatternType.CYCLE,
+            timeframe=Timeframe.H4,
+            params={"cycle": rng.choice(CYCLES).value}
+        ))
+    alignments = [
+        TimeframeAlignment(
+            higher_tf=rng.choice(TIMEFRAMES[2:]),
+            lower_tf=rng.choice(TIMEFRAMES[:2]),
+            bias_required="bullish",
+            entry_pattern="le"
+        )
+        for _ in range(rng.randint(0, 2))
+    ]
+    return StrategyRule(
+        id=str(uuid4()),
+        name=f"Rule {rng.random():.4f}",
+        source=ContentSource(type=SourceType.MANUAL, ref="test"),
+        entry_type=rng.choice(ENTRY_TYPES),
+        conditions=conditions,
+        confluence_required=alignments,
+        risk_params=RiskParameters(sl_distance="below_low"),
+        confidence=rng.choice([0.2, 0.3, 0.5, 0.7, 0.9]),
+        win_rate=rng.choice([None, 0.4, 0.6])
+    )
+
+
+def reference_match(repository, entry_type, cycle, timeframes):
+    """The scoring loop TradeReasoner used before the index existed."""
+    best_strategy = None
+    best_score = 0.0
+    for strategy in repository.get_all(entry_type=entry_type, min_confidence=0.3, limit=None):
+        score = 0.0
+        score += strategy.confidence * 0.4
+        if cycle:
+            for condition in strategy.conditions:
+                if condition.type.value == "cycle" and condition.params.get("cycle") == cycle:
+                    score += 0.2
+                    break
+        for alignment in strategy.confluence_required:
+            if alignment.higher_tf.value in timeframes and alignment.lower_tf.value in timeframes:
+                score += 0.2
+                break
+        if strategy.win_rate and strategy.win_rate > 0.5:
+            score += 0.2
+        if score > best_score:
+            best_score = score
+            best_strategy = strategy
+    return best_strategy
+
+
+def score(rule: StrategyRule, cycle, timeframes) -> float:
+    return StrategyMatchIndex.score(IndexedRule.from_rule(rule), cycle, timeframes)
+
+
+@pytest.fixture
+def rule_repo(test_session):
+    """Strategy rule repository on the SQLite test session."""
+    repo = StrategyRuleRepository(session=test_session, use_cache=False)
+    repo._semantic_search = Mock()
+    return repo
+
+
+class TestStrategyMatchIndex:
+    """Test cases for StrategyMatchIndex."""
+
+    def test_matches_reference_scoring(self, rule_repo):
+        """Index matches equal scoring every rule from the database."""
+        rng = random.Random(0)
+        rule_repo.create_many([random_rule(rng) for _ in range(60)])
+        index = StrategyMatchIndex()
+
+        for _ in range(200):
+            entry_type = rng.choice(ENTRY_TYPES).value
+            cycle = rng.choice([None] + CYCLES)
+            cycle = cycle.value if cycle else None
+            timeframes = {tf.value for tf in rng.sample(TIMEFRAMES, rng.randint(0, 4))}
+
+            got = index.best_match(rule_repo, entry_type, cycle, timeframes)
+            want = reference_match(rule_repo, entry_type, cycle, timeframes)
+            # Equal-score rules come back in unspecified database order
+            assert (got is None) == (want is None)
+            if got is not None:
+                assert score(got, cycle, timeframes) == score(want, cycle, timeframes)
+
+    def test_loads_once(self, rule_repo):
+        """Repeated queries do not hit the repository again."""
+        rule_repo.create(random_rule(random.Random(1)))
+        index = StrategyMatchIndex()
+        repo = Mock(wraps=rule_repo)
+
+        for _ in range(5):
+            index.best_match(repo, EntryType.LE.value)
+
+        assert repo.get_all.call_count == 1
+
+    def test_refreshes_on_repository_changes(self, rule_repo):
+        """Created, updated and deleted rules are reflected in matches."""
+        rule = random_rule(random.Random(2))
+        rule.entry_type = EntryType.ONION
+        rule.confidence = 0.5
+        rule.win_rate = None
+        rule_id = rule_repo.create(rule)
+        index = StrategyMatchIndex()
+        assert index.best_match(rule_repo, EntryType.ONION.value).id == rule_id
+
+        better = random_rule(random.Random(3))
+        better.entry_type = EntryType.ONION
+        better.confidence = 0.9
+        better_id = rule_repo.create(better)
+        rule_repo.session.commit()
+        assert index.best_match(rule_repo, EntryType.ONION.value).id == better_id
+
+        rule_repo.update_performance(rule_id, win_rate=0.8, avg_r_multiple=2.0, confidence=1.0)
+        rule_repo.session.commit()
+        assert index.best_match(rule_repo, EntryType.ONION.value).id == rule_id
+
+        rule_repo.delete(rule_id)
+        rule_repo.session.commit()
+        assert index.best_match(rule_repo, EntryType.ONION.value).id == better_id
+
+        rule_repo.update_performance(better_id, win_rate=0.1, avg_r_multiple=-1.0, confidence=0.1)
+        rule_repo.session.commit()
+        assert index.best_match(rule_repo, EntryType.ONION.value) is None
+        assert len(index) == 0
+
+    def test_notified_only_after_commit(self, rule_repo):
+        """Listeners hear about committed changes, never rolled-back ones."""
+        listener = Mock()
+        StrategyRuleRepository.add_change_listener(listener)
+
+        rule_repo.create(random_rule(random.Random(5)))
+        rule_repo.session.rollback()
+        assert not listener.on_rules_changed.called
+
+        rule_id = rule_repo.create(random_rule(random.Random(6)))
+        assert not listener.on_rules_changed.called
+        rule_repo.session.commit()
+        listener.on_rules_changed.assert_called_once_with([rule_id])
+
+    def test_invalidate_reloads(self, rule_repo):
+        """A full invalidation reloads every rule on the next query."""
+        rule_repo.create(random_rule(random.Random(4)))
+        index = StrategyMatchIndex()
+        repo = Mock(wraps=rule_repo)
+
+        index.best_match(repo, EntryType.LE.value)
+        index.invalidate()
+        index.best_match(repo, EntryType.LE.value)
+
+        assert repo.get_all.call_count == 2
+
+    def test_unknown_entry_type(self, rule_repo):
+        """Entry types without rules have no match."""
+        index = StrategyMatchIndex()
+        assert index.best_match(rule_repo, EntryType.FAKEOUT.value) is None
@@ -0,0 +1,111 @@
+"""
+Unit tests for the transcript/frame interval index.
+"""
+
+import random
+
+import pytest
+
+from src.ingestion.video_pipeline import TranscriptFrameCorrelator, TranscriptIntervalIndex
+
+
+def reference_correlate(segments, timestamp):
+    """The nested loops the index replaced."""
+    relevant_segments = []
+    for segment in segments:
+        seg_start = segment.get('start', 0)
+        seg_end = segment.get('end', 0)
+        if seg_start <= timestamp <= seg_end:
+            relevant_segments.append(segment)
+        elif abs(seg_start - timestamp) <= 30 or abs(seg_end - timestamp) <= 30:
+            relevant_segments.append(segment)
+
+    relevant_words = []
+    for segment in relevant_segments:
+        for word_info in segment.get('words', []):
+            if abs(word_info.get('start', 0) - timestamp) <= 15:
+                relevant_words.append(word_info)
+    return relevant_segments, relevant_words
+
+
+def random_transcript(rng, count, duration):
+    segments = []
+    for i in range(count):
+        start = rng.uniform(0, duration)
+        kind = rng.random()
+        if kind < 0.05:
+            end = start + rng.uniform(200, duration)  # Very long
+        elif kind < 0.1:
+            end = start - rng.uniform(0, 20)  # Malformed: end before start
+        else:
+            end = start + rng.uniform(0, 25)  # Ordinary, often overlapping
+        words = [
+            {'word': f"w{i}_{j}", 'start': rng.uniform(min(start, end), max(start, end))}
+            for j in range(rng.randint(0, 6))
+        ]
+        segment = {'start': round(start, 1), 'end': round(end, 1), 'text': f"s{i}", 'words': words}
+        if rng.random() < 0.03:
+            del segment['end']  # Missing keys default to 0
+        segments.append(segment)
+    return segments
+
+
+class TestTranscriptIntervalIndex:
+    """Test cases for the indexed lookup."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_nested_loops(self, seed):
+        rng = random.Random(seed)
+        duration = rng.choice([120, 600, 3600])
+        segments = random_transcript(rng, rng.randint(0, 300), duration)
+        index = TranscriptIntervalIndex(segments)
+
+        timestamps = [rng.uniform(-60, duration + 60) for _ in range(100)]
+        # Exact boundaries, where <= versus < matters
+        timestamps += [s.get('start', 0) + 30 for s in segments[:20]]
+        timestamps += [s.get('end', 0) - 30 for s in segments[:20]]
+
+        for timestamp in timestamps:
+            expected_segments, expected_words = reference_correlate(segments, timestamp)
+            segment_ids = index.segments_near(timestamp, 30)
+
+            assert [segments[i] for i in segment_ids] == expected_segments
+            assert index.words_near(timestamp, 15, segment_ids) == expected_words
+
+    def test_correlator_output_unchanged(self):
+        rng = random.Random(7)
+        segments = random_transcript(rng, 150, 900)
+        frames = [
+            {'frame_path': f"f{i}.jpg", 'timestamp_seconds': t, 'perceptual_hash': "0"}
+            for i, t in enumerate(range(0, 900, 10))
+        ]
+
+        correlated = TranscriptFrameCorrelator.correlate_transcript_with_frames(
+            {'segments': segments}, frames
+        )
+
+        for frame, entry in zip(frames, correlated):
+            expected_segments, expected_words = reference_correlate(
+                segments, frame['timestamp_seconds']
+            )
+            assert entry['transcript_text'] == " ".join(
+                seg.get('text', '').strip() for seg in expected_segments
+            )
+            assert entry['relevant_words'] == expected_words
+
+    def test_long_segment_does_not_widen_every_lookup(self):
+        segments = [{'start': 0, 'end': 100_000}]
+        segments += [{'start': t, 'end': t + 5} for t in range(0, 100_000, 10)]
+        index = TranscriptIntervalIndex(segments)
+
+        calls = []
+        original = index._collect_spanning
+
+        def counting(*args):
+            calls.append(args)
+            return original(*args)
+
+        index._collect_spanning = counting
+        assert index.segments_near(50_000, 30) == [0] + list(range(4_998, 5_005))
+        # The tree descent visits O(log n) nodes, not every earlier segment
+        assert len(calls) < 100
@@ -0,0 +1,281 @@
+"""
+Unit tests for the strategy rule vector index and its use by semantic search.
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+from uuid import uuid4
+
+from src.database.models import StrategyRuleDB
+from src.knowledge.models import StrategyRule, ContentSource, RiskParameters, PatternCondition
+from src.knowledge.repository import StrategyRuleRepository
+from src.knowledge.semantic_search import SemanticSearch, EmbeddingGenerator
+from src.knowledge.vector_index import VectorIndex, encode_vector, decode_vector
+from src.trading.trade_reasoner import TradeReasoner
+from src.types import EntryType, PatternType, SourceType, Timeframe
+
+
+def write_rules(path, worker, count):
+    """Add rules to a shared on-disk index from a separate process."""
+    index = VectorIndex(8, path=path, capacity=2)
+    for i in range(count):
+        vector = np.zeros(8, dtype=np.float32)
+        vector[worker] = 1.0
+        index.add(f"w{worker}-{i}", vector, {"worker": worker})
+
+
+def brute_force(vectors: np.ndarray, query: np.ndarray, k: int):
+    """Reference cosine top-k."""
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    order = np.argsort(-scores, kind="stable")[:k]
+    return order, scores[order]
+
+
+class TestVectorIndex:
+    """Test cases for VectorIndex."""
+
+    def test_search_matches_brute_force(self):
+        """Top-k results equal a direct cosine ranking."""
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(300, 32)).astype(np.float32)
+        index = VectorIndex(32, capacity=4)
+        index.add_batch([f"r{i}" for i in range(300)], vectors)
+        query = rng.normal(size=32)
+
+        results = index.search(query, k=10)
+        order, scores = brute_force(vectors, query.astype(np.float32), 10)
+
+        assert [item_id for item_id, _ in results] == [f"r{i}" for i in order]
+        assert np.allclose([score for _, score in results], scores, atol=1e-5)
+
+    def test_upsert_replaces_vector(self):
+        """Adding an existing id replaces its vector without growing the index."""
+        index = VectorIndex(3)
+        index.add("a", [1, 0, 0])
+        index.add("b", [0, 1, 0])
+        index.add("a", [0, 0, 1])
+
+        assert len(index) == 2
+        assert index.search([0, 0, 1], k=1)[0][0] == "a"
+
+    def test_remove_moves_last_row(self):
+        """Removing an entry keeps the remaining ids searchable."""
+        index = VectorIndex(3)
+        index.add_batch(["a", "b", "c"], np.eye(3))
+
+        assert index.remove("a") is True
+        assert index.remove("a") is False
+        assert "a" not in index
+        assert index.search([0, 0, 1], k=1) == [("c", pytest.approx(1.0))]
+        assert index.search([0, 1, 0], k=1) == [("b", pytest.approx(1.0))]
+
+    def test_exclude_and_metadata_filter(self):
+        """Excluded ids and entries failing the predicate are skipped."""
+        index = VectorIndex(2)
+        index.add_batch(
+            ["a", "b", "c"],
+            np.array([[1, 0], [1, 0.1], [1, 0.2]]),
+            [{"confidence": 0.9}, {"confidence": 0.2}, {"confidence": 0.6}]
+        )
+
+        results = index.similar_to("a", k=5, where=lambda m: m["confidence"] >= 0.5)
+
+        assert [item_id for item_id, _ in results] == ["c"]
+        assert index.update_metadata("b", confidence=0.95) is True
+        assert [i for i, _ in index.similar_to("a", k=5, where=lambda m: m["confidence"] >= 0.5)] == ["b", "c"]
+
+    def test_binary_wire_format(self):
+        """Vectors round-trip through the float32 byte encoding."""
+        vector = np.random.default_rng(1).normal(size=1536).astype(np.float32)
+        data = encode_vector(vector)
+
+        assert len(data) == 1536 * 4
+        assert np.array_equal(decode_vector(data), vector)
+
+        index = VectorIndex(1536)
+        index.add("a", data)
+        assert index.search(data, k=1)[0][0] == "a"
+
+    def test_persists_memory_mapped_index(self, tmp_path):
+        """A saved index reopens from disk with the same contents."""
+        rng = np.random.default_rng(2)
+        vectors = rng.normal(size=(50, 16)).astype(np.float32)
+        index = VectorIndex(16, path=tmp_path, capacity=8)
+        index.add_batch([f"r{i}" for i in range(50)], vectors, [{"n": i} for i in range(50)])
+        index.remove("r3")
+        index.save()
+
+        reopened = VectorIndex(16, path=tmp_path)
+
+        assert reopened.ids == index.ids
+        assert reopened.metadata("r7") == {"n": 7}
+        assert reopened.search(vectors[10], k=3) == index.search(vectors[10], k=3)
+
+    def test_processes_share_one_index(self, tmp_path):
+        """Concurrent writers in other processes never overwrite each other's rows."""
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=write_rules, args=(tmp_path, w, 40)) for w in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            assert worker.exitcode == 0
+
+        index = VectorIndex(8, path=tmp_path)
+        assert len(index) == 160
+        for w in range(4):
+            for i in range(40):
+                item_id = f"w{w}-{i}"
+                assert index.metadata(item_id) == {"worker": w}
+                assert int(np.argmax(index.get(item_id))) == w
+
+    def test_sees_writes_from_other_handles(self, tmp_path):
+        """An open index picks up rows another process added or removed."""
+        reader = VectorIndex(3, path=tmp_path)
+        writer = VectorIndex(3, path=tmp_path)
+
+        writer.add_batch(["a", "b"], np.eye(3)[:2])
+        assert reader.search([0, 1, 0], k=1)[0][0] == "b"
+
+        reader.add("c", [0, 0, 1])
+        writer.remove("a")
+        assert sorted(writer.ids) == ["b", "c"]
+        assert sorted(reader.ids) == ["b", "c"]
+
+    def test_rejects_wrong_dimension(self, tmp_path):
+        """Vectors and stored indexes must match the index dimension."""
+        index = VectorIndex(4, path=tmp_path)
+        with pytest.raises(ValueError):
+            index.add("a", [1, 2, 3])
+        index.save()
+        with pytest.raises(ValueError):
+            VectorIndex(8, path=tmp_path)
+
+
+class TestEmbeddingGenerator:
+    """Test cases for batched embedding generation."""
+
+    def test_batched_embeddings_match_single(self):
+        """Batch output equals embedding texts one at a time."""
+        generator = EmbeddingGenerator()
+        generator.openai_api_key = None
+        texts = [f"rule {i}" for i in range(7)]
+
+        batch = generator.generate_embeddings(texts, batch_size=3)
+
+        assert batch.shape == (7, generator.embedding_dimension)
+        for row, text in zip(batch, texts):
+            assert np.allclose(row, generator.generate_embedding(text), atol=1e-7)
+
+
+def make_rule(name: str, entry_type: EntryType, confidence: float, tags) -> StrategyRule:
+    return StrategyRule(
+        id=str(uuid4()),
+        name=name,
+        source=ContentSource(type=SourceType.MANUAL, ref="test"),
+        entry_type=entry_type,
+        conditions=[PatternCondition(type=PatternType.CANDLE, timeframe=Timeframe.M15)],
+        risk_params=RiskParameters(sl_distance="below_low"),
+        confidence=confidence,
+        description=f"{name} description",
+        tags=tags
+    )
+
+
+@pytest.fixture
+def indexed_repo(test_session):
+    """Strategy rule repository backed by an in-memory vector index."""
+    repo = StrategyRuleRepository(session=test_session, use_cache=False)
+    repo._semantic_search = SemanticSearch(test_session, index=VectorIndex(1536))
+    repo._semantic_search.embedding_generator.openai_api_key = None
+    return repo
+
+
+class TestIndexedRepository:
+    """Test cases for repository operations keeping the index in sync."""
+
+    def test_create_many_indexes_rules(self, indexed_repo):
+        """Bulk-created rules are embedded and searchable."""
+        rules = [
+            make_rule(f"Rule {i}", EntryType.LE, 0.5 + i / 20, ["LE"])
+            for i in range(5)
+        ]
+
+        ids = indexed_repo.create_many(rules)
+        indexed_repo.session.commit()
+
+        index = indexed_repo.semantic_search.index
+        assert sorted(index.ids) == sorted(ids)
+        assert index.metadata(ids[0])["entry_type"] == EntryType.LE.value
+
+        db_rule = indexed_repo.session.query(StrategyRuleDB).filter_by(id=ids[2]).first()
+        query_text = indexed_repo.semantic_search.generate_rule_embedding_text(db_rule)
+
+        results = indexed_repo.search_semantic(query_text, limit=1)
+        assert results[0][0].id == ids[2]
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+    def test_update_and_delete_keep_index_in_sync(self, indexed_repo):
+        """Performance updates reach index metadata and deletes remove vectors."""
+        rule_id = indexed_repo.create(make_rule("Small", EntryType.SMALL_WICK, 0.4, []))
+        other_id = indexed_repo.create(make_rule("Other", EntryType.SMALL_WICK, 0.9, []))
+        indexed_repo.session.commit()
+        index = indexed_repo.semantic_search.index
+
+        indexed_repo.update_performance(rule_id, win_rate=0.6, avg_r_multiple=1.5, confidence=0.8)
+        indexed_repo.session.commit()
+        assert index.metadata(rule_id)["confidence"] == 0.8
+        assert index.metadata(rule_id)["win_rate"] == 0.6
+
+        similar = indexed_repo.find_similar_rules(other_id, limit=5, min_confidence=0.7)
+        assert [rule.id for rule, _ in similar] == [rule_id]
+
+        assert indexed_repo.delete(rule_id) is True
+        assert rule_id in index
+        indexed_repo.session.commit()
+        assert rule_id not in index
+
+    def test_index_changes_wait_for_commit(self, indexed_repo):
+        """Rolled-back writes never reach the index."""
+        index = indexed_repo.semantic_search.index
+        kept_id = indexed_repo.create(make_rule("Kept", EntryType.LE, 0.5, []))
+        indexed_repo.session.commit()
+
+        rolled_back_id = indexed_repo.create(make_rule("Gone", EntryType.LE, 0.5, []))
+        indexed_repo.update_performance(kept_id, win_rate=0.9, avg_r_multiple=2.0, confidence=0.9)
+        indexed_repo.delete(kept_id)
+        assert index.ids == [kept_id]
+        indexed_repo.session.rollback()
+
+        assert index.ids == [kept_id]
+        assert index.metadata(kept_id)["confidence"] == 0.5
+        indexed_repo.session.commit()
+        assert index.ids == [kept_id]
+
+    def test_savepoint_rollback_keeps_outer_changes(self, indexed_repo):
+        """Only writes inside a rolled-back savepoint are dropped."""
+        outer_id = indexed_repo.create(make_rule("Outer", EntryType.LE, 0.5, []))
+        savepoint = indexed_repo.session.begin_nested()
+        indexed_repo.create(make_rule("Inner", EntryType.LE, 0.5, []))
+        savepoint.rollback()
+        indexed_repo.session.commit()
+
+        assert indexed_repo.semantic_search.index.ids == [outer_id]
+
+    def test_trade_reasoner_lookup_uses_index(self, indexed_repo):
+        """TradeReasoner finds similar rules from the index alone."""
+        ids = indexed_repo.create_many([
+            make_rule(f"Rule {i}", EntryType.CELERY, 0.6, ["celery"]) for i in range(4)
+        ])
+        indexed_repo.session.commit()
+        reasoner = TradeReasoner(use_llm=False, rule_index=indexed_repo.semantic_search.index)
+
+        similar = reasoner.find_similar_strategies(ids[0], limit=3)
+
+        assert len(similar) == 3
+        assert ids[0] not in [rule_id for rule_id, _ in similar]
+        assert reasoner.find_similar_strategies("missing") == []
+
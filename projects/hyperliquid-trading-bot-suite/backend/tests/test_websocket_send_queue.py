@@ -0,0 +1,331 @@
+"""
+Unit tests for per-connection WebSocket send queues and fan-out.
+"""
+
+import asyncio
+import importlib
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from src.api.services import json_encoding, websocket_manager
+from src.api.services.send_queue import ClientSendQueue, SlowConsumerPolicy
+from src.api.services.websocket_manager import StreamType, WebSocketManager
+
+
+class FakeWebSocket:
+    """Records sent messages; `delay` simulates a slow network, `stall` a stuck one."""
+
+    def __init__(self, delay: float = 0.0, stall: bool = False, fail: bool = False):
+        self.delay = delay
+        self.stall = stall
+        self.fail = fail
+        self.sent = []
+        self.payloads = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.fail:
+            raise ConnectionResetError("connection reset")
+        if self.stall:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def send_text(self, text):
+        self.payloads.append(text)
+        await self.send_json(json.loads(text))
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = code
+
+
+async def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.005)
+
+
+class TestClientSendQueue:
+    """Test cases for the slow-consumer policies."""
+
+    @pytest.mark.asyncio
+    async def test_delivers_in_order(self):
+        ws = FakeWebSocket()
+        queue = ClientSendQueue(ws.send_json)
+        queue.start()
+        for i in range(5):
+            assert queue.put({"n": i})
+
+        await wait_until(lambda: len(ws.sent) == 5)
+        assert [m["n"] for m in ws.sent] == list(range(5))
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest(self):
+        ws = FakeWebSocket()
+        queue = ClientSendQueue(ws.send_json, max_size=3, policy=SlowConsumerPolicy.DROP_OLDEST)
+        for i in range(5):
+            assert queue.put({"n": i})  # Writer not started yet: the queue fills up
+
+        assert queue.dropped == 2
+        queue.start()
+        await wait_until(lambda: len(ws.sent) == 3)
+        assert [m["n"] for m in ws.sent] == [2, 3, 4]
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_coalesce_keeps_latest_per_key(self):
+        ws = FakeWebSocket()
+        queue = ClientSendQueue(ws.send_json, max_size=10, policy=SlowConsumerPolicy.COALESCE)
+        queue.put({"type": "progress", "n": 1}, key="progress")
+        queue.put({"type": "trade", "n": 2})
+        queue.put({"type": "progress", "n": 3}, key="progress")
+        queue.put({"type": "trade", "n": 4})
+
+        assert len(queue) == 3
+        assert queue.coalesced == 1
+        queue.start()
+        await wait_until(lambda: len(ws.sent) == 3)
+        assert [m["n"] for m in ws.sent] == [2, 3, 4]
+        await queue.close()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy_reports_overflow(self):
+        reasons = []
+
+        async def on_failure(reason):
+            reasons.append(reason)
+
+        ws = FakeWebSocket()
+        queue = ClientSendQueue(
+            ws.send_json, max_size=2, policy=SlowConsumerPolicy.DISCONNECT, on_failure=on_failure
+        )
+        assert queue.put({"n": 1})
+        assert queue.put({"n": 2})
+        assert not queue.put({"n": 3})
+        assert queue.closed
+
+        await wait_until(lambda: reasons == ["send queue full"])
+        assert not queue.put({"n": 4})
+
+    @pytest.mark.asyncio
+    async def test_stalled_send_times_out(self):
+        reasons = []
+
+        async def on_failure(reason):
+            reasons.append(reason)
+
+        ws = FakeWebSocket(stall=True)
+        queue = ClientSendQueue(ws.send_json, send_timeout=0.05, on_failure=on_failure)
+        queue.start()
+        queue.put({"n": 1})
+
+        await wait_until(lambda: len(reasons) == 1)
+        assert "timed out" in reasons[0]
+        assert queue.closed
+        await queue.close()
+
+
+class TestWebSocketManagerFanOut:
+    """Test cases for broadcasting through the manager."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_does_not_wait_for_slow_clients(self):
+        manager = WebSocketManager(queue_size=100, slow_consumer_policy=SlowConsumerPolicy.DROP_OLDEST)
+        fast = [FakeWebSocket() for _ in range(20)]
+        slow = FakeWebSocket(delay=0.2)
+        stalled = FakeWebSocket(stall=True)
+        for ws in [*fast, slow, stalled]:
+            await manager.connect(ws, StreamType.BACKTEST, "bt_1")
+
+        start = time.perf_counter()
+        for i in range(10):
+            sent = await manager.send_to_stream(StreamType.BACKTEST, "bt_1", {"type": "trade", "n": i})
+            assert sent == 22
+        assert time.perf_counter() - start < 0.05
+
+        await wait_until(lambda: all(len(ws.sent) == 10 for ws in fast))
+        assert len(slow.sent) < 10
+
+        for ws in [*fast, slow, stalled]:
+            await manager.disconnect(ws, StreamType.BACKTEST, "bt_1")
+        assert manager.get_stats()["total"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_client_is_dropped(self):
+        manager = WebSocketManager()
+        healthy, broken = FakeWebSocket(), FakeWebSocket(fail=True)
+        await manager.connect(healthy, StreamType.BACKTEST, "bt_1")
+        await manager.connect(broken, StreamType.BACKTEST, "bt_1")
+
+        await manager.send_to_stream(StreamType.BACKTEST, "bt_1", {"type": "trade"})
+
+        await wait_until(lambda: manager.get_stream_connections(StreamType.BACKTEST, "bt_1") == 1)
+        assert broken.closed_with == 1013
+        assert healthy.sent == [{"type": "trade"}]
+        await manager.disconnect(healthy, StreamType.BACKTEST, "bt_1")
+
+    @pytest.mark.asyncio
+    async def test_progress_updates_coalesce_for_backlogged_client(self):
+        manager = WebSocketManager(slow_consumer_policy=SlowConsumerPolicy.COALESCE)
+        ws = FakeWebSocket(delay=0.05)
+        await manager.connect(ws, StreamType.BACKTEST, "bt_1")
+
+        for i in range(50):
+            await manager.send_progress("bt_1", float(i), datetime(2024, 1, 1))
+        await manager.send_complete("bt_1", {})
+
+        await wait_until(lambda: ws.sent and ws.sent[-1]["type"] == "complete")
+        progress = [m["data"]["progress"] for m in ws.sent if m["type"] == "progress"]
+        assert len(progress) < 5
+        assert progress[-1] == 49.0
+        assert manager.get_stats()["send_queues"]["coalesced"] > 40
+        await manager.disconnect(ws, StreamType.BACKTEST, "bt_1")
+
+
+
+class TestJsonEncoding:
+    """Test cases for broadcast payload encoding."""
+
+    MESSAGE = {
+        "type": "trade",
+        "timestamp": datetime(2024, 1, 2, 3, 4, 5, 600000, tzinfo=timezone.utc),
+        "data": {
+            "side": StreamType.BACKTEST,
+            "price": Decimal("50123.45"),
+            "size": 0.25,
+            "reasoning": "Pullback into demand — 2R target",
+            "hourly": {9: 1, 14: 2},
+        },
+    }
+
+    EXPECTED = {
+        "type": "trade",
+        "timestamp": "2024-01-02T03:04:05.600000+00:00",
+        "data": {
+            "side": "backtest",
+            "price": "50123.45",
+            "size": 0.25,
+            "reasoning": "Pullback into demand — 2R target",
+            "hourly": {"9": 1, "14": 2},
+        },
+    }
+
+    def test_decimal_datetime_enum_semantics(self):
+        assert json.loads(json_encoding.dumps(self.MESSAGE)) == self.EXPECTED
+
+    def test_stdlib_fallback_matches(self, monkeypatch):
+        encoded = json_encoding.dumps(self.MESSAGE)
+
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        fallback = importlib.reload(json_encoding)
+        try:
+            assert not fallback.HAS_ORJSON
+            assert fallback.dumps(self.MESSAGE) == encoded
+        finally:
+            monkeypatch.undo()
+            importlib.reload(json_encoding)
+
+    def test_rejects_unknown_types(self):
+        with pytest.raises(TypeError):
+            json_encoding.dumps({"value": object()})
+
+    @pytest.mark.asyncio
+    async def test_broadcast_encodes_once(self, monkeypatch):
+        calls = []
+
+        def counting_dumps(message):
+            calls.append(message)
+            return json_encoding.dumps(message)
+
+        monkeypatch.setattr(websocket_manager, "dumps", counting_dumps)
+        manager = WebSocketManager()
+        clients = [FakeWebSocket() for _ in range(50)]
+        for ws in clients:
+            await manager.connect(ws, StreamType.BACKTEST, "bt_1")
+
+        await manager.send_trade("bt_1", {"price": Decimal("1.5")})
+
+        await wait_until(lambda: all(ws.payloads for ws in clients))
+        assert len(calls) == 1
+        assert len({id(ws.payloads[0]) for ws in clients}) == 1
+        assert clients[0].sent[0]["data"] == {"price": "1.5"}
+        for ws in clients:
+            await manager.disconnect(ws, StreamType.BACKTEST, "bt_1")
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_benchmark_broadcast_cpu():
+    """Per-broadcast CPU: per-client stdlib encoding vs encode-once fan-out.
+
+    The broadcast itself (encode + enqueue) is what a producer pays and is
+    compared; writer drain time is reported alongside it.
+    """
+    message = {
+        "type": "trade",
+        "timestamp": datetime(2024, 1, 1).isoformat(),
+        "data": {
+            "trade_id": "trade_123",
+            "asset": "BTC-USD",
+            "direction": "long",
+            "entry_price": 50123.45,
+            "stop_loss": 49500.0,
+            "take_profit_levels": [51000.0, 52000.0, 53500.0],
+            "position_size": 0.25,
+            "confluence_score": 0.82,
+            "reasoning": "Higher-timeframe demand retest with LE candle confirmation. " * 4,
+        },
+    }
+
+    async def discard(payload):
+        pass
+
+    results = {}
+    for clients in (1, 100, 1000):
+        broadcasts = max(20, 20_000 // clients)
+
+        # Before: every connection serialized the message itself (send_json)
+        start = time.process_time()
+        for _ in range(broadcasts):
+            for _ in range(clients):
+                await discard(json.dumps(message, separators=(",", ":"), ensure_ascii=False))
+        per_client = (time.process_time() - start) / broadcasts
+
+        # After: encode once and queue the same text for every client...
+        queues = [ClientSendQueue(discard, max_size=broadcasts + 1) for _ in range(clients)]
+        start = time.process_time()
+        for _ in range(broadcasts):
+            payload = json_encoding.dumps(message)
+            for queue in queues:
+                queue.put(payload)
+        encode_once = (time.process_time() - start) / broadcasts
+
+        # ...then the writers only hand it to the socket
+        start = time.process_time()
+        for queue in queues:
+            queue.start()
+        while any(len(q) for q in queues):
+            await asyncio.sleep(0)
+        drain = (time.process_time() - start) / broadcasts
+        for queue in queues:
+            await queue.close()
+
+        results[clients] = (per_client, encode_once)
+        print(f"\n{clients:>5} clients - per-client json: {per_client * 1e6:8.1f}us, "
+              f"encode-once ({'orjson' if json_encoding.HAS_ORJSON else 'json'}): "
+              f"{encode_once * 1e6:8.1f}us + writers {drain * 1e6:8.1f}us per broadcast")
+
+    per_client, encode_once = results[1000]
+    assert encode_once < per_client